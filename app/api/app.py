@@ -0,0 +1,121 @@
+import asyncio
+from contextlib import asynccontextmanager
+from datetime import date
+from typing import AsyncIterator
+
+from core.analysis_index import (
+    AnalysisIndex,
+    FacetCount,
+    PainPointCluster,
+    PainPointHit,
+)
+from core.job_service import JobItemResult, JobRecord, JobService
+from core.storage import Storage
+from fastapi import FastAPI, HTTPException
+from fastapi.responses import StreamingResponse
+from infrastructure.metrics_exporter import MetricsExporter
+from infrastructure.service_collection import ServiceProvider
+from pydantic import BaseModel, Field
+
+
+class SubmitJobRequest(BaseModel):
+    items: list[str] = Field(min_length=1, description="The queries to search or the URLs to scrape or analyze")
+    file_path: str | None = Field(
+        default=None, description="The storage folder of the results, today's date by default")
+
+
+def create_app(service_provider: ServiceProvider) -> FastAPI:
+    """
+    Builds the job API over the services of the process, which stay warm between requests.
+    """
+
+    jobs = service_provider.get(JobService)
+
+    @asynccontextmanager
+    async def lifespan(_: FastAPI) -> AsyncIterator[None]:
+        storage = service_provider.get(Storage)
+        metrics = service_provider.get(MetricsExporter)
+        metrics.start()
+        await jobs.start()
+        try:
+            yield
+        finally:
+            await jobs.close()
+            await storage.aclose()
+            metrics.close()
+
+    app = FastAPI(title="Pain point research jobs", lifespan=lifespan)
+
+    @app.get("/health")
+    async def health() -> dict:
+        return jobs.summary()
+
+    @app.post("/jobs/{kind}", status_code=202)
+    async def submit_job(kind: str, request: SubmitJobRequest) -> JobRecord:
+        try:
+            return jobs.submit(kind, request.items, request.file_path)
+        except ValueError as e:
+            raise HTTPException(status_code=422, detail=str(e))
+
+    @app.get("/jobs")
+    async def list_jobs() -> list[JobRecord]:
+        return jobs.list_jobs()
+
+    @app.get("/jobs/{job_id}")
+    async def get_job(job_id: str) -> JobRecord:
+        return _found(jobs.get(job_id), job_id)
+
+    @app.delete("/jobs/{job_id}")
+    async def cancel_job(job_id: str) -> JobRecord:
+        return _found(await jobs.cancel(job_id), job_id)
+
+    @app.get("/jobs/{job_id}/results")
+    async def stream_results(job_id: str, offset: int = 0) -> StreamingResponse:
+        """
+        Streams the results as JSON lines while the job runs, ending once it finishes.
+        """
+
+        try:
+            results = jobs.results(job_id, offset)
+        except KeyError:
+            raise HTTPException(status_code=404, detail=f"Job {job_id} not found")
+        return StreamingResponse(_json_lines(results), media_type="application/x-ndjson")
+
+    @app.get("/index/search")
+    async def search_pain_points(q: str, since: date | None = None, until: date | None = None,
+                                 limit: int = 20) -> list[PainPointHit]:
+        index = service_provider.get(AnalysisIndex)
+        return await asyncio.to_thread(index.search, q, since, until, limit)
+
+    @app.get("/index/clusters")
+    async def top_clusters(since: date | None = None, until: date | None = None, min_size: int = 2,
+                           limit: int = 10) -> list[PainPointCluster]:
+        index = service_provider.get(AnalysisIndex)
+        return await asyncio.to_thread(index.top_clusters, since, until, min_size, limit)
+
+    @app.get("/index/{facet}")
+    async def top_facets(facet: str, since: date | None = None, until: date | None = None,
+                         limit: int = 10) -> list[FacetCount]:
+        """
+        The top categories, providers or domains by pain points, e.g. /index/categories?since=2024-06-01.
+        """
+
+        index = service_provider.get(AnalysisIndex)
+        queries = {"categories": index.top_categories, "providers": index.top_providers,
+                   "domains": index.top_domains}
+        if facet not in queries:
+            raise HTTPException(status_code=404, detail=f"Unknown facet {facet}")
+        return await asyncio.to_thread(queries[facet], since, until, limit)
+
+    return app
+
+
+def _found(record: JobRecord | None, job_id: str) -> JobRecord:
+    if record is None:
+        raise HTTPException(status_code=404, detail=f"Job {job_id} not found")
+    return record
+
+
+async def _json_lines(results: AsyncIterator[JobItemResult]) -> AsyncIterator[str]:
+    async for result in results:
+        yield result.model_dump_json() + "\n"
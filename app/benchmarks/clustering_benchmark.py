@@ -0,0 +1,62 @@
+#!/usr/bin/env python
+"""
+Measures the clustering of pain points on synthetic descriptions: a few dozen problems, each
+written in many wordings. Purity is the share of pain points in the cluster of their problem.
+
+Usage: python -m benchmarks.clustering_benchmark [pain points] [threshold]
+"""
+import random
+import sys
+import time
+
+import numpy as np
+from configuration import ClusteringSettings
+from core.pain_point_clustering import cluster
+
+SUBJECTS = ["donor data", "volunteer hours", "grant reports", "event registrations", "recurring donations",
+            "board minutes", "membership renewals", "payroll", "food pantry inventory", "email newsletters",
+            "case notes", "tax receipts"]
+PROBLEMS = ["are scattered across spreadsheets", "are tracked by hand", "live in systems that never sync",
+            "take days to reconcile", "get lost when staff leave", "are copied manually every month"]
+AUDIENCES = ["for our small team", "for the staff", "for volunteers", "for the finance lead", ""]
+FILLERS = ["often", "still", "always", "sadly", "frankly"]
+
+
+def build_pain_points(count: int, seed: int = 42) -> tuple[list[str], list[str | None], list[int]]:
+    """
+    Returns the descriptions, the quotes and the problem of each synthetic pain point.
+    """
+
+    rng = random.Random(seed)
+    descriptions, quotes, problems = [], [], []
+    for _ in range(count):
+        subject, problem = rng.randrange(len(SUBJECTS)), rng.randrange(len(PROBLEMS))
+        words = f"{SUBJECTS[subject]} {PROBLEMS[problem]} {rng.choice(AUDIENCES)}".split()
+        if rng.random() < 0.5:
+            words.insert(rng.randrange(len(words)), rng.choice(FILLERS))
+        descriptions.append(" ".join(words).capitalize())
+        quotes.append(f"We told them {' '.join(words)}" if rng.random() < 0.7 else None)
+        problems.append(subject * len(PROBLEMS) + problem)
+    return descriptions, quotes, problems
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 30000
+    settings = ClusteringSettings({})
+    threshold = float(sys.argv[2]) if len(sys.argv) > 2 else settings.similarity_threshold
+
+    descriptions, quotes, problems = build_pain_points(count)
+    started = time.perf_counter()
+    labels, _ = cluster(descriptions, quotes, threshold, settings.dimensions, settings.lsh_tables,
+                        settings.lsh_bits, settings.neighbours)
+    seconds = time.perf_counter() - started
+
+    problems = np.asarray(problems)
+    purity = sum(np.bincount(problems[labels == label]).max() for label in np.unique(labels)) / count
+    print(f"{count} pain points, {len(SUBJECTS) * len(PROBLEMS)} problems, threshold {threshold}")
+    print(f"{seconds:.2f}s, {labels.max() + 1} clusters, largest {np.bincount(labels)[:5].tolist()}, "
+          f"purity {purity:.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,187 @@
+"""
+Fixtures of the pipeline benchmark: a synthetic corpus of nonprofit-style pages served from a
+local HTTP server, a DuckDuckGo search answering from the corpus and a chat model with a
+configurable latency, so runs are repeatable and need no network or API keys.
+"""
+import asyncio
+import json
+import random
+import time
+from dataclasses import dataclass
+
+from aiohttp import web
+from configuration import Settings
+from core.chat_model import ChatModelProvider
+from core.domain import ContentAnalysis, PainPointCategories
+from core.storage import Storage
+from infrastructure.web_search_services import DuckDuckGoSearch
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, BaseMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+
+
+class PageKind:
+    NORMAL = "normal"
+    SLOW = "slow"
+    FAILING = "failing"
+    HUGE = "huge"
+
+
+ORGANIZATIONS = ["Riverside Food Bank", "Hope Shelter Alliance", "Youth Arts Collective",
+                 "Green Valley Land Trust", "Literacy Partners", "Community Health Network"]
+PAIN_POINTS = [
+    "Our volunteers still track their hours in shared spreadsheets that nobody keeps up to date.",
+    "Donor data is scattered across three tools, so thank-you letters go out weeks late.",
+    "Grant reports take our small team days of copying numbers by hand.",
+    "We lose track of recurring donors when their cards expire.",
+    "Event registrations and payments live in different systems that never match.",
+]
+PROVIDERS = ["Bloomerang", "Givebutter", "Little Green Light", "Neon One", "DonorPerfect"]
+
+
+@dataclass
+class FixturePage:
+    path: str
+    kind: str
+    html: str
+
+
+def build_corpus(pages: int, seed: int = 42, slow_ratio: float = 0.1, failing_ratio: float = 0.05,
+                 huge_ratio: float = 0.02) -> list[FixturePage]:
+    """
+    Builds the same pages for the same arguments: mostly normal blog posts, plus slow,
+    failing and huge ones in the given proportions.
+    """
+
+    rng = random.Random(seed)
+    corpus = []
+    for i in range(pages):
+        draw = rng.random()
+        if draw < failing_ratio:
+            kind = PageKind.FAILING
+        elif draw < failing_ratio + slow_ratio:
+            kind = PageKind.SLOW
+        elif draw < failing_ratio + slow_ratio + huge_ratio:
+            kind = PageKind.HUGE
+        else:
+            kind = PageKind.NORMAL
+        organization = rng.choice(ORGANIZATIONS)
+        paragraphs = [rng.choice(PAIN_POINTS) + f" {rng.choice(PROVIDERS)} helped us fix it."
+                      for _ in range(rng.randint(4, 12) * (400 if kind == PageKind.HUGE else 1))]
+        body = "".join(f"<p>{p}</p>" for p in paragraphs)
+        html = (f"<html><head><title>{organization} blog #{i}</title></head><body>"
+                f"<nav>Home | About | Donate</nav><article><h1>How {organization} works</h1>{body}"
+                f"</article><footer>Contact us</footer></body></html>")
+        corpus.append(FixturePage(path=f"/posts/{i}", kind=kind, html=html))
+    return corpus
+
+
+class FixtureServer:
+    """
+    Serves a corpus on a local port: slow pages answer after `slow_seconds`,
+    failing pages answer 500.
+    """
+
+    def __init__(self, corpus: list[FixturePage], slow_seconds: float = 1.0):
+        self._pages = {page.path: page for page in corpus}
+        self._slow_seconds = slow_seconds
+        self._runner: web.AppRunner | None = None
+        self.base_url = ""
+
+    def url(self, page: FixturePage) -> str:
+        return f"{self.base_url}{page.path}"
+
+    async def start(self) -> None:
+        app = web.Application()
+        app.router.add_get("/posts/{id}", self._handle)
+        self._runner = web.AppRunner(app, access_log=None)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, "127.0.0.1", 0)
+        await site.start()
+        port = site._server.sockets[0].getsockname()[1]
+        self.base_url = f"http://127.0.0.1:{port}"
+
+    async def stop(self) -> None:
+        if self._runner:
+            await self._runner.cleanup()
+
+    async def _handle(self, request: web.Request) -> web.Response:
+        page = self._pages.get(request.path)
+        if page is None:
+            raise web.HTTPNotFound()
+        if page.kind == PageKind.SLOW:
+            await asyncio.sleep(self._slow_seconds)
+        if page.kind == PageKind.FAILING:
+            raise web.HTTPInternalServerError(text="fixture failure")
+        return web.Response(text=page.html, content_type="text/html")
+
+
+class StubDuckDuckGoSearch(DuckDuckGoSearch):
+    """
+    DuckDuckGoSearch whose raw results come from the corpus after `latency_seconds`,
+    so the result conversion and storage of the real engine are measured.
+    """
+
+    def __init__(self, settings: Settings, storage: Storage, results: dict[str, list[dict]],
+                 latency_seconds: float = 0.2):
+        super().__init__(settings, storage)
+        self._results = results
+        self._latency_seconds = latency_seconds
+
+    def _search_with_retries(self, query: str) -> list[dict]:
+        # runs in an executor like the real DDGS call
+        time.sleep(self._latency_seconds)
+        return self._results.get(query, [])
+
+
+def search_results(urls: list[str], query: str) -> list[dict]:
+    return [{"title": f"{query} result {i}", "href": url, "body": f"About {query}"}
+            for i, url in enumerate(urls)]
+
+
+class LatencyChatModel(BaseChatModel):
+    """Chat model answering a valid content analysis after a fixed latency"""
+
+    latency_seconds: float = 1.0
+    calls: int = 0
+
+    @property
+    def _llm_type(self) -> str:
+        return "benchmark-stub"
+
+    def _generate(self, messages: list[BaseMessage], stop=None, run_manager=None, **kwargs) -> ChatResult:
+        time.sleep(self.latency_seconds)
+        self.calls += 1
+        pain_point = PAIN_POINTS[self.calls % len(PAIN_POINTS)]
+        analysis = {
+            "url": "",
+            "title": "",
+            "analysis_date": "2024-01-01T12:00:00",
+            "content_type": "non_profit_resource_blog",
+            "service_providers": [{
+                "name": PROVIDERS[self.calls % len(PROVIDERS)],
+                "website": None,
+                "pain_points": [{
+                    "description": pain_point,
+                    "category": PainPointCategories.OTHER,
+                    "source_quote": pain_point,
+                }],
+            }],
+        }
+        # an invalid answer would send every analysis down the repair path instead
+        assert ContentAnalysis.model_validate(analysis)
+        return ChatResult(generations=[ChatGeneration(message=AIMessage(content=json.dumps(analysis)))])
+
+    def bind_tools(self, tools, *, tool_choice=None, **kwargs):
+        return self
+
+
+class StubChatModelProvider(ChatModelProvider):
+    def __init__(self, latency_seconds: float = 1.0):
+        self.chat_model = LatencyChatModel(latency_seconds=latency_seconds)
+
+    def can_handle(self, chat_model_settings=None) -> bool:
+        return True
+
+    def get_chat_model(self, chat_model_settings=None, verbose: bool = False) -> BaseChatModel:
+        return self.chat_model
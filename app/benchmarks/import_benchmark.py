@@ -0,0 +1,116 @@
+#!/usr/bin/env python
+"""
+Measures the startup cost of the entry points: the time to import each of them in a fresh
+interpreter, and which heavy dependencies they load before anything runs.
+
+Usage: python -m benchmarks.import_benchmark [--repeat N] [--top N] [--check] [module ...]
+"""
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+from typing import Any
+
+APP_DIR = Path(__file__).resolve().parent.parent
+
+DEFAULT_MODULES = (
+    "infrastructure.service_collection",
+    "core.workers",
+    "worker",
+    "campaign",
+    "main",
+)
+
+# loaded by the providers that need them, never at import time
+HEAVY_MODULES = (
+    "playwright",
+    "langchain_core",
+    "langchain_anthropic",
+    "anthropic",
+    "ddgs",
+    "langdetect",
+)
+
+PROBE = """
+import json, sys, time
+started = time.perf_counter()
+__import__(sys.argv[1])
+seconds = time.perf_counter() - started
+print(json.dumps({"seconds": seconds, "heavy": [m for m in sys.argv[2:] if m in sys.modules]}))
+"""
+
+
+def import_profile(module: str) -> dict[str, Any]:
+    """
+    Imports the module in a fresh interpreter, returns the seconds it took and the heavy modules it loaded.
+    """
+
+    completed = subprocess.run(
+        [sys.executable, "-c", PROBE, module, *HEAVY_MODULES],
+        cwd=APP_DIR, capture_output=True, text=True, check=True)
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+
+def slowest_imports(module: str, top: int) -> list[tuple[float, str]]:
+    """
+    Returns the `top` imports with the highest cumulative time, from `python -X importtime`.
+    """
+
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=APP_DIR, capture_output=True, text=True, check=True)
+    imports = []
+    for line in completed.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line.split("|")
+        imports.append((int(cumulative) / 1_000_000, name.strip()))
+    return sorted(imports, reverse=True)[:top]
+
+
+def run(modules: list[str], repeat: int) -> dict[str, dict[str, Any]]:
+    report = {}
+    for module in modules:
+        profiles = [import_profile(module) for _ in range(repeat)]
+        seconds = [profile["seconds"] for profile in profiles]
+        report[module] = {
+            "median_ms": statistics.median(seconds) * 1000,
+            "min_ms": min(seconds) * 1000,
+            "heavy": profiles[-1]["heavy"],
+        }
+    return report
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Benchmark the import time of the entry points")
+    parser.add_argument("modules", nargs="*", default=list(DEFAULT_MODULES))
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--top", type=int, default=0,
+                        help="Also print the N slowest imports of each module")
+    parser.add_argument("--check", action="store_true",
+                        help="Exit with an error if a module loads a heavy dependency at import time")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    report = run(args.modules, args.repeat)
+
+    print(f"median of {args.repeat} fresh interpreters")
+    print(f"{'module':<36}{'median ms':>10}{'min ms':>9}  heavy dependencies")
+    for module, m in report.items():
+        print(f"{module:<36}{m['median_ms']:>10.0f}{m['min_ms']:>9.0f}  {', '.join(m['heavy']) or '-'}")
+
+    for module in args.modules if args.top else ():
+        print(f"\nslowest imports of {module}")
+        for seconds, name in slowest_imports(module, args.top):
+            print(f"{seconds * 1000:>8.1f} ms  {name}")
+
+    if args.check and any(m["heavy"] for m in report.values()):
+        sys.exit("Heavy dependencies are loaded at import time")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,351 @@
+#!/usr/bin/env python
+"""
+End-to-end benchmark of the pipeline against a local fixture server and a stub LLM.
+
+Measures pages/sec, p50/p95 latency and RSS of DuckDuckGoSearch (stubbed), WebScraperGeneric
+and ContentAnalysisService one stage at a time, then of the whole PipelineRunner, and compares
+them with a saved baseline. The RSS is sampled while each stage runs: its peak, and how far it
+rose above the RSS the stage started with. The scrape stage needs the Playwright browsers
+(`playwright install chromium`).
+
+Usage: python -m benchmarks.pipeline_benchmark [--pages N] [--queries N] [--llm-latency S]
+                                               [--search-latency S] [--slow-latency S]
+                                               [--baseline PATH] [--save-baseline] [--tolerance F]
+"""
+import argparse
+import asyncio
+import json
+import os
+import resource
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import Any, Awaitable, Callable
+
+from benchmarks.fixtures import (
+    FixtureServer,
+    StubChatModelProvider,
+    StubDuckDuckGoSearch,
+    build_corpus,
+    search_results,
+)
+from configuration import Settings, get_settings
+from core.chat_model import ChatModelProvider
+from core.content_analysis import ContentAnalysisService
+from core.pipeline import PipelineRunner
+from core.storage import Storage
+from core.web_scrape import WebScraper
+from core.web_search import SearchEngine
+from infrastructure.app_host import AppHost
+from infrastructure.content_analysis_module import ContentAnalysisModule
+from infrastructure.local_services import LocalModule
+from infrastructure.pipeline_module import PipelineModule
+from infrastructure.service_collection import ApplicationModule
+from infrastructure.web_scrape_services import WebScraperModule
+from injector import Binder, Injector, Module, provider, singleton
+
+DEFAULT_BASELINE = "benchmarks/pipeline_baseline.json"
+SEARCH_STAGE = "search"
+SCRAPE_STAGE = "scrape"
+ANALYSIS_STAGE = "analysis"
+PIPELINE = "pipeline"
+
+# metric -> whether a higher value is better
+COMPARED_METRICS = {"pages_per_second": True, "p50_ms": False, "p95_ms": False, "peak_rss_mb": False,
+                    "rss_growth_mb": False}
+# latencies below this are noise, whatever their relative change
+MIN_COMPARED_MS = 5.0
+
+
+class BenchmarkModule(Module):
+    """
+    Binds the stub search engine and chat model in place of the real ones.
+    """
+
+    def __init__(self, results: dict[str, list[dict]], search_latency: float, llm_latency: float):
+        self._results = results
+        self._search_latency = search_latency
+        self._chat_model_provider = StubChatModelProvider(llm_latency)
+
+    def configure(self, binder: Binder) -> None:
+        binder.bind(ChatModelProvider, to=self._chat_model_provider)
+
+    @singleton
+    @provider
+    def provide_search_engine(self, settings: Settings, storage: Storage) -> SearchEngine:
+        return StubDuckDuckGoSearch(settings, storage, self._results, self._search_latency)
+
+
+def percentile(values: list[float], q: float) -> float:
+    """
+    Nearest-rank percentile, 0 for no values.
+    """
+
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, max(0, round(q / 100 * len(ordered)) - 1))]
+
+
+def rss_mb() -> float:
+    """
+    The current resident set size, from /proc on Linux. Elsewhere only the high-water mark of the
+    process is known, so the peak of a stage is the peak of the run so far.
+    """
+
+    try:
+        with open("/proc/self/statm") as statm:
+            return int(statm.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / (1024 * 1024)
+    except OSError:
+        # ru_maxrss is in kilobytes on Linux and bytes on macOS
+        rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return rss / (1024 * 1024 if sys.platform == "darwin" else 1024)
+
+
+class RssSampler:
+    """
+    Samples the RSS on a thread while a stage runs, so each stage reports its own peak.
+    """
+
+    def __init__(self, interval_seconds: float = 0.01):
+        self._interval_seconds = interval_seconds
+        self._stopped = threading.Event()
+        self._thread = threading.Thread(target=self._sample, name="rss-sampler", daemon=True)
+        self.start_mb = self.peak_mb = 0.0
+
+    def __enter__(self) -> "RssSampler":
+        self.start_mb = self.peak_mb = rss_mb()
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self._stopped.set()
+        self._thread.join()
+        self.peak_mb = max(self.peak_mb, rss_mb())
+
+    def _sample(self) -> None:
+        while not self._stopped.wait(self._interval_seconds):
+            self.peak_mb = max(self.peak_mb, rss_mb())
+
+    def summary(self) -> dict[str, float]:
+        return {"peak_rss_mb": round(self.peak_mb, 1), "rss_growth_mb": round(self.peak_mb - self.start_mb, 1)}
+
+
+def stage_summary(items: int, succeeded: int, elapsed: float, latencies: list[float],
+                  rss: RssSampler) -> dict[str, Any]:
+    return {
+        "items": items,
+        "succeeded": succeeded,
+        "elapsed_seconds": round(elapsed, 3),
+        "pages_per_second": round(items / elapsed, 3) if elapsed else 0.0,
+        "p50_ms": round(percentile(latencies, 50) * 1000, 1),
+        "p95_ms": round(percentile(latencies, 95) * 1000, 1),
+        **rss.summary(),
+    }
+
+
+async def measure(items: list, handler: Callable[[Any], Awaitable[Any]],
+                  concurrency: int) -> tuple[list, dict[str, Any]]:
+    """
+    Runs the handler over the items, `concurrency` at a time, and returns the non-empty
+    outputs with the stage summary. A handler returning None or raising counts as a failure.
+    """
+
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies: list[float] = []
+
+    async def timed(item: Any) -> Any:
+        async with semaphore:
+            started = time.perf_counter()
+            try:
+                return await handler(item)
+            except Exception as e:
+                print(f"  {item}: {e}")
+                return None
+            finally:
+                latencies.append(time.perf_counter() - started)
+
+    with RssSampler() as rss:
+        started = time.perf_counter()
+        outputs = [o for o in await asyncio.gather(*(timed(item) for item in items)) if o is not None]
+        elapsed = time.perf_counter() - started
+    return outputs, stage_summary(len(items), len(outputs), elapsed, latencies, rss)
+
+
+async def run_stages(injector: Injector, settings: Settings, queries: list[str]) -> dict[str, dict[str, Any]]:
+    pipeline_settings = settings.pipeline_settings
+    search_engine = injector.get(SearchEngine)
+    web_scraper = injector.get(WebScraper)
+    content_analysis = injector.get(ContentAnalysisService)
+    chat_model_provider = injector.get(ChatModelProvider)
+    stages = {}
+
+    async def search(query: str) -> list[str] | None:
+        return [r.url for r in await search_engine.search(query, "stages") or []] or None
+
+    found, stages[SEARCH_STAGE] = await measure(queries, search, pipeline_settings.search_concurrency)
+    urls = [url for urls in found for url in urls]
+
+    async with web_scraper.session() as session:
+        async def scrape(url: str) -> dict | None:
+            result = await session.scrape(url, "stages")
+            return result.model_dump() if result and result.success else None
+
+        pages, stages[SCRAPE_STAGE] = await measure(urls, scrape, pipeline_settings.scrape_concurrency)
+
+    async def analyze(page: dict) -> dict | None:
+        # the analysis makes blocking LLM calls, as in the pipeline
+        return await asyncio.to_thread(
+            content_analysis.analyze_content, page["url"], page, chat_model_provider, "stages")
+
+    _, stages[ANALYSIS_STAGE] = await measure(pages, analyze, pipeline_settings.analysis_concurrency)
+    return stages
+
+
+async def run_pipeline(injector: Injector, queries: list[str]) -> dict[str, Any]:
+    with RssSampler() as rss:
+        result = await injector.get(PipelineRunner).run(queries, "pipeline")
+    summary = {
+        "items": result.urls,
+        "succeeded": result.analyzed,
+        "elapsed_seconds": round(result.elapsed_seconds, 3),
+        "pages_per_second": round(result.urls / result.elapsed_seconds, 3) if result.elapsed_seconds else 0.0,
+        **rss.summary(),
+    }
+    for name, stage in result.stages.items():
+        summary[f"{name}_utilization"] = round(stage["utilization"], 3)
+    return summary
+
+
+async def run(args: argparse.Namespace) -> dict[str, Any]:
+    workspace = tempfile.mkdtemp(prefix="pipeline-benchmark-")
+    # The benchmark settings override the environment before the services read them
+    os.environ.update({
+        "LOCAL_STORAGE_PATH": f"{workspace}/storage",
+        "SEARCH_LIMIT": str(args.pages),
+        "SCRAPER_RETRIES": "1",
+        "SCRAPER_TIMEOUT": str(int((args.slow_latency + 10) * 1000)),
+        "LLM_REQUESTS_PER_MINUTE": "0",
+        "LLM_TOKENS_PER_MINUTE": "0",
+        "CONTENT_ANALYSIS_CASCADE_ENABLED": "false",
+    })
+    # only read for the model settings, the stub chat model answers every call
+    for variable in ("LLM_HOST", "LLM_PROVIDER"):
+        os.environ.setdefault(variable, "anthropic")
+    os.environ.setdefault("LLM_MODEL_NAME", "benchmark-stub")
+    settings = get_settings()
+
+    corpus = build_corpus(args.pages, seed=args.seed)
+    server = FixtureServer(corpus, slow_seconds=args.slow_latency)
+    await server.start()
+    queries = [f"nonprofit software pain points {i}" for i in range(args.queries)]
+    # every query finds its own share of the corpus
+    results = {query: search_results([server.url(page) for page in corpus[i::args.queries]], query)
+               for i, query in enumerate(queries)}
+
+    injector = Injector([
+        ApplicationModule(),
+        LocalModule(app_host=AppHost.LOCAL, storage_backend=settings.local_settings.storage_backend),
+        WebScraperModule(),
+        ContentAnalysisModule(),
+        PipelineModule(),
+        BenchmarkModule(results, args.search_latency, args.llm_latency),
+    ])
+    try:
+        stages = await run_stages(injector, settings, queries)
+        stages[PIPELINE] = await run_pipeline(injector, queries)
+    finally:
+        await injector.get(Storage).aclose()
+        await server.stop()
+
+    pipeline_settings = settings.pipeline_settings
+    return {
+        "config": {
+            "pages": args.pages,
+            "queries": args.queries,
+            "seed": args.seed,
+            "search_latency": args.search_latency,
+            "llm_latency": args.llm_latency,
+            "slow_latency": args.slow_latency,
+            "search_concurrency": pipeline_settings.search_concurrency,
+            "scrape_concurrency": pipeline_settings.scrape_concurrency,
+            "analysis_concurrency": pipeline_settings.analysis_concurrency,
+        },
+        "stages": stages,
+    }
+
+
+def compare(report: dict[str, Any], baseline: dict[str, Any], tolerance: float) -> list[str]:
+    """
+    Prints every metric next to its baseline and returns the regressions beyond `tolerance`.
+    """
+
+    regressions = []
+    print(f"\n{'stage':<10}{'metric':<18}{'baseline':>11}{'current':>11}{'change':>9}")
+    for stage, metrics in report["stages"].items():
+        for metric, higher_is_better in COMPARED_METRICS.items():
+            before = baseline.get("stages", {}).get(stage, {}).get(metric)
+            after = metrics.get(metric)
+            if not before or after is None:
+                continue
+            if metric.endswith("_ms") and max(before, after) < MIN_COMPARED_MS:
+                continue
+            change = (after - before) / before
+            print(f"{stage:<10}{metric:<18}{before:>11.1f}{after:>11.1f}{change:>+8.0%}")
+            if (-change if higher_is_better else change) > tolerance:
+                regressions.append(f"{stage} {metric}: {before} -> {after}")
+    return regressions
+
+
+def print_report(report: dict[str, Any]) -> None:
+    print(f"{report['config']['pages']} pages, {report['config']['queries']} queries")
+    print(f"{'stage':<10}{'items':>7}{'ok':>6}{'pages/s':>9}{'p50 ms':>9}{'p95 ms':>9}{'rss MB':>8}{'+MB':>7}")
+    for stage, m in report["stages"].items():
+        latencies = "".join(f"{m[key]:>9.0f}" if key in m else f"{'-':>9}" for key in ("p50_ms", "p95_ms"))
+        print(f"{stage:<10}{m['items']:>7}{m['succeeded']:>6}{m['pages_per_second']:>9.2f}"
+              f"{latencies}{m['peak_rss_mb']:>8.0f}{m.get('rss_growth_mb', 0):>7.0f}")
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Benchmark the pipeline end to end")
+    parser.add_argument("--pages", type=int, default=60)
+    parser.add_argument("--queries", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--search-latency", type=float, default=0.2)
+    parser.add_argument("--llm-latency", type=float, default=0.5)
+    parser.add_argument("--slow-latency", type=float, default=1.0)
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE)
+    parser.add_argument("--save-baseline", action="store_true",
+                        help="Save this run as the baseline instead of comparing with it")
+    parser.add_argument("--tolerance", type=float, default=0.15,
+                        help="The relative change of a metric counted as a regression")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    report = asyncio.run(run(args))
+    print_report(report)
+
+    baseline_path = Path(args.baseline)
+    if args.save_baseline:
+        baseline_path.write_text(json.dumps(report, indent=4))
+        print(f"\nSaved the baseline to {baseline_path}")
+        return
+    if not baseline_path.exists():
+        print(f"\nNo baseline at {baseline_path}, run with --save-baseline to create it")
+        return
+
+    baseline = json.loads(baseline_path.read_text())
+    if baseline.get("config") != report["config"]:
+        print("\nThe baseline was run with another configuration, the comparison is indicative only")
+    regressions = compare(report, baseline, args.tolerance)
+    if regressions:
+        print("\nRegressions:\n  " + "\n  ".join(regressions))
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+#!/usr/bin/env python
+"""
+Compares the JSON serializers on scrape results shaped like the ones written by the scraper.
+
+Usage: python -m benchmarks.serialization_benchmark [documents] [repeat]
+"""
+import sys
+import timeit
+from datetime import datetime
+
+from core.domain import ScrapePageResult
+from core.serialization import OrjsonSerializer, StdlibJsonSerializer
+
+
+def build_documents(count: int) -> list[dict]:
+    paragraph = "Our clients struggle with slow onboarding and manual reporting. " * 40
+    return [
+        ScrapePageResult(
+            url=f"https://example.com/articles/{i}",
+            created_at=datetime(2024, 1, 1, 12, 0, i % 60),
+            title=f"Article {i}",
+            content=paragraph,
+            success=True,
+            error_message=None,
+        ).model_dump()
+        for i in range(count)
+    ]
+
+
+def run(documents: int = 1000, repeat: int = 5) -> list[tuple[str, float, float, int]]:
+    """
+    Returns (case, best dumps seconds, best loads seconds, bytes per document) for every case.
+    """
+
+    data = build_documents(documents)
+    serializers = [("json", StdlibJsonSerializer())]
+    try:
+        serializers.append(("orjson", OrjsonSerializer()))
+    except ImportError:
+        print("orjson is not installed, skipping it")
+
+    results = []
+    for name, serializer in serializers:
+        for pretty in (True, False):
+            encoded = [serializer.dumps(d, pretty=pretty) for d in data]
+            dumps = min(timeit.repeat(
+                lambda: [serializer.dumps(d, pretty=pretty) for d in data], number=1, repeat=repeat))
+            loads = min(timeit.repeat(
+                lambda: [serializer.loads(e) for e in encoded], number=1, repeat=repeat))
+            size = sum(len(e) for e in encoded) // documents
+            results.append(
+                (f"{name} {'pretty' if pretty else 'compact'}", dumps, loads, size))
+    return results
+
+
+def main():
+    documents = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+    repeat = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+
+    results = run(documents, repeat)
+    baseline = results[0][1] + results[0][2]
+    print(f"{documents} documents, best of {repeat}")
+    print(f"{'case':<16}{'dumps ms':>10}{'loads ms':>10}{'bytes/doc':>11}{'speedup':>9}")
+    for case, dumps, loads, size in results:
+        print(f"{case:<16}{dumps * 1000:>10.1f}{loads * 1000:>10.1f}{size:>11}"
+              f"{baseline / (dumps + loads):>8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
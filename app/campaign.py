@@ -0,0 +1,90 @@
+#!/usr/bin/env python
+"""
+Runs every query of a campaign file in one process: one browser, one set of HTTP and LLM
+clients and one pipeline whose concurrency limits are shared by all the queries.
+Re-running the same campaign on the same day resumes it.
+
+Usage: python campaign.py <queries file> [--search-concurrency N] [--scrape-concurrency N]
+                          [--analysis-concurrency N] [--run-id ID] [--profile]
+"""
+import argparse
+import asyncio
+import contextlib
+import logging
+import os
+from datetime import datetime
+from pathlib import Path
+
+from configuration import Settings
+from core.campaign import build_report, load_campaign
+from core.pipeline import PipelineRunner
+from core.storage import Storage
+from infrastructure.metrics_exporter import MetricsExporter
+from infrastructure.profiling import RunProfiler
+from infrastructure.service_collection import ServiceCollection
+
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+    handlers=[logging.StreamHandler()]
+)
+
+CONCURRENCY_OPTIONS = {
+    "search_concurrency": "PIPELINE_SEARCH_CONCURRENCY",
+    "scrape_concurrency": "PIPELINE_SCRAPE_CONCURRENCY",
+    "analysis_concurrency": "PIPELINE_ANALYSIS_CONCURRENCY",
+}
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Run a campaign of search queries")
+    parser.add_argument("queries_file")
+    for option in CONCURRENCY_OPTIONS:
+        parser.add_argument(f"--{option.replace('_', '-')}", type=int)
+    parser.add_argument("--run-id")
+    parser.add_argument("--profile", action="store_true",
+                        help="Profile the run and write the reports next to its manifest")
+    return parser.parse_args()
+
+
+async def main():
+    args = parse_args()
+    # The budgets override the settings before the services read them
+    for option, variable in CONCURRENCY_OPTIONS.items():
+        if getattr(args, option):
+            os.environ[variable] = str(getattr(args, option))
+
+    queries = load_campaign(args.queries_file)
+    campaign = Path(args.queries_file).stem
+    folder_path = datetime.now().strftime("%Y/%m/%d")
+    run_id = args.run_id or f"{datetime.now().strftime('%Y-%m-%d')}-campaign-{campaign}"
+
+    service_provider = ServiceCollection.add_services()
+    storage = service_provider.get(Storage)
+    metrics = service_provider.get(MetricsExporter)
+    metrics.start()
+    pipeline = service_provider.get(PipelineRunner)
+
+    manifest = pipeline.open_manifest(run_id)
+    profile_dir = Path(service_provider.get(Settings).pipeline_settings.manifest_path) / f"{run_id}_profile"
+    profiler = RunProfiler(profile_dir) if args.profile else contextlib.nullcontext()
+    try:
+        async with profiler:
+            result = await pipeline.run(
+                [q.query for q in queries], folder_path, manifest,
+                limits={q.query: q.limit for q in queries if q.limit})
+    finally:
+        manifest.close()
+
+    report = build_report(campaign, queries, result)
+    await storage.awrite_json(
+        f"{folder_path}/campaigns/{run_id}_report.json", report.model_dump())
+    print(report.model_dump_json(indent=4))
+    if args.profile:
+        print(f"Profile written to {profile_dir}")
+    await storage.aclose()
+    metrics.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -1,5 +1,18 @@
+from .analysis_index_settings import *
 from .anthropic_settings import *
+from .api_settings import *
+from .aws_settings import *
+from .clustering_settings import *
+from .content_analysis_settings import *
+from .crawl_settings import *
+from .discovery_settings import *
+from .entity_resolution_settings import *
+from .job_queue_settings import *
 from .llm_settings import *
+from .local_settings import *
+from .metrics_settings import *
+from .pipeline_settings import *
+from .recrawl_settings import *
 from .settings import *
 from .web_scrape_settings import *
 from .web_search_settings import *
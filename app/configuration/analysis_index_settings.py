@@ -0,0 +1,29 @@
+from .configurable_settings import ConfigurableSettings
+
+
+class AnalysisIndexSettings(ConfigurableSettings):
+    """
+    Settings for the queryable index of the content analyses.
+    """
+
+    def __init__(self, values: dict[str, str | None]):
+        self._enabled = (values.get("ANALYSIS_INDEX_ENABLED")
+                         or "true").lower() == "true"
+        self._sqlite_path = values.get(
+            "ANALYSIS_INDEX_SQLITE_PATH") or "workspace/analysis_index.db"
+
+    @property
+    def enabled(self) -> bool:
+        """
+        Whether each analysis is indexed as it is stored, rather than only by a rebuild.
+        """
+
+        return self._enabled
+
+    @property
+    def sqlite_path(self) -> str:
+        return self._sqlite_path
+
+    @property
+    def is_configured(self) -> bool:
+        return self._sqlite_path is not None
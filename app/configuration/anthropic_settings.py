@@ -1,3 +1,4 @@
+from core.domain import ModelHost
 from pydantic.dataclasses import dataclass
 
 from .configurable_settings import ConfigurableSettings
@@ -16,13 +17,37 @@ class AWSSettings:
     role_arn: str | None = None
 """
 
+@dataclass(frozen=True)
+class AnthropicEndpoint:
+    api_key: str
+    api_url: str | None = None
+
 
 class AnthropicSettings(ConfigurableSettings):
     api_key: str | None = None
 
     def __init__(self, values: dict[str, str | None]):
         self.api_key = values.get("ANTHROPIC_API_KEY") or ""
+        # Extra endpoints (other keys, or a proxy) are named in ANTHROPIC_ENDPOINTS,
+        # each becoming a host LLM_ROUTING_HOSTS can list
+        self._endpoints = {ModelHost.ANTHROPIC: AnthropicEndpoint(api_key=self.api_key)} if self.api_key else {}
+        for name in (values.get("ANTHROPIC_ENDPOINTS") or "").split(","):
+            name = name.strip().lower()
+            if not name:
+                continue
+            if name == ModelHost.ANTHROPIC:
+                raise ValueError(
+                    f"ANTHROPIC_ENDPOINTS cannot name '{ModelHost.ANTHROPIC}', it is configured by ANTHROPIC_API_KEY")
+            api_key = values.get(f"ANTHROPIC_{name.upper()}_API_KEY")
+            if not api_key:
+                raise ValueError(f"ANTHROPIC_{name.upper()}_API_KEY is required by the '{name}' endpoint")
+            self._endpoints[name] = AnthropicEndpoint(
+                api_key=api_key, api_url=values.get(f"ANTHROPIC_{name.upper()}_API_URL") or None)
+
+    @property
+    def endpoints(self) -> dict[str, AnthropicEndpoint]:
+        return self._endpoints
 
     @property
     def is_configured(self) -> bool:
-        return bool(self.api_key)
+        return bool(self._endpoints)
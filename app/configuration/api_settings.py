@@ -0,0 +1,42 @@
+from .configurable_settings import ConfigurableSettings
+
+
+class ApiSettings(ConfigurableSettings):
+    """
+    Settings for the long-running HTTP job API.
+    """
+
+    def __init__(self, values: dict[str, str | None]):
+        self._host = values.get("API_HOST") or "127.0.0.1"
+        self._port = int(values.get("API_PORT") or 8080)
+        self._finished_jobs = int(values.get("API_FINISHED_JOBS") or 200)
+        self._warm_browser = (values.get("API_WARM_BROWSER")
+                              or "true").lower() == "true"
+
+    @property
+    def host(self) -> str:
+        return self._host
+
+    @property
+    def port(self) -> int:
+        return self._port
+
+    @property
+    def finished_jobs(self) -> int:
+        """
+        The number of finished jobs kept with their results, the oldest are forgotten first.
+        """
+
+        return self._finished_jobs
+
+    @property
+    def warm_browser(self) -> bool:
+        """
+        Whether the browser is launched at startup rather than by the first scrape job.
+        """
+
+        return self._warm_browser
+
+    @property
+    def is_configured(self) -> bool:
+        return True
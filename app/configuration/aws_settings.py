@@ -0,0 +1,57 @@
+from .configurable_settings import ConfigurableSettings
+
+
+class AwsSettings(ConfigurableSettings):
+    """
+    Settings for the AWS (or any S3-compatible) storage.
+    """
+
+    def __init__(self, values: dict[str, str | None]):
+        self._s3_bucket = values.get("AWS_S3_BUCKET")
+        self._s3_prefix = (values.get("AWS_S3_PREFIX") or "").strip("/")
+        self._s3_endpoint_url = values.get("AWS_S3_ENDPOINT_URL") or None
+        self._region = values.get("AWS_REGION") or None
+        self._max_pool_connections = int(
+            values.get("AWS_S3_MAX_POOL_CONNECTIONS") or 32)
+        self._concurrency = int(values.get("AWS_S3_CONCURRENCY") or 16)
+        self._multipart_threshold_mb = int(
+            values.get("AWS_S3_MULTIPART_THRESHOLD_MB") or 16)
+        self._multipart_chunk_mb = int(
+            values.get("AWS_S3_MULTIPART_CHUNK_MB") or 8)
+
+    @property
+    def s3_bucket(self) -> str | None:
+        return self._s3_bucket
+
+    @property
+    def s3_prefix(self) -> str:
+        return self._s3_prefix
+
+    @property
+    def s3_endpoint_url(self) -> str | None:
+        return self._s3_endpoint_url
+
+    @property
+    def region(self) -> str | None:
+        return self._region
+
+    @property
+    def max_pool_connections(self) -> int:
+        return self._max_pool_connections
+
+    @property
+    def concurrency(self) -> int:
+        return self._concurrency
+
+    @property
+    def multipart_threshold(self) -> int:
+        return self._multipart_threshold_mb * 1024 * 1024
+
+    @property
+    def multipart_chunk_size(self) -> int:
+        # S3 rejects parts under 5 MB, except the last one
+        return max(self._multipart_chunk_mb, 5) * 1024 * 1024
+
+    @property
+    def is_configured(self) -> bool:
+        return bool(self._s3_bucket)
@@ -0,0 +1,63 @@
+from .configurable_settings import ConfigurableSettings
+
+
+class ClusteringSettings(ConfigurableSettings):
+    """
+    Settings for the clustering of the indexed pain points.
+    """
+
+    def __init__(self, values: dict[str, str | None]):
+        self._similarity_threshold = float(
+            values.get("CLUSTERING_SIMILARITY_THRESHOLD") or 0.65)
+        self._dimensions = int(
+            values.get("CLUSTERING_DIMENSIONS") or 256)
+        self._lsh_tables = int(
+            values.get("CLUSTERING_LSH_TABLES") or 16)
+        self._lsh_bits = int(
+            values.get("CLUSTERING_LSH_BITS") or 8)
+        self._neighbours = int(
+            values.get("CLUSTERING_NEIGHBOURS") or 10)
+
+    @property
+    def similarity_threshold(self) -> float:
+        """
+        The cosine similarity, between 0 and 1, from which two pain points describe the same problem.
+        """
+
+        return self._similarity_threshold
+
+    @property
+    def dimensions(self) -> int:
+        """
+        The size of the hashed TF-IDF vectors: more dimensions mean fewer colliding words but more memory.
+        """
+
+        return self._dimensions
+
+    @property
+    def lsh_tables(self) -> int:
+        """
+        The number of LSH tables: more tables find more of the near neighbours, at more comparisons.
+        """
+
+        return self._lsh_tables
+
+    @property
+    def lsh_bits(self) -> int:
+        """
+        The hyperplanes of each LSH table: more bits mean smaller buckets and fewer comparisons.
+        """
+
+        return self._lsh_bits
+
+    @property
+    def neighbours(self) -> int:
+        """
+        The nearest neighbours kept for each pain point in each bucket.
+        """
+
+        return self._neighbours
+
+    @property
+    def is_configured(self) -> bool:
+        return True
@@ -0,0 +1,68 @@
+from .configurable_settings import ConfigurableSettings
+
+
+class ContentAnalysisOutputMode:
+    """
+    How the model returns the analysis.
+    """
+    PARSER = "parser"  # free-form JSON following format instructions
+    TOOL = "tool"  # arguments of a structured output tool call
+
+
+class ExportFormat:
+    PARQUET = "parquet"
+    ARROW = "arrow"  # Arrow IPC (Feather v2) files
+
+
+class ContentAnalysisSettings(ConfigurableSettings):
+    """
+    Settings for the content analysis.
+    """
+
+    def __init__(self, values: dict[str, str | None]):
+        self._output_mode = (values.get(
+            "CONTENT_ANALYSIS_OUTPUT_MODE") or ContentAnalysisOutputMode.PARSER).lower()
+        self._cascade_enabled = (values.get(
+            "CONTENT_ANALYSIS_CASCADE_ENABLED") or "false").lower() == "true"
+        self._triage_model_name = values.get(
+            "CONTENT_ANALYSIS_TRIAGE_MODEL_NAME") or "claude-3-5-haiku-latest"
+        self._triage_threshold = float(values.get(
+            "CONTENT_ANALYSIS_TRIAGE_THRESHOLD") or 0.5)
+        self._triage_max_chars = int(values.get(
+            "CONTENT_ANALYSIS_TRIAGE_MAX_CHARS") or 8000)
+        self._export_path = values.get(
+            "CONTENT_ANALYSIS_EXPORT_PATH") or "exports/content_analysis"
+        self._export_format = (values.get(
+            "CONTENT_ANALYSIS_EXPORT_FORMAT") or ExportFormat.PARQUET).lower()
+
+    @property
+    def output_mode(self) -> str:
+        return self._output_mode
+
+    @property
+    def cascade_enabled(self) -> bool:
+        return self._cascade_enabled
+
+    @property
+    def triage_model_name(self) -> str:
+        return self._triage_model_name
+
+    @property
+    def triage_threshold(self) -> float:
+        return self._triage_threshold
+
+    @property
+    def triage_max_chars(self) -> int:
+        return self._triage_max_chars
+
+    @property
+    def export_path(self) -> str:
+        return self._export_path
+
+    @property
+    def export_format(self) -> str:
+        return self._export_format
+
+    @property
+    def is_configured(self) -> bool:
+        return self._output_mode in (ContentAnalysisOutputMode.PARSER, ContentAnalysisOutputMode.TOOL)
@@ -0,0 +1,53 @@
+from .configurable_settings import ConfigurableSettings
+
+
+class CrawlSettings(ConfigurableSettings):
+    """
+    Settings for following the links of scraped pages within their domain.
+    """
+
+    def __init__(self, values: dict[str, str | None]):
+        self._enabled = (values.get("CRAWL_ENABLED")
+                         or "false").lower() == "true"
+        self._max_depth = int(values.get("CRAWL_MAX_DEPTH") or 2)
+        self._max_pages_per_seed = int(
+            values.get("CRAWL_MAX_PAGES_PER_SEED") or 10)
+        self._max_pages_per_domain = int(
+            values.get("CRAWL_MAX_PAGES_PER_DOMAIN") or 30)
+        self._min_relevance = float(values.get("CRAWL_MIN_RELEVANCE") or 0)
+
+    @property
+    def enabled(self) -> bool:
+        return self._enabled
+
+    @property
+    def max_depth(self) -> int:
+        """
+        The number of links followed from a search result, 0 to scrape search results only.
+        """
+
+        return self._max_depth
+
+    @property
+    def max_pages_per_seed(self) -> int:
+        """
+        The pages scraped starting from one search result, including it.
+        """
+
+        return self._max_pages_per_seed
+
+    @property
+    def max_pages_per_domain(self) -> int:
+        return self._max_pages_per_domain
+
+    @property
+    def min_relevance(self) -> float:
+        """
+        The share of query terms a link's anchor text or path must contain to be followed.
+        """
+
+        return self._min_relevance
+
+    @property
+    def is_configured(self) -> bool:
+        return self._enabled
@@ -0,0 +1,79 @@
+from .configurable_settings import ConfigurableSettings
+
+
+def _patterns(value: str | None) -> list[str]:
+    return [pattern.strip() for pattern in (value or "").split(",") if pattern.strip()]
+
+
+class DiscoverySettings(ConfigurableSettings):
+    """
+    Settings for discovering pages from the sitemaps and feeds of sites.
+    """
+
+    def __init__(self, values: dict[str, str | None]):
+        self._concurrency = int(values.get("DISCOVERY_CONCURRENCY") or 4)
+        self._timeout = int(values.get("DISCOVERY_TIMEOUT") or 30)
+        self._max_urls = int(values.get("DISCOVERY_MAX_URLS") or 1000)
+        self._max_documents = int(values.get("DISCOVERY_MAX_DOCUMENTS") or 50)
+        self._max_document_bytes = int(
+            values.get("DISCOVERY_MAX_DOCUMENT_MB") or 50) * 1024 * 1024
+        since_days = values.get("DISCOVERY_SINCE_DAYS")
+        self._since_days = int(since_days) if since_days else None
+        self._include_paths = _patterns(values.get("DISCOVERY_INCLUDE_PATHS"))
+        self._exclude_paths = _patterns(values.get("DISCOVERY_EXCLUDE_PATHS"))
+
+    @property
+    def concurrency(self) -> int:
+        """
+        The sitemaps and feeds fetched at once, over one pool of connections.
+        """
+
+        return self._concurrency
+
+    @property
+    def timeout(self) -> int:
+        return self._timeout
+
+    @property
+    def max_urls(self) -> int:
+        """
+        The pages taken from one source, the most recently modified first.
+        """
+
+        return self._max_urls
+
+    @property
+    def max_documents(self) -> int:
+        """
+        The sitemaps and feeds fetched for one source, nested sitemaps included.
+        """
+
+        return self._max_documents
+
+    @property
+    def max_document_bytes(self) -> int:
+        return self._max_document_bytes
+
+    @property
+    def since_days(self) -> int | None:
+        """
+        Only pages modified within this many days are taken, pages without a date always are.
+        """
+
+        return self._since_days
+
+    @property
+    def include_paths(self) -> list[str]:
+        """
+        Glob patterns of the URL paths to take, all paths when empty.
+        """
+
+        return self._include_paths
+
+    @property
+    def exclude_paths(self) -> list[str]:
+        return self._exclude_paths
+
+    @property
+    def is_configured(self) -> bool:
+        return True
@@ -0,0 +1,49 @@
+from .configurable_settings import ConfigurableSettings
+
+
+class EntityResolutionSettings(ConfigurableSettings):
+    """
+    Settings for resolving the service providers of the analyses to canonical entities.
+    """
+
+    def __init__(self, values: dict[str, str | None]):
+        self._enabled = (values.get("ENTITY_RESOLUTION_ENABLED")
+                         or "true").lower() == "true"
+        self._sqlite_path = values.get(
+            "ENTITY_SQLITE_PATH") or "workspace/entities.db"
+        self._match_threshold = float(
+            values.get("ENTITY_MATCH_THRESHOLD") or 0.9)
+        self._max_candidates = int(
+            values.get("ENTITY_MAX_CANDIDATES") or 50)
+
+    @property
+    def enabled(self) -> bool:
+        """
+        Whether the providers of each analysis are resolved as it is stored, rather than only by a rebuild.
+        """
+
+        return self._enabled
+
+    @property
+    def sqlite_path(self) -> str:
+        return self._sqlite_path
+
+    @property
+    def match_threshold(self) -> float:
+        """
+        The similarity of two normalized names, from 0 to 1, above which they are the same provider.
+        """
+
+        return self._match_threshold
+
+    @property
+    def max_candidates(self) -> int:
+        """
+        The entities a mention is compared with at most.
+        """
+
+        return self._max_candidates
+
+    @property
+    def is_configured(self) -> bool:
+        return self._sqlite_path is not None
@@ -0,0 +1,51 @@
+from .configurable_settings import ConfigurableSettings
+
+
+class JobQueueBackend:
+    SQLITE = "sqlite"
+
+
+class JobQueueSettings(ConfigurableSettings):
+    """
+    Settings for the job queue shared by the workers.
+    """
+
+    def __init__(self, values: dict[str, str | None]):
+        self._backend = (values.get("JOB_QUEUE_BACKEND")
+                         or JobQueueBackend.SQLITE).lower()
+        self._sqlite_path = values.get(
+            "JOB_QUEUE_SQLITE_PATH") or "workspace/queue.db"
+        self._lease_seconds = float(
+            values.get("JOB_QUEUE_LEASE_SECONDS") or 300)
+        self._max_attempts = int(values.get("JOB_QUEUE_MAX_ATTEMPTS") or 3)
+        self._retry_delay_seconds = float(
+            values.get("JOB_QUEUE_RETRY_DELAY_SECONDS") or 30)
+        self._poll_seconds = float(values.get("JOB_QUEUE_POLL_SECONDS") or 1)
+
+    @property
+    def backend(self) -> str:
+        return self._backend
+
+    @property
+    def sqlite_path(self) -> str:
+        return self._sqlite_path
+
+    @property
+    def lease_seconds(self) -> float:
+        return self._lease_seconds
+
+    @property
+    def max_attempts(self) -> int:
+        return self._max_attempts
+
+    @property
+    def retry_delay_seconds(self) -> float:
+        return self._retry_delay_seconds
+
+    @property
+    def poll_seconds(self) -> float:
+        return self._poll_seconds
+
+    @property
+    def is_configured(self) -> bool:
+        return True
@@ -19,7 +19,57 @@ class LLMSettings:
             top_p=float(values.get("LLM_TOP_P", "0.95")),
             max_tokens=int(values.get("LLM_MAX_TOKENS", "1024")) or None,
         )
+        self._requests_per_minute = int(
+            values.get("LLM_REQUESTS_PER_MINUTE") or 50)
+        self._tokens_per_minute = int(
+            values.get("LLM_TOKENS_PER_MINUTE") or 40000)
+        self._max_retries = int(values.get("LLM_MAX_RETRIES") or 5)
+        self._routing_hosts = [
+            host.strip().lower() for host in (values.get("LLM_ROUTING_HOSTS") or "").split(",") if host.strip()
+        ]
+        # Each routed host gets its own quota, defaulting to the global one
+        self._route_limits = {
+            host: (
+                int(values.get(f"LLM_ROUTE_{host.upper()}_REQUESTS_PER_MINUTE")
+                    or self._requests_per_minute),
+                int(values.get(f"LLM_ROUTE_{host.upper()}_TOKENS_PER_MINUTE")
+                    or self._tokens_per_minute),
+            )
+            for host in self._routing_hosts
+        }
+        self._routing_failure_threshold = int(
+            values.get("LLM_ROUTING_FAILURE_THRESHOLD") or 3)
+        self._routing_cooldown_seconds = float(
+            values.get("LLM_ROUTING_COOLDOWN_SECONDS") or 30)
 
     @property
     def chat_model_settings(self) -> ChatModelSettings:
         return self._chat_model_settings
+
+    @property
+    def requests_per_minute(self) -> int:
+        return self._requests_per_minute
+
+    @property
+    def tokens_per_minute(self) -> int:
+        return self._tokens_per_minute
+
+    @property
+    def max_retries(self) -> int:
+        return self._max_retries
+
+    @property
+    def routing_hosts(self) -> list[str]:
+        return self._routing_hosts
+
+    def route_limits(self, host: str) -> tuple[int, int]:
+        """Requests and tokens per minute for a routed host."""
+        return self._route_limits.get(host, (self._requests_per_minute, self._tokens_per_minute))
+
+    @property
+    def routing_failure_threshold(self) -> int:
+        return self._routing_failure_threshold
+
+    @property
+    def routing_cooldown_seconds(self) -> float:
+        return self._routing_cooldown_seconds
@@ -1,6 +1,11 @@
 from .configurable_settings import ConfigurableSettings
 
 
+class LocalStorageBackend:
+    FILE = "file"
+    SQLITE = "sqlite"
+
+
 class LocalSettings(ConfigurableSettings):
     """
     Settings for the local.
@@ -9,11 +14,52 @@ class LocalSettings(ConfigurableSettings):
     def __init__(self, values: dict[str, str | None]):
         self._local_storage_path = values.get(
             "LOCAL_STORAGE_PATH") or "workspace/storage"
+        self._storage_backend = (values.get(
+            "LOCAL_STORAGE_BACKEND") or LocalStorageBackend.FILE).lower()
+        self._sqlite_path = values.get(
+            "LOCAL_SQLITE_PATH") or f"{self._local_storage_path}/storage.db"
+        self._io_workers = int(values.get("LOCAL_STORAGE_IO_WORKERS") or 4)
+        self._write_batch_size = int(
+            values.get("LOCAL_STORAGE_WRITE_BATCH_SIZE") or 32)
+        self._flush_interval_ms = int(
+            values.get("LOCAL_STORAGE_FLUSH_INTERVAL_MS") or 50)
+        self._json_serializer = (values.get(
+            "LOCAL_STORAGE_JSON_SERIALIZER") or "auto").lower()
+        self._pretty_json = (values.get(
+            "LOCAL_STORAGE_PRETTY_JSON") or "false").lower() == "true"
 
     @property
     def local_storage_path(self) -> str:
         return self._local_storage_path
 
+    @property
+    def storage_backend(self) -> str:
+        return self._storage_backend
+
+    @property
+    def sqlite_path(self) -> str:
+        return self._sqlite_path
+
+    @property
+    def io_workers(self) -> int:
+        return self._io_workers
+
+    @property
+    def write_batch_size(self) -> int:
+        return self._write_batch_size
+
+    @property
+    def flush_interval_ms(self) -> int:
+        return self._flush_interval_ms
+
+    @property
+    def json_serializer(self) -> str:
+        return self._json_serializer
+
+    @property
+    def pretty_json(self) -> bool:
+        return self._pretty_json
+
     @property
     def is_configured(self) -> bool:
         return self._local_storage_path is not None
@@ -0,0 +1,52 @@
+from .configurable_settings import ConfigurableSettings
+
+
+class MetricsSettings(ConfigurableSettings):
+    """
+    Settings for exporting metrics and traces.
+    """
+
+    def __init__(self, values: dict[str, str | None]):
+        self._enabled = (values.get("METRICS_ENABLED")
+                         or "false").lower() == "true"
+        self._http_host = values.get("METRICS_HTTP_HOST") or "127.0.0.1"
+        http_port = values.get("METRICS_HTTP_PORT")
+        self._http_port = int(http_port) if http_port else None
+        self._file_path = values.get(
+            "METRICS_FILE_PATH") or "workspace/metrics/metrics.prom"
+        self._traces_path = values.get(
+            "METRICS_TRACES_PATH") or "workspace/metrics/traces.jsonl"
+        self._export_interval_seconds = float(
+            values.get("METRICS_EXPORT_INTERVAL_SECONDS") or 15)
+
+    @property
+    def enabled(self) -> bool:
+        return self._enabled
+
+    @property
+    def http_host(self) -> str:
+        return self._http_host
+
+    @property
+    def http_port(self) -> int | None:
+        """
+        The port of the /metrics endpoint, none to serve no endpoint and 0 for any free port.
+        """
+
+        return self._http_port
+
+    @property
+    def file_path(self) -> str:
+        return self._file_path
+
+    @property
+    def traces_path(self) -> str:
+        return self._traces_path
+
+    @property
+    def export_interval_seconds(self) -> float:
+        return self._export_interval_seconds
+
+    @property
+    def is_configured(self) -> bool:
+        return self._enabled
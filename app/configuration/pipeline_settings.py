@@ -0,0 +1,48 @@
+from .configurable_settings import ConfigurableSettings
+
+
+class PipelineSettings(ConfigurableSettings):
+    """
+    Settings for the search → scrape → analyze pipeline.
+    """
+
+    def __init__(self, values: dict[str, str | None]):
+        self._search_concurrency = int(
+            values.get("PIPELINE_SEARCH_CONCURRENCY") or 1)
+        # defaults to the scraper's own concurrency limit
+        self._scrape_concurrency = int(
+            values.get("PIPELINE_SCRAPE_CONCURRENCY") or values.get("SCRAPER_CONCURRENT_LIMIT") or 2)
+        self._analysis_concurrency = int(
+            values.get("PIPELINE_ANALYSIS_CONCURRENCY") or 4)
+        self._queue_size = int(values.get("PIPELINE_QUEUE_SIZE") or 32)
+        self._manifest_path = values.get(
+            "PIPELINE_MANIFEST_PATH") or "workspace/runs"
+        self._max_attempts = int(values.get("PIPELINE_MAX_ATTEMPTS") or 3)
+
+    @property
+    def search_concurrency(self) -> int:
+        return self._search_concurrency
+
+    @property
+    def scrape_concurrency(self) -> int:
+        return self._scrape_concurrency
+
+    @property
+    def analysis_concurrency(self) -> int:
+        return self._analysis_concurrency
+
+    @property
+    def queue_size(self) -> int:
+        return self._queue_size
+
+    @property
+    def manifest_path(self) -> str:
+        return self._manifest_path
+
+    @property
+    def max_attempts(self) -> int:
+        return self._max_attempts
+
+    @property
+    def is_configured(self) -> bool:
+        return True
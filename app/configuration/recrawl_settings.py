@@ -0,0 +1,54 @@
+from .configurable_settings import ConfigurableSettings
+
+HOUR = 3600
+
+
+class RecrawlSettings(ConfigurableSettings):
+    """
+    Settings for refreshing tracked pages at intervals adapted to how often they change.
+    """
+
+    def __init__(self, values: dict[str, str | None]):
+        self._sqlite_path = values.get(
+            "RECRAWL_SQLITE_PATH") or "workspace/recrawl.db"
+        self._initial_interval_seconds = float(
+            values.get("RECRAWL_INITIAL_INTERVAL_HOURS") or 24) * HOUR
+        self._min_interval_seconds = float(
+            values.get("RECRAWL_MIN_INTERVAL_HOURS") or 1) * HOUR
+        self._max_interval_seconds = float(
+            values.get("RECRAWL_MAX_INTERVAL_HOURS") or 24 * 30) * HOUR
+        self._interval_factor = float(
+            values.get("RECRAWL_INTERVAL_FACTOR") or 2)
+        self._batch_size = int(values.get("RECRAWL_BATCH_SIZE") or 100)
+
+    @property
+    def sqlite_path(self) -> str:
+        return self._sqlite_path
+
+    @property
+    def initial_interval_seconds(self) -> float:
+        return self._initial_interval_seconds
+
+    @property
+    def min_interval_seconds(self) -> float:
+        return self._min_interval_seconds
+
+    @property
+    def max_interval_seconds(self) -> float:
+        return self._max_interval_seconds
+
+    @property
+    def interval_factor(self) -> float:
+        """
+        How much the interval of a page shrinks when a refresh finds it changed, and grows when not.
+        """
+
+        return self._interval_factor
+
+    @property
+    def batch_size(self) -> int:
+        return self._batch_size
+
+    @property
+    def is_configured(self) -> bool:
+        return True
@@ -3,9 +3,21 @@ import os
 import dotenv
 from dotenv import dotenv_values
 
+from .analysis_index_settings import AnalysisIndexSettings
 from .anthropic_settings import AnthropicSettings
+from .api_settings import ApiSettings
+from .aws_settings import AwsSettings
+from .clustering_settings import ClusteringSettings
+from .content_analysis_settings import ContentAnalysisSettings
+from .crawl_settings import CrawlSettings
+from .discovery_settings import DiscoverySettings
+from .entity_resolution_settings import EntityResolutionSettings
+from .job_queue_settings import JobQueueSettings
 from .llm_settings import LLMSettings
 from .local_settings import LocalSettings
+from .metrics_settings import MetricsSettings
+from .pipeline_settings import PipelineSettings
+from .recrawl_settings import RecrawlSettings
 from .web_scrape_settings import WebScrapeSettings
 from .web_search_settings import WebSearchSettings
 
@@ -37,10 +49,23 @@ class Settings:
         self._web_search_settings = WebSearchSettings(self._settings)
         self._web_scrape_settings = WebScrapeSettings(self._settings)
         self._local_settings = LocalSettings(self._settings)
+        self._aws_settings = AwsSettings(self._settings)
         self._llm_settings = LLMSettings(self._settings)
         self._anthropic_settings = AnthropicSettings(self._settings)
         self._content_analysis_path = self._settings.get(
             "CONTENT_ANALYSIS_PATH") or "content_analysis"
+        self._content_analysis_settings = ContentAnalysisSettings(
+            self._settings)
+        self._pipeline_settings = PipelineSettings(self._settings)
+        self._job_queue_settings = JobQueueSettings(self._settings)
+        self._metrics_settings = MetricsSettings(self._settings)
+        self._api_settings = ApiSettings(self._settings)
+        self._recrawl_settings = RecrawlSettings(self._settings)
+        self._crawl_settings = CrawlSettings(self._settings)
+        self._discovery_settings = DiscoverySettings(self._settings)
+        self._analysis_index_settings = AnalysisIndexSettings(self._settings)
+        self._entity_resolution_settings = EntityResolutionSettings(self._settings)
+        self._clustering_settings = ClusteringSettings(self._settings)
 
     def __get_dotenv_settings(self, dotenv_path: str = "") -> dict[str, str | None]:
         config = dotenv_values()
@@ -58,6 +83,10 @@ class Settings:
     def local_settings(self) -> LocalSettings:
         return self._local_settings
 
+    @property
+    def aws(self) -> AwsSettings:
+        return self._aws_settings
+
     @property
     def web_search_settings(self) -> WebSearchSettings:
         return self._web_search_settings
@@ -82,6 +111,50 @@ class Settings:
     def content_analysis_path(self) -> str:
         return self._content_analysis_path
 
+    @property
+    def content_analysis_settings(self) -> ContentAnalysisSettings:
+        return self._content_analysis_settings
+
+    @property
+    def pipeline_settings(self) -> PipelineSettings:
+        return self._pipeline_settings
+
+    @property
+    def job_queue_settings(self) -> JobQueueSettings:
+        return self._job_queue_settings
+
+    @property
+    def metrics_settings(self) -> MetricsSettings:
+        return self._metrics_settings
+
+    @property
+    def api_settings(self) -> ApiSettings:
+        return self._api_settings
+
+    @property
+    def recrawl_settings(self) -> RecrawlSettings:
+        return self._recrawl_settings
+
+    @property
+    def crawl_settings(self) -> CrawlSettings:
+        return self._crawl_settings
+
+    @property
+    def discovery_settings(self) -> DiscoverySettings:
+        return self._discovery_settings
+
+    @property
+    def analysis_index_settings(self) -> AnalysisIndexSettings:
+        return self._analysis_index_settings
+
+    @property
+    def entity_resolution_settings(self) -> EntityResolutionSettings:
+        return self._entity_resolution_settings
+
+    @property
+    def clustering_settings(self) -> ClusteringSettings:
+        return self._clustering_settings
+
 
 def get_settings(
     dotenv_path: str = "",
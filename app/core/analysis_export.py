@@ -0,0 +1,197 @@
+import io
+import logging
+import uuid
+from collections import defaultdict
+from datetime import datetime
+from urllib.parse import urlparse
+
+from configuration import ExportFormat, Settings
+from core.storage import Storage
+from injector import inject
+from pydantic import BaseModel, Field
+
+logger = logging.getLogger(__name__)
+
+MANIFEST_FILE_NAME = "_manifest.json"
+
+ANALYSES_TABLE = "analyses"
+SERVICE_PROVIDERS_TABLE = "service_providers"
+PAIN_POINTS_TABLE = "pain_points"
+
+# Column types of each table; the date is carried by the partition folder instead of a column
+TABLE_COLUMNS = {
+    ANALYSES_TABLE: {
+        "url": "string", "domain": "string", "title": "string", "analysis_date": "timestamp",
+        "content_type": "string", "provider_count": "int32", "pain_point_count": "int32",
+        "source_file": "string",
+    },
+    SERVICE_PROVIDERS_TABLE: {
+        "url": "string", "domain": "string", "provider_index": "int32", "name": "string",
+        "website": "string", "value_proposition": "string", "pain_point_count": "int32",
+    },
+    PAIN_POINTS_TABLE: {
+        "url": "string", "domain": "string", "provider_index": "int32", "provider_name": "string",
+        "description": "string", "category": "string", "impact": "string",
+        "source_quote": "string", "solution": "string",
+    },
+}
+
+FILE_EXTENSIONS = {
+    ExportFormat.PARQUET: "parquet",
+    ExportFormat.ARROW: "arrow",
+}
+
+
+class ExportResult(BaseModel):
+    exported_analyses: int = Field(
+        description="The number of analyses appended to the export")
+    skipped_analyses: int = Field(
+        description="The number of analyses already in the export")
+    failed_files: list[str] = Field(
+        description="The analysis files that could not be read")
+    written_files: list[str] = Field(
+        description="The URLs of the part files written")
+
+
+def flatten_analysis(analysis: dict, source_file: str) -> tuple[dict, list[dict], list[dict]]:
+    """
+    Flattens one ContentAnalysis dict into an analysis row, service provider rows and pain point rows.
+    Every row carries the url, domain and date so each table can be filtered on its own.
+    """
+
+    analysis_date = analysis.get("analysis_date")
+    if isinstance(analysis_date, str):
+        analysis_date = datetime.fromisoformat(analysis_date)
+    url = analysis.get("url") or ""
+    keys = {
+        "url": url,
+        "domain": urlparse(url).netloc.lower().removeprefix("www."),
+        "date": analysis_date.date().isoformat() if analysis_date else None,
+    }
+
+    providers, pain_points = [], []
+    for provider_index, provider in enumerate(analysis.get("service_providers") or []):
+        provider_pain_points = provider.get("pain_points") or []
+        providers.append({
+            **keys,
+            "provider_index": provider_index,
+            "name": provider.get("name"),
+            "website": provider.get("website"),
+            "value_proposition": provider.get("value_proposition"),
+            "pain_point_count": len(provider_pain_points),
+        })
+        for pain_point in provider_pain_points:
+            pain_points.append({
+                **keys,
+                "provider_index": provider_index,
+                "provider_name": provider.get("name"),
+                "description": pain_point.get("description"),
+                "category": pain_point.get("category"),
+                "impact": pain_point.get("impact"),
+                "source_quote": pain_point.get("source_quote"),
+                "solution": pain_point.get("solution"),
+            })
+
+    row = {
+        **keys,
+        "title": analysis.get("title"),
+        "analysis_date": analysis_date,
+        "content_type": analysis.get("content_type"),
+        "provider_count": len(providers),
+        "pain_point_count": len(pain_points),
+        "source_file": source_file,
+    }
+    return row, providers, pain_points
+
+
+class AnalysisExportService:
+    """
+    Appends content analyses to columnar tables (analyses, service_providers, pain_points)
+    partitioned by analysis date, e.g. `<export_path>/pain_points/date=2024-01-01/part-....parquet`.
+
+    A manifest of exported source files makes each run append only new analyses.
+    """
+
+    @inject
+    def __init__(self, settings: Settings, storage: Storage):
+        self._export_path = settings.content_analysis_settings.export_path
+        self._format = settings.content_analysis_settings.export_format
+        self._storage = storage
+        if self._format not in FILE_EXTENSIONS:
+            raise ValueError(
+                f"Invalid export format: {self._format}. Must be one of: {', '.join(FILE_EXTENSIONS)}")
+
+    def export(self, file_names: list[str]) -> ExportResult:
+        manifest = self._read_manifest()
+        exported = set(manifest["exported_files"])
+        pending = [name for name in dict.fromkeys(
+            file_names) if name not in exported]
+
+        tables: dict[str, dict[str, list[dict]]] = {
+            ANALYSES_TABLE: defaultdict(list),
+            SERVICE_PROVIDERS_TABLE: defaultdict(list),
+            PAIN_POINTS_TABLE: defaultdict(list),
+        }
+        done, failed = [], []
+        for file_name in pending:
+            try:
+                row, providers, pain_points = flatten_analysis(
+                    self._storage.read_json(file_name), file_name)
+            except Exception as e:
+                logger.error(f"Could not export {file_name}: {str(e)}")
+                failed.append(file_name)
+                continue
+            date = row["date"] or "unknown"
+            tables[ANALYSES_TABLE][date].append(row)
+            tables[SERVICE_PROVIDERS_TABLE][date].extend(providers)
+            tables[PAIN_POINTS_TABLE][date].extend(pain_points)
+            done.append(file_name)
+
+        written = []
+        part_name = f"part-{datetime.now().strftime('%Y%m%dT%H%M%S')}-{uuid.uuid4().hex[:8]}"
+        extension = FILE_EXTENSIONS[self._format]
+        for table_name, partitions in tables.items():
+            for date, rows in partitions.items():
+                if not rows:
+                    continue
+                file_name = f"{self._export_path}/{table_name}/date={date}/{part_name}.{extension}"
+                written.append(self._storage.store_export(
+                    file_name, self._encode(table_name, rows)))
+
+        # The manifest is only updated once every part is stored, so a failed run is retried in full
+        if done:
+            manifest["exported_files"].extend(done)
+            manifest["updated_at"] = datetime.now().isoformat()
+            self._storage.write_json(
+                f"{self._export_path}/{MANIFEST_FILE_NAME}", manifest)
+
+        return ExportResult(
+            exported_analyses=len(done),
+            skipped_analyses=len(file_names) - len(pending),
+            failed_files=failed,
+            written_files=written,
+        )
+
+    def _read_manifest(self) -> dict:
+        try:
+            return self._storage.read_json(f"{self._export_path}/{MANIFEST_FILE_NAME}")
+        except FileNotFoundError:
+            return {"exported_files": []}
+
+    def _encode(self, table_name: str, rows: list[dict]) -> bytes:
+        import pyarrow as pa
+
+        types = {"string": pa.string(), "int32": pa.int32(),
+                 "timestamp": pa.timestamp("us")}
+        # an explicit schema keeps all-null columns typed the same in every part
+        schema = pa.schema([(column, types[type_name])
+                           for column, type_name in TABLE_COLUMNS[table_name].items()])
+        table = pa.Table.from_pylist(rows, schema=schema)
+        buffer = io.BytesIO()
+        if self._format == ExportFormat.ARROW:
+            import pyarrow.feather as feather
+            feather.write_feather(table, buffer, compression="zstd")
+        else:
+            import pyarrow.parquet as pq
+            pq.write_table(table, buffer, compression="zstd")
+        return buffer.getvalue()
@@ -0,0 +1,104 @@
+from datetime import date
+
+from pydantic import BaseModel, Field
+
+
+class AnalysisSink:
+    """
+    Interface for the consumers of content analyses, told of each analysis once it is stored.
+    """
+
+    def record(self, file_name: str, analysis: dict) -> None:
+        raise NotImplementedError
+
+
+class FacetCount(BaseModel):
+    key: str = Field(description="The category, provider or domain")
+    pages: int = Field(description="The analyzed pages it appears in")
+    pain_points: int = Field(description="The pain points it accounts for")
+    providers: int = Field(default=0, description="The service providers mentioned, for domains")
+    last_analysis_date: str | None = Field(default=None, description="The latest analysis it appears in")
+
+
+class PainPointHit(BaseModel):
+    url: str
+    domain: str
+    date: str | None
+    provider_name: str | None
+    category: str | None
+    impact: str | None
+    description: str | None
+    source_quote: str | None
+    snippet: str = Field(description="The matching text with the query terms marked")
+
+
+class PainPointCluster(BaseModel):
+    id: int = Field(description="The cluster, numbered from 0 by decreasing size when the clusters were built")
+    description: str | None = Field(description="The description of the pain point closest to the cluster center")
+    pages: int = Field(description="The analyzed pages its pain points appear in")
+    pain_points: int = Field(description="The pain points in the cluster")
+    top_category: str | None = Field(default=None, description="The most frequent category of its pain points")
+    last_analysis_date: str | None = Field(default=None, description="The latest analysis it appears in")
+
+
+class AnalysisIndex(AnalysisSink):
+    """
+    Interface for the index of the stored analyses, answering aggregate and full-text queries
+    without reading the analysis files. Recording an analysis again replaces its rows.
+
+    Date bounds are inclusive and compare the analysis dates.
+    """
+
+    def record(self, file_name: str, analysis: dict) -> None:
+        raise NotImplementedError
+
+    def top_categories(self, since: date | None = None, until: date | None = None,
+                       limit: int = 10) -> list[FacetCount]:
+        raise NotImplementedError
+
+    def top_providers(self, since: date | None = None, until: date | None = None,
+                      limit: int = 10) -> list[FacetCount]:
+        raise NotImplementedError
+
+    def top_domains(self, since: date | None = None, until: date | None = None,
+                    limit: int = 10) -> list[FacetCount]:
+        raise NotImplementedError
+
+    def search(self, text: str, since: date | None = None, until: date | None = None,
+               limit: int = 20) -> list[PainPointHit]:
+        """
+        Returns the pain points whose description or source quote contains every word of the text,
+        the best matches first
+        """
+
+        raise NotImplementedError
+
+    def pain_point_texts(self) -> tuple[list[int], list[str | None], list[str | None]]:
+        """
+        Returns the ids, descriptions and source quotes of all the indexed pain points
+        """
+
+        raise NotImplementedError
+
+    def store_clusters(self, pain_point_ids: list[int], cluster_ids: list[int],
+                       representative_ids: list[int]) -> None:
+        """
+        Replaces the clusters with the given cluster of each pain point, and the representative
+        pain point of each cluster indexed by cluster id
+        """
+
+        raise NotImplementedError
+
+    def top_clusters(self, since: date | None = None, until: date | None = None, min_size: int = 2,
+                     limit: int = 10) -> list[PainPointCluster]:
+        """
+        Returns the clusters with the most pain points within the dates, and at least `min_size` of them
+        """
+
+        raise NotImplementedError
+
+    def stats(self) -> dict[str, int]:
+        raise NotImplementedError
+
+    def close(self) -> None:
+        pass
@@ -0,0 +1,87 @@
+import json
+from collections import defaultdict
+from pathlib import Path
+from typing import Any
+
+from core.pipeline import PipelineResult
+from pydantic import BaseModel, Field
+
+
+class CampaignQuery(BaseModel):
+    query: str = Field(description="The search query")
+    tags: list[str] = Field(default_factory=list,
+                            description="The tags the query is reported under")
+    limit: int | None = Field(
+        default=None, description="The maximum number of search results to scrape")
+
+
+class CampaignReport(BaseModel):
+    campaign: str = Field(description="The name of the campaign")
+    queries: list[dict[str, Any]] = Field(
+        description="The URLs, scraped and analyzed pages of each query")
+    tags: dict[str, dict[str, int]] = Field(
+        description="The totals of the queries under each tag")
+    totals: dict[str, Any] = Field(
+        description="The totals and stage statistics of the whole campaign")
+
+
+def load_campaign(path: str) -> list[CampaignQuery]:
+    """
+    Reads the queries of a campaign file.
+
+    `.jsonl` files hold one `{"query", "tags", "limit"}` object per line. Other files hold one
+    query per line, optionally followed by `| tags=a,b` and `| limit=N`; `#` starts a comment line.
+    """
+
+    queries = []
+    with open(path, encoding="utf-8") as file:
+        for number, line in enumerate(file, start=1):
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            try:
+                if Path(path).suffix == ".jsonl":
+                    queries.append(CampaignQuery(**json.loads(line)))
+                else:
+                    queries.append(_parse_text_line(line))
+            except Exception as e:
+                raise ValueError(f"Invalid campaign line {number}: {str(e)}") from e
+    return queries
+
+
+def build_report(campaign: str, queries: list[CampaignQuery], result: PipelineResult) -> CampaignReport:
+    rows = []
+    tags: dict[str, dict[str, int]] = defaultdict(
+        lambda: {"queries": 0, "urls": 0, "scraped": 0, "analyzed": 0})
+    for query in queries:
+        counts = result.by_query.get(
+            query.query, {"urls": 0, "scraped": 0, "analyzed": 0})
+        rows.append({"query": query.query, "tags": query.tags, **counts})
+        for tag in query.tags:
+            tags[tag]["queries"] += 1
+            for counter, value in counts.items():
+                tags[tag][counter] += value
+
+    return CampaignReport(
+        campaign=campaign,
+        queries=rows,
+        tags=dict(tags),
+        totals=result.model_dump(exclude={"by_query"}),
+    )
+
+
+def _parse_text_line(line: str) -> CampaignQuery:
+    query, *options = [part.strip() for part in line.split("|")]
+    if not query:
+        raise ValueError("The query is empty")
+    fields: dict[str, Any] = {"query": query}
+    for option in options:
+        name, _, value = option.partition("=")
+        name = name.strip()
+        if name == "tags":
+            fields["tags"] = [tag.strip() for tag in value.split(",") if tag.strip()]
+        elif name == "limit":
+            fields["limit"] = int(value)
+        else:
+            raise ValueError(f"Unknown option: {name}")
+    return CampaignQuery(**fields)
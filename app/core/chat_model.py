@@ -1,5 +1,9 @@
+from typing import TYPE_CHECKING
+
 from core.domain import ChatModelSettings
-from langchain_core.language_models.chat_models import BaseChatModel
+
+if TYPE_CHECKING:
+    from langchain_core.language_models.chat_models import BaseChatModel
 
 
 class ChatModelProvider:
@@ -11,5 +15,5 @@ class ChatModelProvider:
         self,
         chat_model_settings: ChatModelSettings,
         verbose: bool = False,
-    ) -> BaseChatModel:
+    ) -> "BaseChatModel":
         raise NotImplementedError
@@ -0,0 +1,233 @@
+import logging
+import math
+import threading
+import time
+from typing import Any, Callable, Sequence
+
+from core.chat_model import ChatModelProvider
+from core.domain import ChatModelSettings
+from core.llm_scheduler import CHARS_PER_TOKEN, RateLimited, TokenBucket
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, BaseMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+
+logger = logging.getLogger(__name__)
+
+# Status codes that mark a host as degraded rather than the request as invalid
+DEGRADED_STATUS_CODES = (408, 429, 500, 502, 503, 504, 529)
+
+# Weight of the latest call in the latency moving average
+LATENCY_SMOOTHING = 0.3
+
+
+class ChatModelQuotaExceeded(RateLimited):
+    """
+    Raised when no healthy host has the quota for a call, so the LLMCallScheduler waits
+    for the shortest wait and retries instead of the call going out.
+    """
+
+    def __init__(self, wait: float):
+        super().__init__(f"Every chat model host is over its quota for {wait:.1f}s", retry_after=wait)
+        self.wait = wait
+
+
+class ChatModelRoute:
+    """
+    One host behind the router, with its own quota, latency estimate and health.
+    """
+
+    def __init__(self, name: str, provider: ChatModelProvider,
+                 requests_per_minute: int, tokens_per_minute: int,
+                 clock: Callable[[], float] = time.monotonic):
+        self.name = name
+        self.provider = provider
+        self.requests = TokenBucket(
+            requests_per_minute, clock=clock) if requests_per_minute > 0 else None
+        self.tokens = TokenBucket(
+            tokens_per_minute, clock=clock) if tokens_per_minute > 0 else None
+        self.latency: float | None = None
+        self.consecutive_failures = 0
+        self.degraded_until = 0.0
+        self.calls = 0
+        self.failures = 0
+
+    def headroom(self, estimated_tokens: int) -> float:
+        """
+        Share of the quota left after this call, 0 when the call does not fit.
+        """
+
+        shares = []
+        for bucket, amount in ((self.requests, 1), (self.tokens, estimated_tokens)):
+            if bucket is None:
+                continue
+            shares.append(max(bucket.available - amount, 0) / bucket.capacity)
+        return min(shares) if shares else 1.0
+
+    def wait(self, estimated_tokens: int) -> float:
+        """
+        Seconds until the quota covers the call, 0 when it fits now.
+        """
+
+        waits = [bucket.wait(amount) for bucket, amount in ((self.requests, 1), (self.tokens, estimated_tokens))
+                 if bucket is not None]
+        return max(waits, default=0.0)
+
+    def summary(self, now: float) -> dict[str, Any]:
+        return {
+            "calls": self.calls,
+            "failures": self.failures,
+            "latency": self.latency,
+            "degraded": self.degraded_until > now,
+        }
+
+
+class ChatModelRouter:
+    """
+    Spreads calls over several hosts by available quota and observed latency,
+    failing over to the next host when one is rate limited or erroring.
+    """
+
+    def __init__(self, routes: Sequence[ChatModelRoute],
+                 failure_threshold: int = 3,
+                 cooldown_seconds: float = 30.0,
+                 output_tokens: int = 1024,
+                 clock: Callable[[], float] = time.monotonic):
+        if not routes:
+            raise ValueError("At least one route is required")
+        self._routes = list(routes)
+        self._failure_threshold = failure_threshold
+        self._cooldown_seconds = cooldown_seconds
+        self._output_tokens = output_tokens
+        self._clock = clock
+        self._lock = threading.Lock()
+
+    @property
+    def routes(self) -> list[ChatModelRoute]:
+        return self._routes
+
+    def invoke(self, messages: list[BaseMessage], chat_model_settings: ChatModelSettings | None = None,
+               tools: list | None = None, tool_choice: Any = None, **kwargs) -> AIMessage:
+        estimated_tokens = self._estimate_tokens(messages)
+        tried: set[str] = set()
+        last_error: Exception | None = None
+
+        while route := self._select(estimated_tokens, tried):
+            tried.add(route.name)
+            model = route.provider.get_chat_model(chat_model_settings)
+            if tools:
+                model = model.bind_tools(tools, tool_choice=tool_choice)
+
+            started = self._clock()
+            try:
+                message = model.invoke(messages, **kwargs)
+            except Exception as e:
+                last_error = e
+                self._record_failure(route, e)
+                logger.warning(
+                    f"Chat model host {route.name} failed, failing over: {e}")
+                continue
+
+            self._record_success(route, self._clock() - started,
+                                 estimated_tokens, message)
+            return message
+
+        raise last_error or RuntimeError("No chat model host available")
+
+    def summary(self) -> dict[str, dict[str, Any]]:
+        now = self._clock()
+        with self._lock:
+            return {route.name: route.summary(now) for route in self._routes}
+
+    def _select(self, estimated_tokens: int, tried: set[str]) -> ChatModelRoute | None:
+        """
+        Picks the untried host with the best headroom per second of latency and reserves its quota.
+        Degraded hosts are only used once every healthy host has been tried. When no healthy host
+        has the quota for the call, raises ChatModelQuotaExceeded with the shortest wait, or returns
+        None after a failover so that the last error surfaces.
+        """
+
+        now = self._clock()
+        with self._lock:
+            candidates = [r for r in self._routes if r.name not in tried]
+            if not candidates:
+                return None
+            healthy = [r for r in candidates if r.degraded_until <= now]
+            if not healthy:
+                return min(candidates, key=lambda r: r.degraded_until)
+            waits = {r.name: r.wait(estimated_tokens) for r in healthy}
+            if all(waits.values()):
+                if tried:
+                    return None
+                raise ChatModelQuotaExceeded(min(waits.values()))
+            healthy = [r for r in healthy if not waits[r.name]]
+
+            known = [r.latency for r in healthy if r.latency is not None]
+            # Hosts without measurements look as fast as the fastest one so they get explored
+            default_latency = min(known) if known else 1.0
+
+            def score(route: ChatModelRoute) -> float:
+                latency = route.latency if route.latency is not None else default_latency
+                return route.headroom(estimated_tokens) / max(latency, 0.001)
+
+            route = max(healthy, key=score)
+            if route.requests is not None:
+                route.requests.refund(-1)
+            if route.tokens is not None:
+                route.tokens.refund(-estimated_tokens)
+            return route
+
+    def _record_success(self, route: ChatModelRoute, latency: float,
+                        estimated_tokens: int, message: AIMessage) -> None:
+        with self._lock:
+            route.calls += 1
+            route.consecutive_failures = 0
+            route.latency = latency if route.latency is None else (
+                LATENCY_SMOOTHING * latency + (1 - LATENCY_SMOOTHING) * route.latency)
+        usage = getattr(message, "usage_metadata", None) or {}
+        if route.tokens is not None and usage.get("total_tokens"):
+            route.tokens.refund(estimated_tokens - usage["total_tokens"])
+
+    def _record_failure(self, route: ChatModelRoute, error: Exception) -> None:
+        status_code = getattr(error, "status_code", None)
+        with self._lock:
+            route.calls += 1
+            route.failures += 1
+            route.consecutive_failures += 1
+            if status_code in DEGRADED_STATUS_CODES or route.consecutive_failures >= self._failure_threshold:
+                route.degraded_until = self._clock() + self._cooldown_seconds
+
+    def _estimate_tokens(self, messages: list[BaseMessage]) -> int:
+        characters = sum(len(str(m.content)) for m in messages)
+        return math.ceil(characters / CHARS_PER_TOKEN) + self._output_tokens
+
+
+class RoutingChatModel(BaseChatModel):
+    """
+    Chat model that sends each call through a ChatModelRouter.
+    """
+
+    router: Any
+    chat_model_settings: Any = None
+    tools: list | None = None
+    tool_choice: Any = None
+
+    @property
+    def _llm_type(self) -> str:
+        return "routing"
+
+    def _generate(self, messages: list[BaseMessage], stop: list[str] | None = None,
+                  run_manager=None, **kwargs) -> ChatResult:
+        if stop:
+            kwargs["stop"] = stop
+        message = self.router.invoke(
+            messages,
+            chat_model_settings=self.chat_model_settings,
+            tools=self.tools,
+            tool_choice=self.tool_choice,
+            **kwargs
+        )
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+    def bind_tools(self, tools, *, tool_choice=None, **kwargs) -> "RoutingChatModel":
+        # Each host converts the tools to its own format when the call is routed
+        return self.model_copy(update={"tools": list(tools), "tool_choice": tool_choice})
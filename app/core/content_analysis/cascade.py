@@ -0,0 +1,51 @@
+import threading
+from typing import Any
+
+# Output budget of the triage call, which only returns two flags and a score
+TRIAGE_MAX_TOKENS = 256
+
+
+class CascadeStats:
+    """
+    Counts triage decisions and the estimated tokens the cascade saved.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._triaged = 0
+        self._escalated = 0
+        self._skipped = 0
+        self._triage_failures = 0
+        self._triage_tokens = 0
+        self._avoided_tokens = 0
+
+    def record_triage(self, estimated_tokens: int) -> None:
+        with self._lock:
+            self._triaged += 1
+            self._triage_tokens += estimated_tokens
+
+    def record_triage_failure(self) -> None:
+        with self._lock:
+            self._triage_failures += 1
+
+    def record_escalated(self) -> None:
+        with self._lock:
+            self._escalated += 1
+
+    def record_skipped(self, avoided_tokens: int) -> None:
+        with self._lock:
+            self._skipped += 1
+            self._avoided_tokens += avoided_tokens
+
+    def summary(self) -> dict[str, Any]:
+        with self._lock:
+            return {
+                "triaged": self._triaged,
+                "escalated": self._escalated,
+                "skipped": self._skipped,
+                "triage_failures": self._triage_failures,
+                "skip_rate": self._skipped / self._triaged if self._triaged else 0.0,
+                "triage_tokens": self._triage_tokens,
+                "avoided_tokens": self._avoided_tokens,
+                "net_saved_tokens": self._avoided_tokens - self._triage_tokens,
+            }
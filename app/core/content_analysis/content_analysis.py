@@ -1,45 +1,117 @@
-from typing import TypeVar
+import dataclasses
+import logging
+import time
+from datetime import datetime
+from typing import TYPE_CHECKING, TypeVar
 
-from configuration import Settings
+from configuration import ContentAnalysisOutputMode, Settings
+from core.analysis_index import AnalysisSink
 from core.chat_model import ChatModelProvider
-from core.domain import ContentAnalysis
+from core.domain import ContentAnalysis, ContentTriage
+from core.llm_scheduler import LLMCallScheduler
+from core.metrics import REGISTRY
 from core.storage import Storage
+from core.tracing import TRACER
 from core.utils import StandardFileNaming
 from injector import inject
-from langchain_core.output_parsers import PydanticOutputParser
-from langchain_core.prompts import PromptTemplate
-from pydantic import BaseModel
+from pydantic import BaseModel, ValidationError
 
-from .content_analysis_prompt import CONTENT_ANALYSIS_PROMPT
+from .cascade import TRIAGE_MAX_TOKENS, CascadeStats
+from .content_analysis_prompt import CONTENT_ANALYSIS_PROMPT, CONTENT_TRIAGE_PROMPT
+from .structured_output import (
+    TOOL_FORMAT_INSTRUCTIONS,
+    StructuredOutputStats,
+    extract_json,
+    repair_structured_output,
+)
+
+if TYPE_CHECKING:
+    from langchain_core.language_models.chat_models import BaseChatModel
+    from langchain_core.messages import AIMessage
+    from langchain_core.runnables import Runnable
 
 PydanticT = TypeVar('PydanticT', bound=BaseModel)
 
+logger = logging.getLogger(__name__)
+
+ANALYSIS_PAGES = REGISTRY.counter(
+    "analysis_pages_total", "Pages analyzed by outcome", ("outcome",))
+ANALYSIS_DURATION = REGISTRY.histogram(
+    "analysis_duration_seconds", "Duration of a page analysis including triage", ("outcome",))
+ANALYSIS_IN_FLIGHT = REGISTRY.gauge(
+    "analysis_in_flight", "Pages being analyzed")
+LLM_CALLS = REGISTRY.counter(
+    "llm_calls_total", "LLM calls by purpose", ("call",))
+LLM_TOKENS = REGISTRY.counter(
+    "llm_tokens_total", "LLM tokens by purpose and kind: estimated before the call, input and output "
+    "as reported by the model", ("call", "kind"))
+
 
 class ContentAnalysisService:
     @inject
-    def __init__(self, settings: Settings, storage: Storage):
+    def __init__(self, settings: Settings, storage: Storage, scheduler: LLMCallScheduler,
+                 output_stats: StructuredOutputStats, cascade_stats: CascadeStats,
+                 sinks: list[AnalysisSink]):
         self._content_analysis_path = f"{settings.content_analysis_path}"
+        self._analysis_settings = settings.content_analysis_settings
+        self._output_mode = self._analysis_settings.output_mode
+        self._triage_model_settings = dataclasses.replace(
+            settings.llm_settings.chat_model_settings,
+            model_name=self._analysis_settings.triage_model_name,
+            temperature=0.0,
+            max_tokens=TRIAGE_MAX_TOKENS,
+        )
         self._storage = storage
+        self._scheduler = scheduler
+        self._output_stats = output_stats
+        self._cascade_stats = cascade_stats
+        self._sinks = sinks
         self._file_naming = StandardFileNaming()
 
-    def analyze_content(self, url: str, content: str, chat_model_provider: ChatModelProvider,
+    @property
+    def output_stats(self) -> StructuredOutputStats:
+        return self._output_stats
+
+    @property
+    def cascade_stats(self) -> CascadeStats:
+        return self._cascade_stats
+
+    def analyze_content(self, url: str, content: dict, chat_model_provider: ChatModelProvider,
                         file_path: str, prompt_template: str = CONTENT_ANALYSIS_PROMPT,
                         parser_pydantic_object: PydanticT = ContentAnalysis) -> dict:
-        chat_model = chat_model_provider.get_chat_model()
-
-        prompt = PromptTemplate.from_template(prompt_template)
-        parser = PydanticOutputParser(pydantic_object=parser_pydantic_object)
+        with TRACER.span("analysis", url=url) as span, ANALYSIS_IN_FLIGHT.track_in_progress():
+            started = time.perf_counter()
+            result = self._analyze_content(
+                url, content, chat_model_provider, file_path, prompt_template, parser_pydantic_object)
+            outcome = "success" if result is not None else "failed"
+            span.set(outcome=outcome)
+        ANALYSIS_DURATION.observe(time.perf_counter() - started, outcome=outcome)
+        ANALYSIS_PAGES.inc(outcome=outcome)
+        return result
 
-        chain = prompt | chat_model | parser
+    def _analyze_content(self, url: str, content: dict, chat_model_provider: ChatModelProvider,
+                         file_path: str, prompt_template: str, parser_pydantic_object: PydanticT) -> dict:
+        chat_model = chat_model_provider.get_chat_model()
+        defaults = {
+            "url": url,
+            "title": content.get("title") or "",
+            "analysis_date": datetime.now(),
+        }
 
         try:
+            chain, inputs, estimated_tokens = self._prepare(
+                chat_model, prompt_template, parser_pydantic_object, content)
 
-            result = chain.invoke(
-                {
-                    "content": content,
-                    "format_instructions": parser.get_format_instructions()
-                }
-            )
+            if self._analysis_settings.cascade_enabled and not self._triage(content, chat_model_provider):
+                # Negative pages get the same empty result the full analysis would return
+                self._cascade_stats.record_skipped(estimated_tokens)
+                result = self._empty_result(parser_pydantic_object, defaults)
+            else:
+                message = self._scheduler.call(
+                    lambda: chain.invoke(inputs), estimated_tokens)
+                self._record_usage("analysis", message, estimated_tokens)
+                result = self._parse_output(
+                    message, parser_pydantic_object, defaults)
 
             result_dict = result.model_dump()
         except Exception as e:
@@ -53,5 +125,117 @@ class ContentAnalysisService:
             file_name = f"{file_path}/{file_name}"
 
         self._storage.write_json(file_name, result_dict)
+        self._notify(file_name, result_dict)
 
         return result_dict
+
+    def _notify(self, file_name: str, result_dict: dict) -> None:
+        # the analysis is stored already, a failing consumer only loses its own copy
+        for sink in self._sinks:
+            try:
+                sink.record(file_name, result_dict)
+            except Exception as e:
+                logger.error(f"{type(sink).__name__} could not record {file_name}: {str(e)}")
+
+    def _triage(self, content: dict, chat_model_provider: ChatModelProvider) -> bool:
+        """
+        Asks the small triage model whether the page is worth the full analysis.
+        Pages are escalated when the triage itself fails.
+        """
+
+        try:
+            triage_model = chat_model_provider.get_chat_model(
+                self._triage_model_settings)
+            chain, inputs, estimated_tokens = self._prepare(
+                triage_model, CONTENT_TRIAGE_PROMPT, ContentTriage,
+                str(content)[:self._analysis_settings.triage_max_chars])
+            self._cascade_stats.record_triage(estimated_tokens)
+            message = self._scheduler.call(
+                lambda: chain.invoke(inputs), estimated_tokens)
+            self._record_usage("triage", message, estimated_tokens)
+            # parsed apart from the analyses, so the triage does not skew their output stats
+            triage = ContentTriage.model_validate(self._output_data(message))
+        except Exception as e:
+            print(f"Error triaging content: {e}")
+            self._cascade_stats.record_triage_failure()
+            self._cascade_stats.record_escalated()
+            return True
+
+        if triage.relevance >= self._analysis_settings.triage_threshold:
+            self._cascade_stats.record_escalated()
+            return True
+        return False
+
+    def _record_usage(self, call: str, message: "AIMessage", estimated_tokens: int) -> None:
+        LLM_CALLS.inc(call=call)
+        LLM_TOKENS.inc(estimated_tokens, call=call, kind="estimated")
+        usage = getattr(message, "usage_metadata", None) or {}
+        for kind in ("input", "output"):
+            if usage.get(f"{kind}_tokens"):
+                LLM_TOKENS.inc(usage[f"{kind}_tokens"], call=call, kind=kind)
+
+    def _prepare(self, chat_model: "BaseChatModel", prompt_template: str,
+                 parser_pydantic_object: PydanticT,
+                 content: dict | str) -> tuple["Runnable", dict[str, str | dict], int]:
+        """
+        Builds the chain and inputs for a call, and estimates its tokens.
+        """
+
+        # langchain takes most of the startup time, so it is only loaded once a page is analyzed
+        from langchain_core.output_parsers import PydanticOutputParser
+        from langchain_core.prompts import PromptTemplate
+
+        prompt = PromptTemplate.from_template(prompt_template)
+        if self._output_mode == ContentAnalysisOutputMode.TOOL:
+            # The schema travels as the tool definition, so the prompt only needs a short instruction
+            chat_model = chat_model.bind_tools(
+                [parser_pydantic_object], tool_choice=parser_pydantic_object.__name__)
+            format_instructions = TOOL_FORMAT_INSTRUCTIONS.format(
+                tool_name=parser_pydantic_object.__name__)
+        else:
+            format_instructions = PydanticOutputParser(
+                pydantic_object=parser_pydantic_object).get_format_instructions()
+
+        inputs = {
+            "content": content,
+            "format_instructions": format_instructions
+        }
+        estimated_tokens = self._scheduler.estimate_tokens(
+            prompt.format(**inputs))
+        return prompt | chat_model, inputs, estimated_tokens
+
+    def _parse_output(self, message: "AIMessage", parser_pydantic_object: PydanticT,
+                      defaults: dict) -> BaseModel:
+        """
+        Validates the model output, repairing small schema errors locally instead of calling the model again.
+        """
+
+        self._output_stats.record_output()
+        try:
+            data = self._output_data(message)
+        except ValueError:
+            self._output_stats.record_parse_failure()
+            raise
+
+        try:
+            return parser_pydantic_object.model_validate(data)
+        except ValidationError:
+            self._output_stats.record_parse_failure()
+
+        result = repair_structured_output(
+            data, parser_pydantic_object, defaults)
+        self._output_stats.record_repair()
+        return result
+
+    def _output_data(self, message: "AIMessage") -> dict:
+        if message.tool_calls:
+            return message.tool_calls[0]["args"]
+        return extract_json(message.text)
+
+    def _empty_result(self, parser_pydantic_object: PydanticT, defaults: dict) -> BaseModel:
+        # lists are empty rather than missing, as the prompt asks of the model
+        data = dict(defaults)
+        for name, field in parser_pydantic_object.model_fields.items():
+            if name not in data and (field.is_required() or "list" in str(field.annotation)):
+                data[name] = []
+        return parser_pydantic_object.model_validate(data)
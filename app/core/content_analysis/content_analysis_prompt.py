@@ -35,6 +35,27 @@ You will NOT respond with any verbiage. Your response will just be JSON in the f
 {format_instructions}
 """
 
+CONTENT_TRIAGE_PROMPT = """
+You are a helpful assistant that screens content before a detailed analysis for non-profit organizations.
+
+Here is the beginning of the content:
+{content}
+
+Decide whether the content:
+- has_pain_points: describes problems, inefficiencies or challenges that non-profit organizations face
+- has_service_providers: presents companies, platforms or services that solve those problems for non-profit organizations
+- relevance: your confidence from 0 to 1 that a detailed analysis would find pain points or service providers
+
+DO NOT MAKE UP ANY INFORMATION. ONLY USE THE INFORMATION PROVIDED IN THE CONTENT.
+
+Response
+-----------
+
+You will NOT respond with any verbiage. Your response will just be JSON in the following format:
+
+{format_instructions}
+"""
+
 FOCUSED_CONTENT_ANALYSIS_PROMPT = """
 You are an expert in nonprofit operations and technology solutions. Analyze this content to identify automation opportunities and existing solutions.
 
@@ -0,0 +1,173 @@
+import json
+import threading
+from typing import Any
+
+from pydantic import BaseModel, ValidationError
+
+TOOL_FORMAT_INSTRUCTIONS = "Respond only by calling the `{tool_name}` tool with your analysis."
+
+# Number of validate-and-fix rounds before a result is considered unrepairable
+MAX_REPAIR_ROUNDS = 5
+
+# Validation errors raised when a nested list or object was sent as a JSON string
+STRUCTURED_TYPE_ERRORS = {"list_type", "dict_type",
+                          "model_type", "model_attributes_type"}
+
+
+class StructuredOutputStats:
+    """
+    Counts parsed model outputs, parse failures and local repairs.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._outputs = 0
+        self._parse_failures = 0
+        self._repaired = 0
+
+    def record_output(self) -> None:
+        with self._lock:
+            self._outputs += 1
+
+    def record_parse_failure(self) -> None:
+        with self._lock:
+            self._parse_failures += 1
+
+    def record_repair(self) -> None:
+        with self._lock:
+            self._repaired += 1
+
+    @property
+    def parse_failure_rate(self) -> float:
+        with self._lock:
+            return self._parse_failures / self._outputs if self._outputs else 0.0
+
+    @property
+    def repair_rate(self) -> float:
+        """Share of parse failures that were repaired locally."""
+        with self._lock:
+            return self._repaired / self._parse_failures if self._parse_failures else 0.0
+
+    def summary(self) -> dict[str, Any]:
+        with self._lock:
+            outputs, failures, repaired = self._outputs, self._parse_failures, self._repaired
+        return {
+            "outputs": outputs,
+            "parse_failures": failures,
+            "repaired": repaired,
+            "parse_failure_rate": failures / outputs if outputs else 0.0,
+            "repair_rate": repaired / failures if failures else 0.0,
+        }
+
+
+def extract_json(text: str) -> Any:
+    """
+    Extracts the outermost JSON object from a model response, ignoring fences and surrounding text.
+    """
+
+    start = text.find("{")
+    end = text.rfind("}")
+    if start == -1 or end < start:
+        raise ValueError("No JSON object found in model output")
+    return json.loads(text[start:end + 1])
+
+
+def repair_structured_output(data: Any, schema: type[BaseModel],
+                             defaults: dict[str, Any] | None = None) -> BaseModel:
+    """
+    Validates `data` against `schema`, fixing small schema errors locally.
+
+    Missing top level fields are filled from `defaults`, nested values sent as JSON strings
+    are decoded, null lists become empty, and list items that cannot be fixed are dropped.
+    Raises ValueError if the output still does not validate.
+    """
+
+    if not isinstance(data, dict):
+        raise ValueError(f"Expected a JSON object, got {type(data).__name__}")
+    data = json.loads(json.dumps(data, default=str))
+    defaults = defaults or {}
+
+    for _ in range(MAX_REPAIR_ROUNDS):
+        try:
+            return schema.model_validate(data)
+        except ValidationError as e:
+            errors = e.errors()
+
+        # Fix deepest locations first so removing list items keeps earlier indexes valid
+        fixed = False
+        dropped: set[tuple] = set()
+        for error in sorted(errors, key=_location_key, reverse=True):
+            fixed = _fix_error(data, error, defaults, dropped) or fixed
+        if not fixed:
+            break
+
+    try:
+        return schema.model_validate(data)
+    except ValidationError as e:
+        raise ValueError(f"Could not repair model output: {e}") from e
+
+
+def _fix_error(data: dict, error: dict, defaults: dict[str, Any], dropped: set[tuple]) -> bool:
+    loc = tuple(error["loc"])
+    if not loc or any(loc[:i] in dropped for i in range(1, len(loc) + 1)):
+        return False
+
+    parent = _resolve(data, loc[:-1])
+    key = loc[-1]
+    if parent is None:
+        return False
+
+    # Top level fields the caller already knows (url, title, analysis date, ...)
+    if len(loc) == 1 and key in defaults and (
+            error["type"] == "missing" or not isinstance(parent.get(key), (list, dict))):
+        parent[key] = defaults[key]
+        return True
+
+    value = _get(parent, key)
+    if error["type"] in STRUCTURED_TYPE_ERRORS and isinstance(value, str):
+        try:
+            parent[key] = json.loads(value)
+            return True
+        except json.JSONDecodeError:
+            pass
+    if error["type"] == "list_type" and value is None:
+        parent[key] = []
+        return True
+
+    return _drop_enclosing_item(data, loc, dropped)
+
+
+def _location_key(error: dict) -> tuple:
+    # tag each part so int indexes and str keys are never compared with each other
+    return tuple((isinstance(part, int), part) for part in error["loc"])
+
+
+def _drop_enclosing_item(data: dict, loc: tuple, dropped: set[tuple]) -> bool:
+    """
+    Removes the innermost list item that contains the invalid location.
+    """
+
+    for i in range(len(loc) - 1, -1, -1):
+        if isinstance(loc[i], int):
+            container = _resolve(data, loc[:i])
+            if isinstance(container, list) and loc[i] < len(container):
+                del container[loc[i]]
+                dropped.add(loc[:i + 1])
+                return True
+    return False
+
+
+def _resolve(data: Any, path: tuple) -> Any:
+    for part in path:
+        data = _get(data, part)
+        if data is None:
+            return None
+    return data
+
+
+def _get(container: Any, key: Any) -> Any:
+    if isinstance(container, dict):
+        return container.get(key)
+    if isinstance(container, list) and isinstance(key, int) and key < len(container):
+        return container[key]
+    return None
@@ -0,0 +1,203 @@
+import heapq
+import itertools
+import logging
+import re
+from collections import Counter
+from html.parser import HTMLParser
+from urllib.parse import parse_qsl, urldefrag, urlencode, urljoin, urlsplit, urlunsplit
+
+from configuration import CrawlSettings
+from core.domain import PageLink, ScrapePageResult
+from core.web_scrape import WebScrapeSession
+
+logger = logging.getLogger(__name__)
+
+# links to these are files, not posts worth analyzing
+SKIPPED_EXTENSIONS = (
+    ".pdf", ".jpg", ".jpeg", ".png", ".gif", ".svg", ".webp", ".mp3", ".mp4", ".zip",
+    ".css", ".js", ".xml", ".json", ".ico", ".doc", ".docx", ".xls", ".xlsx", ".ppt", ".pptx",
+)
+TRACKING_PARAMETERS = re.compile(r"^(utm_\w+|fbclid|gclid|mc_cid|mc_eid|ref)$")
+# a deeper link must be this much more relevant to be crawled first
+DEPTH_PENALTY = 0.25
+
+_WORD = re.compile(r"[a-z0-9]+")
+
+
+class _LinkParser(HTMLParser):
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.base: str | None = None
+        self.links: list[tuple[str, list[str]]] = []
+        self._open: list[str] | None = None
+
+    def handle_starttag(self, tag: str, attrs: list[tuple[str, str | None]]) -> None:
+        if tag == "base" and self.base is None:
+            self.base = dict(attrs).get("href")
+        elif tag == "a":
+            href = dict(attrs).get("href")
+            if href:
+                self._open = []
+                self.links.append((href, self._open))
+
+    def handle_endtag(self, tag: str) -> None:
+        if tag == "a":
+            self._open = None
+
+    def handle_data(self, data: str) -> None:
+        if self._open is not None:
+            self._open.append(data)
+
+
+def extract_links(html: str, base_url: str) -> list[PageLink]:
+    """
+    Returns the http(s) links of the page, absolute and without fragments, in page order.
+    """
+
+    parser = _LinkParser()
+    parser.feed(html)
+    parser.close()
+    base = urljoin(base_url, parser.base) if parser.base else base_url
+
+    links: dict[str, PageLink] = {}
+    for href, text in parser.links:
+        url = urldefrag(urljoin(base, href.strip())).url
+        if urlsplit(url).scheme not in ("http", "https"):
+            continue
+        text = " ".join("".join(text).split())
+        # the first anchor wins, unless it had no text (e.g. an image link)
+        if url not in links or not links[url].text:
+            links[url] = PageLink(url=url, text=text)
+    return list(links.values())
+
+
+def normalize_url(url: str) -> str:
+    """
+    Returns the URL in the form used to tell pages apart: without fragment, tracking
+    parameters, default port or trailing slash, and with a lowercase host.
+    """
+
+    parts = urlsplit(url)
+    host = (parts.hostname or "").lower()
+    if parts.port and (parts.scheme, parts.port) not in (("http", 80), ("https", 443)):
+        host = f"{host}:{parts.port}"
+    query = urlencode([(k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True)
+                       if not TRACKING_PARAMETERS.match(k)])
+    return urlunsplit((parts.scheme.lower(), host, parts.path.rstrip("/") or "/", query, ""))
+
+
+def domain_of(url: str) -> str:
+    host = (urlsplit(url).hostname or "").lower()
+    return host[4:] if host.startswith("www.") else host
+
+
+def query_terms(query: str) -> set[str]:
+    return {word for word in _WORD.findall(query.lower()) if len(word) > 2}
+
+
+def relevance(link: PageLink, terms: set[str]) -> float:
+    """
+    The share of the query terms found in the anchor text or the path of the link.
+    """
+
+    if not terms:
+        return 0.0
+    words = set(_WORD.findall(f"{link.text} {urlsplit(link.url).path}".lower()))
+    return len(terms & words) / len(terms)
+
+
+def is_crawlable(url: str) -> bool:
+    return not urlsplit(url).path.lower().endswith(SKIPPED_EXTENSIONS)
+
+
+class CrawlFrontier:
+    """
+    The links waiting to be scraped, the most promising first: relevant anchor text
+    raises a link's priority and every level of depth lowers it.
+    """
+
+    def __init__(self):
+        self._heap: list[tuple[float, int, str, int]] = []
+        self._order = itertools.count()
+
+    def __len__(self) -> int:
+        return len(self._heap)
+
+    def push(self, url: str, depth: int, score: float) -> None:
+        priority = score - DEPTH_PENALTY * depth
+        # ties go to the link found first
+        heapq.heappush(self._heap, (-priority, next(self._order), url, depth))
+
+    def pop(self) -> tuple[str, int]:
+        _, _, url, depth = heapq.heappop(self._heap)
+        return url, depth
+
+
+class Crawl:
+    """
+    Expands search results into the related pages of their sites for one run.
+
+    Each search result is crawled from its own frontier, following only links of its domain,
+    up to the depth and page limits. The pages seen and the pages taken from each domain are
+    shared by the whole run, so no page is scraped twice and no site takes the whole budget.
+    """
+
+    def __init__(self, settings: CrawlSettings):
+        self._settings = settings
+        self._seen: set[str] = set()
+        self._domain_pages: Counter[str] = Counter()
+
+    def claim(self, url: str) -> bool:
+        """
+        Marks the page as seen, returns whether it was new.
+        """
+
+        normalized = normalize_url(url)
+        if normalized in self._seen:
+            return False
+        self._seen.add(normalized)
+        return True
+
+    @property
+    def domain_pages(self) -> dict[str, int]:
+        return dict(self._domain_pages)
+
+    async def expand(self, session: WebScrapeSession, url: str, query: str,
+                     file_path: str = None) -> list[ScrapePageResult]:
+        """
+        Scrapes the search result and the pages it leads to, raising if the search result itself fails.
+        """
+
+        settings = self._settings
+        terms = query_terms(query)
+        domain = domain_of(url)
+        self.claim(url)
+        frontier = CrawlFrontier()
+        frontier.push(url, 0, 1.0)
+        pages: list[ScrapePageResult] = []
+
+        while frontier and len(pages) < settings.max_pages_per_seed:
+            if self._domain_pages[domain] >= settings.max_pages_per_domain:
+                logger.info(f"Crawl budget of {domain} used up")
+                break
+            page_url, depth = frontier.pop()
+            self._domain_pages[domain] += 1
+            page = await session.scrape(page_url, file_path)
+            if not page or not page.success:
+                error = page.error_message if page else "no result"
+                if depth == 0:
+                    raise RuntimeError(f"Scraping {page_url} failed: {error}")
+                logger.warning(f"Crawling {page_url} failed: {error}")
+                continue
+            pages.append(page)
+            if depth >= settings.max_depth:
+                continue
+
+            for link in page.links:
+                if domain_of(link.url) != domain or not is_crawlable(link.url):
+                    continue
+                score = relevance(link, terms)
+                if score < settings.min_relevance or not self.claim(link.url):
+                    continue
+                frontier.push(link.url, depth + 1, score)
+        return pages
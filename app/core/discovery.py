@@ -0,0 +1,200 @@
+import zlib
+from datetime import datetime, timedelta, timezone
+from email.utils import parsedate_to_datetime
+from fnmatch import fnmatchcase
+from typing import Iterator
+from urllib.parse import urlsplit
+from xml.etree.ElementTree import Element, ParseError, XMLPullParser
+
+from configuration import DiscoverySettings
+from pydantic import BaseModel, Field
+
+GZIP_MAGIC = b"\x1f\x8b"
+# the elements listing one URL: sitemap <url> and <sitemap>, RSS <item> and Atom <entry>
+ENTRY_ELEMENTS = ("url", "sitemap", "item", "entry")
+
+
+class DiscoveredKind:
+    PAGE = "page"
+    SITEMAP = "sitemap"
+
+
+class DiscoveredUrl(BaseModel):
+    url: str = Field(description="The URL listed by the sitemap or feed")
+    kind: str = Field(default=DiscoveredKind.PAGE, description="Whether the URL is a page or a nested sitemap")
+    last_modified: datetime | None = Field(default=None, description="The lastmod or publication date, in UTC")
+    title: str | None = Field(default=None, description="The title given by a feed")
+    source: str = Field(default="", description="The sitemap or feed listing the URL")
+
+
+def parse_date(value: str | None) -> datetime | None:
+    """
+    Parses W3C datetimes of sitemaps and Atom feeds and RFC 822 dates of RSS feeds, as UTC.
+    """
+
+    if not value or not value.strip():
+        return None
+    value = value.strip()
+    try:
+        parsed = datetime.fromisoformat(value)
+    except ValueError:
+        try:
+            parsed = parsedate_to_datetime(value)
+        except (TypeError, ValueError):
+            return None
+    return parsed.replace(tzinfo=timezone.utc) if parsed.tzinfo is None else parsed.astimezone(timezone.utc)
+
+
+def _name(element: Element) -> str:
+    return element.tag.rsplit("}", 1)[-1].lower()
+
+
+def _child_text(element: Element, *names: str) -> str | None:
+    for name in names:
+        for child in element:
+            if _name(child) == name and child.text and child.text.strip():
+                return child.text.strip()
+    return None
+
+
+def _atom_link(entry: Element) -> str | None:
+    for child in entry:
+        if _name(child) == "link" and child.get("rel", "alternate") == "alternate" and child.get("href"):
+            return child.get("href")
+    return None
+
+
+class SitemapParser:
+    """
+    Incremental parser of sitemaps, sitemap indexes, RSS and Atom feeds.
+
+    Bytes are fed as they arrive, gzip-compressed or not, and the URLs are handed out as soon
+    as their element closes. Parsed elements are cleared and dropped from their parent, so memory
+    stays flat on huge sitemaps.
+
+    With `max_bytes`, a gzip chunk is inflated to one byte past the limit at most, so `bytes_read`
+    tells the caller to stop before a small compressed chunk expands into a huge document.
+    """
+
+    def __init__(self, source: str = "", max_bytes: int | None = None):
+        self._source = source
+        self._max_bytes = max_bytes
+        self._parser = XMLPullParser(events=("start", "end"))
+        # the elements opened and not yet closed, the root first
+        self._open: list[Element] = []
+        self._decompressor = None
+        self._started = False
+        self.bytes_read = 0
+
+    @property
+    def exceeded(self) -> bool:
+        return self._max_bytes is not None and self.bytes_read > self._max_bytes
+
+    def feed(self, chunk: bytes) -> Iterator[DiscoveredUrl]:
+        if self.exceeded:
+            return iter(())
+        if not self._started:
+            self._started = True
+            if chunk.startswith(GZIP_MAGIC):
+                self._decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS)
+        if self._decompressor:
+            if self._max_bytes is None:
+                chunk = self._decompressor.decompress(chunk)
+            else:
+                # stops short of the whole chunk only once the limit is passed
+                chunk = self._decompressor.decompress(chunk, self._max_bytes - self.bytes_read + 1)
+        self.bytes_read += len(chunk)
+        self._parser.feed(chunk)
+        return self._drain()
+
+    def close(self) -> Iterator[DiscoveredUrl]:
+        if self._decompressor and not self.exceeded:
+            self._parser.feed(self._decompressor.flush())
+        try:
+            self._parser.close()
+        except ParseError:
+            # a truncated document still yields the URLs read so far
+            pass
+        return self._drain()
+
+    def _drain(self) -> Iterator[DiscoveredUrl]:
+        for event, element in self._parser.read_events():
+            if event == "start":
+                self._open.append(element)
+                continue
+            self._open.pop()
+            name = _name(element)
+            found = None
+            if name == "url":
+                found = self._entry(_child_text(element, "loc"), DiscoveredKind.PAGE,
+                                    _child_text(element, "lastmod"))
+            elif name == "sitemap":
+                found = self._entry(_child_text(element, "loc"), DiscoveredKind.SITEMAP,
+                                    _child_text(element, "lastmod"))
+            elif name == "item":
+                found = self._entry(_child_text(element, "link", "guid"), DiscoveredKind.PAGE,
+                                    _child_text(element, "pubdate", "date", "updated"),
+                                    _child_text(element, "title"))
+            elif name == "entry":
+                found = self._entry(_atom_link(element), DiscoveredKind.PAGE,
+                                    _child_text(element, "updated", "published"),
+                                    _child_text(element, "title"))
+            if name in ENTRY_ELEMENTS:
+                # the children of an entry are read when it closes, then dropped with it
+                element.clear()
+                if self._open:
+                    self._open[-1].remove(element)
+            if found:
+                yield found
+
+    def _entry(self, url: str | None, kind: str, last_modified: str | None,
+               title: str | None = None) -> DiscoveredUrl | None:
+        if not url or urlsplit(url).scheme not in ("http", "https"):
+            return None
+        return DiscoveredUrl(url=url, kind=kind, last_modified=parse_date(last_modified),
+                             title=title, source=self._source)
+
+
+class DiscoveryFilter:
+    """
+    Keeps the URLs modified recently enough whose path matches the patterns. A URL without
+    a date is kept, and nested sitemaps are only filtered by date.
+    """
+
+    def __init__(self, since: datetime | None = None, include_paths: list[str] | None = None,
+                 exclude_paths: list[str] | None = None):
+        self.since = since
+        self.include_paths = include_paths or []
+        self.exclude_paths = exclude_paths or []
+
+    @staticmethod
+    def from_settings(settings: DiscoverySettings, now: datetime | None = None) -> "DiscoveryFilter":
+        since = None
+        if settings.since_days is not None:
+            since = (now or datetime.now(timezone.utc)) - timedelta(days=settings.since_days)
+        return DiscoveryFilter(since, settings.include_paths, settings.exclude_paths)
+
+    def accepts(self, found: DiscoveredUrl) -> bool:
+        if self.since and found.last_modified and found.last_modified < self.since:
+            return False
+        if found.kind == DiscoveredKind.SITEMAP:
+            return True
+        path = urlsplit(found.url).path or "/"
+        if self.include_paths and not any(fnmatchcase(path, pattern) for pattern in self.include_paths):
+            return False
+        return not any(fnmatchcase(path, pattern) for pattern in self.exclude_paths)
+
+
+def newest_first(found: list[DiscoveredUrl]) -> list[DiscoveredUrl]:
+    """
+    Deduplicates the URLs and orders them by date, the undated last.
+    """
+
+    unique: dict[str, DiscoveredUrl] = {}
+    for item in found:
+        known = unique.get(item.url)
+        if known is None or (item.last_modified and (not known.last_modified
+                                                     or item.last_modified > known.last_modified)):
+            unique[item.url] = item
+    oldest = datetime.min.replace(tzinfo=timezone.utc)
+    return sorted(unique.values(), key=lambda item: item.last_modified or oldest, reverse=True)
@@ -12,6 +12,7 @@ class SearchProvider:
     """
     GOOGLE = "google"
     DUCKDUCKGO = "duckduckgo"
+    SITEMAP = "sitemap"
 
 
 class SearchResult(BaseModel):
@@ -33,12 +34,18 @@ class ModelHost:
     ANTHROPIC = "anthropic"
     AZURE = "azure"
     AWS = "aws"
+    ROUTING = "routing"  # spreads calls over the hosts in LLM_ROUTING_HOSTS
 
 
 class ModelProvider:
     ANTHROPIC = "anthropic"
 
 
+class PageLink(BaseModel):
+    url: str = Field(description="The absolute URL the link points to")
+    text: str = Field(default="", description="The anchor text of the link")
+
+
 class ScrapePageResult(BaseModel):
     url: str = Field(description="The URL to scrape")
     success: bool = Field(description="Whether the scraping was successful")
@@ -48,6 +55,15 @@ class ScrapePageResult(BaseModel):
     content: str | None = Field(description="The content of the scraped page")
     error_message: str | None = Field(
         description="The error message if the scraping failed")
+    etag: str | None = Field(
+        default=None, description="The ETag header of the response, to revalidate the page later")
+    last_modified: str | None = Field(
+        default=None, description="The Last-Modified header of the response, to revalidate the page later")
+    not_modified: bool = Field(
+        default=False, description="Whether the server answered 304 Not Modified, leaving no content")
+    # kept in memory for the crawl, never stored nor passed to the analysis
+    links: list[PageLink] = Field(
+        default_factory=list, exclude=True, description="The links of the page, collected when crawling")
 
 
 class ScrapingResult(BaseModel):
@@ -147,6 +163,16 @@ class ContentAnalysis(BaseModel):
     service_providers: list[ServiceProvider] | None = None
 
 
+class ContentTriage(BaseModel):
+    has_pain_points: bool = Field(
+        description="Whether the content describes pain points of non-profit organizations")
+    has_service_providers: bool = Field(
+        description="Whether the content presents service providers solving non-profit pain points")
+    relevance: float = Field(
+        ge=0.0, le=1.0,
+        description="Confidence from 0 to 1 that a full analysis would find pain points or service providers")
+
+
 class AutomationOpportunity(BaseModel):
     description: str
     current_process: str
@@ -0,0 +1,262 @@
+import logging
+import re
+import unicodedata
+from contextlib import AbstractContextManager
+from datetime import date, datetime
+from difflib import SequenceMatcher
+from urllib.parse import urlsplit
+
+from configuration import Settings
+from core.analysis_index import AnalysisSink
+from injector import inject
+from pydantic import BaseModel, Field
+
+logger = logging.getLogger(__name__)
+
+# words that tell company forms apart, not companies
+LEGAL_SUFFIXES = {
+    "inc", "incorporated", "llc", "ltd", "limited", "corp", "corporation", "co", "company",
+    "gmbh", "plc", "pbc", "sa", "ag", "bv", "pty", "lp", "llp",
+}
+# second-level labels under which a registrable domain takes three labels, as in example.co.uk
+SECOND_LEVEL_LABELS = {"co", "com", "org", "net", "gov", "ac", "edu"}
+# hosts shared by unrelated providers, which therefore say nothing about identity
+SHARED_DOMAINS = {
+    "facebook.com", "linkedin.com", "twitter.com", "x.com", "instagram.com", "youtube.com",
+    "github.com", "google.com", "apple.com", "wordpress.com", "medium.com", "wixsite.com",
+    "squarespace.com", "shopify.com", "salesforce.com", "microsoft.com",
+}
+DOMAIN_KEY = "d:"
+NAME_KEY = "n:"
+PREFIX_KEY = "p:"
+PREFIX_LENGTH = 4
+
+_DOMAIN_LIKE = re.compile(r"^(?:https?://)?(?:www\.)?[a-z0-9-]+(?:\.[a-z0-9-]+)+/?$")
+_TOKEN = re.compile(r"[a-z0-9]+")
+
+
+def registrable_domain(website: str | None) -> str | None:
+    """
+    Returns the domain a website is registered under, e.g. bloomerang.co for https://app.bloomerang.co/x.
+    """
+
+    if not website or not website.strip():
+        return None
+    website = website.strip().lower()
+    host = urlsplit(website if "//" in website else f"//{website}").hostname or ""
+    labels = [label for label in host.split(".") if label]
+    if len(labels) < 2:
+        return None
+    keep = 3 if len(labels) >= 3 and labels[-2] in SECOND_LEVEL_LABELS and len(labels[-1]) == 2 else 2
+    return ".".join(labels[-keep:])
+
+
+def normalize_name(name: str | None) -> str:
+    """
+    Reduces a provider name to the form its variants share: "Bloomerang, Inc.", "bloomerang.co"
+    and "The Bloomerang" all become "bloomerang".
+    """
+
+    if not name:
+        return ""
+    text = unicodedata.normalize("NFKD", name).encode("ascii", "ignore").decode().lower().strip()
+    if _DOMAIN_LIKE.match(text):
+        domain = registrable_domain(text)
+        text = domain.split(".")[0] if domain else text
+    tokens = _TOKEN.findall(text.replace("&", " and "))
+    while len(tokens) > 1 and tokens[-1] in LEGAL_SUFFIXES:
+        tokens.pop()
+    if len(tokens) > 1 and tokens[0] == "the":
+        tokens = tokens[1:]
+    return " ".join(tokens)
+
+
+def name_similarity(a: str, b: str) -> float:
+    return SequenceMatcher(None, a.replace(" ", ""), b.replace(" ", "")).ratio()
+
+
+class ProviderMention(BaseModel):
+    url: str = Field(description="The analyzed page mentioning the provider")
+    provider_index: int = Field(description="The position of the provider in the analysis")
+    name: str = Field(description="The name as written by the analysis")
+    website: str | None = None
+    date: str | None = Field(default=None, description="The analysis date, YYYY-MM-DD")
+
+    @property
+    def name_key(self) -> str:
+        return normalize_name(self.name)
+
+    @property
+    def domain(self) -> str | None:
+        domain = registrable_domain(self.website)
+        if not domain and _DOMAIN_LIKE.match(self.name.strip().lower()):
+            domain = registrable_domain(self.name)
+        return domain if domain not in SHARED_DOMAINS else None
+
+    def blocking_keys(self) -> list[str]:
+        """
+        The keys under which matching entities are looked up: only entities sharing a key are
+        compared, so resolving a mention never scans all entities.
+        """
+
+        keys = []
+        if self.domain:
+            keys.append(f"{DOMAIN_KEY}{self.domain}")
+        name_key = self.name_key
+        if name_key:
+            keys.append(f"{NAME_KEY}{name_key}")
+            keys.append(f"{PREFIX_KEY}{name_key.replace(' ', '')[:PREFIX_LENGTH]}")
+        return keys
+
+
+def mentions_of(analysis: dict) -> list[ProviderMention]:
+    analysis_date = analysis.get("analysis_date")
+    if isinstance(analysis_date, datetime):
+        analysis_date = analysis_date.date().isoformat()
+    elif isinstance(analysis_date, str):
+        analysis_date = analysis_date[:10]
+    return [
+        ProviderMention(url=analysis.get("url") or "", provider_index=index, name=provider["name"],
+                        website=provider.get("website"), date=analysis_date)
+        for index, provider in enumerate(analysis.get("service_providers") or [])
+        if provider.get("name") and normalize_name(provider["name"])
+    ]
+
+
+class ProviderEntity(BaseModel):
+    id: int
+    canonical_name: str = Field(description="The most frequent name of the provider")
+    name_key: str = Field(description="The normalized name the entity was created with")
+    domain: str | None = Field(default=None, description="The first registrable domain seen for the provider")
+    mentions: int = Field(default=0, description="The mentions resolved to the entity")
+    pages: int = Field(default=0, description="The analyzed pages mentioning the entity")
+    last_seen: str | None = Field(default=None, description="The latest analysis date mentioning the entity")
+    aliases: list[str] = Field(default_factory=list, description="The names the provider was mentioned by")
+
+
+class EntityCandidate(BaseModel):
+    entity: ProviderEntity
+    keys: set[str] = Field(description="The blocking keys shared with the mention")
+
+
+class EntityStore:
+    """
+    Interface for the provider entities and the mentions resolved to them. Merged entities
+    point to the entity that absorbed them, so their ids stay valid.
+    """
+
+    def transaction(self) -> AbstractContextManager:
+        """
+        Makes the calls inside atomic and isolated from other resolvers
+        """
+
+        raise NotImplementedError
+
+    def remove_mentions(self, url: str) -> None:
+        raise NotImplementedError
+
+    def candidates(self, keys: list[str], limit: int) -> list[EntityCandidate]:
+        raise NotImplementedError
+
+    def create(self, mention: ProviderMention) -> int:
+        raise NotImplementedError
+
+    def add_mention(self, entity_id: int, mention: ProviderMention) -> None:
+        """
+        Resolves the mention to the entity and files the entity under the keys of the mention
+        """
+
+        raise NotImplementedError
+
+    def merge(self, entity_id: int, other_ids: list[int]) -> None:
+        raise NotImplementedError
+
+    def get(self, entity_id: int) -> ProviderEntity | None:
+        raise NotImplementedError
+
+    def find(self, name: str) -> list[ProviderEntity]:
+        """
+        Returns the entities known by the name, normalized, or by the domain
+        """
+
+        raise NotImplementedError
+
+    def top(self, since: date | None = None, until: date | None = None, limit: int = 20) -> list[ProviderEntity]:
+        raise NotImplementedError
+
+    def stats(self) -> dict[str, int]:
+        raise NotImplementedError
+
+    def clear(self) -> None:
+        raise NotImplementedError
+
+    def close(self) -> None:
+        pass
+
+
+class EntityResolver(AnalysisSink):
+    """
+    Resolves the service providers of each stored analysis to canonical provider entities.
+
+    A mention is only compared with the entities sharing one of its blocking keys. A shared
+    domain or normalized name is a match, and every entity matched that way is merged into one.
+    Otherwise the closest name among the entities with the same prefix is taken above a
+    threshold, unless the two have different domains, and failing that a new entity is created.
+    """
+
+    @inject
+    def __init__(self, settings: Settings, store: EntityStore):
+        entity_settings = settings.entity_resolution_settings
+        self._threshold = entity_settings.match_threshold
+        self._max_candidates = entity_settings.max_candidates
+        self._store = store
+
+    @property
+    def store(self) -> EntityStore:
+        return self._store
+
+    def record(self, file_name: str, analysis: dict) -> None:
+        self.resolve(analysis.get("url") or "", mentions_of(analysis))
+
+    def resolve(self, url: str, mentions: list[ProviderMention]) -> list[int]:
+        """
+        Resolves the mentions of a page, replacing those of a previous analysis of the page.
+        Returns the entity of each mention.
+        """
+
+        with self._store.transaction():
+            self._store.remove_mentions(url)
+            resolved = []
+            for mention in mentions:
+                entity_id = self._match(mention)
+                if entity_id is None:
+                    entity_id = self._store.create(mention)
+                self._store.add_mention(entity_id, mention)
+                resolved.append(entity_id)
+            return resolved
+
+    def _match(self, mention: ProviderMention) -> int | None:
+        candidates = self._store.candidates(mention.blocking_keys(), self._max_candidates)
+        domain = mention.domain
+        exact = [c.entity for c in candidates
+                 if any(key.startswith(DOMAIN_KEY) for key in c.keys)
+                 or (any(key.startswith(NAME_KEY) for key in c.keys) and not self._conflict(domain, c.entity))]
+        if exact:
+            root = max(exact, key=lambda entity: (entity.mentions, -entity.id))
+            others = [entity.id for entity in exact if entity.id != root.id]
+            if others:
+                logger.info(f"Merging provider entities {others} into {root.id} ({root.canonical_name})")
+                self._store.merge(root.id, others)
+            return root.id
+
+        name_key = mention.name_key
+        scored = [(name_similarity(name_key, c.entity.name_key), c.entity) for c in candidates
+                  if not self._conflict(domain, c.entity)]
+        scored = [(score, entity) for score, entity in scored if score >= self._threshold]
+        if not scored:
+            return None
+        return max(scored, key=lambda pair: (pair[0], pair[1].mentions))[1].id
+
+    def _conflict(self, domain: str | None, entity: ProviderEntity) -> bool:
+        # two providers with the same name but different sites are different providers
+        return bool(domain and entity.domain and domain != entity.domain)
@@ -0,0 +1,103 @@
+from typing import Any
+
+from pydantic import BaseModel, Field
+
+SCRAPE_QUEUE = "scrape"
+ANALYSIS_QUEUE = "analysis"
+
+
+class JobStatus:
+    PENDING = "pending"
+    LEASED = "leased"
+    DONE = "done"
+    DEAD = "dead"
+
+
+class Job(BaseModel):
+    id: str = Field(description="The unique id of the job")
+    queue: str = Field(description="The queue the job belongs to")
+    key: str | None = Field(
+        description="The deduplication key, unique within the queue")
+    payload: dict[str, Any] = Field(description="The work to do")
+    attempts: int = Field(
+        description="The number of times the job was leased, including this one")
+    max_attempts: int = Field(
+        description="The attempts after which a failing job is dead-lettered")
+    lease_token: str | None = Field(
+        default=None, description="Proves the lease is still held when completing the job")
+    error: str | None = Field(
+        default=None, description="The error of the last failed attempt")
+
+
+class JobQueue:
+    """
+    Interface for durable work queues shared by several worker processes.
+
+    A leased job is invisible to other workers until its lease expires, so a worker that
+    dies mid-job has the job retried elsewhere. Jobs that keep failing are dead-lettered.
+    """
+
+    def enqueue(self, queue: str, payload: dict[str, Any], key: str | None = None,
+                delay_seconds: float = 0, max_attempts: int | None = None) -> bool:
+        """
+        Adds a job, returns False if a pending or leased job has the same key. A key whose jobs
+        are all done or dead can be enqueued again.
+        """
+
+        raise NotImplementedError
+
+    def enqueue_many(self, queue: str, payloads: list[tuple[str | None, dict[str, Any]]]) -> int:
+        """
+        Adds several (key, payload) jobs, returns the number added
+        """
+
+        return sum(self.enqueue(queue, payload, key) for key, payload in payloads)
+
+    def lease(self, queue: str, worker_id: str, limit: int = 1,
+              lease_seconds: float | None = None) -> list[Job]:
+        """
+        Takes up to `limit` available jobs for `lease_seconds`
+        """
+
+        raise NotImplementedError
+
+    def extend(self, job: Job, lease_seconds: float | None = None) -> bool:
+        """
+        Extends the lease of a job still being worked on, returns False if the lease was lost
+        """
+
+        raise NotImplementedError
+
+    def complete(self, job: Job) -> bool:
+        """
+        Marks the job done, returns False if the lease was lost
+        """
+
+        raise NotImplementedError
+
+    def fail(self, job: Job, error: str, retry_delay_seconds: float | None = None) -> bool:
+        """
+        Schedules a retry of the job, or dead-letters it once out of attempts
+        """
+
+        raise NotImplementedError
+
+    def requeue_dead(self, queue: str) -> int:
+        """
+        Gives the dead-lettered jobs of the queue a new set of attempts
+        """
+
+        raise NotImplementedError
+
+    def dead_letters(self, queue: str, limit: int = 100) -> list[Job]:
+        raise NotImplementedError
+
+    def stats(self, queue: str) -> dict[str, int]:
+        """
+        Counts the jobs of the queue by status
+        """
+
+        raise NotImplementedError
+
+    def close(self) -> None:
+        pass
@@ -0,0 +1,276 @@
+import asyncio
+import logging
+import uuid
+from collections import OrderedDict
+from contextlib import AsyncExitStack
+from datetime import datetime
+from typing import Any, AsyncIterator, Awaitable, Callable
+
+from configuration import Settings
+from core.chat_model import ChatModelProvider
+from core.content_analysis import ContentAnalysisService
+from core.domain import ScrapePageResult
+from core.profiling import stage_scope
+from core.storage import Storage
+from core.web_scrape import WebScraper, WebScrapeSession
+from core.web_search import SearchEngine
+from injector import inject
+from pydantic import BaseModel, Field
+
+logger = logging.getLogger(__name__)
+
+
+class JobKind:
+    SEARCH = "search"
+    SCRAPE = "scrape"
+    ANALYZE = "analyze"
+    ALL = (SEARCH, SCRAPE, ANALYZE)
+
+
+class JobState:
+    PENDING = "pending"
+    RUNNING = "running"
+    SUCCEEDED = "succeeded"
+    FAILED = "failed"
+    CANCELLED = "cancelled"
+    FINISHED = (SUCCEEDED, FAILED, CANCELLED)
+
+
+class JobRecord(BaseModel):
+    id: str = Field(description="The unique id of the job")
+    kind: str = Field(description="What the job does with its items: search, scrape or analyze")
+    items: list[str] = Field(description="The queries to search or the URLs to scrape or analyze")
+    file_path: str = Field(description="The storage folder the results are written under")
+    state: str = Field(default=JobState.PENDING, description="Where the job is in its lifecycle")
+    created_at: datetime = Field(default_factory=datetime.now)
+    started_at: datetime | None = None
+    finished_at: datetime | None = None
+    succeeded: int = Field(default=0, description="The items done successfully")
+    failed: int = Field(default=0, description="The items that failed")
+
+
+class JobItemResult(BaseModel):
+    item: str = Field(description="The query or URL the result is for")
+    success: bool
+    data: dict[str, Any] | None = Field(
+        default=None, description="The search results, scraped page or analysis")
+    error: str | None = None
+
+
+class _JobRun:
+    """
+    A job with its results so far, which readers follow as they arrive.
+    """
+
+    def __init__(self, record: JobRecord):
+        self.record = record
+        self.results: list[JobItemResult] = []
+        self.task: asyncio.Task | None = None
+        self._changed = asyncio.Event()
+
+    @property
+    def finished(self) -> bool:
+        return self.record.state in JobState.FINISHED
+
+    def add(self, result: JobItemResult) -> None:
+        self.results.append(result)
+        if result.success:
+            self.record.succeeded += 1
+        else:
+            self.record.failed += 1
+        self._notify()
+
+    def finish(self, state: str) -> None:
+        self.record.state = state
+        self.record.finished_at = datetime.now()
+        self._notify()
+
+    async def follow(self, offset: int = 0) -> AsyncIterator[JobItemResult]:
+        while True:
+            changed = self._changed
+            while offset < len(self.results):
+                yield self.results[offset]
+                offset += 1
+            if self.finished:
+                return
+            await changed.wait()
+
+    def _notify(self) -> None:
+        # wakes the current readers, later ones wait on a fresh event
+        self._changed.set()
+        self._changed = asyncio.Event()
+
+
+class JobService:
+    """
+    Runs search, scrape and analyze jobs inside a long-running process.
+
+    The search client, the browser and the LLM clients are built once and shared by
+    every job, so a job starts without paying for a cold process. The concurrency
+    limits of the pipeline settings apply across all the running jobs.
+    """
+
+    @inject
+    def __init__(self, settings: Settings, search_engine: SearchEngine, web_scraper: WebScraper,
+                 content_analysis: ContentAnalysisService, chat_model_provider: ChatModelProvider,
+                 storage: Storage):
+        self._api_settings = settings.api_settings
+        pipeline_settings = settings.pipeline_settings
+        self._search_engine = search_engine
+        self._web_scraper = web_scraper
+        self._content_analysis = content_analysis
+        self._chat_model_provider = chat_model_provider
+        self._storage = storage
+        self._search_slots = asyncio.Semaphore(pipeline_settings.search_concurrency)
+        self._analysis_slots = asyncio.Semaphore(pipeline_settings.analysis_concurrency)
+        self._jobs: OrderedDict[str, _JobRun] = OrderedDict()
+        self._resources = AsyncExitStack()
+        self._session: WebScrapeSession | None = None
+        self._session_lock = asyncio.Lock()
+
+    async def start(self) -> None:
+        """
+        Launches the browser up front, unless it is left to the first scrape job.
+        """
+
+        if self._api_settings.warm_browser:
+            await self._scrape_session()
+
+    async def close(self) -> None:
+        """
+        Cancels the running jobs and closes the browser.
+        """
+
+        tasks = [run.task for run in self._jobs.values() if run.task and not run.task.done()]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        await self._resources.aclose()
+        self._session = None
+
+    def submit(self, kind: str, items: list[str], file_path: str | None = None) -> JobRecord:
+        if kind not in JobKind.ALL:
+            raise ValueError(f"Unknown job kind {kind}, must be one of {', '.join(JobKind.ALL)}")
+        items = list(dict.fromkeys(item.strip() for item in items if item.strip()))
+        if not items:
+            raise ValueError("A job needs at least one item")
+
+        run = _JobRun(JobRecord(
+            id=uuid.uuid4().hex, kind=kind, items=items,
+            file_path=file_path or datetime.now().strftime("%Y/%m/%d")))
+        self._jobs[run.record.id] = run
+        run.task = asyncio.create_task(self._run(run))
+        self._forget_finished()
+        return run.record
+
+    def get(self, job_id: str) -> JobRecord | None:
+        run = self._jobs.get(job_id)
+        return run.record if run else None
+
+    def list_jobs(self) -> list[JobRecord]:
+        return [run.record for run in self._jobs.values()]
+
+    async def cancel(self, job_id: str) -> JobRecord | None:
+        run = self._jobs.get(job_id)
+        if run is None:
+            return None
+        if run.task and not run.task.done():
+            run.task.cancel()
+            await asyncio.gather(run.task, return_exceptions=True)
+        return run.record
+
+    def results(self, job_id: str, offset: int = 0) -> AsyncIterator[JobItemResult]:
+        """
+        Streams the results of the job from `offset`, waiting for new ones until the job finishes.
+        """
+
+        run = self._jobs.get(job_id)
+        if run is None:
+            raise KeyError(job_id)
+        return run.follow(offset)
+
+    def summary(self) -> dict[str, Any]:
+        states = {state: 0 for state in (JobState.PENDING, JobState.RUNNING, *JobState.FINISHED)}
+        for run in self._jobs.values():
+            states[run.record.state] += 1
+        return {"jobs": states, "browser": self._session is not None}
+
+    async def _run(self, run: _JobRun) -> None:
+        record = run.record
+        handler: Callable[[str, str], Awaitable[dict[str, Any]]] = {
+            JobKind.SEARCH: self._search,
+            JobKind.SCRAPE: self._scrape,
+            JobKind.ANALYZE: self._analyze,
+        }[record.kind]
+        record.state = JobState.RUNNING
+        record.started_at = datetime.now()
+        try:
+            with stage_scope(record.kind):
+                await asyncio.gather(*(self._run_item(run, handler, item) for item in record.items))
+        except asyncio.CancelledError:
+            run.finish(JobState.CANCELLED)
+            raise
+        except Exception as e:
+            logger.error(f"Job {record.id} failed: {str(e)}")
+            run.finish(JobState.FAILED)
+        else:
+            run.finish(JobState.FAILED if record.failed and not record.succeeded else JobState.SUCCEEDED)
+        finally:
+            self._forget_finished()
+
+    async def _run_item(self, run: _JobRun, handler: Callable[[str, str], Awaitable[dict[str, Any]]],
+                        item: str) -> None:
+        try:
+            data = await handler(item, run.record.file_path)
+        except Exception as e:
+            logger.error(f"{run.record.kind} of {item} failed in job {run.record.id}: {str(e)}")
+            run.add(JobItemResult(item=item, success=False, error=str(e)))
+            return
+        run.add(JobItemResult(item=item, success=True, data=data))
+
+    async def _search(self, query: str, file_path: str) -> dict[str, Any]:
+        async with self._search_slots:
+            results = await self._search_engine.search(query, file_path) or []
+        return {"results": [result.model_dump(mode="json") for result in results]}
+
+    async def _scrape(self, url: str, file_path: str) -> dict[str, Any]:
+        page = await self._scrape_page(url, file_path)
+        return {**page.model_dump(mode="json"), "file": self._web_scraper.result_file_name(url, file_path)}
+
+    async def _analyze(self, url: str, file_path: str) -> dict[str, Any]:
+        try:
+            page = ScrapePageResult(**await self._storage.aread_json(
+                self._web_scraper.result_file_name(url, file_path)))
+        except FileNotFoundError:
+            # not scraped under this folder yet
+            page = await self._scrape_page(url, file_path)
+
+        async with self._analysis_slots:
+            # the analysis makes blocking LLM calls, so it runs off the event loop
+            analysis = await asyncio.to_thread(
+                self._content_analysis.analyze_content,
+                page.url, page.model_dump(), self._chat_model_provider, file_path)
+        if analysis is None:
+            raise RuntimeError(f"Analyzing {url} failed")
+        return analysis
+
+    async def _scrape_page(self, url: str, file_path: str) -> ScrapePageResult:
+        session = await self._scrape_session()
+        result = await session.scrape(url, file_path)
+        if not result or not result.success:
+            raise RuntimeError(
+                f"Scraping {url} failed: {result.error_message if result else 'no result'}")
+        await self._storage.aflush()
+        return result
+
+    async def _scrape_session(self) -> WebScrapeSession:
+        # one browser for the life of the process, its pages shared by every job
+        async with self._session_lock:
+            if self._session is None:
+                self._session = await self._resources.enter_async_context(self._web_scraper.session())
+            return self._session
+
+    def _forget_finished(self) -> None:
+        finished = [job_id for job_id, run in self._jobs.items() if run.finished]
+        for job_id in finished[:max(0, len(finished) - self._api_settings.finished_jobs)]:
+            del self._jobs[job_id]
@@ -0,0 +1,383 @@
+import asyncio
+import logging
+import math
+import threading
+import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Any, Awaitable, Callable, Mapping, TypeVar
+
+from configuration import LLMSettings
+from core.domain import ModelHost
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar('T')
+
+RETRYABLE_STATUS_CODES = (429, 529)
+
+# Rough characters-per-token ratio used to estimate prompt size before sending
+CHARS_PER_TOKEN = 4
+
+# Header names reported by the Anthropic API (and OpenAI-compatible APIs as fallback)
+REQUEST_LIMIT_HEADERS = ("anthropic-ratelimit-requests-limit",
+                         "x-ratelimit-limit-requests")
+REQUEST_REMAINING_HEADERS = ("anthropic-ratelimit-requests-remaining",
+                             "x-ratelimit-remaining-requests")
+REQUEST_RESET_HEADERS = ("anthropic-ratelimit-requests-reset",
+                         "x-ratelimit-reset-requests")
+TOKEN_LIMIT_HEADERS = ("anthropic-ratelimit-tokens-limit",
+                       "x-ratelimit-limit-tokens")
+TOKEN_REMAINING_HEADERS = ("anthropic-ratelimit-tokens-remaining",
+                           "x-ratelimit-remaining-tokens")
+TOKEN_RESET_HEADERS = ("anthropic-ratelimit-tokens-reset",
+                       "x-ratelimit-reset-tokens")
+
+
+class RateLimited(Exception):
+    """
+    Raised by a client that knows it is over its quota before sending the call.
+    The LLMCallScheduler retries it after `retry_after` seconds, like a 429 response.
+    """
+
+    status_code = 429
+
+    def __init__(self, message: str, retry_after: float):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket that refills continuously at `capacity` tokens per `period` seconds.
+    """
+
+    def __init__(self, capacity: float, period: float = 60.0,
+                 clock: Callable[[], float] = time.monotonic):
+        self._capacity = float(capacity)
+        self._period = period
+        self._rate = self._capacity / period
+        self._tokens = self._capacity
+        self._clock = clock
+        self._updated_at = clock()
+        self._lock = threading.Lock()
+
+    @property
+    def capacity(self) -> float:
+        return self._capacity
+
+    @property
+    def available(self) -> float:
+        with self._lock:
+            self._refill()
+            return self._tokens
+
+    def reserve(self, amount: float) -> float:
+        """
+        Takes `amount` tokens if they are available and returns 0,
+        otherwise returns the number of seconds to wait before trying again.
+        """
+
+        with self._lock:
+            self._refill()
+            if self._tokens >= amount:
+                self._tokens -= amount
+                return 0.0
+            return (amount - self._tokens) / self._rate
+
+    def wait(self, amount: float) -> float:
+        """
+        Returns the number of seconds until `amount` tokens are available, without taking them.
+        """
+
+        with self._lock:
+            self._refill()
+            return max(amount - self._tokens, 0.0) / self._rate
+
+    def refund(self, amount: float) -> None:
+        """
+        Returns tokens to the bucket. A negative amount debits the bucket,
+        which may leave it in debt until it refills.
+        """
+
+        with self._lock:
+            self._refill()
+            self._tokens = min(self._capacity, self._tokens + amount)
+
+    def sync(self, remaining: float, limit: float | None = None) -> None:
+        """
+        Aligns the bucket with the quota reported by the server.
+        """
+
+        with self._lock:
+            self._refill()
+            if limit and limit != self._capacity:
+                self._capacity = float(limit)
+                self._rate = self._capacity / self._period
+            self._tokens = min(self._tokens, float(remaining))
+
+    def _refill(self) -> None:
+        now = self._clock()
+        elapsed = now - self._updated_at
+        if elapsed > 0:
+            self._tokens = min(self._capacity,
+                               self._tokens + elapsed * self._rate)
+        self._updated_at = now
+
+
+class LLMCallScheduler:
+    """
+    Paces LLM calls with two token buckets, one for requests and one for tokens.
+
+    Calls wait until both buckets can cover them, retry on 429/529 responses
+    honoring `retry-after`, and follow the rate-limit headers reported by the server.
+    A limit of 0 disables the corresponding bucket.
+    """
+
+    def __init__(self,
+                 requests_per_minute: int,
+                 tokens_per_minute: int,
+                 max_retries: int = 5,
+                 output_tokens: int = 1024,
+                 clock: Callable[[], float] = time.monotonic,
+                 sleep: Callable[[float], None] = time.sleep):
+        self._requests = TokenBucket(
+            requests_per_minute, clock=clock) if requests_per_minute > 0 else None
+        self._tokens = TokenBucket(
+            tokens_per_minute, clock=clock) if tokens_per_minute > 0 else None
+        self._max_retries = max_retries
+        self._output_tokens = output_tokens
+        self._clock = clock
+        self._sleep = sleep
+        self._paused_until = 0.0
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_settings(cls, llm_settings: LLMSettings) -> "LLMCallScheduler":
+        requests_per_minute = llm_settings.requests_per_minute
+        tokens_per_minute = llm_settings.tokens_per_minute
+        if llm_settings.chat_model_settings.host == ModelHost.ROUTING and llm_settings.routing_hosts:
+            # Routed calls can use the combined quota of every host, 0 still meaning unlimited
+            limits = [llm_settings.route_limits(host)
+                      for host in llm_settings.routing_hosts]
+            requests_per_minute = 0 if any(r == 0 for r, _ in limits) else sum(
+                r for r, _ in limits)
+            tokens_per_minute = 0 if any(t == 0 for _, t in limits) else sum(
+                t for _, t in limits)
+        return cls(
+            requests_per_minute=requests_per_minute,
+            tokens_per_minute=tokens_per_minute,
+            max_retries=llm_settings.max_retries,
+            output_tokens=llm_settings.chat_model_settings.max_tokens or 1024,
+        )
+
+    @property
+    def requests_bucket(self) -> TokenBucket | None:
+        return self._requests
+
+    @property
+    def tokens_bucket(self) -> TokenBucket | None:
+        return self._tokens
+
+    def estimate_tokens(self, prompt: str) -> int:
+        """
+        Estimates the tokens a call will use: the prompt plus the reserved output budget.
+        """
+
+        return math.ceil(len(prompt) / CHARS_PER_TOKEN) + self._output_tokens
+
+    def call(self, fn: Callable[[], T], estimated_tokens: int) -> T:
+        """
+        Runs `fn` once both buckets allow it, retrying rate-limited attempts.
+        """
+
+        attempt = 0
+        while True:
+            self._acquire(estimated_tokens)
+            try:
+                result = fn()
+            except Exception as e:
+                delay = self._retry_delay(e, attempt, estimated_tokens)
+                if delay is None:
+                    raise
+                attempt += 1
+                self._sleep(delay)
+                continue
+            self._settle(result, estimated_tokens)
+            return result
+
+    async def acall(self, fn: Callable[[], Awaitable[T]], estimated_tokens: int) -> T:
+        """
+        Async counterpart of `call`, waiting without blocking the event loop.
+        """
+
+        attempt = 0
+        while True:
+            while (wait := self._try_acquire(estimated_tokens)) > 0:
+                await asyncio.sleep(wait)
+            try:
+                result = await fn()
+            except Exception as e:
+                delay = self._retry_delay(e, attempt, estimated_tokens)
+                if delay is None:
+                    raise
+                attempt += 1
+                await asyncio.sleep(delay)
+                continue
+            self._settle(result, estimated_tokens)
+            return result
+
+    def update_from_headers(self, headers: Mapping[str, str]) -> None:
+        """
+        Adjusts the pace from the rate-limit headers of a response.
+        """
+
+        headers = {k.lower(): v for k, v in headers.items()}
+        for bucket, limit_names, remaining_names, reset_names in (
+            (self._requests, REQUEST_LIMIT_HEADERS,
+             REQUEST_REMAINING_HEADERS, REQUEST_RESET_HEADERS),
+            (self._tokens, TOKEN_LIMIT_HEADERS,
+             TOKEN_REMAINING_HEADERS, TOKEN_RESET_HEADERS),
+        ):
+            if bucket is None:
+                continue
+            remaining = _first_number(headers, remaining_names)
+            if remaining is None:
+                continue
+            bucket.sync(remaining, _first_number(headers, limit_names))
+            if remaining <= 0:
+                reset_in = _first_reset(headers, reset_names)
+                if reset_in:
+                    self._pause(reset_in)
+
+    def _acquire(self, estimated_tokens: int) -> None:
+        while (wait := self._try_acquire(estimated_tokens)) > 0:
+            self._sleep(wait)
+
+    def _try_acquire(self, estimated_tokens: int) -> float:
+        if self._tokens is not None and estimated_tokens > self._tokens.capacity:
+            raise ValueError(
+                f"Estimated {estimated_tokens} tokens exceed the limit of {int(self._tokens.capacity)} tokens per minute")
+
+        with self._lock:
+            paused_for = self._paused_until - self._clock()
+        if paused_for > 0:
+            return paused_for
+
+        if self._requests is not None:
+            wait = self._requests.reserve(1)
+            if wait > 0:
+                return wait
+        if self._tokens is not None:
+            wait = self._tokens.reserve(estimated_tokens)
+            if wait > 0:
+                if self._requests is not None:
+                    self._requests.refund(1)
+                return wait
+        return 0.0
+
+    def _settle(self, result: Any, estimated_tokens: int) -> None:
+        """
+        Reconciles the token bucket with the actual usage of a successful call.
+        """
+
+        response_metadata = getattr(result, "response_metadata", None) or {}
+        headers = response_metadata.get("headers")
+        if headers:
+            self.update_from_headers(headers)
+
+        usage = getattr(result, "usage_metadata", None) or {}
+        total_tokens = usage.get("total_tokens")
+        if self._tokens is not None and total_tokens:
+            self._tokens.refund(estimated_tokens - total_tokens)
+
+    def _retry_delay(self, error: Exception, attempt: int, estimated_tokens: int) -> float | None:
+        """
+        Returns how long to wait before retrying, or None if the error should be raised.
+        """
+
+        status_code = getattr(error, "status_code", None)
+        if status_code not in RETRYABLE_STATUS_CODES or attempt >= self._max_retries:
+            return None
+
+        if isinstance(error, RateLimited):
+            delay = error.retry_after
+        else:
+            response = getattr(error, "response", None)
+            headers = {k.lower(): v for k, v in (
+                getattr(response, "headers", None) or {}).items()}
+            self.update_from_headers(headers)
+            delay = _retry_after(headers)
+
+        # The failed attempt did not consume its token estimate
+        if self._tokens is not None:
+            self._tokens.refund(estimated_tokens)
+
+        if delay is None:
+            delay = min(2 ** attempt, 60)
+        self._pause(delay)
+        logger.warning(
+            f"LLM call rate limited (status {status_code}), retrying in {delay:.1f}s")
+        return delay
+
+    def _pause(self, seconds: float) -> None:
+        with self._lock:
+            self._paused_until = max(
+                self._paused_until, self._clock() + seconds)
+
+
+def _first_number(headers: Mapping[str, str], names: tuple[str, ...]) -> float | None:
+    for name in names:
+        value = headers.get(name)
+        if value is None:
+            continue
+        try:
+            return float(value)
+        except ValueError:
+            continue
+    return None
+
+
+def _first_reset(headers: Mapping[str, str], names: tuple[str, ...]) -> float | None:
+    for name in names:
+        value = headers.get(name)
+        if value:
+            seconds = _parse_seconds_or_date(value)
+            if seconds is not None:
+                return seconds
+    return None
+
+
+def _retry_after(headers: Mapping[str, str]) -> float | None:
+    retry_after_ms = headers.get("retry-after-ms")
+    if retry_after_ms:
+        try:
+            return float(retry_after_ms) / 1000
+        except ValueError:
+            pass
+    retry_after = headers.get("retry-after")
+    if retry_after:
+        return _parse_seconds_or_date(retry_after)
+    return None
+
+
+def _parse_seconds_or_date(value: str) -> float | None:
+    """
+    Parses a delay given as seconds, an RFC 3339 timestamp or an HTTP date.
+    """
+
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        pass
+
+    try:
+        moment = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    except ValueError:
+        try:
+            moment = parsedate_to_datetime(value)
+        except (TypeError, ValueError):
+            return None
+    if moment.tzinfo is None:
+        moment = moment.replace(tzinfo=timezone.utc)
+    return max((moment - datetime.now(timezone.utc)).total_seconds(), 0.0)
@@ -0,0 +1,232 @@
+import logging
+import re
+import time
+import zlib
+
+import numpy as np
+from configuration import Settings
+from core.analysis_index import AnalysisIndex
+from injector import inject
+
+logger = logging.getLogger(__name__)
+
+STOP_WORDS = {
+    "a", "an", "the", "and", "or", "but", "of", "to", "in", "on", "for", "with", "by", "at", "from",
+    "as", "is", "are", "was", "were", "be", "been", "being", "it", "its", "this", "that", "these",
+    "those", "their", "they", "them", "our", "we", "us", "you", "your", "i", "my", "me", "he", "she",
+    "his", "her", "has", "have", "had", "do", "does", "did", "not", "no", "so", "than", "then",
+    "there", "which", "who", "what", "when", "where", "how", "can", "could", "would", "should",
+    "will", "into", "about", "also", "very", "too", "all", "any", "some", "more", "most", "other",
+}
+# source quotes restate the description in the words of the page, so they count for less
+QUOTE_WEIGHT = 0.5
+
+_WORD = re.compile(r"[a-z0-9]+")
+_SUFFIX = re.compile(r"(?:ies|ing|ed|es|s)$")
+
+
+def terms(text: str | None) -> list[str]:
+    """
+    The words of a text without stop words, crudely stemmed, and its word pairs.
+    """
+
+    if not text:
+        return []
+    words = [_SUFFIX.sub("", word) if len(word) > 4 else word
+             for word in _WORD.findall(text.lower()) if word not in STOP_WORDS]
+    return words + [f"{first} {second}" for first, second in zip(words, words[1:])]
+
+
+def embed(descriptions: list[str | None], quotes: list[str | None], dimensions: int) -> np.ndarray:
+    """
+    Embeds each description and quote as a unit-length TF-IDF vector, its terms hashed into the
+    given number of dimensions with a random sign so that colliding terms tend to cancel out.
+    """
+
+    vocabulary: dict[str, int] = {}
+    rows, features, weights = [], [], []
+    for row, (description, quote) in enumerate(zip(descriptions, quotes)):
+        weighted: dict[int, float] = {}
+        for weight, text in ((1.0, description), (QUOTE_WEIGHT, quote)):
+            for term in terms(text):
+                feature = vocabulary.setdefault(term, len(vocabulary))
+                weighted[feature] = weighted.get(feature, 0.0) + weight
+        rows.extend([row] * len(weighted))
+        features.extend(weighted.keys())
+        weights.extend(weighted.values())
+
+    if not vocabulary:
+        return np.zeros((len(descriptions), dimensions), dtype=np.float32)
+    rows, features = np.asarray(rows, dtype=np.int64), np.asarray(features, dtype=np.int64)
+    hashes = np.fromiter((zlib.crc32(term.encode()) for term in vocabulary), dtype=np.int64, count=len(vocabulary))
+    signs = np.where(hashes & 1, 1.0, -1.0)
+    idf = np.log((1 + len(descriptions)) / (1 + np.bincount(features, minlength=len(vocabulary)))) + 1
+    values = np.sqrt(np.asarray(weights)) * idf[features] * signs[features]
+    cells = rows * dimensions + (hashes >> 1)[features] % dimensions
+    vectors = np.bincount(cells, weights=values, minlength=len(descriptions) * dimensions).astype(np.float32)
+    vectors = vectors.reshape(len(descriptions), dimensions)
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    return np.divide(vectors, norms, out=vectors, where=norms > 0)
+
+
+def neighbour_pairs(vectors: np.ndarray, threshold: float, tables: int, bits: int, neighbours: int,
+                    seed: int = 0, block: int = 1024) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Approximate nearest neighbours by random hyperplane LSH: in each table the vectors falling on
+    the same side of `bits` random hyperplanes share a bucket, and only the vectors of a bucket are
+    compared, a block of rows at a time. Returns the pairs (i < j) closer than the threshold,
+    keeping the `neighbours` closest of each vector.
+    """
+
+    count = len(vectors)
+    planes = np.random.default_rng(seed).standard_normal((vectors.shape[1], tables * bits)).astype(np.float32)
+    sides = (vectors @ planes > 0).reshape(count, tables, bits)
+    codes = sides.astype(np.int64) @ (1 << np.arange(bits, dtype=np.int64))
+    empty = ~vectors.any(axis=1)
+
+    firsts, seconds = [], []
+    for table in range(tables):
+        order = np.argsort(codes[:, table], kind="stable")
+        order = order[~empty[order]]
+        bounds = np.flatnonzero(np.diff(codes[order, table])) + 1
+        for bucket in np.split(order, bounds):
+            if len(bucket) < 2:
+                continue
+            bucket_vectors = vectors[bucket]
+            for start in range(0, len(bucket), block):
+                similarities = bucket_vectors[start:start + block] @ bucket_vectors.T
+                rows = np.arange(similarities.shape[0])
+                similarities[rows, rows + start] = -1
+                if similarities.shape[1] > neighbours:
+                    kept = np.argpartition(similarities, -neighbours, axis=1)[:, -neighbours:]
+                else:
+                    kept = np.broadcast_to(np.arange(similarities.shape[1]), similarities.shape)
+                close = np.take_along_axis(similarities, kept, axis=1) >= threshold
+                first = bucket[(rows[:, None] + start).repeat(kept.shape[1], axis=1)[close]]
+                second = bucket[kept[close]]
+                firsts.append(np.minimum(first, second))
+                seconds.append(np.maximum(first, second))
+
+    if not firsts:
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64)
+    pairs = np.unique(np.concatenate(firsts) * count + np.concatenate(seconds))
+    return pairs // count, pairs % count
+
+
+def star_clusters(count: int, firsts: np.ndarray, seconds: np.ndarray) -> np.ndarray:
+    """
+    Labels each of `count` items with the center of its cluster. The item with the most neighbours
+    becomes a center and takes its neighbours that have no cluster yet, then the next one, so a
+    cluster never drifts away from its center through a chain of neighbours.
+    """
+
+    sources = np.concatenate([firsts, seconds])
+    targets = np.concatenate([seconds, firsts])
+    order = np.argsort(sources, kind="stable")
+    targets = targets[order]
+    degrees = np.bincount(sources, minlength=count)
+    offsets = np.concatenate([[0], np.cumsum(degrees)])
+
+    labels = np.full(count, -1)
+    for center in np.lexsort((np.arange(count), -degrees)).tolist():
+        if labels[center] >= 0:
+            continue
+        labels[center] = center
+        neighbours = targets[offsets[center]:offsets[center + 1]]
+        labels[neighbours[labels[neighbours] < 0]] = center
+    return labels
+
+
+def centroids(vectors: np.ndarray, labels: np.ndarray) -> np.ndarray:
+    """
+    The unit-length mean vector of each label.
+    """
+
+    sums = np.zeros((labels.max() + 1, vectors.shape[1]), dtype=np.float32)
+    np.add.at(sums, labels, vectors)
+    norms = np.linalg.norm(sums, axis=1, keepdims=True)
+    return np.divide(sums, norms, out=sums, where=norms > 0)
+
+
+def representatives(vectors: np.ndarray, labels: np.ndarray) -> np.ndarray:
+    """
+    The item of each label closest to the centroid of the label.
+    """
+
+    scores = np.einsum("ij,ij->i", vectors, centroids(vectors, labels)[labels])
+    order = np.lexsort((-scores, labels))
+    firsts = np.ones(len(order), dtype=bool)
+    firsts[1:] = labels[order][1:] != labels[order][:-1]
+    closest = np.full(labels.max() + 1, -1)
+    closest[labels[order][firsts]] = order[firsts]
+    return closest
+
+
+def cluster(descriptions: list[str | None], quotes: list[str | None], threshold: float, dimensions: int,
+            tables: int, bits: int, neighbours: int, seed: int = 0) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Clusters the texts around centers at least `threshold` cosine-similar to their members, then
+    clusters the centroids of those clusters the same way, level after level, until no two
+    centroids are close enough to merge. Identical texts are embedded and compared once.
+
+    Returns the cluster of each text, numbered from 0 by decreasing size, and the representative
+    text of each cluster.
+    """
+
+    unique: dict[tuple[str, str], int] = {}
+    inverse = np.fromiter(
+        (unique.setdefault(((description or "").strip().lower(), (quote or "").strip().lower()), len(unique))
+         for description, quote in zip(descriptions, quotes)), dtype=np.int64, count=len(descriptions))
+    if not len(inverse):
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64)
+    texts = list(unique)
+    vectors = embed([d for d, _ in texts], [q for _, q in texts], dimensions)
+
+    labels = np.arange(len(texts))
+    level = vectors
+    while len(level) > 1:
+        centers = star_clusters(len(level), *neighbour_pairs(level, threshold, tables, bits, neighbours, seed))
+        _, merged = np.unique(centers, return_inverse=True)
+        if merged.max() + 1 == len(level):
+            break
+        labels = merged[labels]
+        level = centroids(vectors, labels)
+
+    _, labels, sizes = np.unique(labels[inverse], return_inverse=True, return_counts=True)
+    rank = np.empty(len(sizes), dtype=np.int64)
+    rank[np.argsort(-sizes, kind="stable")] = np.arange(len(sizes))
+    labels = rank[labels]
+
+    # the representative of each cluster of unique texts, mapped back to one of the original texts
+    unique_labels = np.empty(len(texts), dtype=np.int64)
+    unique_labels[inverse] = labels
+    _, originals = np.unique(inverse, return_index=True)
+    return labels, originals[representatives(vectors, unique_labels)]
+
+
+class PainPointClusterer:
+    """
+    Groups the indexed pain points describing the same problem in different words, locally and
+    without a model: hashed TF-IDF vectors of the descriptions and quotes, compared within LSH
+    buckets. Each run clusters every indexed pain point and replaces the stored clusters; pain
+    points indexed since the last run belong to no cluster until the next one.
+    """
+
+    @inject
+    def __init__(self, settings: Settings, index: AnalysisIndex):
+        self._settings = settings.clustering_settings
+        self._index = index
+
+    def run(self) -> dict[str, float]:
+        started = time.perf_counter()
+        ids, descriptions, quotes = self._index.pain_point_texts()
+        settings = self._settings
+        labels, closest = cluster(descriptions, quotes, settings.similarity_threshold, settings.dimensions,
+                                  settings.lsh_tables, settings.lsh_bits, settings.neighbours)
+        self._index.store_clusters(ids, labels.tolist(), [ids[i] for i in closest.tolist()])
+        clusters = len(closest)
+        seconds = round(time.perf_counter() - started, 3)
+        logger.info(f"Clustered {len(ids)} pain points into {clusters} clusters in {seconds}s")
+        return {"pain_points": len(ids), "clusters": clusters,
+                "clustered": int((np.bincount(labels) > 1)[labels].sum()) if clusters else 0,
+                "seconds": seconds}
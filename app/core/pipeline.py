@@ -0,0 +1,311 @@
+import asyncio
+import logging
+import time
+from typing import Any, Awaitable, Callable
+
+from configuration import Settings
+from core.chat_model import ChatModelProvider
+from core.content_analysis import ContentAnalysisService
+from core.crawl import Crawl
+from core.domain import ScrapePageResult
+from core.profiling import stage_scope
+from core.run_manifest import RunManifest
+from core.storage import Storage
+from core.web_scrape import WebScraper, WebScrapeSession
+from core.web_search import SearchEngine
+from injector import inject
+from pydantic import BaseModel, Field
+
+logger = logging.getLogger(__name__)
+
+SEARCH_STAGE = "search"
+SCRAPE_STAGE = "scrape"
+ANALYSIS_STAGE = "analysis"
+
+# Marks the end of a stage's input, one per worker
+_DONE = object()
+
+
+class StageStats:
+    """
+    Counts the items a pipeline stage handled and the time its workers spent busy
+    or blocked on a full downstream queue.
+    """
+
+    def __init__(self, name: str, workers: int, clock: Callable[[], float] = time.monotonic):
+        self.name = name
+        self._workers = workers
+        self._clock = clock
+        self._received = 0
+        self._processed = 0
+        self._failed = 0
+        self._skipped = 0
+        self._emitted = 0
+        self._busy_seconds = 0.0
+        self._blocked_seconds = 0.0
+        self._started_at: float | None = None
+        self._finished_at: float | None = None
+
+    @property
+    def workers(self) -> int:
+        return self._workers
+
+    def record_started(self) -> None:
+        self._started_at = self._clock()
+
+    def record_finished(self) -> None:
+        self._finished_at = self._clock()
+
+    def record_processed(self, seconds: float) -> None:
+        self._received += 1
+        self._processed += 1
+        self._busy_seconds += seconds
+
+    def record_failed(self, seconds: float) -> None:
+        self._received += 1
+        self._failed += 1
+        self._busy_seconds += seconds
+
+    def record_skipped(self) -> None:
+        self._received += 1
+        self._skipped += 1
+
+    def record_emitted(self, blocked_seconds: float) -> None:
+        self._emitted += 1
+        self._blocked_seconds += blocked_seconds
+
+    def summary(self) -> dict[str, Any]:
+        end = self._finished_at if self._finished_at is not None else self._clock()
+        elapsed = end - self._started_at if self._started_at is not None else 0.0
+        return {
+            "workers": self._workers,
+            "received": self._received,
+            "processed": self._processed,
+            "failed": self._failed,
+            "skipped": self._skipped,
+            "emitted": self._emitted,
+            "elapsed_seconds": elapsed,
+            "busy_seconds": self._busy_seconds,
+            "blocked_seconds": self._blocked_seconds,
+            "throughput": self._received / elapsed if elapsed else 0.0,
+            "utilization": self._busy_seconds / (elapsed * self._workers) if elapsed else 0.0,
+        }
+
+
+class PipelineResult(BaseModel):
+    queries: int = Field(description="The number of queries searched")
+    urls: int = Field(description="The number of unique URLs found")
+    scraped: int = Field(description="The number of pages scraped successfully")
+    analyzed: int = Field(description="The number of pages analyzed")
+    elapsed_seconds: float = Field(description="The duration of the whole run")
+    by_query: dict[str, dict[str, int]] = Field(
+        default_factory=dict, description="The URLs, scraped and analyzed pages credited to each query")
+    stages: dict[str, dict[str, Any]] = Field(
+        description="The statistics of each stage")
+
+
+class PipelineRunner:
+    """
+    Runs search, scrape and analysis as concurrent stages linked by bounded queues.
+
+    Each item moves to the next stage as soon as it is ready, and a stage whose
+    downstream queue is full waits, so a slow stage throttles the ones before it.
+
+    With a RunManifest, finished items are skipped and every outcome is checkpointed,
+    so a restarted run only resumes pending and retryable work.
+    """
+
+    @inject
+    def __init__(self, settings: Settings, search_engine: SearchEngine, web_scraper: WebScraper,
+                 content_analysis: ContentAnalysisService, chat_model_provider: ChatModelProvider,
+                 storage: Storage):
+        self._pipeline_settings = settings.pipeline_settings
+        self._crawl_settings = settings.crawl_settings
+        self._storage = storage
+        self._search_engine = search_engine
+        self._web_scraper = web_scraper
+        self._content_analysis = content_analysis
+        self._chat_model_provider = chat_model_provider
+
+    def open_manifest(self, run_id: str) -> RunManifest:
+        """
+        Opens the manifest of the run, resuming it if it exists.
+        """
+
+        return RunManifest(f"{self._pipeline_settings.manifest_path}/{run_id}.jsonl",
+                           max_attempts=self._pipeline_settings.max_attempts)
+
+    async def run(self, queries: list[str], file_path: str = None,
+                  manifest: RunManifest | None = None,
+                  limits: dict[str, int] | None = None) -> PipelineResult:
+        """
+        Runs the queries through every stage. `limits` caps the URLs taken from a query's results;
+        a URL found by several queries is credited to the first one.
+        """
+
+        pipeline_settings = self._pipeline_settings
+        queue_size = pipeline_settings.queue_size
+        stats = {
+            SEARCH_STAGE: StageStats(SEARCH_STAGE, pipeline_settings.search_concurrency),
+            SCRAPE_STAGE: StageStats(SCRAPE_STAGE, pipeline_settings.scrape_concurrency),
+            ANALYSIS_STAGE: StageStats(ANALYSIS_STAGE, pipeline_settings.analysis_concurrency),
+        }
+        started = time.monotonic()
+        seen_urls: set[str] = set()
+        url_queries: dict[str, str] = {}
+        by_query = {query: {"urls": 0, "scraped": 0, "analyzed": 0} for query in queries}
+        crawl = Crawl(self._crawl_settings) if self._crawl_settings.enabled else None
+
+        query_queue: asyncio.Queue = asyncio.Queue()
+        for query in [*queries, *[_DONE] * pipeline_settings.search_concurrency]:
+            query_queue.put_nowait(query)
+        url_queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+        page_queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+
+        async def search(query: str) -> list[str] | None:
+            if manifest and manifest.is_done(SEARCH_STAGE, query):
+                found = manifest.data(SEARCH_STAGE, query).get("urls", [])
+            elif manifest and not manifest.should_run(SEARCH_STAGE, query):
+                return None
+            else:
+                try:
+                    results = await self._search_engine.search(query, file_path) or []
+                except Exception as e:
+                    self._record_failed(manifest, SEARCH_STAGE, query, e)
+                    raise
+                found = list(dict.fromkeys(r.url for r in results if r.url))
+                if manifest:
+                    manifest.record_done(SEARCH_STAGE, query, urls=found)
+            if limits and limits.get(query):
+                found = found[:limits[query]]
+            urls = [url for url in found if url not in seen_urls and (not crawl or crawl.claim(url))]
+            seen_urls.update(urls)
+            for url in urls:
+                url_queries[url] = query
+            by_query[query]["urls"] += len(urls)
+            return urls
+
+        def credit(url: str, counter: str) -> None:
+            by_query[url_queries[url]][counter] += 1
+
+        async with self._web_scraper.session() as session:
+            async def scrape(url: str) -> list[ScrapePageResult] | None:
+                if manifest and (manifest.is_done(ANALYSIS_STAGE, url)
+                                 or not manifest.should_run(ANALYSIS_STAGE, url)):
+                    return None
+                if manifest and manifest.is_done(SCRAPE_STAGE, url):
+                    # scraped before the restart: only the analysis is left
+                    try:
+                        data = await self._storage.aread_json(
+                            manifest.data(SCRAPE_STAGE, url)["file"])
+                        credit(url, "scraped")
+                        return [ScrapePageResult(**data)]
+                    except FileNotFoundError:
+                        logger.warning(f"Scraped page of {url} is missing, scraping it again")
+                elif manifest and not manifest.should_run(SCRAPE_STAGE, url):
+                    return None
+                try:
+                    if crawl:
+                        pages = await crawl.expand(session, url, url_queries[url], file_path)
+                    else:
+                        pages = [await self._scrape(session, url, file_path)]
+                except Exception as e:
+                    self._record_failed(manifest, SCRAPE_STAGE, url, e)
+                    raise
+                for page in pages:
+                    if page.url not in url_queries:
+                        # a page the crawl reached from the search result
+                        seen_urls.add(page.url)
+                        url_queries[page.url] = url_queries[url]
+                        by_query[url_queries[url]]["urls"] += 1
+                    if manifest:
+                        manifest.record_done(
+                            SCRAPE_STAGE, page.url, file=self._web_scraper.result_file_name(page.url, file_path))
+                    credit(page.url, "scraped")
+                return pages
+
+            async def analyze(page: ScrapePageResult) -> list:
+                try:
+                    await self._analyze(page, file_path)
+                except Exception as e:
+                    self._record_failed(manifest, ANALYSIS_STAGE, page.url, e)
+                    raise
+                if manifest:
+                    manifest.record_done(ANALYSIS_STAGE, page.url)
+                credit(page.url, "analyzed")
+                return []
+
+            await asyncio.gather(
+                self._run_stage(stats[SEARCH_STAGE], search, query_queue, url_queue,
+                                pipeline_settings.scrape_concurrency),
+                self._run_stage(stats[SCRAPE_STAGE], scrape, url_queue, page_queue,
+                                pipeline_settings.analysis_concurrency),
+                self._run_stage(stats[ANALYSIS_STAGE], analyze, page_queue, None, 0),
+            )
+
+        summaries = {name: stage.summary() for name, stage in stats.items()}
+        return PipelineResult(
+            queries=len(queries),
+            urls=len(seen_urls),
+            # with crawling, a search result can yield several pages
+            scraped=sum(counts["scraped"] for counts in by_query.values()),
+            analyzed=summaries[ANALYSIS_STAGE]["processed"],
+            elapsed_seconds=time.monotonic() - started,
+            by_query=by_query,
+            stages=summaries,
+        )
+
+    def _record_failed(self, manifest: RunManifest | None, stage: str, key: str, error: Exception) -> None:
+        if manifest:
+            manifest.record_failed(stage, key, str(error))
+
+    async def _scrape(self, session: WebScrapeSession, url: str, file_path: str) -> ScrapePageResult:
+        result = await session.scrape(url, file_path)
+        if not result or not result.success:
+            raise RuntimeError(
+                f"Scraping {url} failed: {result.error_message if result else 'no result'}")
+        return result
+
+    async def _analyze(self, page: ScrapePageResult, file_path: str) -> dict:
+        # the analysis makes blocking LLM calls, so it runs off the event loop
+        analysis = await asyncio.to_thread(
+            self._content_analysis.analyze_content,
+            page.url, page.model_dump(), self._chat_model_provider, file_path)
+        if analysis is None:
+            raise RuntimeError(f"Analyzing {page.url} failed")
+        return analysis
+
+    async def _run_stage(self, stats: StageStats, handler: Callable[[Any], Awaitable[list | None]],
+                         inbox: asyncio.Queue, outbox: asyncio.Queue | None, downstream_workers: int) -> None:
+        """
+        Runs the stage's workers until the input ends, then ends the output for the next stage.
+        """
+
+        async def worker() -> None:
+            with stage_scope(stats.name):
+                while (item := await inbox.get()) is not _DONE:
+                    started = time.monotonic()
+                    try:
+                        outputs = await handler(item)
+                    except Exception as e:
+                        stats.record_failed(time.monotonic() - started)
+                        logger.error(f"{stats.name} stage failed on {item}: {str(e)}")
+                        continue
+                    if outputs is None:
+                        # finished in an earlier run, or out of attempts
+                        stats.record_skipped()
+                        continue
+                    stats.record_processed(time.monotonic() - started)
+                    for output in outputs:
+                        blocked_at = time.monotonic()
+                        await outbox.put(output)
+                        stats.record_emitted(time.monotonic() - blocked_at)
+
+        stats.record_started()
+        try:
+            await asyncio.gather(*(worker() for _ in range(stats.workers)))
+        finally:
+            stats.record_finished()
+            if outbox is not None:
+                for _ in range(downstream_workers):
+                    await outbox.put(_DONE)
@@ -0,0 +1,46 @@
+import asyncio
+import contextvars
+import weakref
+from contextlib import contextmanager
+from typing import Iterator
+
+_current_stage: contextvars.ContextVar[str | None] = contextvars.ContextVar("current_stage", default=None)
+# lets a sampler in another thread tell which stage the task running on the loop belongs to
+_task_stages: "weakref.WeakKeyDictionary[asyncio.Task, str]" = weakref.WeakKeyDictionary()
+
+
+def current_stage() -> str | None:
+    """
+    Returns the pipeline stage the calling code runs for, also inside `asyncio.to_thread`.
+    """
+
+    return _current_stage.get()
+
+
+def task_stage(task: asyncio.Task | None) -> str | None:
+    return _task_stages.get(task) if task is not None else None
+
+
+@contextmanager
+def stage_scope(name: str) -> Iterator[None]:
+    """
+    Marks the work done inside, and the threads it hands work to, as done for the stage.
+    """
+
+    token = _current_stage.set(name)
+    try:
+        task = asyncio.current_task()
+    except RuntimeError:
+        task = None
+    previous = _task_stages.get(task) if task is not None else None
+    if task is not None:
+        _task_stages[task] = name
+    try:
+        yield
+    finally:
+        _current_stage.reset(token)
+        if task is not None:
+            if previous is None:
+                _task_stages.pop(task, None)
+            else:
+                _task_stages[task] = previous
@@ -0,0 +1,240 @@
+import asyncio
+import hashlib
+import logging
+import time
+from datetime import datetime
+from typing import Callable
+
+from configuration import Settings
+from core.chat_model import ChatModelProvider
+from core.content_analysis import ContentAnalysisService
+from core.domain import ScrapePageResult
+from core.web_scrape import WebScraper, WebScrapeSession
+from injector import inject
+from pydantic import BaseModel, Field
+
+logger = logging.getLogger(__name__)
+
+# a refresh that died without saving its outcome is retried after this
+CLAIM_SECONDS = 3600
+
+
+class RecrawlRecord(BaseModel):
+    url: str = Field(description="The tracked page")
+    interval_seconds: float = Field(description="The current refresh interval of the page")
+    next_fetch_at: float = Field(description="When the page is due for a refresh, in epoch seconds")
+    last_fetched_at: float | None = Field(default=None, description="When the page was last fetched")
+    last_changed_at: float | None = Field(default=None, description="When a refresh last found a change")
+    content_hash: str | None = Field(default=None, description="The hash of the last analyzed content")
+    etag: str | None = Field(default=None, description="The ETag of the last fetch")
+    last_modified: str | None = Field(default=None, description="The Last-Modified of the last fetch")
+    fetches: int = Field(default=0, description="The successful refreshes")
+    changes: int = Field(default=0, description="The refreshes that found the content changed")
+    failures: int = Field(default=0, description="The refreshes failed in a row")
+
+    @property
+    def change_ratio(self) -> float | None:
+        """
+        The share of refreshes after the first that found a change.
+        """
+
+        return self.changes / (self.fetches - 1) if self.fetches > 1 else None
+
+
+class RecrawlSummary(BaseModel):
+    due: int = 0
+    not_modified: int = Field(default=0, description="Pages the server answered 304 for")
+    unchanged: int = Field(default=0, description="Pages fetched again with the same content")
+    changed: int = Field(default=0, description="Pages fetched with new content")
+    analyzed: int = 0
+    failed: int = 0
+
+
+def content_hash(page: ScrapePageResult) -> str:
+    return hashlib.sha256(f"{page.title or ''}\n{page.content or ''}".encode()).hexdigest()
+
+
+class RecrawlPolicy:
+    """
+    Adapts the refresh interval of a page to how often it is seen changing: the interval shrinks
+    when a refresh finds a change and grows when it does not, within bounds.
+    """
+
+    def __init__(self, initial_interval_seconds: float, min_interval_seconds: float,
+                 max_interval_seconds: float, factor: float):
+        if factor <= 1:
+            raise ValueError("The interval factor must be greater than 1")
+        self.initial_interval_seconds = initial_interval_seconds
+        self.min_interval_seconds = min_interval_seconds
+        self.max_interval_seconds = max_interval_seconds
+        self.factor = factor
+
+    @staticmethod
+    def from_settings(settings: Settings) -> "RecrawlPolicy":
+        recrawl_settings = settings.recrawl_settings
+        return RecrawlPolicy(
+            recrawl_settings.initial_interval_seconds,
+            recrawl_settings.min_interval_seconds,
+            recrawl_settings.max_interval_seconds,
+            recrawl_settings.interval_factor,
+        )
+
+    def next_interval(self, interval_seconds: float, changed: bool) -> float:
+        interval = interval_seconds / self.factor if changed else interval_seconds * self.factor
+        return min(self.max_interval_seconds, max(self.min_interval_seconds, interval))
+
+    def retry_interval(self, record: RecrawlRecord) -> float:
+        # failures back off from the shortest interval, but never wait longer than a normal refresh
+        return min(record.interval_seconds, self.min_interval_seconds * 2 ** (record.failures - 1))
+
+
+class RecrawlStore:
+    """
+    Interface for the fetch history and refresh schedule of the tracked pages.
+    """
+
+    def track(self, records: list[RecrawlRecord]) -> int:
+        """
+        Adds the pages not tracked yet, returns the number added
+        """
+
+        raise NotImplementedError
+
+    def get(self, url: str) -> RecrawlRecord | None:
+        raise NotImplementedError
+
+    def claim_due(self, now: float, limit: int, claim_seconds: float) -> list[RecrawlRecord]:
+        """
+        Takes up to `limit` pages due by `now`, the most overdue first, and postpones them by
+        `claim_seconds` so other schedulers skip them while they are refreshed
+        """
+
+        raise NotImplementedError
+
+    def save(self, record: RecrawlRecord) -> None:
+        raise NotImplementedError
+
+    def untrack(self, url: str) -> bool:
+        raise NotImplementedError
+
+    def stats(self, now: float) -> dict[str, int]:
+        """
+        Returns the number of tracked pages and of pages due by `now`
+        """
+
+        raise NotImplementedError
+
+    def close(self) -> None:
+        pass
+
+
+class RecrawlScheduler:
+    """
+    Refreshes the tracked pages as they fall due. Each refresh revalidates the page with its
+    ETag and Last-Modified, and only pages whose content changed go on to analysis, so the
+    scraping and LLM budget goes to the sources that actually change.
+    """
+
+    @inject
+    def __init__(self, settings: Settings, store: RecrawlStore, web_scraper: WebScraper,
+                 content_analysis: ContentAnalysisService, chat_model_provider: ChatModelProvider):
+        self._batch_size = settings.recrawl_settings.batch_size
+        self._policy = RecrawlPolicy.from_settings(settings)
+        self._store = store
+        self._web_scraper = web_scraper
+        self._content_analysis = content_analysis
+        self._chat_model_provider = chat_model_provider
+        self._analysis_slots = asyncio.Semaphore(settings.pipeline_settings.analysis_concurrency)
+        self._clock: Callable[[], float] = time.time
+
+    @property
+    def store(self) -> RecrawlStore:
+        return self._store
+
+    def track(self, urls: list[str]) -> int:
+        """
+        Tracks the pages, due right away, returns the number not tracked before.
+        """
+
+        now = self._clock()
+        return self._store.track([
+            RecrawlRecord(url=url, interval_seconds=self._policy.initial_interval_seconds, next_fetch_at=now)
+            for url in dict.fromkeys(urls)])
+
+    async def run_due(self, limit: int | None = None, file_path: str | None = None) -> RecrawlSummary:
+        """
+        Refreshes the pages due now, up to `limit` of them.
+        """
+
+        file_path = file_path or datetime.now().strftime("%Y/%m/%d")
+        records = await asyncio.to_thread(
+            self._store.claim_due, self._clock(), limit or self._batch_size, CLAIM_SECONDS)
+        summary = RecrawlSummary(due=len(records))
+        if not records:
+            return summary
+
+        async with self._web_scraper.session() as session:
+            await asyncio.gather(*(self._refresh(session, record, file_path, summary) for record in records))
+        return summary
+
+    async def _refresh(self, session: WebScrapeSession, record: RecrawlRecord, file_path: str,
+                       summary: RecrawlSummary) -> None:
+        try:
+            page = await session.scrape_if_modified(record.url, file_path, record.etag, record.last_modified)
+            if not page or not page.success:
+                raise RuntimeError(page.error_message if page else "no result")
+        except Exception as e:
+            logger.error(f"Refreshing {record.url} failed: {str(e)}")
+            record.failures += 1
+            record.next_fetch_at = self._clock() + self._policy.retry_interval(record)
+            summary.failed += 1
+            await asyncio.to_thread(self._store.save, record)
+            return
+
+        now = self._clock()
+        first_fetch = record.fetches == 0
+        record.failures = 0
+        record.last_fetched_at = now
+
+        if page.not_modified:
+            changed = False
+            summary.not_modified += 1
+        else:
+            digest = content_hash(page)
+            changed = digest != record.content_hash
+            if not changed:
+                summary.unchanged += 1
+            else:
+                summary.changed += 1
+                # the hash and validators only move on once the new content is analyzed,
+                # so the next refresh fetches it again and retries a failed analysis
+                if not await self._analyze(page, file_path):
+                    # the change is counted, and the interval adapted, once the retry succeeds
+                    record.next_fetch_at = now + record.interval_seconds
+                    await asyncio.to_thread(self._store.save, record)
+                    return
+                record.content_hash = digest
+                summary.analyzed += 1
+        record.fetches += 1
+        record.etag = page.etag or record.etag
+        record.last_modified = page.last_modified or record.last_modified
+
+        if changed and not first_fetch:
+            record.changes += 1
+            record.last_changed_at = now
+        if not first_fetch:
+            record.interval_seconds = self._policy.next_interval(record.interval_seconds, changed)
+        record.next_fetch_at = now + record.interval_seconds
+        await asyncio.to_thread(self._store.save, record)
+
+    async def _analyze(self, page: ScrapePageResult, file_path: str) -> bool:
+        async with self._analysis_slots:
+            try:
+                # the analysis makes blocking LLM calls, so it runs off the event loop
+                analysis = await asyncio.to_thread(
+                    self._content_analysis.analyze_content,
+                    page.url, page.model_dump(), self._chat_model_provider, file_path)
+            except Exception as e:
+                logger.error(f"Analyzing {page.url} failed: {str(e)}")
+                return False
+        return analysis is not None
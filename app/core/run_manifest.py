@@ -0,0 +1,140 @@
+import logging
+import threading
+from datetime import datetime
+from pathlib import Path
+from typing import Any
+
+from core.serialization import JsonSerializer, create_serializer
+
+logger = logging.getLogger(__name__)
+
+
+class ItemStatus:
+    DONE = "done"
+    FAILED = "failed"
+
+
+class RunManifest:
+    """
+    Checkpoint of a pipeline run: the status of every item (a query or a URL) in every stage.
+
+    Each change is appended as one JSON line and flushed, which is cheap enough to do after
+    every item; on open the log is replayed, so a restarted run knows what is finished and
+    which failures can still be retried. A line torn by a crash is ignored.
+    """
+
+    def __init__(self, path: str, max_attempts: int = 3, serializer: JsonSerializer | None = None):
+        self._path = Path(path)
+        self._max_attempts = max_attempts
+        self._serializer = serializer or create_serializer()
+        self._lock = threading.Lock()
+        # stage -> key -> {"status", "attempts", "error", "data"}
+        self._items: dict[str, dict[str, dict[str, Any]]] = {}
+        self._replay()
+        self._path.parent.mkdir(parents=True, exist_ok=True)
+        self._file = open(self._path, "ab")
+        if self._file.tell() and not self._ends_with_newline():
+            # terminate a torn line so the next record starts on its own line
+            self._file.write(b"\n")
+            self._file.flush()
+
+    @property
+    def path(self) -> Path:
+        return self._path
+
+    def record_done(self, stage: str, key: str, **data) -> None:
+        self._record(stage, key, ItemStatus.DONE, data=data)
+
+    def record_failed(self, stage: str, key: str, error: str) -> None:
+        self._record(stage, key, ItemStatus.FAILED, error=error)
+
+    def status(self, stage: str, key: str) -> str | None:
+        with self._lock:
+            item = self._items.get(stage, {}).get(key)
+            return item["status"] if item else None
+
+    def is_done(self, stage: str, key: str) -> bool:
+        return self.status(stage, key) == ItemStatus.DONE
+
+    def should_run(self, stage: str, key: str) -> bool:
+        """
+        Tells whether the item is new, or failed with attempts left.
+        """
+
+        with self._lock:
+            item = self._items.get(stage, {}).get(key)
+            if item is None:
+                return True
+            return item["status"] == ItemStatus.FAILED and item["attempts"] < self._max_attempts
+
+    def data(self, stage: str, key: str) -> dict[str, Any]:
+        with self._lock:
+            item = self._items.get(stage, {}).get(key)
+            return dict(item["data"]) if item else {}
+
+    def keys(self, stage: str, status: str | None = None) -> list[str]:
+        with self._lock:
+            return [key for key, item in self._items.get(stage, {}).items()
+                    if status is None or item["status"] == status]
+
+    def summary(self) -> dict[str, dict[str, int]]:
+        with self._lock:
+            summary = {}
+            for stage, items in self._items.items():
+                counts = {ItemStatus.DONE: 0, ItemStatus.FAILED: 0}
+                for item in items.values():
+                    counts[item["status"]] += 1
+                summary[stage] = counts
+            return summary
+
+    def close(self) -> None:
+        with self._lock:
+            if not self._file.closed:
+                self._file.close()
+
+    def _record(self, stage: str, key: str, status: str,
+                error: str | None = None, data: dict | None = None) -> None:
+        entry = {
+            "stage": stage,
+            "key": key,
+            "status": status,
+            "error": error,
+            "data": data or {},
+            "at": datetime.now(),
+        }
+        line = self._serializer.dumps(entry) + b"\n"
+        with self._lock:
+            self._apply(entry)
+            self._file.write(line)
+            self._file.flush()
+
+    def _apply(self, entry: dict) -> None:
+        items = self._items.setdefault(entry["stage"], {})
+        previous = items.get(entry["key"])
+        attempts = previous["attempts"] if previous else 0
+        if entry["status"] == ItemStatus.FAILED:
+            attempts += 1
+        items[entry["key"]] = {
+            "status": entry["status"],
+            "attempts": attempts,
+            "error": entry.get("error"),
+            "data": entry.get("data") or (previous["data"] if previous else {}),
+        }
+
+    def _ends_with_newline(self) -> bool:
+        with open(self._path, "rb") as file:
+            file.seek(-1, 2)
+            return file.read(1) == b"\n"
+
+    def _replay(self) -> None:
+        if not self._path.exists():
+            return
+        with open(self._path, "rb") as file:
+            for number, line in enumerate(file, start=1):
+                if not line.strip():
+                    continue
+                try:
+                    self._apply(self._serializer.loads(line))
+                except Exception:
+                    logger.warning(
+                        f"Skipping unreadable line {number} of run manifest {self._path}")
@@ -0,0 +1,97 @@
+import json
+from datetime import date, datetime
+from typing import Any
+
+from pydantic import BaseModel
+
+
+class JsonSerializerName:
+    AUTO = "auto"
+    ORJSON = "orjson"
+    STDLIB = "json"
+
+
+def _default(obj):
+    """
+    Serializes the types the JSON encoders do not handle natively
+    """
+
+    if isinstance(obj, BaseModel):
+        return obj.model_dump(mode="json")
+    if isinstance(obj, (datetime, date)):
+        return obj.isoformat()
+    raise TypeError("Type %s not serializable" % type(obj))
+
+
+class JsonSerializer:
+    """Interface for encoding and decoding JSON documents."""
+
+    name = ""
+
+    def dumps(self, data: Any, pretty: bool = False) -> bytes:
+        """
+        Encodes the data as UTF-8 JSON, compact unless `pretty` is set
+        """
+
+        raise NotImplementedError
+
+    def loads(self, data: bytes | str) -> Any:
+        raise NotImplementedError
+
+
+class StdlibJsonSerializer(JsonSerializer):
+    """
+    Serializer built on the standard library json module.
+    """
+
+    name = JsonSerializerName.STDLIB
+
+    def dumps(self, data: Any, pretty: bool = False) -> bytes:
+        if pretty:
+            return json.dumps(data, default=_default, indent=4).encode("utf-8")
+        return json.dumps(data, default=_default, separators=(",", ":")).encode("utf-8")
+
+    def loads(self, data: bytes | str) -> Any:
+        return json.loads(data)
+
+
+class OrjsonSerializer(JsonSerializer):
+    """
+    Serializer built on orjson, which encodes datetimes natively and writes bytes directly.
+    """
+
+    name = JsonSerializerName.ORJSON
+
+    def __init__(self):
+        import orjson
+
+        self._orjson = orjson
+        self._options = orjson.OPT_NON_STR_KEYS
+        self._pretty_options = self._options | orjson.OPT_INDENT_2
+
+    def dumps(self, data: Any, pretty: bool = False) -> bytes:
+        if isinstance(data, BaseModel):
+            data = data.model_dump()
+        return self._orjson.dumps(
+            data, default=_default, option=self._pretty_options if pretty else self._options)
+
+    def loads(self, data: bytes | str) -> Any:
+        return self._orjson.loads(data)
+
+
+def create_serializer(name: str = JsonSerializerName.AUTO) -> JsonSerializer:
+    """
+    Creates the serializer with the given name. `auto` prefers orjson when it is installed.
+    """
+
+    if name == JsonSerializerName.STDLIB:
+        return StdlibJsonSerializer()
+    if name == JsonSerializerName.ORJSON:
+        return OrjsonSerializer()
+    if name == JsonSerializerName.AUTO:
+        try:
+            return OrjsonSerializer()
+        except ImportError:
+            return StdlibJsonSerializer()
+    raise ValueError(
+        f"Invalid JSON serializer: {name}. Must be one of: auto, orjson, json")
@@ -1,3 +1,11 @@
+import asyncio
+import re
+from fnmatch import fnmatchcase
+from typing import Iterator
+
+DATE_PART = re.compile(r"^\d{1,4}$")
+
+
 class Storage:
     """Interface for storage of files."""
 
@@ -13,6 +21,14 @@ class Storage:
     def write_json(self, file_name: str, data: dict) -> None:
         raise NotImplementedError
 
+    def write_many_json(self, files: dict[str, dict]) -> None:
+        """
+        Writes several JSON files, keyed by file name
+        """
+
+        for file_name, data in files.items():
+            self.write_json(file_name, data)
+
     def create_folder(self, folder_name: str) -> None:
         """
         Creates a new folder in the storage
@@ -43,3 +59,132 @@ class Storage:
         """
 
         raise NotImplementedError
+
+    def iter_files(self,
+                   path: str,
+                   recursive: bool = False,
+                   pattern: str | None = None,
+                   suffix: str | None = None,
+                   date_from: str | None = None,
+                   date_to: str | None = None,
+                   start_after: str | None = None,
+                   limit: int | None = None) -> Iterator[str]:
+        """
+        Yields the files in the given path in name order.
+
+        `pattern` is a glob and `suffix` an ending matched against the file name. Dates are
+        inclusive `YYYY-MM-DD` strings matched against the `YYYY/MM/DD` partition of the path.
+        Pass the last name of a page as `start_after` to get the next one.
+        """
+
+        if recursive:
+            raise NotImplementedError
+        names = sorted(self.list_all_files(path))
+        yield from filter_files(names, pattern, suffix, date_from, date_to, start_after, limit)
+
+    def close(self) -> None:
+        """
+        Writes any buffered data and releases resources
+        """
+
+    async def aread(self, file_name: str) -> bytes:
+        return await asyncio.to_thread(self.read, file_name)
+
+    async def aread_json(self, file_name: str) -> dict:
+        return await asyncio.to_thread(self.read_json, file_name)
+
+    async def awrite_json(self, file_name: str, data: dict) -> None:
+        await asyncio.to_thread(self.write_json, file_name, data)
+
+    async def alist(self, path: str) -> list[str]:
+        """
+        Lists all files in the given path without blocking the event loop
+        """
+
+        return await asyncio.to_thread(self.list_all_files, path)
+
+    async def aflush(self) -> None:
+        """
+        Waits until every buffered write is stored
+        """
+
+    async def aclose(self) -> None:
+        await self.aflush()
+        self.close()
+
+
+def partition_date(path: str) -> str | None:
+    """
+    Returns the `YYYY-MM-DD` date of a `YYYY/MM/DD/...` path, or None if it is not date partitioned.
+    """
+
+    parts = path.strip("/").split("/")
+    if len(parts) < 3 or not all(DATE_PART.match(part) for part in parts[:3]):
+        return None
+    return f"{int(parts[0]):04d}-{int(parts[1]):02d}-{int(parts[2]):02d}"
+
+
+def date_prefix_in_range(path: str, date_from: str | None, date_to: str | None) -> bool:
+    """
+    Tells whether a folder may hold files in the date range, judging from the date parts it has
+    (`2024`, `2024/01` or `2024/01/31`). Folders outside the date partitions never match a range.
+    """
+
+    if not date_from and not date_to:
+        return True
+    parts = path.strip("/").split("/")[:3] if path.strip("/") else []
+    if not parts:
+        return True
+    dated = []
+    for part in parts:
+        if not DATE_PART.match(part):
+            break
+        dated.append(part)
+    if not dated:
+        return False
+    widths = (4, 2, 2)
+    prefix = "-".join(f"{int(part):0{width}d}" for part, width in zip(dated, widths))
+    if date_from and prefix < date_from[:len(prefix)]:
+        return False
+    if date_to and prefix > date_to[:len(prefix)]:
+        return False
+    return True
+
+
+def file_matches(name: str,
+                 pattern: str | None = None,
+                 suffix: str | None = None,
+                 date_from: str | None = None,
+                 date_to: str | None = None) -> bool:
+    """
+    Applies the `iter_files` filters to a full file name.
+    """
+
+    base_name = name.rpartition("/")[2]
+    if suffix and not base_name.endswith(suffix):
+        return False
+    if pattern and not fnmatchcase(base_name, pattern):
+        return False
+    if date_from or date_to:
+        date = partition_date(name)
+        if date is None or (date_from and date < date_from) or (date_to and date > date_to):
+            return False
+    return True
+
+
+def filter_files(names, pattern: str | None = None, suffix: str | None = None,
+                 date_from: str | None = None, date_to: str | None = None,
+                 start_after: str | None = None, limit: int | None = None) -> Iterator[str]:
+    """
+    Lazily applies the `iter_files` filters and pagination to file names given in name order.
+    """
+
+    count = 0
+    for name in names:
+        if limit is not None and count >= limit:
+            return
+        if start_after is not None and name <= start_after:
+            continue
+        if file_matches(name, pattern, suffix, date_from, date_to):
+            count += 1
+            yield name
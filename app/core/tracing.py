@@ -0,0 +1,100 @@
+import contextvars
+import hashlib
+import threading
+import time
+import uuid
+from collections import deque
+from contextlib import contextmanager
+from typing import Any, Iterator
+
+from pydantic import BaseModel, Field
+
+_current_span: contextvars.ContextVar["Span | None"] = contextvars.ContextVar("current_span", default=None)
+
+
+class SpanStatus:
+    OK = "ok"
+    ERROR = "error"
+
+
+class Span(BaseModel):
+    trace_id: str = Field(description="Shared by the spans of one URL through every stage")
+    span_id: str
+    parent_id: str | None = None
+    name: str
+    started_at: float = Field(description="Unix time the span started at")
+    duration_seconds: float = 0.0
+    status: str = SpanStatus.OK
+    error: str | None = None
+    attributes: dict[str, Any] = Field(default_factory=dict)
+
+    def set(self, **attributes: Any) -> None:
+        self.attributes.update(attributes)
+
+
+def trace_id_for(url: str) -> str:
+    """
+    Derives the trace id from the URL, so the search, scrape and analysis of a page
+    share one trace although they run in different tasks or processes.
+    """
+
+    return hashlib.sha1(url.encode()).hexdigest()[:16]
+
+
+class Tracer:
+    """
+    Records spans of the work done per URL. Finished spans wait in a bounded buffer
+    until an exporter drains them; nothing is kept while the tracer is disabled.
+    """
+
+    def __init__(self, max_spans: int = 10000):
+        self.enabled = False
+        self._lock = threading.Lock()
+        self._finished: deque[Span] = deque(maxlen=max_spans)
+        self._dropped = 0
+
+    @property
+    def dropped(self) -> int:
+        return self._dropped
+
+    @contextmanager
+    def span(self, name: str, **attributes: Any) -> Iterator[Span]:
+        parent = _current_span.get()
+        if parent is not None:
+            trace_id = parent.trace_id
+        elif attributes.get("url"):
+            trace_id = trace_id_for(attributes["url"])
+        else:
+            trace_id = uuid.uuid4().hex[:16]
+        span = Span(trace_id=trace_id, span_id=uuid.uuid4().hex[:16],
+                    parent_id=parent.span_id if parent else None,
+                    name=name, started_at=time.time(), attributes=attributes)
+        started = time.perf_counter()
+        token = _current_span.set(span)
+        try:
+            yield span
+        except BaseException as e:
+            span.status = SpanStatus.ERROR
+            span.error = str(e) or type(e).__name__
+            raise
+        finally:
+            _current_span.reset(token)
+            span.duration_seconds = time.perf_counter() - started
+            self._record(span)
+
+    def drain(self) -> list[Span]:
+        with self._lock:
+            spans = list(self._finished)
+            self._finished.clear()
+        return spans
+
+    def _record(self, span: Span) -> None:
+        if not self.enabled:
+            return
+        with self._lock:
+            if len(self._finished) == self._finished.maxlen:
+                self._dropped += 1
+            self._finished.append(span)
+
+
+TRACER = Tracer()
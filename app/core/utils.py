@@ -1,9 +1,6 @@
 import json
 from datetime import date, datetime
 
-from langdetect import detect
-from langdetect.lang_detect_exception import LangDetectException
-
 
 class FileNaming:
     """Core interface for file naming strategies"""
@@ -49,6 +46,9 @@ def json_serial(obj):
 
 
 def is_english(text):
+    from langdetect import detect
+    from langdetect.lang_detect_exception import LangDetectException
+
     try:
         return detect(text) == 'en'
     except LangDetectException:
@@ -1,7 +1,40 @@
-from core.domain import ScrapingResult
+from typing import AsyncContextManager
+
+from core.domain import ScrapePageResult, ScrapingResult
+
+
+class WebScrapeSession:
+    """A scraping session sharing its resources (e.g. a browser) across pages."""
+
+    async def scrape(self, url: str, file_path: str = None) -> ScrapePageResult:
+        raise NotImplementedError
+
+    async def scrape_if_modified(self, url: str, file_path: str = None, etag: str | None = None,
+                                 last_modified: str | None = None) -> ScrapePageResult:
+        """
+        Revalidates the page with the validators of its previous fetch: when the server answers
+        304 the result is `not_modified` and nothing is stored. Sessions that cannot send
+        conditional requests scrape the page.
+        """
+
+        return await self.scrape(url, file_path)
 
 
 class WebScraper:
 
     async def scrape_multiple(self, urls: list[str], file_path: str = None) -> ScrapingResult:
         raise NotImplementedError
+
+    def result_file_name(self, url: str, file_path: str = None) -> str:
+        """
+        Returns the storage file name of a successful scrape of the URL
+        """
+
+        raise NotImplementedError
+
+    def session(self) -> AsyncContextManager[WebScrapeSession]:
+        """
+        Opens a session to scrape pages one at a time as they arrive
+        """
+
+        raise NotImplementedError
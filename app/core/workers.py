@@ -0,0 +1,205 @@
+import asyncio
+import logging
+import os
+import socket
+import uuid
+from typing import Any, Awaitable, Callable
+
+from configuration import Settings
+from core.chat_model import ChatModelProvider
+from core.content_analysis import ContentAnalysisService
+from core.domain import ScrapePageResult
+from core.job_queue import ANALYSIS_QUEUE, SCRAPE_QUEUE, Job, JobQueue
+from core.profiling import stage_scope
+from core.storage import Storage
+from core.web_scrape import WebScraper, WebScrapeSession
+from core.web_search import SearchEngine
+from injector import ProviderOf, inject
+
+logger = logging.getLogger(__name__)
+
+
+def default_worker_id() -> str:
+    return f"{socket.gethostname()}-{os.getpid()}-{uuid.uuid4().hex[:6]}"
+
+
+class QueueWorker:
+    """
+    Leases jobs of one queue and runs up to `concurrency` of them at a time,
+    renewing each lease while its job runs.
+    """
+
+    def __init__(self, queue: JobQueue, queue_name: str, handler: Callable[[Job], Awaitable[None]],
+                 concurrency: int, lease_seconds: float, poll_seconds: float,
+                 worker_id: str | None = None):
+        self._queue = queue
+        self._queue_name = queue_name
+        self._handler = handler
+        self._concurrency = concurrency
+        self._lease_seconds = lease_seconds
+        self._poll_seconds = poll_seconds
+        self._worker_id = worker_id or default_worker_id()
+        self._completed = 0
+        self._failed = 0
+        self._lost = 0
+
+    def summary(self) -> dict[str, Any]:
+        return {
+            "worker_id": self._worker_id,
+            "queue": self._queue_name,
+            "completed": self._completed,
+            "failed": self._failed,
+            "lost_leases": self._lost,
+        }
+
+    async def run(self, stop_when_idle: bool = False, max_jobs: int | None = None) -> dict[str, Any]:
+        """
+        Works until cancelled, or until the queue is empty with `stop_when_idle`.
+        """
+
+        active: set[asyncio.Task] = set()
+        leased = 0
+        try:
+            while True:
+                free = self._concurrency - len(active)
+                if max_jobs is not None:
+                    free = min(free, max_jobs - leased)
+                jobs = []
+                if free > 0:
+                    jobs = await asyncio.to_thread(
+                        self._queue.lease, self._queue_name, self._worker_id, free, self._lease_seconds)
+                for job in jobs:
+                    task = asyncio.create_task(self._process(job))
+                    active.add(task)
+                    task.add_done_callback(active.discard)
+                leased += len(jobs)
+
+                if not active:
+                    if stop_when_idle or max_jobs is not None and leased >= max_jobs:
+                        break
+                    await asyncio.sleep(self._poll_seconds)
+                    continue
+                # with free slots, poll for new jobs while waiting for the running ones
+                timeout = None if len(active) >= self._concurrency else self._poll_seconds
+                await asyncio.wait(active, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            if active:
+                await asyncio.gather(*active, return_exceptions=True)
+        return self.summary()
+
+    async def _process(self, job: Job) -> None:
+        heartbeat = asyncio.create_task(self._heartbeat(job))
+        try:
+            with stage_scope(self._queue_name):
+                await self._handler(job)
+        except Exception as e:
+            self._failed += 1
+            logger.error(f"Job {job.id} of {self._queue_name} failed (attempt {job.attempts}): {str(e)}")
+            await asyncio.to_thread(self._queue.fail, job, str(e))
+            return
+        finally:
+            heartbeat.cancel()
+
+        if await asyncio.to_thread(self._queue.complete, job):
+            self._completed += 1
+        else:
+            # the lease expired and another worker took the job over
+            self._lost += 1
+            logger.warning(f"Lost the lease of job {job.id} of {self._queue_name}")
+
+    async def _heartbeat(self, job: Job) -> None:
+        while True:
+            await asyncio.sleep(self._lease_seconds / 3)
+            if not await asyncio.to_thread(self._queue.extend, job, self._lease_seconds):
+                return
+
+
+class PipelineWorkers:
+    """
+    Spreads the pipeline over worker processes: searches enqueue scrape jobs,
+    scrape workers enqueue analysis jobs and analysis workers store the analyses.
+    The services of each stage are built on first use, so a scrape worker never loads the LLM clients.
+    """
+
+    @inject
+    def __init__(self, settings: Settings, queue: JobQueue, search_engine: ProviderOf[SearchEngine],
+                 web_scraper: ProviderOf[WebScraper], content_analysis: ProviderOf[ContentAnalysisService],
+                 chat_model_provider: ProviderOf[ChatModelProvider], storage: Storage):
+        self._queue_settings = settings.job_queue_settings
+        self._pipeline_settings = settings.pipeline_settings
+        self._queue = queue
+        self._search_engine = search_engine
+        self._web_scraper = web_scraper
+        self._content_analysis = content_analysis
+        self._chat_model_provider = chat_model_provider
+        self._storage = storage
+
+    @property
+    def queue(self) -> JobQueue:
+        return self._queue
+
+    async def enqueue_searches(self, queries: list[str], file_path: str = None) -> int:
+        """
+        Searches the queries and enqueues a scrape job per new URL, returns the number enqueued.
+        """
+
+        search_engine = self._search_engine.get()
+        enqueued = 0
+        for query in queries:
+            results = await search_engine.search(query, file_path) or []
+            enqueued += await asyncio.to_thread(self._queue.enqueue_many, SCRAPE_QUEUE, [
+                (result.url, {"url": result.url, "file_path": file_path, "query": query})
+                for result in results if result.url])
+        return enqueued
+
+    async def run_scrape_worker(self, concurrency: int | None = None, stop_when_idle: bool = False,
+                                max_jobs: int | None = None) -> dict[str, Any]:
+        web_scraper = self._web_scraper.get()
+        async with web_scraper.session() as session:
+            async def handle(job: Job) -> None:
+                await self._scrape(web_scraper, session, job)
+
+            worker = self._worker(
+                SCRAPE_QUEUE, handle, concurrency or self._pipeline_settings.scrape_concurrency)
+            return await worker.run(stop_when_idle, max_jobs)
+
+    async def run_analysis_worker(self, concurrency: int | None = None, stop_when_idle: bool = False,
+                                  max_jobs: int | None = None) -> dict[str, Any]:
+        content_analysis = self._content_analysis.get()
+        chat_model_provider = self._chat_model_provider.get()
+
+        async def handle(job: Job) -> None:
+            await self._analyze(content_analysis, chat_model_provider, job)
+
+        worker = self._worker(
+            ANALYSIS_QUEUE, handle, concurrency or self._pipeline_settings.analysis_concurrency)
+        return await worker.run(stop_when_idle, max_jobs)
+
+    def _worker(self, queue_name: str, handler: Callable[[Job], Awaitable[None]], concurrency: int) -> QueueWorker:
+        return QueueWorker(
+            self._queue, queue_name, handler, concurrency,
+            lease_seconds=self._queue_settings.lease_seconds,
+            poll_seconds=self._queue_settings.poll_seconds,
+        )
+
+    async def _scrape(self, web_scraper: WebScraper, session: WebScrapeSession, job: Job) -> None:
+        url, file_path = job.payload["url"], job.payload.get("file_path")
+        result = await session.scrape(url, file_path)
+        if not result or not result.success:
+            raise RuntimeError(result.error_message if result else "no result")
+        await self._storage.aflush()
+        # stored before the analysis is enqueued, so any worker can pick the page up
+        await asyncio.to_thread(self._queue.enqueue, ANALYSIS_QUEUE, {
+            "url": url,
+            "file": web_scraper.result_file_name(url, file_path),
+            "file_path": file_path,
+        }, url)
+
+    async def _analyze(self, content_analysis: ContentAnalysisService,
+                       chat_model_provider: ChatModelProvider, job: Job) -> None:
+        page = ScrapePageResult(**await self._storage.aread_json(job.payload["file"]))
+        analysis = await asyncio.to_thread(
+            content_analysis.analyze_content,
+            page.url, page.model_dump(), chat_model_provider, job.payload.get("file_path"))
+        if analysis is None:
+            raise RuntimeError(f"Analyzing {page.url} failed")
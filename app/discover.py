@@ -0,0 +1,67 @@
+#!/usr/bin/env python
+"""
+Lists the pages of sites from their sitemaps and RSS or Atom feeds, to tune the discovery
+filters before a run or to hand the pages to the recrawl scheduler.
+
+To search, scrape and analyze the discovered pages, set SEARCH_ENGINE=sitemap and pass the
+sites to main.py or campaign.py as queries.
+
+Usage: python discover.py <site, sitemap or feed> [...] [--since-days N] [--include GLOB]
+                          [--exclude GLOB] [--track]
+"""
+import argparse
+import asyncio
+import logging
+from datetime import datetime, timedelta, timezone
+
+from configuration import Settings
+from core.discovery import DiscoveryFilter
+from core.recrawl import RecrawlScheduler
+from infrastructure.discovery_services import SitemapSearch
+from infrastructure.service_collection import ServiceCollection
+
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+    handlers=[logging.StreamHandler()]
+)
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="List the pages of sites from their sitemaps and feeds")
+    parser.add_argument("sources", nargs="+", help="Sites, sitemaps or feeds")
+    parser.add_argument("--since-days", type=int, help="Only pages modified within this many days")
+    parser.add_argument("--include", action="append", metavar="GLOB", help="Only paths matching, repeatable")
+    parser.add_argument("--exclude", action="append", metavar="GLOB", help="Skip paths matching, repeatable")
+    parser.add_argument("--track", action="store_true", help="Track the pages for recrawling")
+    return parser.parse_args()
+
+
+async def main():
+    args = parse_args()
+    service_provider = ServiceCollection.add_services()
+    discovery = service_provider.get(SitemapSearch)
+
+    discovery_filter = DiscoveryFilter.from_settings(service_provider.get(Settings).discovery_settings)
+    if args.since_days is not None:
+        discovery_filter.since = datetime.now(timezone.utc) - timedelta(days=args.since_days)
+    discovery_filter.include_paths = args.include or discovery_filter.include_paths
+    discovery_filter.exclude_paths = args.exclude or discovery_filter.exclude_paths
+
+    urls = []
+    for source in args.sources:
+        for found in await discovery.discover(source, discovery_filter):
+            print(f"{found.last_modified.isoformat() if found.last_modified else '-':<25} {found.url}")
+            urls.append(found.url)
+    print(f"Discovered {len(urls)} pages")
+
+    if args.track:
+        scheduler = service_provider.get(RecrawlScheduler)
+        try:
+            print(f"Tracking {scheduler.track(urls)} new pages")
+        finally:
+            scheduler.store.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
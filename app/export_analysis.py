@@ -0,0 +1,49 @@
+#!/usr/bin/env python
+"""
+Appends stored content analyses to the columnar export (Parquet or Arrow).
+Only analyses not exported by a previous run are added.
+
+Usage: python export_analysis.py [since YYYY-MM-DD] [until YYYY-MM-DD]
+"""
+import logging
+import sys
+from datetime import date, datetime
+
+from configuration import Settings
+from core.analysis_export import AnalysisExportService
+from core.storage import Storage
+from infrastructure.service_collection import ServiceCollection
+
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+    handlers=[logging.StreamHandler()]
+)
+
+
+def main():
+    service_provider = ServiceCollection.add_services()
+    settings = service_provider.get(Settings)
+    storage = service_provider.get(Storage)
+    export_service = service_provider.get(AnalysisExportService)
+
+    today = date.today()
+    since = datetime.strptime(
+        sys.argv[1], "%Y-%m-%d").date() if len(sys.argv) > 1 else today
+    until = datetime.strptime(
+        sys.argv[2], "%Y-%m-%d").date() if len(sys.argv) > 2 else today
+
+    # one walk over the date partitions, skipping days outside the range
+    file_names = [
+        name for name in storage.iter_files(
+            "", recursive=True, suffix="_content_analysis.json",
+            date_from=since.isoformat(), date_to=until.isoformat())
+        if name.rpartition("/")[0].endswith(f"/{settings.content_analysis_path}")
+    ]
+
+    result = export_service.export(file_names)
+    print(result.model_dump_json(indent=4))
+
+
+if __name__ == "__main__":
+    main()
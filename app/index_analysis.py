@@ -0,0 +1,107 @@
+#!/usr/bin/env python
+"""
+Queries the index of the content analyses, which is kept up to date as analyses are stored.
+`build` indexes the analyses already in storage, e.g. those stored before the index existed.
+`cluster` groups the indexed pain points describing the same problem, for `clusters` to report.
+
+Usage: python index_analysis.py build [--since YYYY-MM-DD] [--until YYYY-MM-DD]
+       python index_analysis.py categories|providers|domains [--month | --since .. --until ..] [--limit N]
+       python index_analysis.py search <text> [--since ..] [--until ..] [--limit N]
+       python index_analysis.py cluster
+       python index_analysis.py clusters [--month | --since .. --until ..] [--min-size N] [--limit N]
+       python index_analysis.py stats
+"""
+import argparse
+import json
+import logging
+from datetime import date, datetime
+
+from configuration import Settings
+from core.analysis_index import AnalysisIndex
+from core.pain_point_clustering import PainPointClusterer
+from core.storage import Storage
+from infrastructure.service_collection import ServiceCollection
+
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+    handlers=[logging.StreamHandler()]
+)
+
+
+def parse_date(value: str) -> date:
+    return datetime.strptime(value, "%Y-%m-%d").date()
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Query the index of the content analyses")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    def with_dates(command: argparse.ArgumentParser) -> argparse.ArgumentParser:
+        command.add_argument("--since", type=parse_date)
+        command.add_argument("--until", type=parse_date)
+        command.add_argument("--month", action="store_true", help="Since the first day of this month")
+        return command
+
+    with_dates(commands.add_parser("build", help="Index the analyses in storage"))
+    for name in ("categories", "providers", "domains"):
+        with_dates(commands.add_parser(name, help=f"The top {name} by pain points")).add_argument(
+            "--limit", type=int, default=10)
+    search = with_dates(commands.add_parser("search", help="Full-text search of the pain points"))
+    search.add_argument("text")
+    search.add_argument("--limit", type=int, default=20)
+    commands.add_parser("cluster", help="Cluster the indexed pain points, replacing the previous clusters")
+    clusters = with_dates(commands.add_parser("clusters", help="The largest clusters of pain points"))
+    clusters.add_argument("--min-size", type=int, default=2)
+    clusters.add_argument("--limit", type=int, default=10)
+    commands.add_parser("stats", help="Print the number of indexed rows")
+    args = parser.parse_args()
+    if getattr(args, "month", False):
+        args.since = date.today().replace(day=1)
+    return args
+
+
+def main():
+    args = parse_args()
+    service_provider = ServiceCollection.add_services()
+    index = service_provider.get(AnalysisIndex)
+
+    try:
+        if args.command == "build":
+            settings = service_provider.get(Settings)
+            storage = service_provider.get(Storage)
+            indexed, failed = 0, 0
+            for name in storage.iter_files(
+                    "", recursive=True, suffix="_content_analysis.json",
+                    date_from=args.since.isoformat() if args.since else None,
+                    date_to=args.until.isoformat() if args.until else None):
+                if not name.rpartition("/")[0].endswith(f"/{settings.content_analysis_path}"):
+                    continue
+                try:
+                    index.record(name, storage.read_json(name))
+                    indexed += 1
+                except Exception as e:
+                    logging.error(f"Could not index {name}: {str(e)}")
+                    failed += 1
+            print(json.dumps({"indexed": indexed, "failed": failed, **index.stats()}, indent=4))
+        elif args.command == "stats":
+            print(json.dumps(index.stats(), indent=4))
+        elif args.command == "cluster":
+            print(json.dumps(service_provider.get(PainPointClusterer).run(), indent=4))
+        elif args.command == "clusters":
+            clusters = index.top_clusters(args.since, args.until, args.min_size, args.limit)
+            print(json.dumps([cluster.model_dump(exclude_none=True) for cluster in clusters], indent=4))
+        elif args.command == "search":
+            hits = index.search(args.text, args.since, args.until, args.limit)
+            print(json.dumps([hit.model_dump() for hit in hits], indent=4))
+        else:
+            query = {"categories": index.top_categories, "providers": index.top_providers,
+                     "domains": index.top_domains}[args.command]
+            facets = query(args.since, args.until, args.limit)
+            print(json.dumps([facet.model_dump(exclude_none=True) for facet in facets], indent=4))
+    finally:
+        index.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,41 @@
+from contextvars import ContextVar
+from typing import Any
+
+from langchain_anthropic import ChatAnthropic
+from langchain_core.outputs import ChatResult
+
+# the headers of the last response received in the current thread or task
+_RESPONSE_HEADERS: ContextVar[dict[str, str] | None] = ContextVar("anthropic_response_headers", default=None)
+
+
+class HeaderReportingChatAnthropic(ChatAnthropic):
+    """
+    ChatAnthropic reporting the HTTP headers of each response in the `headers` of its response
+    metadata, where the LLMCallScheduler reads the rate limits to pace the next calls.
+    """
+
+    def _create(self, payload: dict) -> Any:
+        raw_response = super()._create(payload)
+        _RESPONSE_HEADERS.set(dict(raw_response.headers))
+        return raw_response
+
+    async def _acreate(self, payload: dict) -> Any:
+        raw_response = await super()._acreate(payload)
+        _RESPONSE_HEADERS.set(dict(raw_response.headers))
+        return raw_response
+
+    def _generate(self, *args, **kwargs) -> ChatResult:
+        _RESPONSE_HEADERS.set(None)
+        return _with_headers(super()._generate(*args, **kwargs))
+
+    async def _agenerate(self, *args, **kwargs) -> ChatResult:
+        _RESPONSE_HEADERS.set(None)
+        return _with_headers(await super()._agenerate(*args, **kwargs))
+
+
+def _with_headers(result: ChatResult) -> ChatResult:
+    headers = _RESPONSE_HEADERS.get()
+    if headers:
+        for generation in result.generations:
+            generation.message.response_metadata["headers"] = headers
+    return result
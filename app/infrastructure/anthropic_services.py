@@ -1,9 +1,12 @@
-from configuration import Settings
+from typing import TYPE_CHECKING
+
+from configuration import AnthropicEndpoint, Settings
 from core.chat_model import ChatModelProvider
-from core.domain import ModelHost
-from injector import Binder, Module, inject, singleton
-from langchain_anthropic import ChatAnthropic
-from langchain_core.language_models.chat_models import BaseChatModel
+from core.domain import ChatModelSettings, ModelHost
+from injector import Binder, Module, NoInject, inject, multiprovider, singleton
+
+if TYPE_CHECKING:
+    from langchain_core.language_models.chat_models import BaseChatModel
 
 """
 We could create a similar services for azure, and other cloud providers.
@@ -28,19 +31,33 @@ class AnthropicModule(Module):
                         scope=singleton
                         )
 
+    @singleton
+    @multiprovider
+    def provide_routed_chat_model_providers(self, settings: Settings) -> dict[str, ChatModelProvider]:
+        # always register every endpoint as a host so the routing provider can use it
+        return {name: AnthropicChatModelProvider(settings, endpoint)
+                for name, endpoint in settings.anthropic.endpoints.items()}
+
 
 class AnthropicChatModelProvider(ChatModelProvider):
     @inject
-    def __init__(self, settings: Settings):
+    def __init__(self, settings: Settings, endpoint: NoInject[AnthropicEndpoint | None] = None):
         self._settings = settings
+        self._endpoint = endpoint or settings.anthropic.endpoints[ModelHost.ANTHROPIC]
 
     def can_handle(self) -> bool:
         return self._settings.llm_settings.chat_model_settings.host == ModelHost.ANTHROPIC
 
-    def get_chat_model(self) -> BaseChatModel:
-        return ChatAnthropic(
-            model=self._settings.llm_settings.chat_model_settings.model_name,
-            api_key=self._settings.anthropic.api_key,
-            temperature=self._settings.llm_settings.chat_model_settings.temperature,
-            max_tokens=self._settings.llm_settings.chat_model_settings.max_tokens
+    def get_chat_model(self, chat_model_settings: ChatModelSettings | None = None) -> "BaseChatModel":
+        from .anthropic_chat_model import HeaderReportingChatAnthropic
+
+        chat_model_settings = chat_model_settings or self._settings.llm_settings.chat_model_settings
+        return HeaderReportingChatAnthropic(
+            model=chat_model_settings.model_name,
+            api_key=self._endpoint.api_key,
+            base_url=self._endpoint.api_url,
+            temperature=chat_model_settings.temperature,
+            max_tokens=chat_model_settings.max_tokens,
+            # the LLMCallScheduler retries rate-limited calls, pacing them from the headers
+            max_retries=0
         )
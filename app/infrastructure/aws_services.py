@@ -0,0 +1,321 @@
+import asyncio
+import atexit
+import logging
+import threading
+from typing import Any, Awaitable, Iterator, TypeVar
+
+from configuration import Settings
+from core.serialization import create_serializer
+from core.storage import Storage, file_matches, partition_date
+from injector import Binder, Module, inject, singleton
+
+from .app_host import AppHost
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar('T')
+
+NOT_FOUND_CODES = ("NoSuchKey", "404", "NotFound")
+
+# Keys fetched per list request, the S3 maximum
+LIST_PAGE_SIZE = 1000
+
+
+class AwsModule(Module):
+    """
+    AWS module.
+    """
+
+    def __init__(self, app_host: str):
+        self.app_host = app_host
+
+    def configure(self, binder: Binder) -> None:
+        if self.app_host == AppHost.AWS:
+            binder.bind(Storage, to=S3Storage, scope=singleton)
+
+
+class S3Storage(Storage):
+    """
+    Storage implementation backed by an S3-compatible bucket.
+
+    One aiobotocore client, with its connection pool, runs on a dedicated I/O event loop thread
+    and is shared by every caller: sync methods wait on it, async methods await it from any loop.
+    """
+
+    @inject
+    def __init__(self, settings: Settings):
+        aws = settings.aws
+        if not aws.is_configured:
+            raise ValueError("AWS_S3_BUCKET must be set to use the S3 storage")
+        self.settings = settings
+        self._bucket = aws.s3_bucket
+        self._prefix = f"{aws.s3_prefix}/" if aws.s3_prefix else ""
+        self._concurrency = aws.concurrency
+        self._multipart_threshold = aws.multipart_threshold
+        self._multipart_chunk_size = aws.multipart_chunk_size
+        self._serializer = create_serializer(
+            settings.local_settings.json_serializer)
+
+        self._client: Any = None
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(
+            target=self._loop.run_forever, name="s3-io", daemon=True)
+        self._thread.start()
+        self._client_lock = asyncio.Lock()
+        self._closed = False
+        atexit.register(self.close)
+
+    def read(self, file_name: str) -> bytes:
+        """
+        Reads the object from the bucket.
+        """
+
+        return self._run(self._get(file_name))
+
+    def read_json(self, file_name: str) -> dict:
+        """
+        Reads the JSON object from the bucket.
+        """
+
+        return self._serializer.loads(self.read(file_name))
+
+    def write(self, file_name: str, data: bytes, container: str | None = None) -> None:
+        """
+        Writes the object to the bucket, in parts when it is large.
+        """
+
+        if not isinstance(data, bytes):
+            raise ValueError(f"Invalid data type: {type(data)}")
+        self._run(self._put(file_name, data))
+
+    def write_json(self, file_name: str, data: dict) -> None:
+        """
+        Writes the JSON object to the bucket.
+        """
+
+        self._run(self._put(file_name, self._serializer.dumps(data), "application/json"))
+
+    def write_many_json(self, files: dict[str, dict]) -> None:
+        """
+        Writes several JSON objects concurrently.
+        """
+
+        self._run(self._put_many({name: self._serializer.dumps(data)
+                                  for name, data in files.items()}))
+
+    def store_image(self, file_name: str, data: bytes) -> str:
+        self.write(file_name, data)
+        return self._url(file_name)
+
+    def store_export(self, file_name: str, data: bytes) -> str:
+        """
+        Stores the export in the bucket and returns its s3:// URL.
+        """
+
+        self.write(file_name, data)
+        return self._url(file_name)
+
+    def delete(self, file_name: str) -> None:
+        self._run(self._delete(file_name))
+
+    def list_all_files(self, path: str) -> list[str]:
+        """
+        Lists all objects directly under the given prefix. Buckets have no folders,
+        so a missing prefix is an empty listing.
+        """
+
+        return list(self.iter_files(path))
+
+    def iter_files(self,
+                   path: str,
+                   recursive: bool = False,
+                   pattern: str | None = None,
+                   suffix: str | None = None,
+                   date_from: str | None = None,
+                   date_to: str | None = None,
+                   start_after: str | None = None,
+                   limit: int | None = None) -> Iterator[str]:
+        """
+        Pages through the prefix with ListObjectsV2, one request per page of names.
+        The listing starts at the first partition of the date range and stops after the last.
+        """
+
+        folder = path.strip("/")
+        prefix = f"{self._prefix}{folder}/" if folder else self._prefix
+        start = start_after
+        if date_from:
+            first_partition = date_from.replace("-", "/")
+            start = max(start or "", first_partition)
+
+        count = 0
+        token = None
+        while True:
+            page = self._run(self._list_page(prefix, recursive, start, token))
+            for key in page["keys"]:
+                name = key[len(self._prefix):]
+                date = partition_date(name)
+                if date_to and date is not None and date > date_to:
+                    # partitions are zero padded, so every later key is past the range
+                    return
+                if limit is not None and count >= limit:
+                    return
+                if file_matches(name, pattern, suffix, date_from, date_to):
+                    count += 1
+                    yield name
+            token = page["token"]
+            if token is None:
+                return
+
+    def create_folder(self, folder_name: str) -> None:
+        """
+        Folders are implied by object keys, so there is nothing to create.
+        """
+
+    def close(self) -> None:
+        """
+        Closes the client and stops the I/O loop.
+        """
+
+        if self._closed:
+            return
+        self._closed = True
+        try:
+            asyncio.run_coroutine_threadsafe(
+                self._close_client(), self._loop).result()
+        finally:
+            self._loop.call_soon_threadsafe(self._loop.stop)
+            self._thread.join()
+            self._loop.close()
+
+    async def aread(self, file_name: str) -> bytes:
+        return await self._arun(self._get(file_name))
+
+    async def aread_json(self, file_name: str) -> dict:
+        return self._serializer.loads(await self.aread(file_name))
+
+    async def awrite_json(self, file_name: str, data: dict) -> None:
+        await self._arun(self._put(file_name, self._serializer.dumps(data), "application/json"))
+
+    async def aclose(self) -> None:
+        await asyncio.to_thread(self.close)
+
+    async def _create_client(self) -> Any:
+        """
+        Opens the pooled client; override to use another S3 client.
+        """
+
+        from aiobotocore.config import AioConfig
+        from aiobotocore.session import get_session
+
+        aws = self.settings.aws
+        self._client_context = get_session().create_client(
+            "s3",
+            region_name=aws.region,
+            endpoint_url=aws.s3_endpoint_url,
+            config=AioConfig(max_pool_connections=aws.max_pool_connections),
+        )
+        return await self._client_context.__aenter__()
+
+    async def _close_client(self) -> None:
+        if self._client is not None and hasattr(self, "_client_context"):
+            await self._client_context.__aexit__(None, None, None)
+        self._client = None
+
+    async def _get_client(self) -> Any:
+        if self._client is None:
+            async with self._client_lock:
+                if self._client is None:
+                    self._client = await self._create_client()
+        return self._client
+
+    async def _get(self, file_name: str) -> bytes:
+        client = await self._get_client()
+        try:
+            response = await client.get_object(Bucket=self._bucket, Key=self._key(file_name))
+        except Exception as e:
+            if _error_code(e) in NOT_FOUND_CODES:
+                raise FileNotFoundError(f"File {file_name} not found") from e
+            raise
+        async with response["Body"] as stream:
+            return await stream.read()
+
+    async def _put(self, file_name: str, data: bytes,
+                   content_type: str = "application/octet-stream") -> None:
+        client = await self._get_client()
+        key = self._key(file_name)
+        if len(data) < self._multipart_threshold:
+            await client.put_object(Bucket=self._bucket, Key=key, Body=data, ContentType=content_type)
+            return
+
+        upload = await client.create_multipart_upload(
+            Bucket=self._bucket, Key=key, ContentType=content_type)
+        upload_id = upload["UploadId"]
+        semaphore = asyncio.Semaphore(self._concurrency)
+
+        async def upload_part(number: int, offset: int) -> dict:
+            async with semaphore:
+                part = await client.upload_part(
+                    Bucket=self._bucket, Key=key, UploadId=upload_id, PartNumber=number,
+                    Body=data[offset:offset + self._multipart_chunk_size])
+            return {"PartNumber": number, "ETag": part["ETag"]}
+
+        try:
+            parts = await asyncio.gather(*(
+                upload_part(number, offset) for number, offset in enumerate(
+                    range(0, len(data), self._multipart_chunk_size), start=1)))
+            await client.complete_multipart_upload(
+                Bucket=self._bucket, Key=key, UploadId=upload_id,
+                MultipartUpload={"Parts": list(parts)})
+        except Exception:
+            await client.abort_multipart_upload(Bucket=self._bucket, Key=key, UploadId=upload_id)
+            raise
+
+    async def _put_many(self, files: dict[str, bytes]) -> None:
+        semaphore = asyncio.Semaphore(self._concurrency)
+
+        async def put(file_name: str, data: bytes) -> None:
+            async with semaphore:
+                await self._put(file_name, data, "application/json")
+
+        await asyncio.gather(*(put(name, data) for name, data in files.items()))
+
+    async def _delete(self, file_name: str) -> None:
+        client = await self._get_client()
+        await client.delete_object(Bucket=self._bucket, Key=self._key(file_name))
+
+    async def _list_page(self, prefix: str, recursive: bool, start_after: str | None,
+                         token: str | None) -> dict:
+        client = await self._get_client()
+        kwargs = {"Bucket": self._bucket, "Prefix": prefix, "MaxKeys": LIST_PAGE_SIZE}
+        if not recursive:
+            kwargs["Delimiter"] = "/"
+        if token:
+            kwargs["ContinuationToken"] = token
+        elif start_after:
+            kwargs["StartAfter"] = self._key(start_after)
+        response = await client.list_objects_v2(**kwargs)
+        return {
+            "keys": [item["Key"] for item in response.get("Contents", [])],
+            "token": response.get("NextContinuationToken") if response.get("IsTruncated") else None,
+        }
+
+    def _run(self, coro: Awaitable[T]) -> T:
+        if self._closed:
+            raise RuntimeError("The S3 storage is closed")
+        return asyncio.run_coroutine_threadsafe(coro, self._loop).result()
+
+    async def _arun(self, coro: Awaitable[T]) -> T:
+        if self._closed:
+            raise RuntimeError("The S3 storage is closed")
+        return await asyncio.wrap_future(asyncio.run_coroutine_threadsafe(coro, self._loop))
+
+    def _key(self, file_name: str) -> str:
+        return f"{self._prefix}{file_name.strip('/')}"
+
+    def _url(self, file_name: str) -> str:
+        return f"s3://{self._bucket}/{self._key(file_name)}"
+
+
+def _error_code(error: Exception) -> str | None:
+    response = getattr(error, "response", None) or {}
+    return str(response.get("Error", {}).get("Code")) if response.get("Error") else None
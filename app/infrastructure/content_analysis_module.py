@@ -1,7 +1,24 @@
+from configuration import Settings
+from core.analysis_export import AnalysisExportService
+from core.analysis_index import AnalysisSink
 from core.content_analysis import ContentAnalysisService
-from injector import Binder, Module
+from core.content_analysis.cascade import CascadeStats
+from core.content_analysis.structured_output import StructuredOutputStats
+from core.llm_scheduler import LLMCallScheduler
+from injector import Binder, Module, provider, singleton
 
 
 class ContentAnalysisModule(Module):
     def configure(self, binder: Binder) -> None:
         binder.bind(ContentAnalysisService, to=ContentAnalysisService)
+        binder.bind(AnalysisExportService, to=AnalysisExportService)
+        binder.bind(StructuredOutputStats, scope=singleton)
+        binder.bind(CascadeStats, scope=singleton)
+        # other modules add the consumers of the stored analyses
+        binder.multibind(list[AnalysisSink], to=[])
+
+    @singleton
+    @provider
+    def provide_llm_call_scheduler(self, settings: Settings) -> LLMCallScheduler:
+        # shared by every analysis so concurrent calls draw from the same quota
+        return LLMCallScheduler.from_settings(settings.llm_settings)
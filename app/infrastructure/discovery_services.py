@@ -0,0 +1,154 @@
+import asyncio
+import logging
+from datetime import datetime
+from typing import TYPE_CHECKING
+from urllib.parse import urljoin, urlsplit
+
+from configuration import Settings
+from core.discovery import (
+    DiscoveredKind,
+    DiscoveredUrl,
+    DiscoveryFilter,
+    SitemapParser,
+    newest_first,
+)
+from core.metrics import REGISTRY
+from core.storage import Storage
+from core.tracing import TRACER
+from core.utils import StandardFileNaming
+from core.web_search import SearchEngine, SearchResult
+from injector import inject
+
+if TYPE_CHECKING:
+    from aiohttp import ClientSession
+
+logger = logging.getLogger(__name__)
+
+CHUNK_SIZE = 64 * 1024
+# documents a source URL is taken to be, rather than a site whose sitemaps must be found
+DOCUMENT_HINTS = (".xml", ".xml.gz", ".gz", ".rss", ".atom", "/feed", "/rss", "sitemap")
+
+DISCOVERY_DOCUMENTS = REGISTRY.counter(
+    "discovery_documents_total", "Sitemaps and feeds fetched by outcome", ("outcome",))
+DISCOVERY_URLS = REGISTRY.counter(
+    "discovery_urls_total", "Page URLs listed by sitemaps and feeds by whether the filters kept them",
+    ("outcome",))
+
+
+class SitemapSearch(SearchEngine):
+    """
+    Finds pages in the sitemaps and RSS or Atom feeds of a site instead of a search engine.
+
+    The query is a site, a sitemap or a feed URL. For a site, the sitemaps are taken from
+    robots.txt, falling back to /sitemap.xml. Sitemap indexes are followed, and documents are
+    parsed while they download, so a large sitemap yields its URLs without being held in memory.
+    """
+
+    @inject
+    def __init__(self, settings: Settings, storage: Storage):
+        self._settings = settings
+        self._discovery_settings = settings.discovery_settings
+        self._storage = storage
+        self._file_naming = StandardFileNaming()
+
+    async def search(self, query: str, file_path: str = None) -> list[SearchResult] | None:
+        with TRACER.span("discover", source=query) as span:
+            found = await self.discover(query)
+            span.set(results=len(found))
+        if not found:
+            logger.info(f"No pages discovered from {query}")
+            return None
+
+        results = [SearchResult(
+            title=item.title or "",
+            url=item.url,
+            description="",
+            created_at=item.last_modified or datetime.now(),
+            source=item.source,
+            snippet=None,
+        ) for item in found]
+        # one file per source rather than per result: a sitemap can list thousands of pages
+        folder_name = self._settings.web_search_settings.search_folder_name
+        if file_path:
+            folder_name = f"{file_path}/{folder_name}"
+        await self._storage.awrite_json(
+            f"{folder_name}/{self._file_naming.clean_url_for_file(query)}_discovery.json",
+            {"source": query, "results": [result.model_dump(mode="json") for result in results]})
+        return results
+
+    async def discover(self, source: str, discovery_filter: DiscoveryFilter | None = None) -> list[DiscoveredUrl]:
+        """
+        Returns the pages listed by the source that pass the filter, the most recently modified first.
+        """
+
+        import aiohttp
+
+        settings = self._discovery_settings
+        discovery_filter = discovery_filter or DiscoveryFilter.from_settings(settings)
+        connector = aiohttp.TCPConnector(limit=settings.concurrency)
+        timeout = aiohttp.ClientTimeout(total=settings.timeout)
+        headers = {"User-Agent": self._settings.web_scrape_settings.headers["User-Agent"]}
+        async with aiohttp.ClientSession(connector=connector, timeout=timeout, headers=headers) as session:
+            documents = await self._documents(session, source)
+            return await self._crawl(session, documents, discovery_filter)
+
+    async def _documents(self, session: "ClientSession", source: str) -> list[str]:
+        if any(hint in urlsplit(source).path.lower() for hint in DOCUMENT_HINTS):
+            return [source]
+        robots_url = urljoin(source, "/robots.txt")
+        try:
+            async with session.get(robots_url) as response:
+                robots = await response.text() if response.status == 200 else ""
+        except Exception as e:
+            logger.warning(f"Reading {robots_url} failed: {str(e)}")
+            robots = ""
+        sitemaps = [line.split(":", 1)[1].strip() for line in robots.splitlines()
+                    if line.lower().startswith("sitemap:") and line.split(":", 1)[1].strip()]
+        return sitemaps or [urljoin(source, "/sitemap.xml")]
+
+    async def _crawl(self, session: "ClientSession", documents: list[str],
+                     discovery_filter: DiscoveryFilter) -> list[DiscoveredUrl]:
+        settings = self._discovery_settings
+        seen = set(documents)
+        pending = list(documents)
+        fetched = 0
+        pages: list[DiscoveredUrl] = []
+        while pending and fetched < settings.max_documents:
+            batch = pending[:min(settings.concurrency, settings.max_documents - fetched)]
+            pending = pending[len(batch):]
+            fetched += len(batch)
+            for listed in await asyncio.gather(*(self._fetch(session, url) for url in batch)):
+                for item in listed:
+                    kept = discovery_filter.accepts(item)
+                    if item.kind == DiscoveredKind.SITEMAP:
+                        if kept and item.url not in seen:
+                            seen.add(item.url)
+                            pending.append(item.url)
+                        continue
+                    DISCOVERY_URLS.inc(outcome="kept" if kept else "filtered")
+                    if kept:
+                        pages.append(item)
+        if pending:
+            logger.warning(f"Skipped {len(pending)} sitemaps after fetching {fetched}")
+        return newest_first(pages)[:settings.max_urls]
+
+    async def _fetch(self, session: "ClientSession", url: str) -> list[DiscoveredUrl]:
+        parser = SitemapParser(url, max_bytes=self._discovery_settings.max_document_bytes)
+        found: list[DiscoveredUrl] = []
+        try:
+            async with session.get(url) as response:
+                if response.status != 200:
+                    raise RuntimeError(f"HTTP {response.status}")
+                async for chunk in response.content.iter_chunked(CHUNK_SIZE):
+                    found.extend(parser.feed(chunk))
+                    if parser.exceeded:
+                        logger.warning(f"Stopped reading {url} after {parser.bytes_read} bytes")
+                        break
+            found.extend(parser.close())
+        except Exception as e:
+            logger.error(f"Reading {url} failed: {str(e)}")
+            DISCOVERY_DOCUMENTS.inc(outcome="failed")
+            return found
+        DISCOVERY_DOCUMENTS.inc(outcome="success")
+        logger.info(f"Read {len(found)} URLs from {url}")
+        return found
@@ -1,12 +1,37 @@
-import json
+import asyncio
+import atexit
+import logging
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
+from typing import Callable, Iterator, TypeVar
 
-from configuration import Settings
-from core.storage import Storage
-from core.utils import json_serial
-from injector import Binder, Module, inject
+from configuration import LocalStorageBackend, Settings
+from core.metrics import REGISTRY
+from core.serialization import create_serializer
+from core.storage import Storage, date_prefix_in_range, file_matches
+from injector import Binder, Module, inject, singleton
 
 from .app_host import AppHost
+from .sqlite_storage import SQLiteStorage
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+STORAGE_WRITES = REGISTRY.counter(
+    "storage_writes_total", "Files written to the local storage, by whether they went through the buffer",
+    ("mode",))
+STORAGE_BYTES_WRITTEN = REGISTRY.counter(
+    "storage_bytes_written_total", "Bytes written to the local storage")
+STORAGE_BATCH_DURATION = REGISTRY.histogram(
+    "storage_batch_write_seconds", "Duration of writing a batch of buffered files")
+STORAGE_PENDING = REGISTRY.gauge(
+    "storage_pending_files", "Buffered files not yet handed to the I/O pool")
+
+# Locks serializing the writes of a file, shared by the files hashing to the same stripe
+FILE_LOCK_STRIPES = 64
 
 
 class LocalModule(Module):
@@ -14,17 +39,25 @@ class LocalModule(Module):
     Local module.
     """
 
-    def __init__(self, app_host: str):
+    def __init__(self, app_host: str, storage_backend: str = LocalStorageBackend.FILE):
         self.app_host = app_host
+        self.storage_backend = storage_backend
 
     def configure(self, binder: Binder) -> None:
         if self.app_host == AppHost.LOCAL:
-            binder.bind(Storage, to=LocalStorage)
+            if self.storage_backend == LocalStorageBackend.SQLITE:
+                binder.bind(Storage, to=SQLiteStorage, scope=singleton)
+            else:
+                # singleton so every service shares the write-behind buffer
+                binder.bind(Storage, to=LocalStorage, scope=singleton)
 
 
 class LocalStorage(Storage):
     """
     Local storage implementation.
+
+    Async writes go to a write-behind buffer that is flushed in batches on a dedicated
+    I/O pool, so coroutines never block on disk. Reads and listings see buffered writes.
     """
 
     @inject
@@ -33,11 +66,34 @@ class LocalStorage(Storage):
         self.storage_path = Path(settings.local_settings.local_storage_path)
         self.storage_path.mkdir(parents=True, exist_ok=True)
 
+        local_settings = settings.local_settings
+        self._serializer = create_serializer(local_settings.json_serializer)
+        self._pretty = local_settings.pretty_json
+        self._batch_size = local_settings.write_batch_size
+        self._flush_interval = local_settings.flush_interval_ms / 1000
+        self._executor = ThreadPoolExecutor(
+            max_workers=local_settings.io_workers, thread_name_prefix="storage-io")
+        self._lock = threading.Lock()
+        # file name -> serialized data, not yet handed to the pool / being written
+        self._pending: dict[str, bytes] = {}
+        self._writing: dict[str, bytes] = {}
+        self._file_locks = [threading.Lock() for _ in range(FILE_LOCK_STRIPES)]
+        # the loop the flush timer runs on, which may be gone by the next write
+        self._flush_handle: asyncio.TimerHandle | None = None
+        self._flush_loop: asyncio.AbstractEventLoop | None = None
+        self._inflight: set[asyncio.Future] = set()
+        self._closed = False
+        atexit.register(self.close)
+
     def read(self, file_name: str) -> bytes:
         """
         Reads the file from the local storage.
         """
 
+        buffered = self._buffered(file_name)
+        if buffered is not None:
+            return buffered
+
         file_path = self.storage_path / file_name
         if not file_path.exists():
             raise FileNotFoundError(f"File {file_name} not found")
@@ -52,7 +108,7 @@ class LocalStorage(Storage):
         """
 
         data = self.read(file_name)
-        return json.loads(data)
+        return self._serializer.loads(data)
 
     def write(self, file_name: str, data: bytes, container: str | None = None) -> None:
         """
@@ -71,25 +127,76 @@ class LocalStorage(Storage):
         Writes the JSON file to the local storage.
         """
 
-        file_path = self.storage_path / file_name
-        file_path.parent.mkdir(parents=True, exist_ok=True)
-        file_path.write_text(json.dumps(data, default=json_serial, indent=4))
+        payload = self._serialize(data)
+        with self._lock:
+            # a direct write supersedes any buffered or in-flight one for the same file
+            self._pending.pop(file_name, None)
+            self._writing[file_name] = payload
+        STORAGE_WRITES.inc(mode="direct")
+        self._write_files({file_name: payload}, raise_errors=True)
+
+    def store_export(self, file_name: str, data: bytes) -> str:
+        """
+        Stores the export in the local storage and returns its file URL.
+        """
+
+        self.write(file_name, data)
+        return (self.storage_path / file_name).resolve().as_uri()
 
     def list_all_files(self, path: str) -> list[str]:
         """
         Lists all files in the given path
         """
 
-        file_path = self.storage_path / path
-        if not file_path.exists():
+        return list(self.iter_files(path))
+
+    def iter_files(self,
+                   path: str,
+                   recursive: bool = False,
+                   pattern: str | None = None,
+                   suffix: str | None = None,
+                   date_from: str | None = None,
+                   date_to: str | None = None,
+                   start_after: str | None = None,
+                   limit: int | None = None) -> Iterator[str]:
+        """
+        Walks the folder with `os.scandir`, one directory at a time, yielding files in name order.
+        Date partitions outside the range and folders before `start_after` are never opened.
+        """
+
+        self._write_buffered()
+        root = path.strip("/")
+        if not (self.storage_path / root).is_dir():
             raise FileNotFoundError(f"Path {path} not found")
 
-        files = []
-        for file in file_path.iterdir():
-            if file.is_file():
-                files.append(str(file.relative_to(self.storage_path)))
+        count = 0
+        for name in self._walk(root, recursive, date_from, date_to, start_after):
+            if limit is not None and count >= limit:
+                return
+            if file_matches(name, pattern, suffix, date_from, date_to):
+                count += 1
+                yield name
+
+    def _walk(self, folder: str, recursive: bool, date_from: str | None,
+              date_to: str | None, start_after: str | None) -> Iterator[str]:
+        with os.scandir(self.storage_path / folder) as scan:
+            # "dir/" sorts the way its files do, so the walk yields names in string order
+            entries = sorted((entry.name + "/" if entry.is_dir() else entry.name, entry.is_dir())
+                             for entry in scan)
 
-        return files
+        for key, is_dir in entries:
+            name = f"{folder}/{key}" if folder else key
+            if not is_dir:
+                if start_after is None or name > start_after:
+                    yield name
+                continue
+            if not recursive:
+                continue
+            if start_after is not None and name < start_after and not start_after.startswith(name):
+                continue
+            if not date_prefix_in_range(name, date_from, date_to):
+                continue
+            yield from self._walk(name.rstrip("/"), recursive, date_from, date_to, start_after)
 
     def create_folder(self, folder_name: str) -> None:
         """
@@ -98,3 +205,165 @@ class LocalStorage(Storage):
 
         folder_path = self.storage_path / folder_name
         folder_path.mkdir(parents=True, exist_ok=True)
+
+    def close(self) -> None:
+        """
+        Waits for in-flight writes, writes what is still buffered and stops the I/O pool.
+        """
+
+        if self._closed:
+            return
+        self._closed = True
+        atexit.unregister(self.close)
+        self._cancel_flush()
+        self._executor.shutdown(wait=True)
+        self._write_buffered()
+
+    async def aread(self, file_name: str) -> bytes:
+        buffered = self._buffered(file_name)
+        if buffered is not None:
+            return buffered
+        return await self._run_io(self.read, file_name)
+
+    async def aread_json(self, file_name: str) -> dict:
+        return self._serializer.loads(await self.aread(file_name))
+
+    async def awrite_json(self, file_name: str, data: dict) -> None:
+        """
+        Buffers the JSON file; it is written with the next batch.
+        """
+
+        if self._closed:
+            await asyncio.to_thread(self.write_json, file_name, data)
+            return
+        payload = self._serialize(data)
+        with self._lock:
+            self._pending[file_name] = payload
+            full = len(self._pending) >= self._batch_size
+            STORAGE_PENDING.set(len(self._pending))
+        STORAGE_WRITES.inc(mode="buffered")
+        if full:
+            self._start_flush()
+        else:
+            loop = asyncio.get_running_loop()
+            if self._flush_handle is None or self._flush_loop is not loop:
+                self._cancel_flush()
+                self._flush_loop = loop
+                self._flush_handle = loop.call_later(self._flush_interval, self._start_flush)
+
+    async def alist(self, path: str) -> list[str]:
+        await self.aflush()
+        return await self._run_io(self.list_all_files, path)
+
+    async def aflush(self) -> None:
+        self._start_flush()
+        loop = asyncio.get_running_loop()
+        # batches started on another loop are written by the pool all the same
+        inflight = [future for future in self._inflight if future.get_loop() is loop]
+        if inflight:
+            await asyncio.gather(*inflight)
+
+    async def aclose(self) -> None:
+        await self.aflush()
+        await asyncio.get_running_loop().run_in_executor(None, self.close)
+
+    def _start_flush(self) -> None:
+        """
+        Hands the buffered files to the I/O pool as one batch.
+        """
+
+        self._cancel_flush()
+        with self._lock:
+            if not self._pending or self._closed:
+                return
+            batch, self._pending = self._pending, {}
+            self._writing.update(batch)
+            STORAGE_PENDING.set(0)
+
+        future = asyncio.get_running_loop().run_in_executor(
+            self._executor, self._write_batch, batch)
+        self._inflight.add(future)
+        future.add_done_callback(self._inflight.discard)
+
+    def _cancel_flush(self) -> None:
+        handle, loop = self._flush_handle, self._flush_loop
+        self._flush_handle = self._flush_loop = None
+        if handle is None:
+            return
+        if loop is _running_loop():
+            handle.cancel()
+        elif not loop.is_closed():
+            loop.call_soon_threadsafe(handle.cancel)
+
+    async def _run_io(self, fn: Callable[..., T], *args) -> T:
+        """
+        Runs `fn` on the I/O pool, or on the default executor once the pool is shut down.
+        """
+
+        loop = asyncio.get_running_loop()
+        try:
+            future = loop.run_in_executor(None if self._closed else self._executor, fn, *args)
+        except RuntimeError:
+            # the pool was shut down between the check and the submit
+            future = loop.run_in_executor(None, fn, *args)
+        return await future
+
+    def _write_batch(self, batch: dict[str, bytes]) -> None:
+        if not batch:
+            return
+        with STORAGE_BATCH_DURATION.time():
+            self._write_files(batch)
+
+    def _write_files(self, batch: dict[str, bytes], raise_errors: bool = False) -> None:
+        """
+        Writes the files whose payload is still the latest one, skipping those a newer write superseded.
+        """
+
+        for file_name, payload in batch.items():
+            try:
+                with self._file_locks[hash(file_name) % FILE_LOCK_STRIPES]:
+                    with self._lock:
+                        if self._writing.get(file_name) is not payload:
+                            continue
+                    self._write_file(file_name, payload)
+            except Exception as e:
+                if raise_errors:
+                    raise
+                logger.error(f"Error writing {file_name}: {str(e)}")
+            finally:
+                with self._lock:
+                    if self._writing.get(file_name) is payload:
+                        del self._writing[file_name]
+
+    def _write_buffered(self) -> None:
+        """
+        Writes the buffer in the calling thread.
+        """
+
+        with self._lock:
+            batch, self._pending = self._pending, {}
+            self._writing.update(batch)
+            STORAGE_PENDING.set(0)
+        self._write_batch(batch)
+
+    def _buffered(self, file_name: str) -> bytes | None:
+        with self._lock:
+            if file_name in self._pending:
+                return self._pending[file_name]
+            return self._writing.get(file_name)
+
+    def _write_file(self, file_name: str, payload: bytes) -> None:
+        file_path = self.storage_path / file_name
+        file_path.parent.mkdir(parents=True, exist_ok=True)
+        file_path.write_bytes(payload)
+        STORAGE_BYTES_WRITTEN.inc(len(payload))
+
+    def _serialize(self, data: dict) -> bytes:
+        return self._serializer.dumps(data, pretty=self._pretty)
+
+
+def _running_loop() -> asyncio.AbstractEventLoop | None:
+    try:
+        return asyncio.get_running_loop()
+    except RuntimeError:
+        return None
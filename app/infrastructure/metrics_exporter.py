@@ -0,0 +1,112 @@
+import logging
+import os
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+from configuration import Settings
+from core.metrics import REGISTRY, MetricsRegistry
+from core.tracing import TRACER, Tracer
+from injector import Binder, Module, inject, singleton
+
+logger = logging.getLogger(__name__)
+
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+class MetricsModule(Module):
+    def configure(self, binder: Binder) -> None:
+        binder.bind(MetricsExporter, to=MetricsExporter, scope=singleton)
+
+
+class MetricsExporter:
+    """
+    Exports the metrics registry as a Prometheus /metrics endpoint and a text file
+    rewritten every interval, and appends the finished spans to a JSONL file.
+    Does nothing unless metrics are enabled.
+    """
+
+    @inject
+    def __init__(self, settings: Settings):
+        self._settings = settings.metrics_settings
+        self._registry: MetricsRegistry = REGISTRY
+        self._tracer: Tracer = TRACER
+        self._server: ThreadingHTTPServer | None = None
+        self._thread: threading.Thread | None = None
+        self._stop = threading.Event()
+
+    @property
+    def port(self) -> int | None:
+        return self._server.server_address[1] if self._server else None
+
+    def start(self) -> None:
+        if not self._settings.enabled or self._thread is not None:
+            return
+        self._tracer.enabled = True
+        if self._settings.http_port is not None:
+            self._server = ThreadingHTTPServer(
+                (self._settings.http_host, self._settings.http_port), self._handler())
+            threading.Thread(target=self._server.serve_forever, name="metrics-http", daemon=True).start()
+            logger.info(f"Serving metrics on http://{self._settings.http_host}:{self.port}/metrics")
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="metrics-export", daemon=True)
+        self._thread.start()
+
+    def export(self) -> None:
+        """
+        Writes the metrics file and appends the spans finished since the last export.
+        """
+
+        metrics_path = Path(self._settings.file_path)
+        metrics_path.parent.mkdir(parents=True, exist_ok=True)
+        # renamed into place so a scraper of the file never reads half of it
+        temporary = metrics_path.with_suffix(metrics_path.suffix + ".tmp")
+        temporary.write_text(self._registry.render())
+        os.replace(temporary, metrics_path)
+
+        spans = self._tracer.drain()
+        if spans:
+            traces_path = Path(self._settings.traces_path)
+            traces_path.parent.mkdir(parents=True, exist_ok=True)
+            with traces_path.open("a") as traces:
+                traces.writelines(span.model_dump_json() + "\n" for span in spans)
+
+    def close(self) -> None:
+        if self._thread is None:
+            return
+        self._stop.set()
+        self._thread.join()
+        self._thread = None
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+        self.export()
+        self._tracer.enabled = False
+
+    def _run(self) -> None:
+        while not self._stop.wait(self._settings.export_interval_seconds):
+            try:
+                self.export()
+            except Exception as e:
+                logger.error(f"Error exporting metrics: {str(e)}")
+
+    def _handler(self) -> type[BaseHTTPRequestHandler]:
+        registry = self._registry
+
+        class MetricsHandler(BaseHTTPRequestHandler):
+            def do_GET(self) -> None:
+                if self.path.split("?")[0] != "/metrics":
+                    self.send_error(404)
+                    return
+                body = registry.render().encode()
+                self.send_response(200)
+                self.send_header("Content-Type", PROMETHEUS_CONTENT_TYPE)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format: str, *args) -> None:
+                pass
+
+        return MetricsHandler
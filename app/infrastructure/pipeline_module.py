@@ -0,0 +1,10 @@
+from core.job_service import JobService
+from core.pipeline import PipelineRunner
+from injector import Binder, Module, singleton
+
+
+class PipelineModule(Module):
+    def configure(self, binder: Binder) -> None:
+        binder.bind(PipelineRunner, to=PipelineRunner)
+        # one per process, it owns the jobs and the warm browser
+        binder.bind(JobService, to=JobService, scope=singleton)
@@ -0,0 +1,360 @@
+import asyncio
+import contextlib
+import contextvars
+import cProfile
+import functools
+import heapq
+import io
+import json
+import logging
+import os
+import pstats
+import sys
+import threading
+import time
+from collections import Counter, defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Callable
+
+from core.profiling import current_stage, task_stage
+
+logger = logging.getLogger(__name__)
+
+LOOP_PROFILE = "event_loop"
+EXECUTOR_ROOT = "executor"
+UNSCOPED_STAGE = "other"
+MAX_STACK_DEPTH = 128
+MAX_SLOW_CALLBACKS = 50
+
+
+def describe_callable(fn: Callable) -> str:
+    # asyncio.to_thread submits functools.partial(context.run, func, ...)
+    while isinstance(fn, functools.partial):
+        if isinstance(getattr(fn.func, "__self__", None), contextvars.Context) and fn.args:
+            fn = fn.args[0]
+        else:
+            fn = fn.func
+    name = getattr(fn, "__qualname__", None) or type(fn).__qualname__
+    module = getattr(fn, "__module__", None)
+    return f"{module}.{name}" if module else name
+
+
+def describe_frame(frame) -> str:
+    code = frame.f_code
+    return f"{getattr(code, 'co_qualname', code.co_name)} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+
+class ExecutorStats:
+    def __init__(self):
+        self.calls = 0
+        self.failed = 0
+        self.unprofiled = 0
+        self.wait_seconds = 0.0
+        self.max_wait_seconds = 0.0
+        self.run_seconds = 0.0
+
+    def record(self, wait: float, run: float, failed: bool, profiled: bool) -> None:
+        self.calls += 1
+        self.failed += failed
+        self.unprofiled += not profiled
+        self.wait_seconds += wait
+        self.max_wait_seconds = max(self.max_wait_seconds, wait)
+        self.run_seconds += run
+
+    def summary(self) -> dict[str, Any]:
+        return {
+            "calls": self.calls,
+            "failed": self.failed,
+            "unprofiled": self.unprofiled,
+            "run_seconds": round(self.run_seconds, 4),
+            "wait_seconds": round(self.wait_seconds, 4),
+            "max_wait_seconds": round(self.max_wait_seconds, 4),
+        }
+
+
+class InstrumentedExecutor(ThreadPoolExecutor):
+    """
+    Default executor of a profiled loop, so `asyncio.to_thread` and `run_in_executor(None, ...)`
+    work is timed and profiled per stage.
+    """
+
+    def __init__(self, profiler: "RunProfiler", max_workers: int | None = None):
+        super().__init__(max_workers=max_workers, thread_name_prefix="profiled-executor")
+        self._profiler = profiler
+
+    def submit(self, fn, /, *args, **kwargs):
+        # read on the submitting side, where the stage of the caller is known
+        stage = current_stage() or UNSCOPED_STAGE
+        return super().submit(self._profiler._run_in_thread, stage, describe_callable(fn),
+                              time.perf_counter(), fn, args, kwargs)
+
+
+class RunProfiler:
+    """
+    Profiles a pipeline run from inside its event loop:
+
+    - cProfile of the event loop thread, and one cProfile per stage of the executor work
+    - a sampler thread folding the stacks of the loop and busy executor threads, per stage,
+      into a flamegraph-compatible file
+    - the duration of every loop callback, reporting the slow ones that blocked the loop,
+      and the lag of a periodic timer
+    - the queue wait and run time of executor work per stage and function
+
+    On Python 3.12+ only one cProfile can be active at a time and it covers every thread,
+    so the executor work is then profiled within the event loop profile.
+    """
+
+    def __init__(self, output_dir: str | Path, top_n: int = 30, sample_interval: float = 0.005,
+                 lag_interval: float = 0.05, slow_callback_seconds: float = 0.1):
+        self.output_dir = Path(output_dir)
+        self._top_n = top_n
+        self._sample_interval = sample_interval
+        self._lag_interval = lag_interval
+        self._slow_callback_seconds = slow_callback_seconds
+
+        self._lock = threading.Lock()
+        self._active = False
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._loop_thread_id: int | None = None
+        self._loop_profile: cProfile.Profile | None = None
+        self._stage_profiles: dict[tuple[str, int], cProfile.Profile] = {}
+        self._executor_stats: dict[tuple[str, str], ExecutorStats] = defaultdict(ExecutorStats)
+        self._thread_stages: dict[int, str] = {}
+        self._stacks: Counter[str] = Counter()
+        self._lags: list[float] = []
+        self._callbacks = 0
+        self._busy_seconds = 0.0
+        self._blocked_seconds = 0.0
+        self._slow_callbacks: list[tuple[float, int, str, str]] = []
+        self._original_handle_run: Callable | None = None
+        self._lag_task: asyncio.Task | None = None
+        self._sampler: threading.Thread | None = None
+        self._stop_sampling = threading.Event()
+        self._started = 0.0
+        self._elapsed = 0.0
+
+    async def __aenter__(self) -> "RunProfiler":
+        self.start()
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.stop()
+        self.write_report()
+
+    def start(self) -> None:
+        self._loop = asyncio.get_running_loop()
+        self._loop_thread_id = threading.get_ident()
+        self._active = True
+        self._started = time.perf_counter()
+
+        self._loop.set_default_executor(InstrumentedExecutor(self))
+        self._patch_callbacks()
+        self._lag_task = self._loop.create_task(self._monitor_lag(), name="profiler-lag-monitor")
+        self._stop_sampling.clear()
+        self._sampler = threading.Thread(target=self._sample, name="profiler-sampler", daemon=True)
+        self._sampler.start()
+
+        self._loop_profile = cProfile.Profile()
+        if not self._enable(self._loop_profile):
+            logger.warning("Another profiler is active, the event loop is not profiled with cProfile")
+            self._loop_profile = None
+
+    async def stop(self) -> None:
+        if not self._active:
+            return
+        if self._loop_profile is not None:
+            self._loop_profile.disable()
+        self._active = False
+        self._elapsed = time.perf_counter() - self._started
+        self._lag_task.cancel()
+        with contextlib.suppress(asyncio.CancelledError):
+            await self._lag_task
+        self._stop_sampling.set()
+        self._sampler.join()
+        asyncio.events.Handle._run = self._original_handle_run
+
+    def summary(self) -> dict[str, Any]:
+        lags = sorted(self._lags)
+        return {
+            "elapsed_seconds": round(self._elapsed, 3),
+            "loop": {
+                "callbacks": self._callbacks,
+                "busy_seconds": round(self._busy_seconds, 4),
+                "blocked_seconds": round(self._blocked_seconds, 4),
+                "slow_callback_threshold_seconds": self._slow_callback_seconds,
+                "lag_p50_seconds": round(lags[len(lags) // 2], 4) if lags else 0.0,
+                "lag_p95_seconds": round(lags[int(len(lags) * 0.95)], 4) if lags else 0.0,
+                "lag_max_seconds": round(lags[-1], 4) if lags else 0.0,
+            },
+            "slow_callbacks": [
+                {"seconds": round(seconds, 4), "stage": stage, "callback": callback}
+                for seconds, _, stage, callback in sorted(self._slow_callbacks, reverse=True)
+            ],
+            "executor": {
+                f"{stage} {function}": stats.summary()
+                for (stage, function), stats in sorted(
+                    self._executor_stats.items(), key=lambda item: -item[1].run_seconds)
+            },
+            "hot_functions": self._hot_functions(),
+        }
+
+    def write_report(self) -> Path:
+        """
+        Writes the folded stacks, a pstats file per profile and the summaries, returns the folder.
+        """
+
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        with (self.output_dir / "profile.folded").open("w") as folded:
+            folded.writelines(f"{stack} {count}\n" for stack, count in sorted(self._stacks.items()))
+
+        text = io.StringIO()
+        for name, stats in self._profile_stats().items():
+            stats.dump_stats(str(self.output_dir / f"{name}.pstats"))
+            text.write(f"==== cProfile {name}: top {self._top_n} by cumulative time ====\n")
+            stats.stream = text
+            stats.sort_stats(pstats.SortKey.CUMULATIVE).print_stats(self._top_n)
+
+        summary = self.summary()
+        text.write(f"==== sampled hot functions: top {self._top_n} by own samples ====\n")
+        for stage, functions in summary["hot_functions"].items():
+            text.write(f"-- {stage}\n")
+            text.writelines(f"{f['self']:>8} {f['total']:>8}  {f['function']}\n" for f in functions)
+        (self.output_dir / "profile_summary.txt").write_text(text.getvalue())
+        (self.output_dir / "profile_summary.json").write_text(json.dumps(summary, indent=4))
+        return self.output_dir
+
+    def _run_in_thread(self, stage: str, function: str, submitted: float,
+                       fn: Callable, args: tuple, kwargs: dict) -> Any:
+        if not self._active:
+            return fn(*args, **kwargs)
+        thread_id = threading.get_ident()
+        started = time.perf_counter()
+        profile = self._stage_profile(stage, thread_id)
+        profiled = self._enable(profile)
+        self._thread_stages[thread_id] = stage
+        failed = False
+        try:
+            return fn(*args, **kwargs)
+        except BaseException:
+            failed = True
+            raise
+        finally:
+            if profiled:
+                profile.disable()
+            self._thread_stages.pop(thread_id, None)
+            with self._lock:
+                self._executor_stats[(stage, function)].record(
+                    started - submitted, time.perf_counter() - started, failed, profiled)
+
+    def _stage_profile(self, stage: str, thread_id: int) -> cProfile.Profile:
+        # a cProfile.Profile only profiles the thread that enabled it, hence one per thread
+        with self._lock:
+            key = (stage, thread_id)
+            if key not in self._stage_profiles:
+                self._stage_profiles[key] = cProfile.Profile()
+            return self._stage_profiles[key]
+
+    def _enable(self, profile: cProfile.Profile) -> bool:
+        try:
+            profile.enable()
+            return True
+        except ValueError:
+            return False
+
+    def _patch_callbacks(self) -> None:
+        profiler = self
+        original = self._original_handle_run = asyncio.events.Handle._run
+
+        def _run(handle: asyncio.Handle) -> None:
+            if handle._loop is not profiler._loop or not profiler._active:
+                return original(handle)
+            # the task may leave its stage during the callback, so the stage is read first
+            owner = getattr(handle._callback, "__self__", None)
+            stage = task_stage(owner) if isinstance(owner, asyncio.Task) else None
+            started = time.perf_counter()
+            try:
+                return original(handle)
+            finally:
+                profiler._record_callback(handle, owner, stage, time.perf_counter() - started)
+
+        asyncio.events.Handle._run = _run
+
+    def _record_callback(self, handle: asyncio.Handle, owner: Any, stage: str | None, seconds: float) -> None:
+        self._callbacks += 1
+        self._busy_seconds += seconds
+        if seconds < self._slow_callback_seconds:
+            return
+        self._blocked_seconds += seconds
+        if isinstance(owner, asyncio.Task):
+            coro = owner.get_coro()
+            description = f"task {owner.get_name()} ({getattr(coro, '__qualname__', coro)})"
+        else:
+            description = describe_callable(handle._callback)
+        entry = (seconds, self._callbacks, stage or UNSCOPED_STAGE, description)
+        if len(self._slow_callbacks) < MAX_SLOW_CALLBACKS:
+            heapq.heappush(self._slow_callbacks, entry)
+        else:
+            heapq.heappushpop(self._slow_callbacks, entry)
+
+    async def _monitor_lag(self) -> None:
+        while True:
+            started = self._loop.time()
+            await asyncio.sleep(self._lag_interval)
+            self._lags.append(max(0.0, self._loop.time() - started - self._lag_interval))
+
+    def _sample(self) -> None:
+        while not self._stop_sampling.wait(self._sample_interval):
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == self._loop_thread_id:
+                    stage = task_stage(asyncio.current_task(self._loop)) or UNSCOPED_STAGE
+                    root = f"{LOOP_PROFILE};{stage}"
+                elif (stage := self._thread_stages.get(thread_id)) is not None:
+                    root = f"{EXECUTOR_ROOT};{stage}"
+                else:
+                    # idle executor threads and threads the profiler does not know about
+                    continue
+                frames = []
+                while frame is not None and len(frames) < MAX_STACK_DEPTH:
+                    frames.append(describe_frame(frame).replace(";", ","))
+                    frame = frame.f_back
+                self._stacks[";".join([root, *reversed(frames)])] += 1
+
+    def _hot_functions(self) -> dict[str, list[dict[str, Any]]]:
+        own: dict[str, Counter[str]] = defaultdict(Counter)
+        total: dict[str, Counter[str]] = defaultdict(Counter)
+        for stack, count in self._stacks.items():
+            root, stage, *frames = stack.split(";")
+            key = f"{root} {stage}"
+            if frames:
+                own[key][frames[-1]] += count
+            for function in set(frames):
+                total[key][function] += count
+        return {
+            key: [{"function": function, "self": count, "total": total[key][function]}
+                  for function, count in counter.most_common(self._top_n)]
+            for key, counter in sorted(own.items())
+        }
+
+    def _profile_stats(self) -> dict[str, pstats.Stats]:
+        by_name: dict[str, list[cProfile.Profile]] = defaultdict(list)
+        if self._loop_profile is not None:
+            by_name[LOOP_PROFILE].append(self._loop_profile)
+        for (stage, _), profile in self._stage_profiles.items():
+            by_name[f"{EXECUTOR_ROOT}_{stage}"].append(profile)
+
+        stats = {}
+        for name, profiles in by_name.items():
+            merged = None
+            for profile in profiles:
+                try:
+                    if merged is None:
+                        merged = pstats.Stats(profile)
+                    else:
+                        merged.add(profile)
+                except TypeError:
+                    # a profile that never ran has no stats
+                    continue
+            if merged is not None:
+                stats[name] = merged
+        return stats
@@ -0,0 +1,70 @@
+from typing import TYPE_CHECKING
+
+from configuration import Settings
+from core.chat_model import ChatModelProvider
+from core.domain import ChatModelSettings, ModelHost
+from injector import Binder, Module, inject, singleton
+
+if TYPE_CHECKING:
+    from core.chat_model_routing import ChatModelRouter
+    from langchain_core.language_models.chat_models import BaseChatModel
+
+
+class LLMRoutingModule(Module):
+    def __init__(self, llm_model_host: str):
+        self.llm_model_host = llm_model_host
+
+    def configure(self, binder: Binder) -> None:
+        # only bind if the llm_model_host is routing
+        if self.llm_model_host == ModelHost.ROUTING:
+            binder.bind(ChatModelProvider,
+                        to=RoutingChatModelProvider,
+                        scope=singleton
+                        )
+
+
+class RoutingChatModelProvider(ChatModelProvider):
+    """
+    ChatModelProvider spreading calls over the hosts listed in LLM_ROUTING_HOSTS. Each host module
+    registers its providers in the dict[str, ChatModelProvider] multibind, as AnthropicModule does
+    for each endpoint of ANTHROPIC_ENDPOINTS; a listed host without one fails at startup.
+    """
+
+    @inject
+    def __init__(self, settings: Settings, providers: dict[str, ChatModelProvider]):
+        # RoutingChatModel is a langchain model, loaded only when routing is configured
+        from core.chat_model_routing import ChatModelRoute, ChatModelRouter
+
+        self._settings = settings
+        llm_settings = settings.llm_settings
+
+        missing = [host for host in llm_settings.routing_hosts
+                   if host not in providers]
+        if missing or not llm_settings.routing_hosts:
+            raise ValueError(
+                f"LLM_ROUTING_HOSTS must list configured hosts, missing: {missing or 'all'}. Available: {sorted(providers)}")
+
+        routes = []
+        for host in llm_settings.routing_hosts:
+            requests_per_minute, tokens_per_minute = llm_settings.route_limits(
+                host)
+            routes.append(ChatModelRoute(
+                host, providers[host], requests_per_minute, tokens_per_minute))
+        self._router = ChatModelRouter(
+            routes,
+            failure_threshold=llm_settings.routing_failure_threshold,
+            cooldown_seconds=llm_settings.routing_cooldown_seconds,
+            output_tokens=llm_settings.chat_model_settings.max_tokens or 1024,
+        )
+
+    @property
+    def router(self) -> "ChatModelRouter":
+        return self._router
+
+    def can_handle(self) -> bool:
+        return self._settings.llm_settings.chat_model_settings.host == ModelHost.ROUTING
+
+    def get_chat_model(self, chat_model_settings: ChatModelSettings | None = None) -> "BaseChatModel":
+        from core.chat_model_routing import RoutingChatModel
+
+        return RoutingChatModel(router=self._router, chat_model_settings=chat_model_settings)
@@ -4,8 +4,16 @@ from configuration import Settings, get_settings
 from injector import Binder, Injector, Module, T, singleton
 
 from .anthropic_services import AnthropicModule
+from .aws_services import AwsModule
 from .content_analysis_module import ContentAnalysisModule
 from .local_services import LocalModule
+from .metrics_exporter import MetricsModule
+from .pipeline_module import PipelineModule
+from .routing_services import LLMRoutingModule
+from .sqlite_analysis_index import AnalysisIndexModule
+from .sqlite_entity_store import EntityResolutionModule
+from .sqlite_job_queue import JobQueueModule
+from .sqlite_recrawl_store import RecrawlModule
 from .web_scrape_services import WebScraperModule
 from .web_search_services import WebSearchModule
 
@@ -55,13 +63,33 @@ class ServiceCollection:
             ),
             WebScraperModule(),
             ContentAnalysisModule(),
+            PipelineModule(),
+            MetricsModule(),
+            JobQueueModule(
+                backend=settings.job_queue_settings.backend
+            ),
+            RecrawlModule(),
+            AnalysisIndexModule(
+                enabled=settings.analysis_index_settings.enabled
+            ),
+            EntityResolutionModule(
+                enabled=settings.entity_resolution_settings.enabled
+            ),
         ]
         if settings.local_settings.is_configured:
-            modules.append(LocalModule(app_host=settings.app_host))
+            modules.append(LocalModule(
+                app_host=settings.app_host,
+                storage_backend=settings.local_settings.storage_backend
+            ))
+        if settings.aws.is_configured:
+            modules.append(AwsModule(app_host=settings.app_host))
         if settings.anthropic.is_configured:
             modules.append(AnthropicModule(
                 llm_model_host=settings.llm_settings.chat_model_settings.host
             ))
+        modules.append(LLMRoutingModule(
+            llm_model_host=settings.llm_settings.chat_model_settings.host
+        ))
 
         injector = Injector(modules=modules)
         return ServiceProvider._initialize(injector)
@@ -0,0 +1,222 @@
+import re
+from datetime import date
+
+from configuration import Settings
+from core.analysis_export import flatten_analysis
+from core.analysis_index import (
+    AnalysisIndex,
+    AnalysisSink,
+    FacetCount,
+    PainPointCluster,
+    PainPointHit,
+)
+from core.entity_resolution import normalize_name
+from injector import Binder, Module, ProviderOf, inject, multiprovider, singleton
+
+from .sqlite_utils import SQLiteConnectionPool, date_filter
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS analyses (
+    url TEXT PRIMARY KEY,
+    domain TEXT NOT NULL,
+    date TEXT,
+    title TEXT,
+    content_type TEXT,
+    provider_count INTEGER NOT NULL,
+    pain_point_count INTEGER NOT NULL,
+    source_file TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_analyses_date ON analyses (date);
+CREATE INDEX IF NOT EXISTS idx_analyses_domain ON analyses (domain, date);
+
+CREATE TABLE IF NOT EXISTS providers (
+    url TEXT NOT NULL,
+    provider_index INTEGER NOT NULL,
+    date TEXT,
+    name TEXT,
+    name_key TEXT,
+    website TEXT,
+    pain_point_count INTEGER NOT NULL,
+    PRIMARY KEY (url, provider_index)
+);
+CREATE INDEX IF NOT EXISTS idx_providers_name ON providers (name_key, date);
+
+CREATE TABLE IF NOT EXISTS pain_points (
+    id INTEGER PRIMARY KEY,
+    url TEXT NOT NULL,
+    domain TEXT NOT NULL,
+    date TEXT,
+    provider_name TEXT,
+    category TEXT,
+    impact TEXT,
+    description TEXT,
+    source_quote TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_pain_points_url ON pain_points (url);
+CREATE INDEX IF NOT EXISTS idx_pain_points_category ON pain_points (category, date);
+
+-- the porter stemmer lets "scheduling" find "schedule" and "schedules"
+CREATE VIRTUAL TABLE IF NOT EXISTS pain_points_fts USING fts5(
+    description, source_quote, content='pain_points', content_rowid='id', tokenize='porter unicode61');
+CREATE TRIGGER IF NOT EXISTS pain_points_fts_insert AFTER INSERT ON pain_points BEGIN
+    INSERT INTO pain_points_fts (rowid, description, source_quote)
+    VALUES (new.id, new.description, new.source_quote);
+END;
+CREATE TRIGGER IF NOT EXISTS pain_points_fts_delete AFTER DELETE ON pain_points BEGIN
+    INSERT INTO pain_points_fts (pain_points_fts, rowid, description, source_quote)
+    VALUES ('delete', old.id, old.description, old.source_quote);
+END;
+
+CREATE TABLE IF NOT EXISTS clusters (
+    id INTEGER PRIMARY KEY,
+    description TEXT
+);
+CREATE TABLE IF NOT EXISTS pain_point_clusters (
+    pain_point_id INTEGER PRIMARY KEY,
+    cluster_id INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_pain_point_clusters_cluster ON pain_point_clusters (cluster_id);
+-- a pain point replaced by a new analysis of its page leaves its cluster until the next clustering
+CREATE TRIGGER IF NOT EXISTS pain_points_clusters_delete AFTER DELETE ON pain_points BEGIN
+    DELETE FROM pain_point_clusters WHERE pain_point_id = old.id;
+END;
+"""
+
+_WORD = re.compile(r"\w+")
+
+
+class AnalysisIndexModule(Module):
+    def __init__(self, enabled: bool):
+        self.enabled = enabled
+
+    def configure(self, binder: Binder) -> None:
+        binder.bind(AnalysisIndex, to=SQLiteAnalysisIndex, scope=singleton)
+
+    @multiprovider
+    def provide_analysis_sinks(self, index: ProviderOf[AnalysisIndex]) -> list[AnalysisSink]:
+        # the database is only opened by processes that index or query it
+        return [index.get()] if self.enabled else []
+
+
+class SQLiteAnalysisIndex(AnalysisIndex):
+    """
+    Analysis index in a SQLite database in WAL mode: one row per analysis, service provider and
+    pain point, indexed for the rollups, and an FTS5 table over the pain point descriptions and quotes.
+    """
+
+    @inject
+    def __init__(self, settings: Settings):
+        self._pool = SQLiteConnectionPool(settings.analysis_index_settings.sqlite_path, SCHEMA)
+
+    def record(self, file_name: str, analysis: dict) -> None:
+        row, providers, pain_points = flatten_analysis(analysis, file_name)
+        url = row["url"]
+        conn = self._pool.connection()
+        with conn:
+            conn.execute("DELETE FROM pain_points WHERE url = ?", (url,))
+            conn.execute("DELETE FROM providers WHERE url = ?", (url,))
+            conn.execute(
+                """INSERT OR REPLACE INTO analyses
+                   (url, domain, date, title, content_type, provider_count, pain_point_count, source_file)
+                   VALUES (?, ?, ?, ?, ?, ?, ?, ?)""",
+                (url, row["domain"], row["date"], row["title"], row["content_type"],
+                 row["provider_count"], row["pain_point_count"], file_name))
+            conn.executemany(
+                """INSERT INTO providers (url, provider_index, date, name, name_key, website, pain_point_count)
+                   VALUES (?, ?, ?, ?, ?, ?, ?)""",
+                [(url, p["provider_index"], p["date"], p["name"], normalize_name(p["name"]),
+                  p["website"], p["pain_point_count"]) for p in providers])
+            conn.executemany(
+                """INSERT INTO pain_points
+                   (url, domain, date, provider_name, category, impact, description, source_quote)
+                   VALUES (?, ?, ?, ?, ?, ?, ?, ?)""",
+                [(url, p["domain"], p["date"], p["provider_name"], p["category"], p["impact"],
+                  p["description"], p["source_quote"]) for p in pain_points])
+
+    def top_categories(self, since: date | None = None, until: date | None = None,
+                       limit: int = 10) -> list[FacetCount]:
+        where, params = date_filter("date", since, until)
+        return self._facets(
+            f"""SELECT COALESCE(category, 'other') AS key, COUNT(DISTINCT url) AS pages,
+                       COUNT(*) AS pain_points, MAX(date) AS last_analysis_date
+                FROM pain_points WHERE {where} GROUP BY key
+                ORDER BY pain_points DESC, pages DESC, key LIMIT ?""", [*params, limit])
+
+    def top_providers(self, since: date | None = None, until: date | None = None,
+                      limit: int = 10) -> list[FacetCount]:
+        where, params = date_filter("date", since, until)
+        return self._facets(
+            f"""SELECT MAX(name) AS key, COUNT(DISTINCT url) AS pages,
+                       SUM(pain_point_count) AS pain_points, MAX(date) AS last_analysis_date
+                FROM providers WHERE name_key != '' AND {where} GROUP BY name_key
+                ORDER BY pages DESC, pain_points DESC, key LIMIT ?""", [*params, limit])
+
+    def top_domains(self, since: date | None = None, until: date | None = None,
+                    limit: int = 10) -> list[FacetCount]:
+        where, params = date_filter("date", since, until)
+        return self._facets(
+            f"""SELECT domain AS key, COUNT(*) AS pages, SUM(pain_point_count) AS pain_points,
+                       SUM(provider_count) AS providers, MAX(date) AS last_analysis_date
+                FROM analyses WHERE {where} GROUP BY domain
+                ORDER BY pain_points DESC, pages DESC, key LIMIT ?""", [*params, limit])
+
+    def search(self, text: str, since: date | None = None, until: date | None = None,
+               limit: int = 20) -> list[PainPointHit]:
+        words = _WORD.findall(text)
+        if not words:
+            return []
+        # every word quoted, so user input is never read as FTS5 query syntax
+        match = " ".join(f'"{word}"' for word in words)
+        where, params = date_filter("p.date", since, until)
+        rows = self._pool.connection().execute(
+            f"""SELECT p.url, p.domain, p.date, p.provider_name, p.category, p.impact, p.description,
+                       p.source_quote, snippet(pain_points_fts, -1, '[', ']', '...', 16) AS snippet
+                FROM pain_points_fts JOIN pain_points p ON p.id = pain_points_fts.rowid
+                WHERE pain_points_fts MATCH ? AND {where}
+                ORDER BY bm25(pain_points_fts) LIMIT ?""", [match, *params, limit]).fetchall()
+        return [PainPointHit(**dict(row)) for row in rows]
+
+    def pain_point_texts(self) -> tuple[list[int], list[str | None], list[str | None]]:
+        rows = self._pool.connection().execute(
+            "SELECT id, description, source_quote FROM pain_points ORDER BY id").fetchall()
+        return [row[0] for row in rows], [row[1] for row in rows], [row[2] for row in rows]
+
+    def store_clusters(self, pain_point_ids: list[int], cluster_ids: list[int],
+                       representative_ids: list[int]) -> None:
+        conn = self._pool.connection()
+        with conn:
+            conn.execute("DELETE FROM pain_point_clusters")
+            conn.execute("DELETE FROM clusters")
+            conn.executemany(
+                """INSERT INTO clusters (id, description)
+                   SELECT ?, description FROM pain_points WHERE id = ?""", enumerate(representative_ids))
+            conn.executemany("INSERT INTO pain_point_clusters (pain_point_id, cluster_id) VALUES (?, ?)",
+                             zip(pain_point_ids, cluster_ids))
+
+    def top_clusters(self, since: date | None = None, until: date | None = None, min_size: int = 2,
+                     limit: int = 10) -> list[PainPointCluster]:
+        where, params = date_filter("p.date", since, until)
+        category_where, category_params = date_filter("cp.date", since, until)
+        rows = self._pool.connection().execute(
+            f"""SELECT c.id, c.description, COUNT(DISTINCT p.url) AS pages, COUNT(*) AS pain_points,
+                       MAX(p.date) AS last_analysis_date,
+                       (SELECT cp.category FROM pain_point_clusters cc JOIN pain_points cp ON cp.id = cc.pain_point_id
+                        WHERE cc.cluster_id = c.id AND cp.category IS NOT NULL AND {category_where}
+                        GROUP BY cp.category ORDER BY COUNT(*) DESC, cp.category LIMIT 1) AS top_category
+                FROM pain_point_clusters pc JOIN pain_points p ON p.id = pc.pain_point_id
+                JOIN clusters c ON c.id = pc.cluster_id
+                WHERE {where} GROUP BY c.id HAVING COUNT(*) >= ?
+                ORDER BY pain_points DESC, pages DESC, c.id LIMIT ?""",
+            [*category_params, *params, min_size, limit]).fetchall()
+        return [PainPointCluster(**dict(row)) for row in rows]
+
+    def stats(self) -> dict[str, int]:
+        conn = self._pool.connection()
+        return {table: conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+                for table in ("analyses", "providers", "pain_points")}
+
+    def close(self) -> None:
+        self._pool.close()
+
+    def _facets(self, query: str, params: list) -> list[FacetCount]:
+        return [FacetCount(**dict(row)) for row in self._pool.connection().execute(query, params).fetchall()]
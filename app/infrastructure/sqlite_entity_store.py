@@ -0,0 +1,255 @@
+from collections import Counter
+from contextlib import contextmanager
+from datetime import date
+from typing import Iterator
+
+from configuration import Settings
+from core.analysis_index import AnalysisSink
+from core.entity_resolution import (
+    DOMAIN_KEY,
+    NAME_KEY,
+    EntityCandidate,
+    EntityResolver,
+    EntityStore,
+    ProviderEntity,
+    ProviderMention,
+    normalize_name,
+    registrable_domain,
+)
+from injector import Binder, Module, ProviderOf, inject, multiprovider, singleton
+
+from .sqlite_utils import SQLiteConnectionPool, date_filter
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS entities (
+    id INTEGER PRIMARY KEY,
+    parent_id INTEGER,
+    canonical_name TEXT NOT NULL,
+    name_key TEXT NOT NULL,
+    domain TEXT,
+    mentions INTEGER NOT NULL DEFAULT 0,
+    pages INTEGER NOT NULL DEFAULT 0,
+    last_seen TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_entities_parent ON entities (parent_id);
+
+CREATE TABLE IF NOT EXISTS entity_keys (
+    key TEXT NOT NULL,
+    entity_id INTEGER NOT NULL,
+    PRIMARY KEY (key, entity_id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_entity_keys_entity ON entity_keys (entity_id);
+
+CREATE TABLE IF NOT EXISTS entity_names (
+    entity_id INTEGER NOT NULL,
+    name TEXT NOT NULL,
+    mentions INTEGER NOT NULL,
+    PRIMARY KEY (entity_id, name)
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS mentions (
+    url TEXT NOT NULL,
+    provider_index INTEGER NOT NULL,
+    entity_id INTEGER NOT NULL,
+    name TEXT NOT NULL,
+    website TEXT,
+    date TEXT,
+    PRIMARY KEY (url, provider_index)
+);
+CREATE INDEX IF NOT EXISTS idx_mentions_entity ON mentions (entity_id, date);
+"""
+
+ENTITY_COLUMNS = "e.id, e.canonical_name, e.name_key, e.domain, e.mentions, e.pages, e.last_seen"
+
+
+class EntityResolutionModule(Module):
+    def __init__(self, enabled: bool):
+        self.enabled = enabled
+
+    def configure(self, binder: Binder) -> None:
+        binder.bind(EntityStore, to=SQLiteEntityStore, scope=singleton)
+        binder.bind(EntityResolver, to=EntityResolver, scope=singleton)
+
+    @multiprovider
+    def provide_analysis_sinks(self, resolver: ProviderOf[EntityResolver]) -> list[AnalysisSink]:
+        return [resolver.get()] if self.enabled else []
+
+
+class SQLiteEntityStore(EntityStore):
+    """
+    Provider entities in a SQLite database in WAL mode. Merging moves the mentions, names and
+    blocking keys to the surviving entity and points the merged entities to it, so every key
+    leads straight to a current entity.
+
+    A resolution runs in one immediate transaction: concurrent analyses resolve one at a time
+    and never create the same entity twice. Each entity keeps the count of its mentions and pages
+    and its last date, updated in that transaction, so lookups never count the mentions.
+    """
+
+    @inject
+    def __init__(self, settings: Settings):
+        self._pool = SQLiteConnectionPool(settings.entity_resolution_settings.sqlite_path, SCHEMA)
+
+    @contextmanager
+    def transaction(self) -> Iterator[None]:
+        conn = self._pool.connection()
+        if conn.in_transaction:
+            yield
+            return
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+
+    def remove_mentions(self, url: str) -> None:
+        conn = self._pool.connection()
+        removed = conn.execute("SELECT entity_id, name FROM mentions WHERE url = ?", (url,)).fetchall()
+        if not removed:
+            return
+        conn.executemany("UPDATE entity_names SET mentions = mentions - 1 WHERE entity_id = ? AND name = ?",
+                         [(row["entity_id"], row["name"]) for row in removed])
+        conn.execute("DELETE FROM entity_names WHERE mentions <= 0")
+        conn.execute("DELETE FROM mentions WHERE url = ?", (url,))
+        counts = Counter(row["entity_id"] for row in removed)
+        # every mention of the page is gone, so each entity loses exactly one page
+        conn.executemany(
+            """UPDATE entities SET mentions = mentions - ?, pages = pages - 1,
+                   last_seen = (SELECT MAX(date) FROM mentions WHERE entity_id = ?)
+               WHERE id = ?""", [(count, entity_id, entity_id) for entity_id, count in counts.items()])
+        for entity_id in counts:
+            self._update_canonical_name(entity_id)
+
+    def candidates(self, keys: list[str], limit: int) -> list[EntityCandidate]:
+        conn = self._pool.connection()
+        found: dict[int, EntityCandidate] = {}
+        for key in keys:
+            # one bounded lookup per key, so a crowded prefix never hides an exact match
+            rows = conn.execute(
+                f"""SELECT {ENTITY_COLUMNS} FROM entity_keys k JOIN entities e ON e.id = k.entity_id
+                    WHERE k.key = ? LIMIT ?""", (key, limit)).fetchall()
+            for row in rows:
+                candidate = found.setdefault(
+                    row["id"], EntityCandidate(entity=ProviderEntity(**dict(row)), keys=set()))
+                candidate.keys.add(key)
+        return list(found.values())
+
+    def create(self, mention: ProviderMention) -> int:
+        return self._pool.connection().execute(
+            "INSERT INTO entities (canonical_name, name_key, domain) VALUES (?, ?, ?)",
+            (mention.name.strip(), mention.name_key, mention.domain)).lastrowid
+
+    def add_mention(self, entity_id: int, mention: ProviderMention) -> None:
+        conn = self._pool.connection()
+        new_page = conn.execute("SELECT 1 FROM mentions WHERE url = ? AND entity_id = ?",
+                                (mention.url, entity_id)).fetchone() is None
+        conn.execute(
+            """INSERT OR REPLACE INTO mentions (url, provider_index, entity_id, name, website, date)
+               VALUES (?, ?, ?, ?, ?, ?)""",
+            (mention.url, mention.provider_index, entity_id, mention.name.strip(), mention.website, mention.date))
+        conn.execute(
+            """INSERT INTO entity_names (entity_id, name, mentions) VALUES (?, ?, 1)
+               ON CONFLICT (entity_id, name) DO UPDATE SET mentions = mentions + 1""",
+            (entity_id, mention.name.strip()))
+        conn.executemany("INSERT OR IGNORE INTO entity_keys (key, entity_id) VALUES (?, ?)",
+                         [(key, entity_id) for key in mention.blocking_keys()])
+        conn.execute(
+            """UPDATE entities SET domain = COALESCE(domain, ?), mentions = mentions + 1, pages = pages + ?,
+                   last_seen = MAX(COALESCE(last_seen, ?), COALESCE(?, last_seen))
+               WHERE id = ?""", (mention.domain, int(new_page), mention.date, mention.date, entity_id))
+        self._update_canonical_name(entity_id)
+
+    def merge(self, entity_id: int, other_ids: list[int]) -> None:
+        conn = self._pool.connection()
+        for other_id in other_ids:
+            other = conn.execute("SELECT mentions, pages, last_seen FROM entities WHERE id = ?", (other_id,)).fetchone()
+            # the pages mentioning both entities are counted once
+            shared = conn.execute(
+                """SELECT COUNT(DISTINCT m.url) FROM mentions m WHERE m.entity_id = ? AND EXISTS (
+                       SELECT 1 FROM mentions s WHERE s.url = m.url AND s.entity_id = ?)""",
+                (other_id, entity_id)).fetchone()[0]
+            conn.execute(
+                """UPDATE entities SET mentions = mentions + ?, pages = pages + ?,
+                       last_seen = MAX(COALESCE(last_seen, ?), COALESCE(?, last_seen))
+                   WHERE id = ?""",
+                (other["mentions"], other["pages"] - shared, other["last_seen"], other["last_seen"], entity_id))
+            conn.execute("UPDATE entities SET mentions = 0, pages = 0, last_seen = NULL WHERE id = ?", (other_id,))
+            conn.execute("UPDATE mentions SET entity_id = ? WHERE entity_id = ?", (entity_id, other_id))
+            conn.execute(
+                """INSERT INTO entity_names (entity_id, name, mentions)
+                   SELECT ?, name, mentions FROM entity_names WHERE entity_id = ?
+                   ON CONFLICT (entity_id, name) DO UPDATE SET mentions = mentions + excluded.mentions""",
+                (entity_id, other_id))
+            conn.execute("DELETE FROM entity_names WHERE entity_id = ?", (other_id,))
+            conn.execute("INSERT OR IGNORE INTO entity_keys (key, entity_id) SELECT key, ? FROM entity_keys "
+                         "WHERE entity_id = ?", (entity_id, other_id))
+            conn.execute("DELETE FROM entity_keys WHERE entity_id = ?", (other_id,))
+            conn.execute(
+                """UPDATE entities SET domain = COALESCE(domain, (SELECT domain FROM entities WHERE id = ?))
+                   WHERE id = ?""", (other_id, entity_id))
+            conn.execute("UPDATE entities SET parent_id = ? WHERE id = ? OR parent_id = ?",
+                         (entity_id, other_id, other_id))
+        self._update_canonical_name(entity_id)
+
+    def get(self, entity_id: int) -> ProviderEntity | None:
+        conn = self._pool.connection()
+        row = conn.execute(
+            f"""SELECT {ENTITY_COLUMNS} FROM entities e
+                WHERE e.id = (SELECT COALESCE(parent_id, id) FROM entities WHERE id = ?)""",
+            (entity_id,)).fetchone()
+        return self._with_aliases([ProviderEntity(**dict(row))])[0] if row else None
+
+    def find(self, name: str) -> list[ProviderEntity]:
+        keys = [f"{NAME_KEY}{normalize_name(name)}"]
+        if registrable_domain(name) and " " not in name.strip():
+            keys.append(f"{DOMAIN_KEY}{registrable_domain(name)}")
+        candidates = self.candidates(keys, limit=20)
+        return self._with_aliases([candidate.entity for candidate in candidates])
+
+    def top(self, since: date | None = None, until: date | None = None, limit: int = 20) -> list[ProviderEntity]:
+        where, params = date_filter("m.date", since, until)
+        rows = self._pool.connection().execute(
+            f"""SELECT e.id, e.canonical_name, e.name_key, e.domain, COUNT(*) AS mentions,
+                       COUNT(DISTINCT m.url) AS pages, MAX(m.date) AS last_seen
+                FROM mentions m JOIN entities e ON e.id = m.entity_id WHERE {where}
+                GROUP BY e.id ORDER BY pages DESC, mentions DESC, e.canonical_name LIMIT ?""",
+            [*params, limit]).fetchall()
+        return self._with_aliases([ProviderEntity(**dict(row)) for row in rows])
+
+    def stats(self) -> dict[str, int]:
+        row = self._pool.connection().execute(
+            """SELECT (SELECT COUNT(*) FROM mentions) AS mentions,
+                      (SELECT COUNT(*) FROM entities WHERE parent_id IS NULL) AS entities,
+                      (SELECT COUNT(*) FROM entities WHERE parent_id IS NOT NULL) AS merged""").fetchone()
+        return dict(row)
+
+    def clear(self) -> None:
+        conn = self._pool.connection()
+        with conn:
+            for table in ("mentions", "entity_names", "entity_keys", "entities"):
+                conn.execute(f"DELETE FROM {table}")
+
+    def close(self) -> None:
+        self._pool.close()
+
+    def _update_canonical_name(self, entity_id: int) -> None:
+        self._pool.connection().execute(
+            """UPDATE entities SET canonical_name = COALESCE(
+                   (SELECT name FROM entity_names WHERE entity_id = ? ORDER BY mentions DESC, name LIMIT 1),
+                   canonical_name)
+               WHERE id = ?""", (entity_id, entity_id))
+
+    def _with_aliases(self, entities: list[ProviderEntity]) -> list[ProviderEntity]:
+        if not entities:
+            return entities
+        rows = self._pool.connection().execute(
+            f"""SELECT entity_id, name FROM entity_names WHERE entity_id IN ({', '.join('?' * len(entities))})
+                ORDER BY mentions DESC, name""", [entity.id for entity in entities]).fetchall()
+        aliases: dict[int, list[str]] = {}
+        for row in rows:
+            aliases.setdefault(row["entity_id"], []).append(row["name"])
+        for entity in entities:
+            entity.aliases = aliases.get(entity.id, [])
+        return entities
@@ -0,0 +1,192 @@
+import time
+import uuid
+from typing import Any, Callable
+
+from configuration import JobQueueBackend, Settings
+from core.job_queue import Job, JobQueue, JobStatus
+from core.serialization import create_serializer
+from injector import Binder, Module, inject, singleton
+
+from .sqlite_utils import SQLiteConnectionPool
+
+SCHEMA = f"""
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    queue TEXT NOT NULL,
+    key TEXT,
+    payload BLOB NOT NULL,
+    status TEXT NOT NULL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    max_attempts INTEGER NOT NULL,
+    available_at REAL NOT NULL,
+    lease_token TEXT,
+    leased_until REAL,
+    worker_id TEXT,
+    error TEXT,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL
+);
+-- a key is unique among the jobs still to run, so a finished job never blocks a new one
+CREATE UNIQUE INDEX IF NOT EXISTS idx_jobs_active_key ON jobs (queue, key)
+    WHERE status IN ('{JobStatus.PENDING}', '{JobStatus.LEASED}');
+CREATE INDEX IF NOT EXISTS idx_jobs_ready ON jobs (queue, status, available_at);
+CREATE INDEX IF NOT EXISTS idx_jobs_leases ON jobs (queue, status, leased_until);
+"""
+
+
+class JobQueueModule(Module):
+    """
+    Job queue module.
+    """
+
+    def __init__(self, backend: str = JobQueueBackend.SQLITE):
+        self.backend = backend
+
+    def configure(self, binder: Binder) -> None:
+        if self.backend == JobQueueBackend.SQLITE:
+            binder.bind(JobQueue, to=SQLiteJobQueue, scope=singleton)
+        else:
+            raise ValueError(
+                f"Invalid job queue backend: {self.backend}. Must be one of: {JobQueueBackend.SQLITE}")
+
+
+class SQLiteJobQueue(JobQueue):
+    """
+    Job queue in a SQLite database in WAL mode, shared by the worker processes of one machine only:
+    WAL relies on shared memory, so the database must not sit on a network volume (NFS, SMB).
+    Workers on several machines need a JobQueue backed by a server instead.
+
+    Leasing claims jobs with a single `UPDATE ... RETURNING` inside an immediate transaction,
+    so concurrent workers never get the same job.
+    """
+
+    @inject
+    def __init__(self, settings: Settings):
+        queue_settings = settings.job_queue_settings
+        self._lease_seconds = queue_settings.lease_seconds
+        self._max_attempts = queue_settings.max_attempts
+        self._retry_delay_seconds = queue_settings.retry_delay_seconds
+        self._serializer = create_serializer(
+            settings.local_settings.json_serializer)
+        self._clock: Callable[[], float] = time.time
+        self._pool = SQLiteConnectionPool(queue_settings.sqlite_path, SCHEMA)
+
+    def enqueue(self, queue: str, payload: dict[str, Any], key: str | None = None,
+                delay_seconds: float = 0, max_attempts: int | None = None) -> bool:
+        return self._insert(queue, [(key, payload)], delay_seconds, max_attempts) == 1
+
+    def enqueue_many(self, queue: str, payloads: list[tuple[str | None, dict[str, Any]]]) -> int:
+        return self._insert(queue, payloads)
+
+    def lease(self, queue: str, worker_id: str, limit: int = 1,
+              lease_seconds: float | None = None) -> list[Job]:
+        now = self._clock()
+        token = uuid.uuid4().hex
+        conn = self._pool.connection()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            # jobs whose worker died without finishing them and were leased too often
+            conn.execute(
+                """UPDATE jobs SET status = ?, error = 'lease expired', updated_at = ?
+                   WHERE queue = ? AND status = ? AND leased_until <= ? AND attempts >= max_attempts""",
+                (JobStatus.DEAD, now, queue, JobStatus.LEASED, now))
+            rows = conn.execute(
+                """UPDATE jobs SET status = ?, lease_token = ?, leased_until = ?, worker_id = ?,
+                       attempts = attempts + 1, updated_at = ?
+                   WHERE id IN (
+                       -- first in, first out: by the time a job became ready, then by insertion
+                       SELECT id FROM (
+                           SELECT id, available_at AS ready_at, rowid AS position FROM jobs
+                           WHERE queue = ? AND status = ? AND available_at <= ?
+                           UNION ALL
+                           SELECT id, leased_until, rowid FROM jobs
+                           WHERE queue = ? AND status = ? AND leased_until <= ?)
+                       ORDER BY ready_at, position
+                       LIMIT ?)
+                   RETURNING *""",
+                (JobStatus.LEASED, token, now + (lease_seconds or self._lease_seconds), worker_id, now,
+                 queue, JobStatus.PENDING, now, queue, JobStatus.LEASED, now, limit)).fetchall()
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        return [self._job(row) for row in rows]
+
+    def extend(self, job: Job, lease_seconds: float | None = None) -> bool:
+        return self._update_leased(
+            job, "leased_until = ?", (self._clock() + (lease_seconds or self._lease_seconds),))
+
+    def complete(self, job: Job) -> bool:
+        return self._update_leased(job, "status = ?, lease_token = NULL, error = NULL", (JobStatus.DONE,))
+
+    def fail(self, job: Job, error: str, retry_delay_seconds: float | None = None) -> bool:
+        if job.attempts >= job.max_attempts:
+            return self._update_leased(
+                job, "status = ?, lease_token = NULL, error = ?", (JobStatus.DEAD, error))
+        if retry_delay_seconds is None:
+            retry_delay_seconds = self._retry_delay_seconds * 2 ** (job.attempts - 1)
+        return self._update_leased(
+            job, "status = ?, lease_token = NULL, error = ?, available_at = ?",
+            (JobStatus.PENDING, error, self._clock() + retry_delay_seconds))
+
+    def requeue_dead(self, queue: str) -> int:
+        conn = self._pool.connection()
+        with conn:
+            return conn.execute(
+                # a dead job whose key was enqueued again stays dead rather than run twice
+                """UPDATE OR IGNORE jobs SET status = ?, attempts = 0, available_at = ?, updated_at = ?
+                   WHERE queue = ? AND status = ?""",
+                (JobStatus.PENDING, self._clock(), self._clock(), queue, JobStatus.DEAD)).rowcount
+
+    def dead_letters(self, queue: str, limit: int = 100) -> list[Job]:
+        rows = self._pool.connection().execute(
+            "SELECT * FROM jobs WHERE queue = ? AND status = ? ORDER BY updated_at LIMIT ?",
+            (queue, JobStatus.DEAD, limit)).fetchall()
+        return [self._job(row) for row in rows]
+
+    def stats(self, queue: str) -> dict[str, int]:
+        counts = {status: 0 for status in (
+            JobStatus.PENDING, JobStatus.LEASED, JobStatus.DONE, JobStatus.DEAD)}
+        for row in self._pool.connection().execute(
+                "SELECT status, COUNT(*) AS count FROM jobs WHERE queue = ? GROUP BY status", (queue,)):
+            counts[row["status"]] = row["count"]
+        return counts
+
+    def close(self) -> None:
+        self._pool.close()
+
+    def _insert(self, queue: str, payloads: list[tuple[str | None, dict[str, Any]]],
+                delay_seconds: float = 0, max_attempts: int | None = None) -> int:
+        now = self._clock()
+        rows = [(uuid.uuid4().hex, queue, key, self._serializer.dumps(payload), JobStatus.PENDING,
+                 max_attempts or self._max_attempts, now + delay_seconds, now, now)
+                for key, payload in payloads]
+        conn = self._pool.connection()
+        with conn:
+            before = conn.total_changes
+            conn.executemany(
+                """INSERT OR IGNORE INTO jobs
+                   (id, queue, key, payload, status, max_attempts, available_at, created_at, updated_at)
+                   VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)""", rows)
+            return conn.total_changes - before
+
+    def _update_leased(self, job: Job, assignments: str, params: tuple) -> bool:
+        conn = self._pool.connection()
+        with conn:
+            # the token check keeps a worker whose lease expired from overwriting the new holder
+            cursor = conn.execute(
+                f"UPDATE jobs SET {assignments}, updated_at = ? WHERE id = ? AND lease_token = ? AND status = ?",
+                (*params, self._clock(), job.id, job.lease_token, JobStatus.LEASED))
+            return cursor.rowcount == 1
+
+    def _job(self, row) -> Job:
+        return Job(
+            id=row["id"],
+            queue=row["queue"],
+            key=row["key"],
+            payload=self._serializer.loads(row["payload"]),
+            attempts=row["attempts"],
+            max_attempts=row["max_attempts"],
+            lease_token=row["lease_token"],
+            error=row["error"],
+        )
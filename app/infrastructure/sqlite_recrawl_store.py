@@ -0,0 +1,94 @@
+from configuration import Settings
+from core.recrawl import RecrawlRecord, RecrawlStore
+from injector import Binder, Module, inject, singleton
+
+from .sqlite_utils import SQLiteConnectionPool
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS pages (
+    url TEXT PRIMARY KEY,
+    interval_seconds REAL NOT NULL,
+    next_fetch_at REAL NOT NULL,
+    last_fetched_at REAL,
+    last_changed_at REAL,
+    content_hash TEXT,
+    etag TEXT,
+    last_modified TEXT,
+    fetches INTEGER NOT NULL DEFAULT 0,
+    changes INTEGER NOT NULL DEFAULT 0,
+    failures INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS idx_pages_due ON pages (next_fetch_at);
+"""
+
+COLUMNS = tuple(RecrawlRecord.model_fields)
+
+
+class RecrawlModule(Module):
+    def configure(self, binder: Binder) -> None:
+        binder.bind(RecrawlStore, to=SQLiteRecrawlStore, scope=singleton)
+
+
+class SQLiteRecrawlStore(RecrawlStore):
+    """
+    Recrawl schedule in a SQLite database in WAL mode. Claiming selects and postpones the due
+    pages in one immediate transaction, so concurrent schedulers never refresh a page twice.
+    """
+
+    @inject
+    def __init__(self, settings: Settings):
+        self._pool = SQLiteConnectionPool(settings.recrawl_settings.sqlite_path, SCHEMA)
+
+    def track(self, records: list[RecrawlRecord]) -> int:
+        conn = self._pool.connection()
+        with conn:
+            before = conn.total_changes
+            conn.executemany(
+                f"INSERT OR IGNORE INTO pages ({', '.join(COLUMNS)}) VALUES ({', '.join('?' * len(COLUMNS))})",
+                [self._values(record) for record in records])
+            return conn.total_changes - before
+
+    def get(self, url: str) -> RecrawlRecord | None:
+        row = self._pool.connection().execute("SELECT * FROM pages WHERE url = ?", (url,)).fetchone()
+        return RecrawlRecord(**dict(row)) if row else None
+
+    def claim_due(self, now: float, limit: int, claim_seconds: float) -> list[RecrawlRecord]:
+        conn = self._pool.connection()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            rows = conn.execute(
+                """SELECT * FROM pages WHERE next_fetch_at <= ? ORDER BY next_fetch_at LIMIT ?""",
+                (now, limit)).fetchall()
+            conn.executemany(
+                "UPDATE pages SET next_fetch_at = ? WHERE url = ?",
+                [(now + claim_seconds, row["url"]) for row in rows])
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        # the records keep their due time, the claim only hides them from other schedulers
+        return [RecrawlRecord(**dict(row)) for row in rows]
+
+    def save(self, record: RecrawlRecord) -> None:
+        conn = self._pool.connection()
+        with conn:
+            conn.execute(
+                f"INSERT OR REPLACE INTO pages ({', '.join(COLUMNS)}) VALUES ({', '.join('?' * len(COLUMNS))})",
+                self._values(record))
+
+    def untrack(self, url: str) -> bool:
+        conn = self._pool.connection()
+        with conn:
+            return conn.execute("DELETE FROM pages WHERE url = ?", (url,)).rowcount == 1
+
+    def stats(self, now: float) -> dict[str, int]:
+        row = self._pool.connection().execute(
+            "SELECT COUNT(*) AS tracked, COALESCE(SUM(next_fetch_at <= ?), 0) AS due FROM pages",
+            (now,)).fetchone()
+        return {"tracked": row["tracked"], "due": row["due"]}
+
+    def close(self) -> None:
+        self._pool.close()
+
+    def _values(self, record: RecrawlRecord) -> tuple:
+        return tuple(getattr(record, column) for column in COLUMNS)
@@ -0,0 +1,275 @@
+from datetime import datetime
+from pathlib import Path
+from typing import Iterator
+from urllib.parse import urlparse
+
+from configuration import Settings
+from core.serialization import create_serializer
+from core.storage import DATE_PART, Storage, file_matches
+from injector import inject
+
+from .sqlite_utils import SQLiteConnectionPool
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS files (
+    name TEXT PRIMARY KEY,
+    folder TEXT NOT NULL,
+    data BLOB NOT NULL,
+    url TEXT,
+    domain TEXT,
+    date TEXT,
+    stage TEXT,
+    status TEXT,
+    created_at TEXT,
+    size INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_files_folder ON files (folder, name);
+CREATE INDEX IF NOT EXISTS idx_files_url ON files (url);
+CREATE INDEX IF NOT EXISTS idx_files_domain_date ON files (domain, date);
+CREATE INDEX IF NOT EXISTS idx_files_stage_status_date ON files (stage, status, date);
+"""
+
+UPSERT = """
+INSERT INTO files (name, folder, data, url, domain, date, stage, status, created_at, size)
+VALUES (:name, :folder, :data, :url, :domain, :date, :stage, :status, :created_at, :size)
+ON CONFLICT (name) DO UPDATE SET
+    folder = excluded.folder, data = excluded.data, url = excluded.url,
+    domain = excluded.domain, date = excluded.date, stage = excluded.stage,
+    status = excluded.status, created_at = excluded.created_at, size = excluded.size
+"""
+
+
+class SQLiteStorage(Storage):
+    """
+    Storage implementation backed by a SQLite database in WAL mode.
+
+    File names keep the same layout as LocalStorage (`YYYY/MM/DD/<stage>/<status>/<file>`),
+    and the date, stage, status, URL and domain of each file are kept in indexed columns.
+    """
+
+    @inject
+    def __init__(self, settings: Settings):
+        self.settings = settings
+        self._serializer = create_serializer(
+            settings.local_settings.json_serializer)
+        self._pool = SQLiteConnectionPool(
+            settings.local_settings.sqlite_path, SCHEMA)
+
+    def read(self, file_name: str) -> bytes:
+        """
+        Reads the file from the database.
+        """
+
+        row = self._pool.connection().execute(
+            "SELECT data FROM files WHERE name = ?", (file_name,)).fetchone()
+        if row is None:
+            raise FileNotFoundError(f"File {file_name} not found")
+        return bytes(row["data"])
+
+    def read_json(self, file_name: str) -> dict:
+        """
+        Reads the JSON file from the database.
+        """
+
+        return self._serializer.loads(self.read(file_name))
+
+    def write(self, file_name: str, data: bytes, container: str | None = None) -> None:
+        """
+        Writes the file to the database.
+        """
+
+        if not isinstance(data, bytes):
+            raise ValueError(f"Invalid data type: {type(data)}")
+        self._upsert([self._row(file_name, data)])
+
+    def write_json(self, file_name: str, data: dict) -> None:
+        """
+        Writes the JSON file to the database, indexing its URL.
+        """
+
+        self._upsert([self._json_row(file_name, data)])
+
+    def write_many_json(self, files: dict[str, dict]) -> None:
+        """
+        Writes several JSON files in a single transaction.
+        """
+
+        self._upsert([self._json_row(file_name, data)
+                     for file_name, data in files.items()])
+
+    def store_export(self, file_name: str, data: bytes) -> str:
+        """
+        Stores the export as a plain file next to the database, so analytics tools can scan it,
+        and returns its file URL.
+        """
+
+        file_path = Path(self.settings.local_settings.local_storage_path) / file_name
+        file_path.parent.mkdir(parents=True, exist_ok=True)
+        file_path.write_bytes(data)
+        return file_path.resolve().as_uri()
+
+    def delete(self, file_name: str) -> None:
+        conn = self._pool.connection()
+        with conn:
+            conn.execute("DELETE FROM files WHERE name = ?", (file_name,))
+
+    def list_all_files(self, path: str) -> list[str]:
+        """
+        Lists all files directly in the given path
+        """
+
+        folder = path.strip("/")
+        conn = self._pool.connection()
+        files = [row["name"] for row in conn.execute(
+            "SELECT name FROM files WHERE folder = ? ORDER BY name", (folder,))]
+        if not files and not self._folder_exists(folder):
+            raise FileNotFoundError(f"Path {path} not found")
+        return files
+
+    def iter_files(self,
+                   path: str,
+                   recursive: bool = False,
+                   pattern: str | None = None,
+                   suffix: str | None = None,
+                   date_from: str | None = None,
+                   date_to: str | None = None,
+                   start_after: str | None = None,
+                   limit: int | None = None) -> Iterator[str]:
+        """
+        Streams the matching names from a cursor; folder, date range and pagination
+        are answered by the indexes, the name filters are applied while reading.
+        """
+
+        folder = path.strip("/")
+        clauses, params = [], []
+        if not recursive:
+            clauses.append("folder = ?")
+            params.append(folder)
+        elif folder:
+            clauses.append("(folder = ? OR (folder >= ? AND folder < ?))")
+            params.extend([folder, f"{folder}/", f"{folder}0"])
+        if date_from:
+            clauses.append("date >= ?")
+            params.append(date_from)
+        if date_to:
+            clauses.append("date <= ?")
+            params.append(date_to)
+        if start_after is not None:
+            clauses.append("name > ?")
+            params.append(start_after)
+
+        sql = "SELECT name FROM files"
+        if clauses:
+            sql += " WHERE " + " AND ".join(clauses)
+        sql += " ORDER BY name"
+
+        if folder and not self._folder_exists(folder):
+            raise FileNotFoundError(f"Path {path} not found")
+
+        count = 0
+        for row in self._pool.connection().execute(sql, params):
+            if limit is not None and count >= limit:
+                return
+            if file_matches(row["name"], pattern, suffix):
+                count += 1
+                yield row["name"]
+
+    def find_files(self,
+                   url: str | None = None,
+                   domain: str | None = None,
+                   stage: str | None = None,
+                   status: str | None = None,
+                   date_from: str | None = None,
+                   date_to: str | None = None,
+                   limit: int | None = None) -> list[str]:
+        """
+        Finds files by their indexed metadata. Dates are inclusive `YYYY-MM-DD` strings.
+        """
+
+        clauses, params = [], []
+        for column, value in (("url", url), ("domain", _domain(domain) if domain else None),
+                              ("stage", stage), ("status", status)):
+            if value is not None:
+                clauses.append(f"{column} = ?")
+                params.append(value)
+        if date_from:
+            clauses.append("date >= ?")
+            params.append(date_from)
+        if date_to:
+            clauses.append("date <= ?")
+            params.append(date_to)
+
+        sql = "SELECT name FROM files"
+        if clauses:
+            sql += " WHERE " + " AND ".join(clauses)
+        sql += " ORDER BY name"
+        if limit:
+            sql += " LIMIT ?"
+            params.append(limit)
+        return [row["name"] for row in self._pool.connection().execute(sql, params)]
+
+    def create_folder(self, folder_name: str) -> None:
+        """
+        Folders are implied by file names, so there is nothing to create.
+        """
+
+    def close(self) -> None:
+        self._pool.close()
+
+    def _folder_exists(self, folder: str) -> bool:
+        # range scans on the folder index: the folder itself or any folder nested under `folder/`
+        conn = self._pool.connection()
+        row = conn.execute("SELECT 1 FROM files WHERE folder = ? LIMIT 1", (folder,)).fetchone() \
+            or conn.execute("SELECT 1 FROM files WHERE folder >= ? AND folder < ? LIMIT 1",
+                            (f"{folder}/", f"{folder}0")).fetchone()
+        return row is not None
+
+    def _upsert(self, rows: list[dict]) -> None:
+        conn = self._pool.connection()
+        with conn:
+            conn.executemany(UPSERT, rows)
+
+    def _json_row(self, file_name: str, data: dict) -> dict:
+        payload = self._serializer.dumps(data)
+        created_at = data.get("created_at") or data.get("analysis_date")
+        if isinstance(created_at, datetime):
+            created_at = created_at.isoformat()
+        return self._row(file_name, payload, url=data.get("url"), created_at=created_at)
+
+    def _row(self, file_name: str, data: bytes, url: str | None = None,
+             created_at: str | None = None) -> dict:
+        file_name = file_name.strip("/")
+        folder, _, _ = file_name.rpartition("/")
+        date, stage, status = _partition_metadata(folder)
+        return {
+            "name": file_name,
+            "folder": folder,
+            "data": data,
+            "url": url,
+            "domain": _domain(url) if url else None,
+            "date": date,
+            "stage": stage,
+            "status": status,
+            "created_at": created_at,
+            "size": len(data),
+        }
+
+
+def _partition_metadata(folder: str) -> tuple[str | None, str | None, str | None]:
+    """
+    Splits `YYYY/MM/DD/<stage>/<status>` into its date, stage and status.
+    """
+
+    parts = [part for part in folder.split("/") if part]
+    date = None
+    if len(parts) >= 3 and all(DATE_PART.match(part) for part in parts[:3]):
+        date = f"{int(parts[0]):04d}-{int(parts[1]):02d}-{int(parts[2]):02d}"
+        parts = parts[3:]
+    stage = parts[0] if parts else None
+    status = parts[1] if len(parts) > 1 else None
+    return date, stage, status
+
+
+def _domain(url: str) -> str:
+    netloc = urlparse(url if "://" in url else f"//{url}").netloc.lower()
+    return netloc.removeprefix("www.")
@@ -0,0 +1,61 @@
+import sqlite3
+import threading
+from datetime import date
+from pathlib import Path
+
+
+class SQLiteConnectionPool:
+    """
+    One SQLite connection per thread on a WAL-mode database,
+    so readers never wait for the writer and threads never share a connection.
+    """
+
+    def __init__(self, path: str | Path, schema: str = ""):
+        self._path = Path(path)
+        self._path.parent.mkdir(parents=True, exist_ok=True)
+        self._local = threading.local()
+        self._connections: list[sqlite3.Connection] = []
+        self._lock = threading.Lock()
+        if schema:
+            with self.connection() as conn:
+                conn.executescript(schema)
+
+    @property
+    def path(self) -> Path:
+        return self._path
+
+    def connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "connection", None)
+        if conn is None:
+            conn = sqlite3.connect(
+                self._path, timeout=30, check_same_thread=False)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("PRAGMA foreign_keys=ON")
+            self._local.connection = conn
+            with self._lock:
+                self._connections.append(conn)
+        return conn
+
+    def close(self) -> None:
+        with self._lock:
+            for conn in self._connections:
+                conn.close()
+            self._connections.clear()
+        self._local = threading.local()
+
+
+def date_filter(column: str, since: date | None, until: date | None) -> tuple[str, list[str]]:
+    """
+    Returns a WHERE clause bounding an ISO date column, inclusive, and its parameters.
+    """
+
+    clauses, params = [], []
+    if since:
+        clauses.append(f"{column} >= ?")
+        params.append(since.isoformat())
+    if until:
+        clauses.append(f"{column} <= ?")
+        params.append(until.isoformat())
+    return " AND ".join(clauses) or "1", params
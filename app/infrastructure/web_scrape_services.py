@@ -1,21 +1,39 @@
 import asyncio
 import json
 import logging
+import time
+from contextlib import asynccontextmanager
 from datetime import datetime
+from typing import TYPE_CHECKING, AsyncIterator
 
 from configuration import Settings
+from core.crawl import extract_links
 from core.domain import ScrapePageResult
+from core.metrics import REGISTRY
 from core.storage import Storage
+from core.tracing import TRACER
 from core.utils import StandardFileNaming
-from core.web_scrape import ScrapingResult, WebScraper
+from core.web_scrape import ScrapingResult, WebScraper, WebScrapeSession
 from injector import Binder, Module, inject
-from playwright.async_api import Page, async_playwright
+
+if TYPE_CHECKING:
+    from playwright.async_api import BrowserContext, Page
 
 DEFAULT_SUCCESS_STATUS = "success"
 DEFAULT_FAILED_STATUS = "failed"
+NOT_MODIFIED_STATUS = "not_modified"
 
 logger = logging.getLogger(__name__)
 
+SCRAPE_PAGES = REGISTRY.counter(
+    "scrape_pages_total", "Pages scraped by outcome", ("outcome",))
+SCRAPE_DURATION = REGISTRY.histogram(
+    "scrape_duration_seconds", "Duration of a page scrape including its retries", ("outcome",))
+SCRAPE_IN_FLIGHT = REGISTRY.gauge(
+    "scrape_in_flight", "Pages being scraped")
+SCRAPE_CONTENT_BYTES = REGISTRY.counter(
+    "scrape_content_bytes_total", "Bytes of text content extracted from scraped pages")
+
 
 class WebScraperModule(Module):
     def configure(self, binder: Binder) -> None:
@@ -27,57 +45,71 @@ class WebScraperGeneric(WebScraper):
     def __init__(self, storage: Storage, settings: Settings):
         self._storage = storage
         self._scrape_settings = settings.web_scrape_settings
+        self._collect_links = settings.crawl_settings.enabled
         logger.info(f"Scrape settings: {self._scrape_settings}")
         self._file_naming = StandardFileNaming()
 
-        self._total_requests = 0
-        self._successful_requests = 0
-        self._failed_requests = 0
-        self._failed_urls = []
-        self._successful_urls = []
-
     async def scrape_multiple(self, urls: list[str], file_path: str = None) -> ScrapingResult:
-        async with async_playwright() as p:
-            browser = await p.chromium.launch(headless=True)
-            context = await browser.new_context(
-                java_script_enabled=False,
-                viewport={'width': 1280, 'height': 720},
-                user_agent=self._scrape_settings.headers['User-Agent']
-            )
-            # Define a route interception to block images, media, fonts, and JavaScript files
-
-            async def route_intercept(route, request):
-                if request.resource_type in ["image", "media", "font", "script"]:
-                    await route.abort()
-                else:
-                    await route.continue_()
+        async with self.session() as session:
+            tasks = [asyncio.create_task(session.scrape(url, file_path))
+                     for url in urls]
+            results = await asyncio.gather(*tasks)
+        return self._get_statistics(results)
 
-            # Apply route interception at the context level so it affects all pages
-            await context.route("**/*", route_intercept)
+    def result_file_name(self, url: str, file_path: str = None) -> str:
+        folder_name = f"{self._scrape_settings.scraper_folder_name}/{DEFAULT_SUCCESS_STATUS}"
+        if file_path:
+            folder_name = f"{file_path}/{folder_name}"
+        return f"{folder_name}/{self._file_naming.clean_url_for_file(url)}_scraped.json"
 
-            sem = asyncio.Semaphore(self._scrape_settings.concurrent_limit)
+    @asynccontextmanager
+    async def session(self) -> AsyncIterator[WebScrapeSession]:
+        from playwright.async_api import async_playwright
 
-            async def process_url(url):
-                async with sem:
-                    page = None
-                    try:
-                        page = await context.new_page()
-                        result = await self._scrape_page(url, page, file_path)
+        async with async_playwright() as p:
+            browser = await p.chromium.launch(headless=True)
+            try:
+                context = await browser.new_context(
+                    java_script_enabled=False,
+                    viewport={'width': 1280, 'height': 720},
+                    user_agent=self._scrape_settings.headers['User-Agent']
+                )
+                # Define a route interception to block images, media, fonts, and JavaScript files
 
-                        return result
-                    finally:
-                        if page:
-                            await page.close()
+                async def route_intercept(route, request):
+                    if request.resource_type in ["image", "media", "font", "script"]:
+                        await route.abort()
+                    else:
+                        await route.continue_()
 
-            try:
-                tasks = [asyncio.create_task(process_url(url)) for url in urls]
-                await asyncio.gather(*tasks)
+                # Apply route interception at the context level so it affects all pages
+                await context.route("**/*", route_intercept)
+
+                yield PlaywrightScrapeSession(
+                    self, context, asyncio.Semaphore(self._scrape_settings.concurrent_limit))
             finally:
                 await browser.close()
-        return self._get_statistics()
 
-    async def _scrape_page(self, url: str, page: Page, file_path: str = None) -> ScrapePageResult:
-        self._total_requests += 1
+    async def _scrape_page(self, url: str, page: "Page", file_path: str = None,
+                           conditional_headers: dict[str, str] | None = None) -> ScrapePageResult:
+        with TRACER.span("scrape", url=url) as span, SCRAPE_IN_FLIGHT.track_in_progress():
+            started = time.perf_counter()
+            result = await self._load_page(url, page, file_path, conditional_headers)
+            if result.not_modified:
+                outcome = NOT_MODIFIED_STATUS
+            else:
+                outcome = DEFAULT_SUCCESS_STATUS if result.success else DEFAULT_FAILED_STATUS
+            span.set(outcome=outcome)
+        SCRAPE_DURATION.observe(time.perf_counter() - started, outcome=outcome)
+        SCRAPE_PAGES.inc(outcome=outcome)
+        if result.content:
+            SCRAPE_CONTENT_BYTES.inc(len(result.content.encode()))
+        return result
+
+    async def _load_page(self, url: str, page: "Page", file_path: str = None,
+                         conditional_headers: dict[str, str] | None = None) -> ScrapePageResult:
+        if conditional_headers:
+            await page.set_extra_http_headers(conditional_headers)
         for attempt in range(self._scrape_settings.retries):
             try:
                 # Handle popups
@@ -85,9 +117,25 @@ class WebScraperGeneric(WebScraper):
                     dialog.dismiss()))
                 page.on("popup", lambda popup: asyncio.create_task(popup.close()))
 
-                await page.goto(url,
-                                timeout=self._scrape_settings.timeout,
-                                wait_until='networkidle')
+                response = await page.goto(url,
+                                           timeout=self._scrape_settings.timeout,
+                                           wait_until='networkidle')
+                # the validators to revalidate the page with on its next refresh
+                headers = getattr(response, "headers", None)
+                headers = headers if isinstance(headers, dict) else {}
+                if response is not None and response.status == 304:
+                    logger.info(f"Page not modified: {url}")
+                    return ScrapePageResult(
+                        url=url,
+                        created_at=datetime.now(),
+                        title=None,
+                        content=None,
+                        success=True,
+                        error_message=None,
+                        etag=headers.get("etag"),
+                        last_modified=headers.get("last-modified"),
+                        not_modified=True,
+                    )
                 logger.info(f"Page loaded: {url}")
                 logger.info(f"Page title: {await page.title()}")
                 content = await self._extract_content(page)
@@ -97,20 +145,15 @@ class WebScraperGeneric(WebScraper):
                     title=await page.title(),
                     content=content,
                     success=True,
-                    error_message=None
+                    error_message=None,
+                    etag=headers.get("etag"),
+                    last_modified=headers.get("last-modified"),
                 )
+                if self._collect_links:
+                    result.links = extract_links(await page.content(), url)
 
-                self._successful_requests += 1
-                self._successful_urls.append(url)
-
-                status = DEFAULT_SUCCESS_STATUS if result.success else DEFAULT_FAILED_STATUS
-                folder_name = f"{self._scrape_settings.scraper_folder_name}/{status}"
-                if file_path:
-                    folder_name = f"{file_path}/{self._scrape_settings.scraper_folder_name}/{status}"
-
-                file_name = f"{folder_name}/{self._file_naming.clean_url_for_file(url)}_scraped.json"
-                await asyncio.to_thread(
-                    self._storage.write_json,
+                file_name = self.result_file_name(url, file_path)
+                await self._storage.awrite_json(
                     file_name,
                     result.model_dump()
                 )
@@ -120,8 +163,6 @@ class WebScraperGeneric(WebScraper):
                 if attempt < self._scrape_settings.retries - 1:
                     await asyncio.sleep(2 ** attempt)
                 else:
-                    self._failed_requests += 1
-                    self._failed_urls.append(url)
                     return ScrapePageResult(
                         url=url,
                         created_at=datetime.now(),
@@ -131,7 +172,7 @@ class WebScraperGeneric(WebScraper):
                         error_message=str(e)
                     )
 
-    async def _extract_content(self, page: Page) -> str:
+    async def _extract_content(self, page: "Page") -> str:
         """Efficient content extraction that stops at first valid selector"""
         for selector in self._scrape_settings.main_content_selectors:
             selector = selector.strip()
@@ -181,12 +222,51 @@ class WebScraperGeneric(WebScraper):
         text = ' '.join(text.split())
         return text.strip()
 
-    def _get_statistics(self) -> ScrapingResult:
-        """Get scraping statistics"""
+    def _get_statistics(self, results: list[ScrapePageResult]) -> ScrapingResult:
+        """Get the scraping statistics of one batch of results"""
+        successful_urls = [result.url for result in results if result.success]
+        failed_urls = [result.url for result in results if not result.success]
         return ScrapingResult(
-            total_requests=self._total_requests,
-            successful_requests=self._successful_requests,
-            failed_requests=self._failed_requests,
-            failed_urls=self._failed_urls,
-            successful_urls=self._successful_urls
+            total_requests=len(results),
+            successful_requests=len(successful_urls),
+            failed_requests=len(failed_urls),
+            failed_urls=failed_urls,
+            successful_urls=successful_urls
         )
+
+
+class PlaywrightScrapeSession(WebScrapeSession):
+    """
+    Scrapes each page in its own tab of a shared browser context.
+    """
+
+    def __init__(self, scraper: WebScraperGeneric, context: "BrowserContext", semaphore: asyncio.Semaphore):
+        self._scraper = scraper
+        self._context = context
+        self._semaphore = semaphore
+
+    async def scrape(self, url: str, file_path: str = None) -> ScrapePageResult:
+        async with self._semaphore:
+            page = None
+            try:
+                page = await self._context.new_page()
+                return await self._scraper._scrape_page(url, page, file_path)
+            finally:
+                if page:
+                    await page.close()
+
+    async def scrape_if_modified(self, url: str, file_path: str = None, etag: str | None = None,
+                                 last_modified: str | None = None) -> ScrapePageResult:
+        headers = {}
+        if etag:
+            headers["If-None-Match"] = etag
+        if last_modified:
+            headers["If-Modified-Since"] = last_modified
+        async with self._semaphore:
+            page = None
+            try:
+                page = await self._context.new_page()
+                return await self._scraper._scrape_page(url, page, file_path, headers)
+            finally:
+                if page:
+                    await page.close()
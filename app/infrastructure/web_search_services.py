@@ -5,12 +5,22 @@ from datetime import datetime
 
 from configuration import Settings
 from core.domain import SearchProvider
+from core.metrics import REGISTRY
 from core.storage import Storage
+from core.tracing import TRACER
 from core.utils import StandardFileNaming
 from core.web_search import SearchEngine, SearchResult
-from ddgs import DDGS
 from injector import Binder, Module, inject
 
+from .discovery_services import SitemapSearch
+
+SEARCH_REQUESTS = REGISTRY.counter(
+    "search_requests_total", "Searches by engine and whether they found results", ("engine", "outcome"))
+SEARCH_RESULTS = REGISTRY.counter(
+    "search_results_total", "Search results returned", ("engine",))
+SEARCH_DURATION = REGISTRY.histogram(
+    "search_duration_seconds", "Duration of a search including its retries", ("engine",))
+
 
 class WebSearchModule(Module):
     def __init__(self, search_engine: str):
@@ -25,9 +35,12 @@ class WebSearchModule(Module):
             binder.bind(SearchEngine, to=GoogleSearch)
         elif search_engine == SearchProvider.DUCKDUCKGO:
             binder.bind(SearchEngine, to=DuckDuckGoSearch)
+        elif search_engine == SearchProvider.SITEMAP:
+            binder.bind(SearchEngine, to=SitemapSearch)
         else:
             raise ValueError(
-                f"Invalid search engine: {search_engine}. Must be one of: {SearchProvider.GOOGLE}, {SearchProvider.DUCKDUCKGO}")
+                f"Invalid search engine: {search_engine}. Must be one of: {SearchProvider.GOOGLE}, "
+                f"{SearchProvider.DUCKDUCKGO}, {SearchProvider.SITEMAP}")
 
 
 class GoogleSearch(SearchEngine):
@@ -66,10 +79,21 @@ class DuckDuckGoSearch(SearchEngine):
         self._file_naming = StandardFileNaming()
 
         # Create the DDGS client
+        from ddgs import DDGS
+
         self._ddgs = DDGS(timeout=self._search_timeout)
 
     async def search(self, query: str, file_path: str = None) -> list[SearchResult] | None:
         """Search DuckDuckGo for the given query"""
+        with TRACER.span("search", engine="duckduckgo", query=query) as span, \
+                SEARCH_DURATION.time(engine="duckduckgo"):
+            results = await self._search(query, file_path)
+            span.set(results=len(results or []))
+        SEARCH_REQUESTS.inc(engine="duckduckgo", outcome="results" if results else "no_results")
+        SEARCH_RESULTS.inc(len(results or []), engine="duckduckgo")
+        return results
+
+    async def _search(self, query: str, file_path: str = None) -> list[SearchResult] | None:
         try:
             logging.info(f"Starting DuckDuckGo search for query: {query}")
 
@@ -109,7 +133,7 @@ class DuckDuckGoSearch(SearchEngine):
                         folder_name = f"{file_path}/{self._settings.web_search_settings.search_folder_name}"
 
                     file_name = f"{folder_name}/{self._file_naming.clean_url_for_file(result.get('href', ''))}_search.json"
-                    self._storage.write_json(
+                    await self._storage.awrite_json(
                         file_name,
                         search_result.model_dump()
                     )
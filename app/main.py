@@ -3,18 +3,21 @@
 Simple script to test the search functionality using ServiceCollection.
 Run this script directly to perform a search and see the results.
 """
+import argparse
 import asyncio
+import contextlib
 import logging
 import os
-import sys
 from datetime import datetime
+from pathlib import Path
 
 from configuration import Settings
-from core.chat_model import ChatModelProvider
 from core.content_analysis import ContentAnalysisService
+from core.pipeline import PipelineRunner
 from core.storage import Storage
-from core.web_scrape import WebScraper
-from core.web_search import SearchEngine
+from core.utils import StandardFileNaming
+from infrastructure.metrics_exporter import MetricsExporter
+from infrastructure.profiling import RunProfiler
 from infrastructure.service_collection import ServiceCollection
 
 # Configure logging to show all messages
@@ -25,21 +28,29 @@ logging.basicConfig(
 )
 
 
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Search, scrape and analyze a query")
+    parser.add_argument("query", nargs="?", default="python programming")
+    parser.add_argument("--profile", action="store_true",
+                        help="Profile the run and write the reports next to its manifest")
+    return parser.parse_args()
+
+
 async def main():
     """Run a test search and print the results"""
+    args = parse_args()
+
     # Initialize services
     service_provider = ServiceCollection.add_services()
 
-    # Get the configured search engine from the service provider
     settings = service_provider.get(Settings)
     storage = service_provider.get(Storage)
-    search_engine = service_provider.get(SearchEngine)
-    web_scraper = service_provider.get(WebScraper)
+    metrics = service_provider.get(MetricsExporter)
+    metrics.start()
     content_analysis = service_provider.get(ContentAnalysisService)
-    chat_model = service_provider.get(ChatModelProvider)
+    pipeline = service_provider.get(PipelineRunner)
 
-    # Get search query from command line or use default
-    query = sys.argv[1] if len(sys.argv) > 1 else "python programming"
+    query = args.query
     print(f"Searching for: {query}")
 
     now = datetime.now()
@@ -48,37 +59,28 @@ async def main():
     day = now.strftime("%d")
     folder_path = f"{year}/{month}/{day}"
 
-    # Perform search
-    results = await search_engine.search(query, folder_path)
-
-    # Print results
-    if results:
-        print(f"\nFound {len(results)} results:")
-        for i, result in enumerate(results, 1):
-            print(f"\n--- Result {i} ---")
-            print(f"Title: {result.title}")
-            print(f"URL: {result.url}")
-            print(f"Description: {result.description[:100]}...")
-    else:
-        print("No results found or an error occurred.")
-    if results:
-        scraping_result = await web_scraper.scrape_multiple(
-            [result.url for result in results], folder_path)
-        print(scraping_result)
+    # Re-running the same query on the same day resumes the run from its manifest
+    run_id = f"{year}-{month}-{day}-{StandardFileNaming().clean_url_for_file(query)}"
+    manifest = pipeline.open_manifest(run_id)
 
-        sucess_scrape_path = f"{folder_path}/{settings.web_scrape_settings.scraper_folder_name}/success"
-        url_list = storage.list_all_files(sucess_scrape_path)
+    # Search, scrape and analyze as one pipeline: pages are analyzed while others are still scraped
+    profile_dir = Path(settings.pipeline_settings.manifest_path) / f"{run_id}_profile"
+    profiler = RunProfiler(profile_dir) if args.profile else contextlib.nullcontext()
+    try:
+        async with profiler:
+            result = await pipeline.run([query], folder_path, manifest)
+    finally:
+        manifest.close()
+    print(result.model_dump_json(indent=4))
+    print(manifest.summary())
+    print(content_analysis.output_stats.summary())
+    if args.profile:
+        print(f"Profile written to {profile_dir}")
+    if settings.content_analysis_settings.cascade_enabled:
+        print(content_analysis.cascade_stats.summary())
 
-        if len(url_list) > 0:
-            for url in url_list:
-                print(f"Analyzing {url}")
-                file_name = url.split("/")[-1]
-                content = storage.read_json(url)
-                analysis = content_analysis.analyze_content(
-                    file_name, content, chat_model, folder_path)
-                print(analysis)
-        else:
-            print("No successful scrapes found.")
+    await storage.aclose()
+    metrics.close()
 
 
 if __name__ == "__main__":
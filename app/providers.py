@@ -0,0 +1,90 @@
+#!/usr/bin/env python
+"""
+Queries the service provider entities, which are resolved as analyses are stored.
+`build` resolves the analyses already in storage again, from scratch.
+
+Usage: python providers.py build [--since YYYY-MM-DD] [--until YYYY-MM-DD]
+       python providers.py top [--month | --since .. --until ..] [--limit N]
+       python providers.py show <name or domain>
+       python providers.py stats
+"""
+import argparse
+import json
+import logging
+from datetime import date, datetime
+
+from configuration import Settings
+from core.entity_resolution import EntityResolver
+from core.storage import Storage
+from infrastructure.service_collection import ServiceCollection
+
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+    handlers=[logging.StreamHandler()]
+)
+
+
+def parse_date(value: str) -> date:
+    return datetime.strptime(value, "%Y-%m-%d").date()
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Query the service provider entities")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    def with_dates(command: argparse.ArgumentParser) -> argparse.ArgumentParser:
+        command.add_argument("--since", type=parse_date)
+        command.add_argument("--until", type=parse_date)
+        command.add_argument("--month", action="store_true", help="Since the first day of this month")
+        return command
+
+    with_dates(commands.add_parser("build", help="Resolve the analyses in storage from scratch"))
+    with_dates(commands.add_parser("top", help="The most mentioned providers")).add_argument(
+        "--limit", type=int, default=20)
+    commands.add_parser("show", help="The entities known by a name or domain").add_argument("name")
+    commands.add_parser("stats", help="Print the number of mentions and entities")
+    args = parser.parse_args()
+    if getattr(args, "month", False):
+        args.since = date.today().replace(day=1)
+    return args
+
+
+def main():
+    args = parse_args()
+    service_provider = ServiceCollection.add_services()
+    resolver = service_provider.get(EntityResolver)
+    store = resolver.store
+
+    try:
+        if args.command == "build":
+            settings = service_provider.get(Settings)
+            storage = service_provider.get(Storage)
+            store.clear()
+            resolved, failed = 0, 0
+            for name in storage.iter_files(
+                    "", recursive=True, suffix="_content_analysis.json",
+                    date_from=args.since.isoformat() if args.since else None,
+                    date_to=args.until.isoformat() if args.until else None):
+                if not name.rpartition("/")[0].endswith(f"/{settings.content_analysis_path}"):
+                    continue
+                try:
+                    resolver.record(name, storage.read_json(name))
+                    resolved += 1
+                except Exception as e:
+                    logging.error(f"Could not resolve the providers of {name}: {str(e)}")
+                    failed += 1
+            print(json.dumps({"analyses": resolved, "failed": failed, **store.stats()}, indent=4))
+        elif args.command == "stats":
+            print(json.dumps(store.stats(), indent=4))
+        elif args.command == "show":
+            print(json.dumps([entity.model_dump() for entity in store.find(args.name)], indent=4))
+        else:
+            entities = store.top(args.since, args.until, args.limit)
+            print(json.dumps([entity.model_dump(exclude_none=True) for entity in entities], indent=4))
+    finally:
+        store.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+#!/usr/bin/env python
+"""
+Keeps tracked pages fresh: each run refreshes the pages that are due, revalidating them with
+their ETag and Last-Modified, and sends only the changed ones to analysis.
+
+Usage: python recrawl.py track <urls file>
+       python recrawl.py untrack <url> [<url> ...]
+       python recrawl.py run [--limit N] [--loop SECONDS]
+       python recrawl.py stats
+"""
+import argparse
+import asyncio
+import json
+import logging
+import time
+from pathlib import Path
+
+from core.recrawl import RecrawlScheduler
+from core.storage import Storage
+from infrastructure.metrics_exporter import MetricsExporter
+from infrastructure.service_collection import ServiceCollection
+
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+    handlers=[logging.StreamHandler()]
+)
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Refresh tracked pages at adaptive intervals")
+    commands = parser.add_subparsers(dest="command", required=True)
+    track = commands.add_parser("track", help="Track the URLs of a file, one per line")
+    track.add_argument("file", type=Path)
+    untrack = commands.add_parser("untrack", help="Stop refreshing the URLs")
+    untrack.add_argument("urls", nargs="+")
+    run = commands.add_parser("run", help="Refresh the pages that are due")
+    run.add_argument("--limit", type=int)
+    run.add_argument("--loop", type=float, metavar="SECONDS",
+                     help="Keep running, checking for due pages every SECONDS")
+    commands.add_parser("stats", help="Print the number of tracked and due pages")
+    return parser.parse_args()
+
+
+async def main():
+    args = parse_args()
+    service_provider = ServiceCollection.add_services()
+    scheduler = service_provider.get(RecrawlScheduler)
+
+    try:
+        if args.command == "track":
+            urls = [line.strip() for line in args.file.read_text().splitlines()
+                    if line.strip() and not line.startswith("#")]
+            print(f"Tracking {scheduler.track(urls)} new pages")
+        elif args.command == "untrack":
+            print(f"Untracked {sum(scheduler.store.untrack(url) for url in args.urls)} pages")
+        elif args.command == "stats":
+            print(json.dumps(scheduler.store.stats(time.time()), indent=4))
+        elif args.command == "run":
+            storage = service_provider.get(Storage)
+            metrics = service_provider.get(MetricsExporter)
+            metrics.start()
+            try:
+                while True:
+                    summary = await scheduler.run_due(args.limit)
+                    print(summary.model_dump_json(indent=4))
+                    if args.loop is None:
+                        break
+                    await asyncio.sleep(args.loop)
+            finally:
+                await storage.aclose()
+                metrics.close()
+    finally:
+        scheduler.store.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
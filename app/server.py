@@ -0,0 +1,43 @@
+#!/usr/bin/env python
+"""
+Serves the job API: a long-running process that keeps the browser, the search client
+and the LLM clients warm, so submitted jobs start in milliseconds.
+
+Usage: python server.py [--host HOST] [--port PORT]
+
+    curl -X POST localhost:8080/jobs/search -H 'Content-Type: application/json' -d '{"items": ["python"]}'
+    curl localhost:8080/jobs/<id>
+    curl -N localhost:8080/jobs/<id>/results
+"""
+import argparse
+import logging
+
+import uvicorn
+from api.app import create_app
+from configuration import Settings
+from infrastructure.service_collection import ServiceCollection
+
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+    handlers=[logging.StreamHandler()]
+)
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Serve the search, scrape and analyze job API")
+    parser.add_argument("--host")
+    parser.add_argument("--port", type=int)
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    service_provider = ServiceCollection.add_services()
+    api_settings = service_provider.get(Settings).api_settings
+    uvicorn.run(create_app(service_provider),
+                host=args.host or api_settings.host, port=args.port or api_settings.port)
+
+
+if __name__ == "__main__":
+    main()
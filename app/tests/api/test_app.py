@@ -0,0 +1,71 @@
+# app/tests/api/test_app.py
+
+import json
+from unittest.mock import AsyncMock, Mock
+
+import pytest
+from api.app import create_app
+from core.analysis_index import AnalysisIndex
+from core.job_service import JobService
+from core.storage import Storage
+from fastapi.testclient import TestClient
+from infrastructure.metrics_exporter import MetricsExporter
+from infrastructure.sqlite_analysis_index import SQLiteAnalysisIndex
+from injector import Binder, Injector
+from tests.builders.build import Build
+
+
+@pytest.fixture
+def client(tmp_path):
+    storage = Mock()
+    storage.aclose = AsyncMock()
+    index = SQLiteAnalysisIndex(settings=Build.settings(
+        analysis_index_sqlite_path=str(tmp_path / "analysis_index.db")))
+    index.record("2024/06/01/a.json", {
+        "url": "https://riverside.org/volunteers", "title": "Volunteers", "analysis_date": "2024-06-01T12:00:00",
+        "service_providers": [{"name": "Bloomerang", "pain_points": [{
+            "description": "Volunteer shifts are scheduled by email", "category": "volunteer_and_recruitment_management",
+            "source_quote": "we email everyone"}]}],
+    })
+
+    def configure(binder: Binder) -> None:
+        binder.bind(JobService, to=Build.job_service())
+        binder.bind(Storage, to=storage)
+        binder.bind(MetricsExporter, to=MetricsExporter(settings=Build.settings()))
+        binder.bind(AnalysisIndex, to=index)
+
+    with TestClient(create_app(Injector([configure]))) as client:
+        yield client
+
+
+class TestJobApi:
+    """Test the HTTP job API"""
+
+    def test_submits_a_job_and_streams_its_results(self, client):
+        """Test the job lifecycle over HTTP"""
+        response = client.post("/jobs/scrape", json={"items": ["https://example.com/1"]})
+        assert response.status_code == 202
+        job_id = response.json()["id"]
+
+        with client.stream("GET", f"/jobs/{job_id}/results") as stream:
+            results = [json.loads(line) for line in stream.iter_lines() if line]
+
+        assert [(r["item"], r["success"]) for r in results] == [("https://example.com/1", True)]
+        assert client.get(f"/jobs/{job_id}").json()["state"] == "succeeded"
+
+    def test_rejects_unknown_jobs(self, client):
+        """Test the error responses"""
+        assert client.post("/jobs/crawl", json={"items": ["x"]}).status_code == 422
+        assert client.get("/jobs/missing").status_code == 404
+        assert client.get("/jobs/missing/results").status_code == 404
+
+    def test_queries_the_analysis_index(self, client):
+        """Test the aggregate and full-text endpoints of the analysis index"""
+        categories = client.get("/index/categories", params={"since": "2024-06-01"}).json()
+        hits = client.get("/index/search", params={"q": "volunteer scheduling"}).json()
+
+        assert [(c["key"], c["pain_points"]) for c in categories] == [("volunteer_and_recruitment_management", 1)]
+        assert [hit["url"] for hit in hits] == ["https://riverside.org/volunteers"]
+        assert client.get("/index/categories", params={"since": "2024-07-01"}).json() == []
+        assert client.get("/index/clusters").json() == []
+        assert client.get("/index/tags").status_code == 404
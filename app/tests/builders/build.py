@@ -2,7 +2,10 @@
 from configuration import Settings
 from configuration.web_search_settings import WebSearchSettings
 from core.domain import ScrapePageResult, SearchResult
+from core.job_service import JobService
 
+from .chat_model_builder import StubChatModelProvider, build_chat_model_provider
+from .job_service_builder import FakeWebScraper, build_job_service
 from .settings_builder import build_settings, build_web_search_settings
 from .web_scrape_builder import MockResponse, build_mock_response, build_scrape_result
 from .web_search_builder import build_default_search_result
@@ -35,3 +38,18 @@ class Build:
     def scrape_result(**kwargs) -> ScrapePageResult:
         """Factory method for scrape results"""
         return build_scrape_result(**kwargs)
+
+    @staticmethod
+    def chat_model_provider(**kwargs) -> StubChatModelProvider:
+        """Factory method for stub chat model providers"""
+        return build_chat_model_provider(**kwargs)
+
+    @staticmethod
+    def web_scraper(**kwargs) -> FakeWebScraper:
+        """Factory method for fake web scrapers"""
+        return FakeWebScraper(**kwargs)
+
+    @staticmethod
+    def job_service(**kwargs) -> JobService:
+        """Factory method for job services on fake search and scrape services"""
+        return build_job_service(**kwargs)
@@ -0,0 +1,57 @@
+from typing import Any
+
+from core.chat_model import ChatModelProvider
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, BaseMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+
+
+class StubChatModel(BaseChatModel):
+    """Chat model returning queued responses, recording the prompts it received"""
+
+    responses: list[AIMessage]
+    prompts: list[str] = []
+    bound_tools: list[Any] = []
+
+    @property
+    def _llm_type(self) -> str:
+        return "stub"
+
+    def _generate(self, messages: list[BaseMessage], stop=None, run_manager=None, **kwargs) -> ChatResult:
+        self.prompts.append("\n".join(str(m.content) for m in messages))
+        message = self.responses.pop(0) if len(
+            self.responses) > 1 else self.responses[0]
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+    def bind_tools(self, tools, *, tool_choice=None, **kwargs):
+        self.bound_tools.extend(tools)
+        return self
+
+
+class StubChatModelProvider(ChatModelProvider):
+    """ChatModelProvider handing out a single stub chat model"""
+
+    def __init__(self, chat_model: StubChatModel, host: str = "stub"):
+        self.chat_model = chat_model
+        self.host = host
+
+    def can_handle(self, chat_model_settings=None) -> bool:
+        return True
+
+    def get_chat_model(self, chat_model_settings=None, verbose: bool = False) -> BaseChatModel:
+        return self.chat_model
+
+
+def build_chat_model_provider(
+    *,  # Force keyword arguments
+    responses: list[AIMessage | str] | None = None,
+) -> StubChatModelProvider:
+    """Build a chat model provider whose model replies with the given responses
+
+    Args:
+        responses: Messages returned in order, strings become plain text replies.
+            The last response is repeated once the others are used up.
+    """
+    messages = [AIMessage(content=r) if isinstance(r, str) else r
+                for r in (responses or ["{}"])]
+    return StubChatModelProvider(StubChatModel(responses=messages, prompts=[], bound_tools=[]))
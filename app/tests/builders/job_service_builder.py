@@ -0,0 +1,81 @@
+# app/tests/builders/job_service_builder.py
+
+import asyncio
+from contextlib import asynccontextmanager
+from unittest.mock import AsyncMock, Mock
+
+from core.job_service import JobService
+from core.storage import Storage
+from core.web_scrape import WebScraper, WebScrapeSession
+from core.web_search import SearchEngine
+
+from .chat_model_builder import build_chat_model_provider
+from .settings_builder import build_settings
+from .web_scrape_builder import build_scrape_result
+from .web_search_builder import build_default_search_result
+
+
+class FakeSearchEngine(SearchEngine):
+    """Search engine returning one result per query"""
+
+    async def search(self, query: str, file_path: str = None):
+        return [build_default_search_result(url=f"https://example.com/{query}")]
+
+
+class FakeScrapeSession(WebScrapeSession):
+    """Scrape session failing the URLs containing "error", recording the URLs it scraped"""
+
+    def __init__(self, delay: float):
+        self._delay = delay
+        self.scraped = []
+
+    async def scrape(self, url: str, file_path: str = None):
+        await asyncio.sleep(self._delay)
+        self.scraped.append(url)
+        return build_scrape_result(url=url, success="error" not in url,
+                                   error_message="boom" if "error" in url else None)
+
+
+class FakeWebScraper(WebScraper):
+    """Web scraper recording the sessions it opened"""
+
+    def __init__(self, delay: float = 0.01):
+        self._delay = delay
+        self.sessions = []
+
+    def result_file_name(self, url: str, file_path: str = None) -> str:
+        return f"{file_path}/scrape/success/{url.rsplit('/', 1)[-1]}_scraped.json"
+
+    @asynccontextmanager
+    async def session(self):
+        session = FakeScrapeSession(self._delay)
+        self.sessions.append(session)
+        yield session
+
+
+def build_job_service(
+    web_scraper: WebScraper | None = None,
+    storage: Storage | None = None,
+    **kwargs
+) -> JobService:
+    """Build a job service on fake search and scrape services for testing
+
+    Args:
+        web_scraper: The web scraper, a FakeWebScraper by default
+        storage: The storage, by default one where no page has been scraped yet
+        **kwargs: Settings overrides
+    """
+    content_analysis = Mock()
+    content_analysis.analyze_content.side_effect = lambda url, *_: {"url": url}
+    if storage is None:
+        storage = Mock()
+        storage.aread_json = AsyncMock(side_effect=FileNotFoundError)
+        storage.aflush = AsyncMock()
+    return JobService(
+        settings=build_settings(**kwargs),
+        search_engine=FakeSearchEngine(),
+        web_scraper=web_scraper or FakeWebScraper(),
+        content_analysis=content_analysis,
+        chat_model_provider=build_chat_model_provider(),
+        storage=storage,
+    )
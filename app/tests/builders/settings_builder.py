@@ -1,7 +1,19 @@
 from configuration import (
+    AnalysisIndexSettings,
     AnthropicSettings,
+    ApiSettings,
+    AwsSettings,
+    ClusteringSettings,
+    ContentAnalysisSettings,
+    CrawlSettings,
+    DiscoverySettings,
+    EntityResolutionSettings,
+    JobQueueSettings,
     LLMSettings,
     LocalSettings,
+    MetricsSettings,
+    PipelineSettings,
+    RecrawlSettings,
     Settings,
     WebScrapeSettings,
     WebSearchSettings,
@@ -36,8 +48,17 @@ def build_settings(**kwargs) -> Settings:
 
     # Create base settings dictionary
     settings_dict = {
-        "APP_HOST": "local",
-        "LOCAL_STORAGE_PATH": "/tmp/test_storage",
+        "APP_HOST": kwargs.get("app_host", "local"),
+        "LOCAL_STORAGE_PATH": kwargs.get("local_storage_path", "/tmp/test_storage"),
+        "LOCAL_STORAGE_BACKEND": kwargs.get("local_storage_backend", "file"),
+        "LOCAL_STORAGE_WRITE_BATCH_SIZE": str(kwargs.get("local_storage_write_batch_size", 32)),
+        "LOCAL_STORAGE_FLUSH_INTERVAL_MS": str(kwargs.get("local_storage_flush_interval_ms", 50)),
+
+        # AWS settings
+        "AWS_S3_BUCKET": kwargs.get("aws_s3_bucket", "test-bucket"),
+        "AWS_S3_PREFIX": kwargs.get("aws_s3_prefix", ""),
+        "AWS_S3_MULTIPART_THRESHOLD_MB": str(kwargs.get("aws_s3_multipart_threshold_mb", 16)),
+        "AWS_S3_MULTIPART_CHUNK_MB": str(kwargs.get("aws_s3_multipart_chunk_mb", 8)),
 
         # Search settings
         "SEARCH_ENGINE": kwargs.get("search_engine", SearchProvider.DUCKDUCKGO),
@@ -55,7 +76,8 @@ def build_settings(**kwargs) -> Settings:
         "SCRAPER_HEADERS": '{"User-Agent": "Test Agent"}',
 
         # LLM settings
-        "LLM_HOST": "anthropic",
+        "LLM_HOST": kwargs.get("llm_host", "anthropic"),
+        "LLM_ROUTING_HOSTS": kwargs.get("llm_routing_hosts", ""),
         "LLM_PROVIDER": "anthropic",
         "LLM_MODEL_NAME": "claude-3-5-sonnet-20240620",
         "LLM_STREAMING": "true",
@@ -65,7 +87,86 @@ def build_settings(**kwargs) -> Settings:
         "LLM_MAX_TOKENS": "1000",
 
         # Anthropic settings
-        "ANTHROPIC_API_KEY": "test_api_key"
+        "ANTHROPIC_API_KEY": "test_api_key",
+        "ANTHROPIC_ENDPOINTS": ",".join(kwargs.get("anthropic_endpoints", {})),
+        **{f"ANTHROPIC_{name.upper()}_{key}": value
+           for name, endpoint in kwargs.get("anthropic_endpoints", {}).items()
+           for key, value in endpoint.items()},
+
+        # Content analysis settings
+        "CONTENT_ANALYSIS_PATH": "test_content_analysis",
+        "CONTENT_ANALYSIS_OUTPUT_MODE": kwargs.get("content_analysis_output_mode", "parser"),
+        "CONTENT_ANALYSIS_CASCADE_ENABLED": str(kwargs.get("content_analysis_cascade_enabled", False)).lower(),
+        "CONTENT_ANALYSIS_TRIAGE_THRESHOLD": str(kwargs.get("content_analysis_triage_threshold", 0.5)),
+
+        # Pipeline settings
+        "PIPELINE_SCRAPE_CONCURRENCY": str(kwargs.get("pipeline_scrape_concurrency", 2)),
+        "PIPELINE_ANALYSIS_CONCURRENCY": str(kwargs.get("pipeline_analysis_concurrency", 2)),
+        "PIPELINE_QUEUE_SIZE": str(kwargs.get("pipeline_queue_size", 4)),
+        "PIPELINE_MANIFEST_PATH": kwargs.get("pipeline_manifest_path", "/tmp/test_runs"),
+
+        # Job queue settings
+        "JOB_QUEUE_SQLITE_PATH": kwargs.get("job_queue_sqlite_path", "/tmp/test_queue.db"),
+        "JOB_QUEUE_LEASE_SECONDS": str(kwargs.get("job_queue_lease_seconds", 300)),
+        "JOB_QUEUE_MAX_ATTEMPTS": str(kwargs.get("job_queue_max_attempts", 3)),
+        "JOB_QUEUE_RETRY_DELAY_SECONDS": str(kwargs.get("job_queue_retry_delay_seconds", 0)),
+        "JOB_QUEUE_POLL_SECONDS": str(kwargs.get("job_queue_poll_seconds", 0.01)),
+
+        # Metrics settings
+        "METRICS_ENABLED": str(kwargs.get("metrics_enabled", False)).lower(),
+        "METRICS_HTTP_PORT": (str(kwargs["metrics_http_port"])
+                              if kwargs.get("metrics_http_port") is not None else None),
+        "METRICS_FILE_PATH": kwargs.get("metrics_file_path", "/tmp/test_metrics/metrics.prom"),
+        "METRICS_TRACES_PATH": kwargs.get("metrics_traces_path", "/tmp/test_metrics/traces.jsonl"),
+        "METRICS_EXPORT_INTERVAL_SECONDS": str(kwargs.get("metrics_export_interval_seconds", 15)),
+
+        # API settings
+        "API_HOST": kwargs.get("api_host", "127.0.0.1"),
+        "API_PORT": str(kwargs.get("api_port", 8080)),
+        "API_FINISHED_JOBS": str(kwargs.get("api_finished_jobs", 200)),
+        "API_WARM_BROWSER": str(kwargs.get("api_warm_browser", False)).lower(),
+
+        # Recrawl settings
+        "RECRAWL_SQLITE_PATH": kwargs.get("recrawl_sqlite_path", "/tmp/test_recrawl.db"),
+        "RECRAWL_INITIAL_INTERVAL_HOURS": str(kwargs.get("recrawl_initial_interval_hours", 24)),
+        "RECRAWL_MIN_INTERVAL_HOURS": str(kwargs.get("recrawl_min_interval_hours", 1)),
+        "RECRAWL_MAX_INTERVAL_HOURS": str(kwargs.get("recrawl_max_interval_hours", 24 * 30)),
+        "RECRAWL_INTERVAL_FACTOR": str(kwargs.get("recrawl_interval_factor", 2)),
+        "RECRAWL_BATCH_SIZE": str(kwargs.get("recrawl_batch_size", 100)),
+
+        # Crawl settings
+        "CRAWL_ENABLED": str(kwargs.get("crawl_enabled", False)).lower(),
+        "CRAWL_MAX_DEPTH": str(kwargs.get("crawl_max_depth", 2)),
+        "CRAWL_MAX_PAGES_PER_SEED": str(kwargs.get("crawl_max_pages_per_seed", 10)),
+        "CRAWL_MAX_PAGES_PER_DOMAIN": str(kwargs.get("crawl_max_pages_per_domain", 30)),
+        "CRAWL_MIN_RELEVANCE": str(kwargs.get("crawl_min_relevance", 0)),
+
+        # Discovery settings
+        "DISCOVERY_CONCURRENCY": str(kwargs.get("discovery_concurrency", 4)),
+        "DISCOVERY_TIMEOUT": str(kwargs.get("discovery_timeout", 5)),
+        "DISCOVERY_MAX_URLS": str(kwargs.get("discovery_max_urls", 1000)),
+        "DISCOVERY_MAX_DOCUMENTS": str(kwargs.get("discovery_max_documents", 50)),
+        "DISCOVERY_MAX_DOCUMENT_MB": str(kwargs.get("discovery_max_document_mb", 50)),
+        "DISCOVERY_SINCE_DAYS": str(kwargs.get("discovery_since_days", "")),
+        "DISCOVERY_INCLUDE_PATHS": ",".join(kwargs.get("discovery_include_paths", [])),
+        "DISCOVERY_EXCLUDE_PATHS": ",".join(kwargs.get("discovery_exclude_paths", [])),
+
+        # Analysis index settings
+        "ANALYSIS_INDEX_ENABLED": str(kwargs.get("analysis_index_enabled", False)).lower(),
+        "ANALYSIS_INDEX_SQLITE_PATH": kwargs.get("analysis_index_sqlite_path", "/tmp/test_analysis_index.db"),
+
+        # Entity resolution settings
+        "ENTITY_RESOLUTION_ENABLED": str(kwargs.get("entity_resolution_enabled", False)).lower(),
+        "ENTITY_SQLITE_PATH": kwargs.get("entity_sqlite_path", "/tmp/test_entities.db"),
+        "ENTITY_MATCH_THRESHOLD": str(kwargs.get("entity_match_threshold", 0.9)),
+        "ENTITY_MAX_CANDIDATES": str(kwargs.get("entity_max_candidates", 50)),
+
+        # Clustering settings
+        "CLUSTERING_SIMILARITY_THRESHOLD": str(kwargs.get("clustering_similarity_threshold", 0.65)),
+        "CLUSTERING_DIMENSIONS": str(kwargs.get("clustering_dimensions", 256)),
+        "CLUSTERING_LSH_TABLES": str(kwargs.get("clustering_lsh_tables", 16)),
+        "CLUSTERING_LSH_BITS": str(kwargs.get("clustering_lsh_bits", 8)),
+        "CLUSTERING_NEIGHBOURS": str(kwargs.get("clustering_neighbours", 10)),
     }
 
     # Create a Settings instance without calling __init__
@@ -78,7 +179,21 @@ def build_settings(**kwargs) -> Settings:
     settings._web_search_settings = WebSearchSettings(settings_dict)
     settings._web_scrape_settings = WebScrapeSettings(settings_dict)
     settings._local_settings = LocalSettings(settings_dict)
+    settings._aws_settings = AwsSettings(settings_dict)
     settings._llm_settings = LLMSettings(settings_dict)
     settings._anthropic_settings = AnthropicSettings(settings_dict)
+    settings._content_analysis_path = settings_dict["CONTENT_ANALYSIS_PATH"]
+    settings._content_analysis_settings = ContentAnalysisSettings(
+        settings_dict)
+    settings._pipeline_settings = PipelineSettings(settings_dict)
+    settings._job_queue_settings = JobQueueSettings(settings_dict)
+    settings._metrics_settings = MetricsSettings(settings_dict)
+    settings._api_settings = ApiSettings(settings_dict)
+    settings._recrawl_settings = RecrawlSettings(settings_dict)
+    settings._crawl_settings = CrawlSettings(settings_dict)
+    settings._discovery_settings = DiscoverySettings(settings_dict)
+    settings._analysis_index_settings = AnalysisIndexSettings(settings_dict)
+    settings._entity_resolution_settings = EntityResolutionSettings(settings_dict)
+    settings._clustering_settings = ClusteringSettings(settings_dict)
 
     return settings
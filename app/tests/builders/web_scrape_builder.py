@@ -3,7 +3,7 @@
 from datetime import datetime
 from typing import Any
 
-from core.domain import ScrapePageResult
+from core.domain import PageLink, ScrapePageResult
 
 
 class MockResponse:
@@ -49,7 +49,11 @@ def build_scrape_result(
     created_at: datetime | None = None,
     title: str | None = "Test Page",
     content: str | None = "Test content",
-    error_message: str | None = None
+    error_message: str | None = None,
+    etag: str | None = None,
+    last_modified: str | None = None,
+    not_modified: bool = False,
+    links: list[PageLink] | None = None
 ) -> ScrapePageResult:
     """Build a scrape result for testing
 
@@ -60,6 +64,10 @@ def build_scrape_result(
         title: Page title
         content: Page content
         error_message: Error if scraping failed
+        etag: ETag header of the response
+        last_modified: Last-Modified header of the response
+        not_modified: Whether the server answered 304 Not Modified
+        links: Links collected from the page
     """
     return ScrapePageResult(
         url=url,
@@ -67,5 +75,9 @@ def build_scrape_result(
         created_at=created_at or datetime(2024, 1, 1, 12, 0, 0),
         title=title,
         content=content,
-        error_message=error_message
+        error_message=error_message,
+        etag=etag,
+        last_modified=last_modified,
+        not_modified=not_modified,
+        links=links or []
     )
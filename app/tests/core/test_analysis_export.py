@@ -0,0 +1,87 @@
+import pyarrow.dataset as ds
+import pytest
+from core.analysis_export import AnalysisExportService, flatten_analysis
+from infrastructure.local_services import LocalStorage
+from tests.builders.build import Build
+
+
+def build_analysis(url: str, analysis_date: str, categories: list[str]) -> dict:
+    return {
+        "url": url,
+        "title": "Post",
+        "analysis_date": analysis_date,
+        "content_type": "non_profit_resource_blog",
+        "service_providers": [
+            {
+                "name": "Bloomerang",
+                "website": None,
+                "pain_points": [
+                    {"description": f"{category} pain", "category": category,
+                     "impact": "hours", "source_quote": "quote", "solution": None}
+                    for category in categories
+                ]
+            }
+        ]
+    }
+
+
+@pytest.fixture
+def storage(tmp_path):
+    return LocalStorage(settings=Build.settings(local_storage_path=str(tmp_path)))
+
+
+@pytest.fixture
+def export_service(storage):
+    return AnalysisExportService(settings=Build.settings(local_storage_path=str(storage.storage_path)), storage=storage)
+
+
+def test_flatten_analysis_produces_one_row_per_pain_point():
+    """Test flattening nested providers and pain points into rows"""
+    analysis = build_analysis("https://www.example.org/post", "2024-01-01T12:00:00",
+                              ["fundraising_and_donor_relations", "other"])
+
+    row, providers, pain_points = flatten_analysis(analysis, "a.json")
+
+    assert row["domain"] == "example.org"
+    assert row["pain_point_count"] == 2
+    assert providers[0]["name"] == "Bloomerang"
+    assert [p["category"] for p in pain_points] == [
+        "fundraising_and_donor_relations", "other"]
+    assert all(p["date"] == "2024-01-01" for p in pain_points)
+
+
+def test_export_appends_only_new_analyses(storage, export_service):
+    """Test that a second export adds new files without rewriting earlier parts"""
+    storage.write_json("2024/01/01/content_analysis/a_content_analysis.json",
+                       build_analysis("https://example.org/a", "2024-01-01T12:00:00", ["other"]))
+    first = export_service.export(
+        ["2024/01/01/content_analysis/a_content_analysis.json"])
+
+    storage.write_json("2024/01/02/content_analysis/b_content_analysis.json",
+                       build_analysis("https://example.org/b", "2024-01-02T12:00:00",
+                                      ["it_and_data_management", "other"]))
+    second = export_service.export([
+        "2024/01/01/content_analysis/a_content_analysis.json",
+        "2024/01/02/content_analysis/b_content_analysis.json",
+    ])
+
+    assert first.exported_analyses == 1
+    assert second.exported_analyses == 1
+    assert second.skipped_analyses == 1
+
+    pain_points = ds.dataset(
+        storage.storage_path / "exports/content_analysis/pain_points",
+        format="parquet", partitioning="hive").to_table()
+    assert pain_points.num_rows == 3
+    assert sorted(pain_points.column("category").to_pylist()) == [
+        "it_and_data_management", "other", "other"]
+    assert set(map(str, pain_points.column("date").to_pylist())) == {
+        "2024-01-01", "2024-01-02"}
+
+
+def test_export_reports_unreadable_files(export_service):
+    """Test that missing files are reported and not marked as exported"""
+    result = export_service.export(["missing_content_analysis.json"])
+
+    assert result.failed_files == ["missing_content_analysis.json"]
+    assert result.exported_analyses == 0
@@ -0,0 +1,55 @@
+# app/tests/core/test_campaign.py
+
+import pytest
+from core.campaign import CampaignQuery, build_report, load_campaign
+from core.pipeline import PipelineResult
+
+
+class TestCampaign:
+    """Test reading campaign files and reporting on them"""
+
+    def test_load_text_campaign(self, tmp_path):
+        """Test queries with optional tags and limits in a text file"""
+        path = tmp_path / "campaign.txt"
+        path.write_text(
+            "# onboarding pain points\n"
+            "saas onboarding problems | tags=saas, onboarding | limit=5\n"
+            "\n"
+            "crm migration issues\n")
+
+        assert load_campaign(str(path)) == [
+            CampaignQuery(query="saas onboarding problems",
+                          tags=["saas", "onboarding"], limit=5),
+            CampaignQuery(query="crm migration issues"),
+        ]
+
+    def test_load_jsonl_campaign(self, tmp_path):
+        """Test one JSON object per line"""
+        path = tmp_path / "campaign.jsonl"
+        path.write_text('{"query": "a", "tags": ["x"], "limit": 3}\n{"query": "b"}\n')
+
+        assert [q.query for q in load_campaign(str(path))] == ["a", "b"]
+        assert load_campaign(str(path))[0].limit == 3
+
+    def test_invalid_line_reports_its_number(self, tmp_path):
+        path = tmp_path / "campaign.txt"
+        path.write_text("a\nb | size=3\n")
+
+        with pytest.raises(ValueError, match="line 2"):
+            load_campaign(str(path))
+
+    def test_report_totals_by_tag(self):
+        """Test that tag totals add up the queries under each tag"""
+        queries = [CampaignQuery(query="a", tags=["saas"]),
+                   CampaignQuery(query="b", tags=["saas", "crm"])]
+        result = PipelineResult(
+            queries=2, urls=5, scraped=4, analyzed=3, elapsed_seconds=1.0, stages={},
+            by_query={"a": {"urls": 2, "scraped": 2, "analyzed": 1},
+                      "b": {"urls": 3, "scraped": 2, "analyzed": 2}})
+
+        report = build_report("campaign", queries, result)
+
+        assert report.tags["saas"] == {"queries": 2, "urls": 5, "scraped": 4, "analyzed": 3}
+        assert report.tags["crm"] == {"queries": 1, "urls": 3, "scraped": 2, "analyzed": 2}
+        assert report.totals["analyzed"] == 3
+        assert "by_query" not in report.totals
@@ -0,0 +1,140 @@
+from types import SimpleNamespace
+
+import pytest
+from core.chat_model_routing import (
+    ChatModelQuotaExceeded,
+    ChatModelRoute,
+    ChatModelRouter,
+    RoutingChatModel,
+)
+from langchain_core.messages import AIMessage, HumanMessage
+from tests.builders.build import Build
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class FailingChatModel:
+    def __init__(self, status_code: int):
+        self.status_code = status_code
+        self.calls = 0
+
+    def invoke(self, messages, **kwargs):
+        self.calls += 1
+        error = Exception(f"status {self.status_code}")
+        error.status_code = self.status_code
+        raise error
+
+
+def build_route(name: str, provider, clock, requests_per_minute: int = 60) -> ChatModelRoute:
+    return ChatModelRoute(name, provider, requests_per_minute, 0, clock=clock)
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+def test_router_spreads_calls_by_available_quota(clock):
+    """Test that calls move to the other host as one host's quota drains"""
+    first = Build.chat_model_provider(responses=["first"])
+    second = Build.chat_model_provider(responses=["second"])
+    router = ChatModelRouter([
+        build_route("first", first, clock, requests_per_minute=4),
+        build_route("second", second, clock, requests_per_minute=4),
+    ], clock=clock)
+
+    replies = [router.invoke([HumanMessage(content="hi")]).content
+               for _ in range(6)]
+
+    assert replies.count("first") == 3
+    assert replies.count("second") == 3
+
+
+def test_router_prefers_lower_latency(clock):
+    """Test that a faster host gets more calls when quota is equal"""
+    fast = Build.chat_model_provider(responses=["fast"])
+    slow = Build.chat_model_provider(responses=["slow"])
+    router = ChatModelRouter([
+        build_route("fast", fast, clock, requests_per_minute=1000),
+        build_route("slow", slow, clock, requests_per_minute=1000),
+    ], clock=clock)
+    router.routes[0].latency = 0.2
+    router.routes[1].latency = 2.0
+
+    replies = [router.invoke([HumanMessage(content="hi")]).content
+               for _ in range(5)]
+
+    assert replies == ["fast"] * 5
+
+
+def test_router_fails_over_and_marks_host_degraded(clock):
+    """Test that a rate limited host is skipped until its cooldown ends"""
+    broken_model = FailingChatModel(status_code=529)
+    broken = SimpleNamespace(
+        get_chat_model=lambda chat_model_settings=None: broken_model)
+    healthy = Build.chat_model_provider(responses=["ok"])
+    router = ChatModelRouter([
+        build_route("broken", broken, clock),
+        build_route("healthy", healthy, clock),
+    ], cooldown_seconds=30, clock=clock)
+    router.routes[0].latency = 0.1
+
+    assert router.invoke([HumanMessage(content="hi")]).content == "ok"
+    assert router.invoke([HumanMessage(content="hi")]).content == "ok"
+    assert broken_model.calls == 1
+    assert router.summary()["broken"]["degraded"]
+
+    clock.now += 31
+    assert not router.summary()["broken"]["degraded"]
+
+
+def test_router_raises_when_every_host_fails(clock):
+    """Test that the last error surfaces so the caller can back off"""
+    model = FailingChatModel(status_code=429)
+    provider = SimpleNamespace(
+        get_chat_model=lambda chat_model_settings=None: model)
+    router = ChatModelRouter(
+        [build_route("a", provider, clock), build_route("b", provider, clock)], clock=clock)
+
+    with pytest.raises(Exception) as error:
+        router.invoke([HumanMessage(content="hi")])
+    assert error.value.status_code == 429
+    assert model.calls == 2
+
+
+def test_routing_chat_model_binds_tools_per_host(clock):
+    """Test that tools bound on the routing model reach the selected host"""
+    provider = Build.chat_model_provider(responses=[AIMessage(
+        content="", tool_calls=[{"name": "Tool", "args": {}, "id": "1"}])])
+    router = ChatModelRouter([build_route("a", provider, clock)], clock=clock)
+
+    model = RoutingChatModel(router=router).bind_tools(
+        ["Tool"], tool_choice="Tool")
+    message = model.invoke("hi")
+
+    assert message.tool_calls[0]["name"] == "Tool"
+    assert provider.chat_model.bound_tools == ["Tool"]
+
+
+def test_router_backs_off_when_every_host_is_over_quota(clock):
+    """Test that no call goes out, nor is debited, once every host's quota is spent"""
+    provider = Build.chat_model_provider(responses=["a", "b"])
+    router = ChatModelRouter([build_route("a", provider, clock, requests_per_minute=1),
+                              build_route("b", provider, clock, requests_per_minute=1)], clock=clock)
+    router.invoke([HumanMessage(content="hi")])
+    router.invoke([HumanMessage(content="hi")])
+
+    with pytest.raises(ChatModelQuotaExceeded) as error:
+        router.invoke([HumanMessage(content="hi")])
+    assert error.value.status_code == 429
+    assert error.value.wait == pytest.approx(60)
+    assert router.summary()["a"]["calls"] + router.summary()["b"]["calls"] == 2
+
+    clock.now += 60
+    assert router.invoke([HumanMessage(content="hi")]) is not None
@@ -0,0 +1,196 @@
+import json
+from unittest.mock import MagicMock
+
+import pytest
+from core.analysis_index import AnalysisSink
+from core.content_analysis import ContentAnalysisService
+from core.content_analysis.cascade import CascadeStats
+from core.content_analysis.content_analysis import ANALYSIS_PAGES, LLM_CALLS, LLM_TOKENS
+from core.content_analysis.structured_output import StructuredOutputStats
+from core.domain import ContentAnalysis
+from core.llm_scheduler import LLMCallScheduler
+from core.storage import Storage
+from langchain_core.messages import AIMessage
+from tests.builders.build import Build
+
+VALID_ANALYSIS = {
+    "url": "https://example.com/post",
+    "title": "Post",
+    "analysis_date": "2024-01-01T12:00:00",
+    "content_type": "non_profit_resource_blog",
+    "service_providers": [
+        {
+            "name": "Bloomerang",
+            "website": "https://bloomerang.co",
+            "pain_points": [
+                {"description": "Donor data is scattered", "source_quote": "spreadsheets"}
+            ]
+        }
+    ]
+}
+
+PAGE = {"url": "https://example.com/post", "title": "Post", "content": "content"}
+
+
+@pytest.fixture
+def mock_storage():
+    return MagicMock(spec=Storage)
+
+
+def build_service(mock_storage, output_mode: str = "parser", cascade_enabled: bool = False,
+                  sinks: list | None = None) -> ContentAnalysisService:
+    settings = Build.settings(
+        content_analysis_output_mode=output_mode,
+        content_analysis_cascade_enabled=cascade_enabled,
+        content_analysis_triage_threshold=0.5
+    )
+    return ContentAnalysisService(
+        settings=settings,
+        storage=mock_storage,
+        scheduler=LLMCallScheduler(requests_per_minute=0, tokens_per_minute=0),
+        output_stats=StructuredOutputStats(),
+        cascade_stats=CascadeStats(),
+        sinks=sinks or []
+    )
+
+
+def test_parser_mode_parses_json_response(mock_storage):
+    """Test that a JSON reply is validated and stored"""
+    service = build_service(mock_storage)
+    provider = Build.chat_model_provider(
+        responses=[f"```json\n{json.dumps(VALID_ANALYSIS)}\n```"])
+
+    result = service.analyze_content(
+        "https://example.com/post", PAGE, provider, "2024/01/01")
+
+    assert result["service_providers"][0]["name"] == "Bloomerang"
+    mock_storage.write_json.assert_called_once()
+    assert service.output_stats.summary()["parse_failures"] == 0
+
+
+def test_stored_analyses_reach_every_sink(mock_storage):
+    """Test that sinks get each stored analysis and a failing sink does not fail the analysis"""
+    failing, recording = MagicMock(spec=AnalysisSink), MagicMock(spec=AnalysisSink)
+    failing.record.side_effect = RuntimeError("database is locked")
+    service = build_service(mock_storage, sinks=[failing, recording])
+    provider = Build.chat_model_provider(
+        responses=[f"```json\n{json.dumps(VALID_ANALYSIS)}\n```"])
+
+    result = service.analyze_content(
+        "https://example.com/post", PAGE, provider, "2024/01/01")
+
+    file_name, analysis = recording.record.call_args.args
+    assert file_name == mock_storage.write_json.call_args.args[0]
+    assert analysis == result
+
+
+def test_tool_mode_uses_tool_call_and_drops_format_instructions(mock_storage):
+    """Test that tool mode binds the schema as a tool and reads the call arguments"""
+    service = build_service(mock_storage, output_mode="tool")
+    provider = Build.chat_model_provider(responses=[AIMessage(
+        content="",
+        tool_calls=[{"name": "ContentAnalysis", "args": VALID_ANALYSIS, "id": "1"}]
+    )])
+
+    result = service.analyze_content(
+        "https://example.com/post", PAGE, provider, "2024/01/01")
+
+    assert result["title"] == "Post"
+    assert provider.chat_model.bound_tools == [ContentAnalysis]
+    assert '"properties"' not in provider.chat_model.prompts[0]
+
+
+def test_schema_errors_are_repaired_locally(mock_storage):
+    """Test that small schema errors are fixed without calling the model again"""
+    service = build_service(mock_storage, output_mode="tool")
+    broken = {
+        "title": "Post",
+        "service_providers": [
+            {"name": "Bloomerang", "website": None,
+             "pain_points": json.dumps(VALID_ANALYSIS["service_providers"][0]["pain_points"])},
+            {"website": "https://missing-name.org"}
+        ]
+    }
+    provider = Build.chat_model_provider(responses=[AIMessage(
+        content="",
+        tool_calls=[{"name": "ContentAnalysis", "args": broken, "id": "1"}]
+    )])
+
+    result = service.analyze_content(
+        "https://example.com/post", PAGE, provider, "2024/01/01")
+
+    assert result["url"] == "https://example.com/post"
+    assert [p["name"] for p in result["service_providers"]] == ["Bloomerang"]
+    assert len(result["service_providers"][0]["pain_points"]) == 1
+    assert len(provider.chat_model.prompts) == 1
+    summary = service.output_stats.summary()
+    assert summary["parse_failures"] == 1
+    assert summary["repair_rate"] == 1.0
+
+
+def test_unparseable_output_returns_none(mock_storage):
+    """Test that a reply without JSON is counted as a failure and not stored"""
+    service = build_service(mock_storage)
+    provider = Build.chat_model_provider(responses=["I cannot help with that."])
+
+    result = service.analyze_content(
+        "https://example.com/post", PAGE, provider, "2024/01/01")
+
+    assert result is None
+    mock_storage.write_json.assert_not_called()
+    assert service.output_stats.parse_failure_rate == 1.0
+
+
+def test_cascade_skips_negative_pages(mock_storage):
+    """Test that pages triaged below the threshold never reach the full analysis"""
+    service = build_service(mock_storage, cascade_enabled=True)
+    triage = {"has_pain_points": False,
+              "has_service_providers": False, "relevance": 0.1}
+    provider = Build.chat_model_provider(
+        responses=[json.dumps(triage), json.dumps(VALID_ANALYSIS)])
+
+    result = service.analyze_content(
+        "https://example.com/post", {"title": "Post", "content": "Recipes"}, provider, "2024/01/01")
+
+    assert result["service_providers"] == []
+    assert result["title"] == "Post"
+    assert len(provider.chat_model.prompts) == 1
+    mock_storage.write_json.assert_called_once()
+    summary = service.cascade_stats.summary()
+    assert summary["skipped"] == 1
+    assert summary["avoided_tokens"] > 0
+
+
+def test_cascade_escalates_positive_pages(mock_storage):
+    """Test that relevant pages get the full analysis after triage"""
+    service = build_service(mock_storage, cascade_enabled=True)
+    triage = {"has_pain_points": True,
+              "has_service_providers": True, "relevance": 0.9}
+    provider = Build.chat_model_provider(
+        responses=[json.dumps(triage), json.dumps(VALID_ANALYSIS)])
+
+    result = service.analyze_content(
+        "https://example.com/post", PAGE, provider, "2024/01/01")
+
+    assert result["service_providers"][0]["name"] == "Bloomerang"
+    assert len(provider.chat_model.prompts) == 2
+    assert service.cascade_stats.summary()["escalated"] == 1
+    # only the analysis counts as a structured output, not its triage
+    assert service.output_stats.summary()["outputs"] == 1
+
+
+def test_analysis_records_outcome_and_tokens(mock_storage):
+    """Test that each analysis counts its outcome, LLM call and tokens"""
+    service = build_service(mock_storage)
+    message = AIMessage(content=json.dumps(VALID_ANALYSIS),
+                        usage_metadata={"input_tokens": 120, "output_tokens": 30, "total_tokens": 150})
+    provider = Build.chat_model_provider(responses=[message])
+    pages = ANALYSIS_PAGES.value(outcome="success")
+    calls = LLM_CALLS.value(call="analysis")
+    output_tokens = LLM_TOKENS.value(call="analysis", kind="output")
+
+    service.analyze_content("https://example.com/post", PAGE, provider, "2024/01/01")
+
+    assert ANALYSIS_PAGES.value(outcome="success") == pages + 1
+    assert LLM_CALLS.value(call="analysis") == calls + 1
+    assert LLM_TOKENS.value(call="analysis", kind="output") == output_tokens + 30
@@ -0,0 +1,119 @@
+# app/tests/core/test_crawl.py
+
+import pytest
+from configuration import CrawlSettings
+from core.crawl import Crawl, CrawlFrontier, extract_links, normalize_url, relevance
+from core.domain import PageLink
+from core.web_scrape import WebScrapeSession
+from tests.builders.build import Build
+
+
+class FakeSite(WebScrapeSession):
+    """Serves pages linking to each other, failing the ones it does not know"""
+
+    def __init__(self, links: dict[str, list[PageLink]]):
+        self._links = links
+        self.scraped: list[str] = []
+
+    async def scrape(self, url: str, file_path: str = None):
+        self.scraped.append(url)
+        if url not in self._links:
+            return Build.scrape_result(url=url, success=False, error_message="404")
+        return Build.scrape_result(url=url, links=self._links[url])
+
+
+def crawl_settings(**kwargs) -> CrawlSettings:
+    return Build.settings(crawl_enabled=True, **kwargs).crawl_settings
+
+
+class TestCrawl:
+    """Test the link-following crawl"""
+
+    def test_extracts_absolute_links(self):
+        """Test link resolution, fragments, schemes and duplicate anchors"""
+        html = """
+            <base href="https://blog.example/posts/">
+            <a href="first">First <b>post</b></a>
+            <a href="first#comments">Comments</a>
+            <a href="/about"><img src="logo.png"></a>
+            <a href="/about">About us</a>
+            <a href="mailto:me@blog.example">Mail</a>
+            <a href="javascript:void(0)">Menu</a>
+        """
+
+        links = extract_links(html, "https://blog.example/index.html")
+
+        assert links == [
+            PageLink(url="https://blog.example/posts/first", text="First post"),
+            PageLink(url="https://blog.example/about", text="About us"),
+        ]
+
+    def test_links_are_neither_stored_nor_analyzed(self):
+        """Test that the links of a page stay out of its stored and analyzed dump"""
+        page = Build.scrape_result(links=[PageLink(url="https://blog.example/about", text="About us")])
+
+        assert page.links
+        assert "links" not in page.model_dump()
+        assert "links" not in page.model_dump_json()
+
+    def test_normalizes_urls_and_scores_relevance(self):
+        """Test that URL variants collapse and anchor text drives relevance"""
+        assert normalize_url("https://Blog.Example:443/a/?utm_source=x&id=1#top") == "https://blog.example/a?id=1"
+        terms = {"python", "testing"}
+        assert relevance(PageLink(url="https://blog.example/python-tips", text="Testing tricks"), terms) == 1.0
+        assert relevance(PageLink(url="https://blog.example/cats", text="Python"), terms) == 0.5
+
+    def test_frontier_prefers_relevant_shallow_links(self):
+        """Test the priority order of the frontier"""
+        frontier = CrawlFrontier()
+        frontier.push("deep-relevant", 2, 1.0)
+        frontier.push("shallow-irrelevant", 1, 0.0)
+        frontier.push("shallow-relevant", 1, 1.0)
+        frontier.push("shallow-relevant-later", 1, 1.0)
+
+        assert [frontier.pop()[0] for _ in range(4)] == [
+            "shallow-relevant", "shallow-relevant-later", "deep-relevant", "shallow-irrelevant"]
+
+    @pytest.mark.asyncio
+    async def test_expands_within_domain_depth_and_page_limits(self):
+        """Test that the crawl stays in the seed's domain and respects its limits"""
+        site = FakeSite({
+            "https://blog.example/": [
+                PageLink(url="https://blog.example/python", text="Python"),
+                PageLink(url="https://blog.example/cats", text="Cats"),
+                PageLink(url="https://elsewhere.example/python", text="Python"),
+                PageLink(url="https://blog.example/report.pdf", text="Python report"),
+                PageLink(url="https://blog.example/gone", text="Python"),
+            ],
+            "https://blog.example/python": [
+                PageLink(url="https://blog.example/?utm_source=loop", text="Home"),
+                PageLink(url="https://blog.example/python/deeper", text="Python"),
+            ],
+            "https://blog.example/cats": [],
+        })
+        crawl = Crawl(crawl_settings(crawl_max_depth=1, crawl_max_pages_per_seed=3))
+
+        pages = await crawl.expand(site, "https://blog.example/", "python")
+
+        assert [page.url for page in pages] == [
+            "https://blog.example/", "https://blog.example/python", "https://blog.example/cats"]
+        assert site.scraped == [
+            "https://blog.example/", "https://blog.example/python", "https://blog.example/gone",
+            "https://blog.example/cats"]
+        assert not crawl.claim("https://blog.example/python/")
+
+    @pytest.mark.asyncio
+    async def test_domain_budget_and_failed_seeds(self):
+        """Test the per-domain page budget shared by seeds and that a failed seed raises"""
+        site = FakeSite({
+            "https://blog.example/a": [PageLink(url="https://blog.example/c")],
+            "https://blog.example/b": [PageLink(url="https://blog.example/d")],
+            "https://blog.example/c": [],
+        })
+        crawl = Crawl(crawl_settings(crawl_max_pages_per_domain=3, crawl_min_relevance=0))
+
+        assert len(await crawl.expand(site, "https://blog.example/a", "python")) == 2
+        assert len(await crawl.expand(site, "https://blog.example/b", "python")) == 1
+        assert crawl.domain_pages == {"blog.example": 3}
+        with pytest.raises(RuntimeError):
+            await Crawl(crawl_settings()).expand(site, "https://blog.example/missing", "python")
@@ -0,0 +1,124 @@
+# app/tests/core/test_discovery.py
+
+import gzip
+from datetime import datetime, timezone
+
+from core.discovery import (
+    DiscoveredKind,
+    DiscoveredUrl,
+    DiscoveryFilter,
+    SitemapParser,
+    newest_first,
+    parse_date,
+)
+
+SITEMAP_INDEX = b"""<?xml version="1.0" encoding="UTF-8"?>
+<sitemapindex xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">
+  <sitemap><loc>https://blog.example/posts.xml.gz</loc><lastmod>2024-06-01</lastmod></sitemap>
+</sitemapindex>"""
+
+RSS = b"""<?xml version="1.0"?>
+<rss version="2.0"><channel><title>Blog</title><link>https://blog.example/</link>
+  <item><title>Volunteer tracking</title><link>https://blog.example/volunteers</link>
+    <pubDate>Tue, 04 Jun 2024 10:00:00 +0200</pubDate></item>
+  <item><title>No link</title></item>
+</channel></rss>"""
+
+ATOM = b"""<?xml version="1.0" encoding="utf-8"?>
+<feed xmlns="http://www.w3.org/2005/Atom"><title>Blog</title>
+  <entry><title>Donors</title><link rel="alternate" href="https://blog.example/donors"/>
+    <link rel="edit" href="https://blog.example/edit/1"/><updated>2024-06-05T08:00:00Z</updated></entry>
+</feed>"""
+
+
+def parse(document: bytes, chunk_size: int = 16) -> list[DiscoveredUrl]:
+    parser = SitemapParser("source")
+    found = []
+    for start in range(0, len(document), chunk_size):
+        found.extend(parser.feed(document[start:start + chunk_size]))
+    found.extend(parser.close())
+    return found
+
+
+class TestSitemapParser:
+    """Test the streaming sitemap and feed parser"""
+
+    def test_parses_sitemap_indexes_and_gzipped_sitemaps(self):
+        """Test nested sitemap entries and gzip detection across chunk boundaries"""
+        urlset = (b'<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">'
+                  + b"".join(f"<url><loc>https://blog.example/{i}</loc></url>".encode() for i in range(500))
+                  + b"</urlset>")
+
+        [nested] = parse(SITEMAP_INDEX)
+        pages = parse(gzip.compress(urlset), chunk_size=1000)
+
+        assert (nested.kind, nested.url) == (DiscoveredKind.SITEMAP, "https://blog.example/posts.xml.gz")
+        assert nested.last_modified == datetime(2024, 6, 1, tzinfo=timezone.utc)
+        assert [page.url for page in pages] == [f"https://blog.example/{i}" for i in range(500)]
+
+    def test_parses_rss_and_atom_feeds(self):
+        """Test feed items, their dates in UTC and their titles"""
+        [rss] = parse(RSS)
+        [atom] = parse(ATOM)
+
+        assert (rss.url, rss.title) == ("https://blog.example/volunteers", "Volunteer tracking")
+        assert rss.last_modified == datetime(2024, 6, 4, 8, tzinfo=timezone.utc)
+        assert (atom.url, atom.last_modified) == ("https://blog.example/donors", parse_date("2024-06-05T08:00:00Z"))
+
+    def test_parsed_entries_are_dropped_from_the_tree(self):
+        """Test that the entries read so far do not stay attached to the root"""
+        parser = SitemapParser("source")
+        urlset = b"<urlset>" + b"".join(f"<url><loc>https://blog.example/{i}</loc></url>".encode() for i in range(100))
+
+        assert len(list(parser.feed(urlset))) == 100
+        [root] = parser._open
+        assert len(root) == 0
+
+    def test_gzip_inflation_stops_past_the_limit(self):
+        """Test that a small gzip chunk is not inflated beyond the document limit"""
+        urlset = (b"<urlset>"
+                  + b"".join(f"<url><loc>https://blog.example/{i}</loc></url>".encode() for i in range(10000))
+                  + b"</urlset>")
+        parser = SitemapParser("source", max_bytes=1000)
+
+        found = list(parser.feed(gzip.compress(urlset))) + list(parser.close())
+
+        assert parser.exceeded and parser.bytes_read == 1001
+        assert 0 < len(found) < 1000 / len(b"<url><loc>https://blog.example/0</loc></url>")
+
+    def test_truncated_documents_keep_what_was_read(self):
+        """Test that a cut-off sitemap still yields its complete entries"""
+        found = parse(b'<urlset><url><loc>https://blog.example/1</loc></url><url><loc>https://blog')
+
+        assert [item.url for item in found] == ["https://blog.example/1"]
+
+
+class TestDiscoveryFilter:
+    """Test the filtering and ordering of discovered URLs"""
+
+    def test_filters_by_date_and_path(self):
+        """Test lastmod cut-off, include and exclude globs, and that undated pages are kept"""
+        since = datetime(2024, 6, 1, tzinfo=timezone.utc)
+        discovery_filter = DiscoveryFilter(since, include_paths=["/blog/*"], exclude_paths=["/blog/tag/*"])
+
+        def page(path: str, day: int | None = None, kind: str = DiscoveredKind.PAGE) -> DiscoveredUrl:
+            return DiscoveredUrl(url=f"https://site.example{path}", kind=kind,
+                                 last_modified=datetime(2024, 6, day, tzinfo=timezone.utc) if day else None)
+
+        assert discovery_filter.accepts(page("/blog/new", 2))
+        assert discovery_filter.accepts(page("/blog/undated"))
+        assert not discovery_filter.accepts(page("/blog/new", 2).model_copy(
+            update={"last_modified": datetime(2024, 5, 1, tzinfo=timezone.utc)}))
+        assert not discovery_filter.accepts(page("/about", 2))
+        assert not discovery_filter.accepts(page("/blog/tag/python", 2))
+        assert discovery_filter.accepts(page("/sitemap-pages.xml", 2, DiscoveredKind.SITEMAP))
+
+    def test_newest_first_deduplicates(self):
+        """Test the ordering and that a URL listed twice keeps its latest date"""
+        def found(url: str, day: int | None) -> DiscoveredUrl:
+            return DiscoveredUrl(url=url, last_modified=datetime(2024, 6, day, tzinfo=timezone.utc) if day else None)
+
+        ordered = newest_first([found("a", 1), found("b", None), found("c", 3), found("a", 5)])
+
+        assert [(item.url, item.last_modified.day if item.last_modified else None) for item in ordered] == [
+            ("a", 5), ("c", 3), ("b", None)]
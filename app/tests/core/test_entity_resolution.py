@@ -0,0 +1,47 @@
+# app/tests/core/test_entity_resolution.py
+
+from core.entity_resolution import (
+    ProviderMention,
+    mentions_of,
+    normalize_name,
+    registrable_domain,
+)
+
+
+class TestEntityResolution:
+    """Test the normalization and blocking of provider mentions"""
+
+    def test_normalizes_name_variants(self):
+        """Test legal suffixes, punctuation, accents and domain-like names"""
+        assert normalize_name("Bloomerang, Inc.") == "bloomerang"
+        assert normalize_name("bloomerang.co") == "bloomerang"
+        assert normalize_name("The Bloomerang LLC") == "bloomerang"
+        assert normalize_name("Café Côté") == "cafe cote"
+        assert normalize_name("Salesforce.org Nonprofit Cloud") == "salesforce org nonprofit cloud"
+        assert normalize_name("Co") == "co"
+        assert normalize_name(None) == ""
+
+    def test_registrable_domain(self):
+        """Test subdomains, ports and two-label public suffixes"""
+        assert registrable_domain("https://app.bloomerang.co/login") == "bloomerang.co"
+        assert registrable_domain("www.charity.org.uk:8080") == "charity.org.uk"
+        assert registrable_domain("neonone.com") == "neonone.com"
+        assert registrable_domain("localhost") is None
+        assert registrable_domain(" ") is None
+
+    def test_blocking_keys(self):
+        """Test the keys of a mention, ignoring domains shared by unrelated providers"""
+        mention = ProviderMention(url="u", provider_index=0, name="Neon One, LLC", website="https://neonone.com")
+        shared = ProviderMention(url="u", provider_index=1, name="Neon One", website="facebook.com/neonone")
+
+        assert mention.blocking_keys() == ["d:neonone.com", "n:neon one", "p:neon"]
+        assert shared.blocking_keys() == ["n:neon one", "p:neon"]
+
+    def test_mentions_of_analysis(self):
+        """Test the mentions of an analysis, skipping nameless providers"""
+        analysis = {"url": "https://a.org/post", "analysis_date": "2024-06-01T10:00:00",
+                    "service_providers": [{"name": "Givebutter"}, {"name": " , "}, {"name": "Bloomerang",
+                                                                                   "website": "bloomerang.co"}]}
+
+        assert [(m.provider_index, m.name, m.website, m.date) for m in mentions_of(analysis)] == [
+            (0, "Givebutter", None, "2024-06-01"), (2, "Bloomerang", "bloomerang.co", "2024-06-01")]
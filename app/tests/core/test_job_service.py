@@ -0,0 +1,99 @@
+# app/tests/core/test_job_service.py
+
+import asyncio
+from unittest.mock import AsyncMock, Mock
+
+import pytest
+from core.job_service import JobKind, JobService, JobState
+from tests.builders.build import Build
+
+
+async def collect(service: JobService, job_id: str, offset: int = 0) -> list:
+    return [result async for result in service.results(job_id, offset)]
+
+
+class TestJobService:
+    """Test the jobs run by the long-running API process"""
+
+    @pytest.mark.asyncio
+    async def test_streams_results_until_the_job_finishes(self):
+        """Test that a reader started early receives every result"""
+        service = Build.job_service()
+
+        record = service.submit(JobKind.SCRAPE, ["https://example.com/1", "https://example.com/error"])
+        results = await collect(service, record.id)
+
+        assert {(r.item, r.success) for r in results} == {
+            ("https://example.com/1", True), ("https://example.com/error", False)}
+        assert record.state == JobState.SUCCEEDED
+        assert (record.succeeded, record.failed) == (1, 1)
+        assert await collect(service, record.id, offset=1) == results[1:]
+        await service.close()
+
+    @pytest.mark.asyncio
+    async def test_jobs_share_one_browser_session(self):
+        """Test that the browser is launched once and kept for later jobs"""
+        web_scraper = Build.web_scraper()
+        service = Build.job_service(web_scraper=web_scraper, api_warm_browser=True)
+        await service.start()
+
+        first = service.submit(JobKind.SCRAPE, ["https://example.com/1"])
+        await collect(service, first.id)
+        second = service.submit(JobKind.ANALYZE, ["https://example.com/2"])
+        results = await collect(service, second.id)
+
+        assert len(web_scraper.sessions) == 1
+        assert web_scraper.sessions[0].scraped == ["https://example.com/1", "https://example.com/2"]
+        assert results[0].data == {"url": "https://example.com/2"}
+        assert service.summary()["browser"]
+        await service.close()
+
+    @pytest.mark.asyncio
+    async def test_analyze_reads_pages_already_scraped(self):
+        """Test that a stored scrape is analyzed without scraping the page again"""
+        web_scraper = Build.web_scraper()
+        storage = Mock()
+        storage.aread_json = AsyncMock(return_value=Build.scrape_result(url="https://example.com/1").model_dump())
+        service = Build.job_service(web_scraper=web_scraper, storage=storage)
+
+        record = service.submit(JobKind.ANALYZE, ["https://example.com/1"], "2024/01/01")
+        results = await collect(service, record.id)
+
+        assert results[0].success
+        assert web_scraper.sessions == []
+        storage.aread_json.assert_awaited_once_with("2024/01/01/scrape/success/1_scraped.json")
+        await service.close()
+
+    @pytest.mark.asyncio
+    async def test_cancel_stops_a_running_job(self):
+        """Test that cancelling ends the job and its result stream"""
+        service = Build.job_service(web_scraper=Build.web_scraper(delay=10))
+        record = service.submit(JobKind.SCRAPE, ["https://example.com/1"])
+        reader = asyncio.create_task(collect(service, record.id))
+        await asyncio.sleep(0.01)
+
+        await service.cancel(record.id)
+
+        assert record.state == JobState.CANCELLED
+        assert await asyncio.wait_for(reader, 1) == []
+        await service.close()
+
+    @pytest.mark.asyncio
+    async def test_rejects_invalid_jobs_and_forgets_old_ones(self):
+        """Test validation and that only the latest finished jobs are kept"""
+        service = Build.job_service(api_finished_jobs=1)
+
+        with pytest.raises(ValueError):
+            service.submit("crawl", ["x"])
+        with pytest.raises(ValueError):
+            service.submit(JobKind.SEARCH, [" "])
+        first = service.submit(JobKind.SEARCH, ["a"])
+        await collect(service, first.id)
+        second = service.submit(JobKind.SEARCH, ["b", "b"])
+        results = await collect(service, second.id)
+
+        assert service.get(first.id) is None
+        assert [job.id for job in service.list_jobs()] == [second.id]
+        assert results[0].data["results"][0]["url"] == "https://example.com/b"
+        assert len(results) == 1
+        await service.close()
@@ -0,0 +1,157 @@
+from types import SimpleNamespace
+
+import pytest
+from core.llm_scheduler import LLMCallScheduler, RateLimited, TokenBucket
+
+
+class FakeClock:
+    """Clock advanced manually, or by the scheduler sleeping"""
+
+    def __init__(self):
+        self.now = 0.0
+        self.sleeps = []
+
+    def __call__(self) -> float:
+        return self.now
+
+    def sleep(self, seconds: float) -> None:
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+class RateLimitError(Exception):
+    def __init__(self, status_code: int, headers: dict[str, str]):
+        super().__init__(f"status {status_code}")
+        self.status_code = status_code
+        self.response = SimpleNamespace(headers=headers)
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+def build_scheduler(clock, **kwargs) -> LLMCallScheduler:
+    values = {
+        "requests_per_minute": 60,
+        "tokens_per_minute": 6000,
+        "max_retries": 3,
+        "output_tokens": 100,
+    }
+    values.update(kwargs)
+    return LLMCallScheduler(**values, clock=clock, sleep=clock.sleep)
+
+
+def test_token_bucket_refills_over_time(clock):
+    """Test that consumed tokens come back at the configured rate"""
+    bucket = TokenBucket(60, clock=clock)
+
+    assert bucket.reserve(60) == 0
+    assert bucket.reserve(1) == pytest.approx(1.0)
+
+    clock.now += 30
+    assert bucket.available == pytest.approx(30)
+
+
+def test_estimate_tokens_includes_output_budget(clock):
+    """Test that estimates cover the prompt and the reserved output"""
+    scheduler = build_scheduler(clock)
+    assert scheduler.estimate_tokens("a" * 400) == 200
+
+
+def test_call_waits_for_request_bucket(clock):
+    """Test that calls beyond the request quota are paced, not failed"""
+    scheduler = build_scheduler(clock, requests_per_minute=2)
+
+    for _ in range(3):
+        scheduler.call(lambda: "ok", estimated_tokens=10)
+
+    assert sum(clock.sleeps) == pytest.approx(30.0)
+
+
+def test_call_rejects_estimate_above_token_limit(clock):
+    """Test that a prompt which can never fit the quota is rejected before sending"""
+    scheduler = build_scheduler(clock, tokens_per_minute=100)
+    calls = []
+
+    with pytest.raises(ValueError):
+        scheduler.call(lambda: calls.append(1), estimated_tokens=500)
+    assert calls == []
+
+
+def test_call_honors_retry_after(clock):
+    """Test that 429 responses are retried after the server provided delay"""
+    scheduler = build_scheduler(clock)
+    attempts = []
+
+    def flaky():
+        attempts.append(clock.now)
+        if len(attempts) == 1:
+            raise RateLimitError(429, {"retry-after": "7"})
+        return "ok"
+
+    assert scheduler.call(flaky, estimated_tokens=10) == "ok"
+    assert attempts[1] - attempts[0] == pytest.approx(7.0)
+
+
+def test_call_retries_client_side_rate_limits(clock):
+    """Test that a call refused before sending is retried after its own delay"""
+    scheduler = build_scheduler(clock)
+    attempts = []
+
+    def over_quota():
+        attempts.append(clock.now)
+        if len(attempts) == 1:
+            raise RateLimited("over quota", retry_after=12.5)
+        return "ok"
+
+    assert scheduler.call(over_quota, estimated_tokens=10) == "ok"
+    assert attempts[1] - attempts[0] == pytest.approx(12.5)
+
+
+def test_call_raises_after_max_retries(clock):
+    """Test that persistent overload errors eventually surface"""
+    scheduler = build_scheduler(clock, max_retries=2)
+
+    def overloaded():
+        raise RateLimitError(529, {})
+
+    with pytest.raises(RateLimitError):
+        scheduler.call(overloaded, estimated_tokens=10)
+    assert len(clock.sleeps) >= 2
+
+
+def test_call_does_not_retry_other_errors(clock):
+    """Test that non rate-limit errors are raised immediately"""
+    scheduler = build_scheduler(clock)
+
+    def broken():
+        raise RateLimitError(400, {})
+
+    with pytest.raises(RateLimitError):
+        scheduler.call(broken, estimated_tokens=10)
+    assert clock.sleeps == []
+
+
+def test_call_refunds_unused_token_estimate(clock):
+    """Test that actual usage replaces the estimate after the call"""
+    scheduler = build_scheduler(clock)
+    message = SimpleNamespace(usage_metadata={"total_tokens": 300})
+
+    scheduler.call(lambda: message, estimated_tokens=1000)
+
+    assert scheduler.tokens_bucket.available == pytest.approx(5700)
+
+
+def test_update_from_headers_pauses_until_reset(clock):
+    """Test that an exhausted server quota pauses the next call"""
+    scheduler = build_scheduler(clock)
+
+    scheduler.update_from_headers({
+        "anthropic-ratelimit-requests-limit": "60",
+        "anthropic-ratelimit-requests-remaining": "0",
+        "anthropic-ratelimit-requests-reset": "12",
+    })
+    scheduler.call(lambda: "ok", estimated_tokens=10)
+
+    assert clock.now >= 12
@@ -0,0 +1,87 @@
+import threading
+
+import pytest
+from core.metrics import Counter, Histogram, MetricsRegistry
+
+
+@pytest.fixture
+def registry():
+    return MetricsRegistry()
+
+
+def test_counter_counts_per_label_values(registry):
+    """Test that each combination of label values has its own count"""
+    pages = registry.counter("pages_total", "Pages", ("outcome",))
+
+    pages.inc(outcome="success")
+    pages.inc(2, outcome="success")
+    pages.inc(outcome="failed")
+
+    assert pages.value(outcome="success") == 3
+    assert pages.value(outcome="failed") == 1
+    with pytest.raises(ValueError):
+        pages.inc(-1, outcome="success")
+    with pytest.raises(ValueError):
+        pages.inc(stage="scrape")
+
+
+def test_registering_twice_returns_the_same_metric(registry):
+    """Test that modules declaring the same metric share it"""
+    assert registry.counter("pages_total", "Pages") is registry.counter("pages_total", "Pages")
+    with pytest.raises(ValueError):
+        registry.gauge("pages_total", "Pages")
+
+
+def test_gauge_tracks_in_progress_work(registry):
+    """Test that the in-flight gauge drops back once the work ends, even on errors"""
+    in_flight = registry.gauge("in_flight", "Pages in flight")
+
+    with in_flight.track_in_progress():
+        assert in_flight.value() == 1
+    with pytest.raises(RuntimeError), in_flight.track_in_progress():
+        raise RuntimeError("boom")
+
+    assert in_flight.value() == 0
+
+
+def test_histogram_renders_cumulative_buckets(registry):
+    """Test the Prometheus text format of a histogram"""
+    duration = registry.histogram("duration_seconds", "Durations", ("stage",), buckets=(0.1, 1.0))
+    for value in (0.05, 0.5, 0.7, 3.0):
+        duration.observe(value, stage="scrape")
+
+    text = registry.render()
+
+    assert "# TYPE duration_seconds histogram" in text
+    assert 'duration_seconds_bucket{stage="scrape",le="0.1"} 1' in text
+    assert 'duration_seconds_bucket{stage="scrape",le="1.0"} 3' in text
+    assert 'duration_seconds_bucket{stage="scrape",le="+Inf"} 4' in text
+    assert 'duration_seconds_sum{stage="scrape"} 4.25' in text
+    assert 'duration_seconds_count{stage="scrape"} 4' in text
+
+
+def test_render_escapes_label_values(registry):
+    """Test that quotes and newlines in label values keep the output parseable"""
+    registry.counter("errors_total", "Errors", ("error",)).inc(error='say "hi"\nbye')
+
+    assert 'errors_total{error="say \\"hi\\"\\nbye"} 1' in registry.render()
+
+
+def test_metrics_are_thread_safe():
+    """Test that concurrent increments from worker threads are not lost"""
+    counter = Counter("calls_total", "Calls")
+    histogram = Histogram("call_seconds", "Calls")
+
+    def work():
+        for _ in range(1000):
+            counter.inc()
+            histogram.observe(0.01)
+
+    threads = [threading.Thread(target=work) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert counter.value() == 8000
+    assert histogram.value() == 8000
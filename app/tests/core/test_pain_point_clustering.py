@@ -0,0 +1,83 @@
+# app/tests/core/test_pain_point_clustering.py
+
+import numpy as np
+from core.pain_point_clustering import (
+    cluster,
+    embed,
+    neighbour_pairs,
+    star_clusters,
+    terms,
+)
+
+DESCRIPTIONS = [
+    "Donor data is scattered across spreadsheets",
+    "Donor data scattered across several spreadsheets",
+    "Our donor data is spread across spreadsheets",
+    "Volunteer hours are tracked by hand",
+    "Volunteer hours still tracked by hand",
+    "Grant reports take days to compile",
+]
+
+
+def clusters_of(labels: np.ndarray) -> list[set[int]]:
+    return sorted(({int(i) for i in np.flatnonzero(labels == label)} for label in np.unique(labels)), key=min)
+
+
+class TestPainPointClustering:
+    """Test the vectorized clustering of pain point texts"""
+
+    def test_terms_stem_and_pair_words(self):
+        """Test stop words, plural and verb endings, and word pairs"""
+        assert terms("The volunteers tracked their hours") == [
+            "volunteer", "track", "hour", "volunteer track", "track hour"]
+        assert terms(None) == []
+
+    def test_embeds_unit_vectors(self):
+        """Test that paraphrases are closer than different problems and empty texts stay zero"""
+        vectors = embed(DESCRIPTIONS + [""], [None] * 7, dimensions=256)
+
+        assert np.allclose(np.linalg.norm(vectors[:6], axis=1), 1)
+        assert not vectors[6].any()
+        similarities = vectors @ vectors.T
+        assert similarities[0, 1] > 0.5 > similarities[0, 3]
+
+    def test_clusters_paraphrases(self):
+        """Test that each problem gets one cluster, the largest first, with a member as representative"""
+        labels, representatives = cluster(DESCRIPTIONS, [None] * 6, threshold=0.5, dimensions=256,
+                                          tables=8, bits=4, neighbours=10)
+
+        assert clusters_of(labels) == [{0, 1, 2}, {3, 4}, {5}]
+        assert labels.tolist()[0] == 0
+        assert [labels[i] for i in representatives] == [0, 1, 2]
+
+    def test_identical_texts_share_a_cluster(self):
+        """Test duplicates and quotes, and an empty input"""
+        labels, representatives = cluster(["Exports break", "exports break ", "Grant reports are late"],
+                                          ["Exports break monthly", "Exports break monthly", None],
+                                          threshold=0.9, dimensions=64, tables=4, bits=4, neighbours=5)
+
+        assert clusters_of(labels) == [{0, 1}, {2}]
+        assert representatives.tolist() == [0, 2]
+        assert [len(result) for result in cluster([], [], 0.5, 64, 4, 4, 5)] == [0, 0]
+
+    def test_star_clusters_do_not_chain(self):
+        """Test that items linked only through a chain of neighbours are not all merged"""
+        firsts, seconds = np.array([0, 1, 2, 3]), np.array([1, 2, 3, 4])
+
+        labels = star_clusters(5, firsts, seconds)
+
+        assert len(set(labels.tolist())) > 1
+        assert all(labels[labels] == labels)
+
+    def test_neighbour_pairs_find_near_duplicates(self):
+        """Test that the LSH buckets find close pairs and cap the neighbours of each vector"""
+        rng = np.random.default_rng(1)
+        centers = rng.standard_normal((20, 64)).astype(np.float32)
+        vectors = np.repeat(centers, 5, axis=0) + 0.05 * rng.standard_normal((100, 64)).astype(np.float32)
+        vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+
+        firsts, seconds = neighbour_pairs(vectors, threshold=0.9, tables=8, bits=6, neighbours=2)
+
+        assert len(firsts) and (firsts < seconds).all()
+        assert (firsts // 5 == seconds // 5).all()
+        assert np.bincount(np.concatenate([firsts, seconds]), minlength=100).max() <= 2 * 8 * 2
@@ -0,0 +1,205 @@
+# app/tests/core/test_pipeline.py
+
+import asyncio
+import threading
+import time
+from contextlib import asynccontextmanager
+from unittest.mock import AsyncMock, Mock
+
+import pytest
+from core.domain import PageLink
+from core.pipeline import ANALYSIS_STAGE, SCRAPE_STAGE, SEARCH_STAGE, PipelineRunner
+from core.storage import Storage
+from core.web_scrape import WebScraper, WebScrapeSession
+from core.web_search import SearchEngine
+from tests.builders.build import Build
+
+
+class FakeSearchEngine(SearchEngine):
+    def __init__(self, urls_by_query: dict[str, list[str]]):
+        self._urls_by_query = urls_by_query
+
+    async def search(self, query: str, file_path: str = None):
+        return [Build.search_result(url=url) for url in self._urls_by_query[query]]
+
+
+class FakeScrapeSession(WebScrapeSession):
+    def __init__(self, events: list, delay: float, links: dict[str, list[str]]):
+        self._events = events
+        self._delay = delay
+        self._links = links
+
+    async def scrape(self, url: str, file_path: str = None):
+        await asyncio.sleep(self._delay)
+        self._events.append(("scraped", url))
+        return Build.scrape_result(url=url, success="error" not in url,
+                                   error_message="boom" if "error" in url else None,
+                                   links=[PageLink(url=link) for link in self._links.get(url, [])])
+
+
+class FakeWebScraper(WebScraper):
+    def __init__(self, events: list, delay: float = 0.01, links: dict[str, list[str]] | None = None):
+        self._events = events
+        self._delay = delay
+        self._links = links or {}
+
+    def result_file_name(self, url: str, file_path: str = None) -> str:
+        return f"scrape/success/{url.rsplit('/', 1)[-1]}_scraped.json"
+
+    @asynccontextmanager
+    async def session(self):
+        yield FakeScrapeSession(self._events, self._delay, self._links)
+
+
+def build_runner(urls_by_query, events, analysis_delay=0.0, scrape_delay=0.01,
+                 failing_analyses=(), storage=None, links=None, **kwargs):
+    lock = threading.Lock()
+
+    def analyze_content(url, content, chat_model_provider, file_path):
+        time.sleep(analysis_delay)
+        with lock:
+            events.append(("analyzed", url))
+        return None if url in failing_analyses else {"url": url}
+
+    content_analysis = Mock()
+    content_analysis.analyze_content.side_effect = analyze_content
+    return PipelineRunner(
+        settings=Build.settings(**kwargs),
+        search_engine=FakeSearchEngine(urls_by_query),
+        web_scraper=FakeWebScraper(events, scrape_delay, links),
+        content_analysis=content_analysis,
+        chat_model_provider=Build.chat_model_provider(),
+        storage=storage or Mock(),
+    )
+
+
+class TestPipelineRunner:
+    """Test the pipelined search, scrape and analysis"""
+
+    @pytest.mark.asyncio
+    async def test_runs_every_stage_and_deduplicates_urls(self):
+        """Test that each unique URL is scraped and analyzed once"""
+        events = []
+        runner = build_runner({
+            "a": ["https://example.com/1", "https://example.com/2"],
+            "b": ["https://example.com/2", "https://example.com/3"],
+        }, events)
+
+        result = await runner.run(["a", "b"], "2024/01/01")
+
+        assert result.queries == 2
+        assert result.urls == 3
+        assert result.scraped == 3
+        assert result.analyzed == 3
+        assert sorted(url for kind, url in events if kind == "analyzed") == [
+            "https://example.com/1", "https://example.com/2", "https://example.com/3"]
+        assert result.stages[SEARCH_STAGE]["emitted"] == 3
+
+    @pytest.mark.asyncio
+    async def test_limits_and_credits_urls_per_query(self):
+        """Test per-query limits and that shared URLs are credited to the first query"""
+        events = []
+        runner = build_runner({
+            "a": ["https://example.com/1", "https://example.com/2", "https://example.com/3"],
+            "b": ["https://example.com/1", "https://example.com/4"],
+        }, events)
+
+        result = await runner.run(["a", "b"], limits={"a": 2})
+
+        assert result.by_query == {
+            "a": {"urls": 2, "scraped": 2, "analyzed": 2},
+            "b": {"urls": 1, "scraped": 1, "analyzed": 1},
+        }
+
+    @pytest.mark.asyncio
+    async def test_crawl_expands_search_results_into_their_sites(self):
+        """Test that crawled pages are scraped once, analyzed and credited to the query of their seed"""
+        events = []
+        runner = build_runner({
+            "a": ["https://example.com/1"],
+            "b": ["https://example.com/2", "https://other.org/3"],
+        }, events, links={
+            "https://example.com/1": ["https://example.com/1a", "https://example.com/2", "https://other.org/x"],
+            "https://example.com/1a": ["https://example.com/1b"],
+        }, crawl_enabled=True, crawl_max_depth=1)
+
+        result = await runner.run(["a", "b"])
+
+        scraped = [url for event, url in events if event == "scraped"]
+        assert sorted(scraped) == sorted(set(scraped))
+        assert "https://example.com/1a" in scraped
+        assert "https://example.com/1b" not in scraped
+        assert "https://other.org/x" not in scraped
+        assert result.scraped == result.analyzed == len(scraped) == 4
+        assert result.urls == sum(counts["urls"] for counts in result.by_query.values()) == 4
+
+    @pytest.mark.asyncio
+    async def test_failed_scrapes_are_not_analyzed(self):
+        """Test that failed pages are counted and dropped"""
+        events = []
+        runner = build_runner(
+            {"a": ["https://example.com/1", "https://example.com/error"]}, events)
+
+        result = await runner.run(["a"])
+
+        assert result.scraped == 1
+        assert result.analyzed == 1
+        assert result.stages[SCRAPE_STAGE]["failed"] == 1
+
+    @pytest.mark.asyncio
+    async def test_pages_are_analyzed_while_others_are_scraped(self):
+        """Test that items move downstream as soon as they are ready"""
+        events = []
+        urls = [f"https://example.com/{i}" for i in range(6)]
+        runner = build_runner({"a": urls}, events, scrape_delay=0.02,
+                              pipeline_scrape_concurrency=1, pipeline_queue_size=8)
+
+        await runner.run(["a"])
+
+        first_analysis = events.index(next(e for e in events if e[0] == "analyzed"))
+        last_scrape = max(i for i, e in enumerate(events) if e[0] == "scraped")
+        assert first_analysis < last_scrape
+
+    @pytest.mark.asyncio
+    async def test_full_queue_slows_the_upstream_stage(self):
+        """Test backpressure: a slow analysis blocks the scraper on the full queue"""
+        events = []
+        urls = [f"https://example.com/{i}" for i in range(6)]
+        runner = build_runner({"a": urls}, events, analysis_delay=0.05, scrape_delay=0.0,
+                              pipeline_analysis_concurrency=1, pipeline_queue_size=1)
+
+        result = await runner.run(["a"])
+
+        assert result.analyzed == 6
+        assert result.stages[SCRAPE_STAGE]["blocked_seconds"] > 0.1
+        assert result.stages[ANALYSIS_STAGE]["utilization"] > 0.5
+
+    @pytest.mark.asyncio
+    async def test_resumed_run_only_retries_unfinished_items(self, tmp_path):
+        """Test that a restart skips the search, scrapes and analyses that finished"""
+        urls = ["https://example.com/1", "https://example.com/2"]
+        storage = AsyncMock(spec=Storage)
+        storage.aread_json.return_value = Build.scrape_result(
+            url="https://example.com/2").model_dump()
+
+        events = []
+        runner = build_runner({"a": urls}, events, storage=storage,
+                              failing_analyses={"https://example.com/2"},
+                              pipeline_manifest_path=str(tmp_path))
+        manifest = runner.open_manifest("run")
+        await runner.run(["a"], manifest=manifest)
+        manifest.close()
+
+        events = []
+        runner = build_runner({"a": []}, events, storage=storage,
+                              pipeline_manifest_path=str(tmp_path))
+        manifest = runner.open_manifest("run")
+        result = await runner.run(["a"], manifest=manifest)
+        manifest.close()
+
+        # no new search or scrape, only the failed analysis is retried from the stored page
+        assert events == [("analyzed", "https://example.com/2")]
+        assert result.urls == 2
+        assert result.stages[SCRAPE_STAGE]["skipped"] == 1
+        storage.aread_json.assert_awaited_once_with("scrape/success/2_scraped.json")
+        assert manifest.summary()[ANALYSIS_STAGE] == {"done": 2, "failed": 0}
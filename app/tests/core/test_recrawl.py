@@ -0,0 +1,154 @@
+# app/tests/core/test_recrawl.py
+
+from contextlib import asynccontextmanager
+from unittest.mock import Mock
+
+import pytest
+from configuration.recrawl_settings import HOUR
+from core.recrawl import RecrawlPolicy, RecrawlScheduler
+from core.web_scrape import WebScraper, WebScrapeSession
+from infrastructure.sqlite_recrawl_store import SQLiteRecrawlStore
+from tests.builders.build import Build
+
+
+class FakeClock:
+    def __init__(self, now: float = 1000.0):
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class FakeSite(WebScrapeSession, WebScraper):
+    """Serves pages whose content the test changes, honouring ETags like a server would"""
+
+    def __init__(self):
+        self.contents: dict[str, str] = {}
+        self.requests: list[tuple[str, str | None]] = []
+
+    @asynccontextmanager
+    async def session(self):
+        yield self
+
+    async def scrape_if_modified(self, url, file_path=None, etag=None, last_modified=None):
+        self.requests.append((url, etag))
+        if url not in self.contents:
+            return Build.scrape_result(url=url, success=False, error_message="404")
+        current = f"v{hash(self.contents[url])}"
+        if etag == current:
+            return Build.scrape_result(url=url, content=None, etag=current, not_modified=True)
+        return Build.scrape_result(url=url, content=self.contents[url], etag=current)
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+@pytest.fixture
+def settings(tmp_path):
+    return Build.settings(
+        recrawl_sqlite_path=str(tmp_path / "recrawl.db"),
+        recrawl_initial_interval_hours=24, recrawl_min_interval_hours=6,
+        recrawl_max_interval_hours=96, recrawl_interval_factor=2)
+
+
+@pytest.fixture
+def store(settings):
+    store = SQLiteRecrawlStore(settings=settings)
+    yield store
+    store.close()
+
+
+@pytest.fixture
+def site():
+    return FakeSite()
+
+
+@pytest.fixture
+def analysis():
+    content_analysis = Mock()
+    content_analysis.analyze_content.side_effect = lambda url, *_: {"url": url}
+    return content_analysis
+
+
+@pytest.fixture
+def scheduler(settings, store, site, analysis, clock):
+    scheduler = RecrawlScheduler(settings=settings, store=store, web_scraper=site,
+                                 content_analysis=analysis, chat_model_provider=Build.chat_model_provider())
+    scheduler._clock = clock
+    return scheduler
+
+
+class TestRecrawlScheduler:
+    """Test the change-rate-aware recrawl of tracked pages"""
+
+    def test_policy_adapts_within_bounds(self):
+        """Test that intervals shrink on changes and grow otherwise, clamped"""
+        policy = RecrawlPolicy(24 * HOUR, 6 * HOUR, 96 * HOUR, 2)
+
+        assert policy.next_interval(24 * HOUR, changed=True) == 12 * HOUR
+        assert policy.next_interval(8 * HOUR, changed=True) == 6 * HOUR
+        assert policy.next_interval(24 * HOUR, changed=False) == 48 * HOUR
+        assert policy.next_interval(80 * HOUR, changed=False) == 96 * HOUR
+
+    @pytest.mark.asyncio
+    async def test_only_changed_pages_are_analyzed(self, scheduler, store, site, analysis, clock):
+        """Test revalidation with ETags and that unchanged pages skip the analysis"""
+        site.contents = {"https://blog.example/a": "first", "https://blog.example/b": "static"}
+        assert scheduler.track(list(site.contents)) == 2
+        assert scheduler.track(["https://blog.example/a"]) == 0
+
+        first = await scheduler.run_due()
+        assert (first.due, first.changed, first.analyzed) == (2, 2, 2)
+        assert (await scheduler.run_due()).due == 0
+
+        site.contents["https://blog.example/a"] = "second"
+        clock.now += 24 * HOUR
+        second = await scheduler.run_due()
+
+        assert (second.due, second.changed, second.not_modified) == (2, 1, 1)
+        assert analysis.analyze_content.call_count == 3
+        assert site.requests[-1][1] is not None
+        changing, static = store.get("https://blog.example/a"), store.get("https://blog.example/b")
+        assert (changing.interval_seconds, changing.changes) == (12 * HOUR, 1)
+        assert (static.interval_seconds, static.changes) == (48 * HOUR, 0)
+        assert static.next_fetch_at == clock.now + 48 * HOUR
+        assert changing.change_ratio == 1.0
+
+    @pytest.mark.asyncio
+    async def test_failed_analysis_is_retried_on_the_next_refresh(self, scheduler, store, site, analysis, clock):
+        """Test that the content hash, the change count and the interval only move once the analysis succeeded"""
+        site.contents = {"https://blog.example/a": "first"}
+        scheduler.track(list(site.contents))
+        await scheduler.run_due()
+        analyzed_hash = store.get("https://blog.example/a").content_hash
+
+        site.contents["https://blog.example/a"] = "second"
+        analysis.analyze_content.side_effect = RuntimeError("rate limited")
+        clock.now += 24 * HOUR
+        assert (await scheduler.run_due()).analyzed == 0
+        clock.now += 24 * HOUR
+        assert (await scheduler.run_due()).analyzed == 0
+        record = store.get("https://blog.example/a")
+        assert (record.content_hash, record.changes, record.interval_seconds) == (analyzed_hash, 0, 24 * HOUR)
+
+        analysis.analyze_content.side_effect = lambda url, *_: {"url": url}
+        clock.now += 24 * HOUR
+        assert (await scheduler.run_due()).analyzed == 1
+        record = store.get("https://blog.example/a")
+        assert record.etag is not None
+        assert (record.fetches, record.changes, record.interval_seconds) == (2, 1, 12 * HOUR)
+        assert record.change_ratio == 1.0
+
+    @pytest.mark.asyncio
+    async def test_failures_back_off(self, scheduler, store, clock):
+        """Test the retry schedule of failing pages"""
+        scheduler.track(["https://blog.example/gone", "https://blog.example/other"])
+
+        summary = await scheduler.run_due()
+        record = store.get("https://blog.example/gone")
+
+        assert summary.failed == 2
+        assert record.failures == 1
+        assert record.next_fetch_at == clock.now + 6 * HOUR
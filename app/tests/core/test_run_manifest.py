@@ -0,0 +1,52 @@
+# app/tests/core/test_run_manifest.py
+
+from core.run_manifest import ItemStatus, RunManifest
+
+
+class TestRunManifest:
+    """Test the checkpoint log of pipeline runs"""
+
+    def test_replays_the_log_on_open(self, tmp_path):
+        """Test that a reopened manifest knows the state of every item"""
+        manifest = RunManifest(str(tmp_path / "run.jsonl"))
+        manifest.record_done("search", "query", urls=["https://example.com/1"])
+        manifest.record_failed("scrape", "https://example.com/1", "timeout")
+        manifest.record_done("scrape", "https://example.com/1", file="a.json")
+        manifest.record_failed("analysis", "https://example.com/1", "bad output")
+        manifest.close()
+
+        reopened = RunManifest(str(tmp_path / "run.jsonl"))
+
+        assert reopened.is_done("search", "query")
+        assert reopened.data("search", "query") == {"urls": ["https://example.com/1"]}
+        assert reopened.data("scrape", "https://example.com/1") == {"file": "a.json"}
+        assert reopened.status("analysis", "https://example.com/1") == ItemStatus.FAILED
+        assert reopened.keys("scrape", ItemStatus.DONE) == ["https://example.com/1"]
+        reopened.close()
+
+    def test_failed_items_run_until_attempts_are_exhausted(self, tmp_path):
+        """Test that failures are retried up to the maximum attempts"""
+        manifest = RunManifest(str(tmp_path / "run.jsonl"), max_attempts=2)
+
+        assert manifest.should_run("scrape", "url")
+        manifest.record_failed("scrape", "url", "first")
+        assert manifest.should_run("scrape", "url")
+        manifest.record_failed("scrape", "url", "second")
+        assert not manifest.should_run("scrape", "url")
+        manifest.close()
+
+    def test_torn_last_line_is_ignored(self, tmp_path):
+        """Test that a line cut by a crash does not break the resume"""
+        path = tmp_path / "run.jsonl"
+        manifest = RunManifest(str(path))
+        manifest.record_done("search", "query")
+        manifest.close()
+        with open(path, "ab") as file:
+            file.write(b'{"stage": "scrape", "key": "ur')
+
+        reopened = RunManifest(str(path))
+
+        assert reopened.summary() == {"search": {"done": 1, "failed": 0}}
+        reopened.record_done("scrape", "url")
+        reopened.close()
+        assert RunManifest(str(path)).is_done("scrape", "url")
@@ -0,0 +1,58 @@
+# app/tests/core/test_serialization.py
+
+from datetime import date, datetime
+
+import pytest
+from core.serialization import (
+    JsonSerializerName,
+    OrjsonSerializer,
+    StdlibJsonSerializer,
+    create_serializer,
+)
+from tests.builders.build import Build
+
+SERIALIZERS = [StdlibJsonSerializer(), OrjsonSerializer()]
+
+
+@pytest.mark.parametrize("serializer", SERIALIZERS, ids=lambda s: s.name)
+class TestJsonSerializer:
+    """Test the JSON serializers produce the same documents"""
+
+    def test_round_trips_datetimes_as_iso_strings(self, serializer):
+        """Test that datetimes and dates are written as ISO strings"""
+        data = {"created_at": datetime(2024, 1, 1, 12, 0), "day": date(2024, 1, 2)}
+
+        assert serializer.loads(serializer.dumps(data)) == {
+            "created_at": "2024-01-01T12:00:00", "day": "2024-01-02"}
+
+    def test_serializes_pydantic_models(self, serializer):
+        """Test that models are dumped directly and when nested"""
+        result = Build.scrape_result(url="https://example.com/a")
+
+        assert serializer.loads(serializer.dumps(result))["url"] == "https://example.com/a"
+        nested = serializer.loads(serializer.dumps({"results": [result]}))
+        assert nested["results"][0]["created_at"] == "2024-01-01T12:00:00"
+
+    def test_compact_by_default_and_pretty_on_request(self, serializer):
+        """Test that only pretty output is indented"""
+        data = {"a": [1, 2], "b": "c"}
+
+        assert b"\n" not in serializer.dumps(data)
+        assert b" " not in serializer.dumps(data)
+        pretty = serializer.dumps(data, pretty=True)
+        assert b"\n" in pretty
+        assert serializer.loads(pretty) == data
+
+
+class TestCreateSerializer:
+    """Test choosing the serializer from settings"""
+
+    def test_auto_prefers_orjson(self):
+        assert isinstance(create_serializer(JsonSerializerName.AUTO), OrjsonSerializer)
+
+    def test_stdlib_by_name(self):
+        assert isinstance(create_serializer("json"), StdlibJsonSerializer)
+
+    def test_unknown_name_raises(self):
+        with pytest.raises(ValueError):
+            create_serializer("yaml")
@@ -0,0 +1,77 @@
+import asyncio
+
+import pytest
+from core.tracing import SpanStatus, Tracer, trace_id_for
+
+
+@pytest.fixture
+def tracer():
+    tracer = Tracer(max_spans=10)
+    tracer.enabled = True
+    return tracer
+
+
+def test_spans_of_a_url_share_a_trace(tracer):
+    """Test that the stages of one URL land in the same trace"""
+    url = "https://example.com/post"
+    with tracer.span("scrape", url=url):
+        pass
+    with tracer.span("analysis", url=url):
+        pass
+
+    spans = tracer.drain()
+
+    assert [s.name for s in spans] == ["scrape", "analysis"]
+    assert {s.trace_id for s in spans} == {trace_id_for(url)}
+    assert tracer.drain() == []
+
+
+def test_nested_spans_link_to_their_parent(tracer):
+    """Test that child spans inherit the trace and point to the parent"""
+    with tracer.span("analysis", url="https://example.com") as parent:
+        with tracer.span("llm_call") as child:
+            pass
+
+    assert child.trace_id == parent.trace_id
+    assert child.parent_id == parent.span_id
+
+
+@pytest.mark.asyncio
+async def test_concurrent_tasks_keep_their_own_parent(tracer):
+    """Test that spans opened in concurrent tasks do not nest into each other"""
+    async def scrape(url):
+        with tracer.span("scrape", url=url) as span:
+            await asyncio.sleep(0.01)
+            with tracer.span("extract") as child:
+                pass
+        return span, child
+
+    (a, a_child), (b, b_child) = await asyncio.gather(scrape("https://a.org"), scrape("https://b.org"))
+
+    assert a.parent_id is None and b.parent_id is None
+    assert a_child.parent_id == a.span_id
+    assert b_child.parent_id == b.span_id
+
+
+def test_failed_span_records_the_error(tracer):
+    """Test that an exception marks the span and propagates"""
+    with pytest.raises(ValueError), tracer.span("scrape", url="https://example.com"):
+        raise ValueError("timeout")
+
+    span = tracer.drain()[0]
+    assert span.status == SpanStatus.ERROR
+    assert span.error == "timeout"
+
+
+def test_buffer_is_bounded_and_disabled_tracer_keeps_nothing(tracer):
+    """Test that spans are dropped rather than growing without bound"""
+    for i in range(15):
+        with tracer.span("scrape", url=f"https://example.com/{i}"):
+            pass
+    assert len(tracer.drain()) == 10
+    assert tracer.dropped == 5
+
+    tracer.enabled = False
+    with tracer.span("scrape", url="https://example.com"):
+        pass
+    assert tracer.drain() == []
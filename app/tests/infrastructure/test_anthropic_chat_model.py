@@ -0,0 +1,50 @@
+# app/tests/infrastructure/test_anthropic_chat_model.py
+
+from types import SimpleNamespace
+from unittest.mock import Mock
+
+from anthropic.types import Message
+from core.llm_scheduler import LLMCallScheduler
+from infrastructure.anthropic_chat_model import HeaderReportingChatAnthropic
+from infrastructure.anthropic_services import AnthropicChatModelProvider
+from tests.builders.build import Build
+
+MESSAGE = {
+    "id": "msg_1", "type": "message", "role": "assistant", "model": "claude-test",
+    "content": [{"type": "text", "text": "Hello"}], "stop_reason": "end_turn", "stop_sequence": None,
+    "usage": {"input_tokens": 10, "output_tokens": 2},
+}
+
+
+def build_chat_model(headers: dict[str, str]) -> HeaderReportingChatAnthropic:
+    chat_model = AnthropicChatModelProvider(settings=Build.settings()).get_chat_model()
+    raw_response = SimpleNamespace(headers=headers, parse=lambda: Message(**MESSAGE))
+    client = Mock()
+    client.messages.with_raw_response.create.return_value = raw_response
+    # the SDK client is a cached property, built on first use
+    object.__setattr__(chat_model, "_client", client)
+    return chat_model
+
+
+class TestHeaderReportingChatAnthropic:
+    """Test that the rate-limit headers of Anthropic responses reach the scheduler"""
+
+    def test_leaves_the_retries_to_the_scheduler(self):
+        """Test that the SDK does not retry rate-limited calls itself"""
+        chat_model = AnthropicChatModelProvider(settings=Build.settings()).get_chat_model()
+
+        assert isinstance(chat_model, HeaderReportingChatAnthropic)
+        assert chat_model.max_retries == 0
+
+    def test_reports_the_response_headers(self):
+        """Test the headers in the response metadata, and the scheduler pacing from them"""
+        chat_model = build_chat_model({"anthropic-ratelimit-tokens-limit": "6000",
+                                       "anthropic-ratelimit-tokens-remaining": "1000"})
+        scheduler = LLMCallScheduler(requests_per_minute=0, tokens_per_minute=6000, output_tokens=100)
+
+        message = scheduler.call(lambda: chat_model.invoke("Hi"), estimated_tokens=200)
+
+        assert message.content == "Hello"
+        assert message.response_metadata["headers"]["anthropic-ratelimit-tokens-remaining"] == "1000"
+        # synced down to the remaining tokens, then refunded what the estimate overshot
+        assert scheduler.tokens_bucket.available < 1200
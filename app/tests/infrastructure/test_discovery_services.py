@@ -0,0 +1,117 @@
+# app/tests/infrastructure/test_discovery_services.py
+
+import gzip
+from contextlib import asynccontextmanager
+from datetime import datetime, timezone
+from unittest.mock import AsyncMock, Mock
+
+import pytest
+from aiohttp import web
+from core.discovery import DiscoveryFilter
+from infrastructure.discovery_services import SitemapSearch
+from tests.builders.build import Build
+
+
+@asynccontextmanager
+async def serve(documents: dict[str, bytes]):
+    """Serves the documents on a local port, yielding its base URL and the paths requested"""
+    requested = []
+
+    async def handle(request: web.Request) -> web.Response:
+        requested.append(request.path)
+        if request.path not in documents:
+            return web.Response(status=404)
+        return web.Response(body=documents[request.path])
+
+    app = web.Application()
+    app.router.add_get("/{path:.*}", handle)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    port = runner.addresses[0][1]
+    try:
+        yield f"http://127.0.0.1:{port}", requested
+    finally:
+        await runner.cleanup()
+
+
+def site_documents(base: str) -> dict[str, bytes]:
+    def urlset(*entries: tuple[str, str]) -> bytes:
+        return ('<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">' + "".join(
+            f"<url><loc>{base}{path}</loc><lastmod>{lastmod}</lastmod></url>" for path, lastmod in entries)
+                + "</urlset>").encode()
+
+    return {
+        "/robots.txt": f"User-agent: *\nDisallow: /admin\nSitemap: {base}/sitemap_index.xml\n".encode(),
+        "/sitemap_index.xml": f"""<sitemapindex xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">
+            <sitemap><loc>{base}/posts.xml.gz</loc><lastmod>2024-06-10</lastmod></sitemap>
+            <sitemap><loc>{base}/archive.xml</loc><lastmod>2019-01-01</lastmod></sitemap>
+            <sitemap><loc>{base}/missing.xml</loc></sitemap>
+            </sitemapindex>""".encode(),
+        "/posts.xml.gz": gzip.compress(urlset(
+            ("/blog/recent", "2024-06-09"), ("/blog/older", "2024-06-02"),
+            ("/blog/stale", "2023-01-01"), ("/about", "2024-06-09"))),
+        "/archive.xml": urlset(("/blog/2018", "2018-12-31")),
+    }
+
+
+@pytest.fixture
+def storage():
+    storage = Mock()
+    storage.awrite_json = AsyncMock()
+    return storage
+
+
+def build_search(storage, **kwargs) -> SitemapSearch:
+    settings = Build.settings(discovery_since_days=365 * 100, discovery_include_paths=["/blog/*"], **kwargs)
+    return SitemapSearch(settings=settings, storage=storage)
+
+
+class TestSitemapSearch:
+    """Test page discovery from the sitemaps of a site"""
+
+    @pytest.mark.asyncio
+    async def test_discovers_pages_through_robots_and_nested_sitemaps(self, storage):
+        """Test robots.txt, sitemap indexes, gzip, path filters and the ordering"""
+        documents = {}
+        async with serve(documents) as (base, requested):
+            documents.update(site_documents(base))
+            search = build_search(storage)
+
+            results = await search.search(base, "2024/06/10")
+
+        assert [result.url for result in results] == [
+            f"{base}/blog/recent", f"{base}/blog/older", f"{base}/blog/stale", f"{base}/blog/2018"]
+        assert "/missing.xml" in requested
+        storage.awrite_json.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    async def test_lastmod_filter_skips_old_sitemaps(self, storage):
+        """Test that nested sitemaps older than the cut-off are not fetched"""
+        documents = {}
+        async with serve(documents) as (base, requested):
+            documents.update(site_documents(base))
+            search = build_search(storage)
+            discovery_filter = DiscoveryFilter(datetime(2024, 6, 1, tzinfo=timezone.utc), ["/blog/*"])
+
+            found = await search.discover(f"{base}/sitemap_index.xml", discovery_filter)
+
+        assert [item.url for item in found] == [f"{base}/blog/recent", f"{base}/blog/older"]
+        assert "/archive.xml" not in requested
+        assert "/robots.txt" not in requested
+
+    @pytest.mark.asyncio
+    async def test_falls_back_to_the_default_sitemap_and_caps_documents(self, storage):
+        """Test the /sitemap.xml fallback and the limit on fetched documents"""
+        documents = {}
+        async with serve(documents) as (base, requested):
+            documents.update(site_documents(base))
+            documents["/sitemap.xml"] = documents.pop("/sitemap_index.xml")
+            del documents["/robots.txt"]
+            search = build_search(storage, discovery_max_documents=2, discovery_concurrency=1)
+
+            found = await search.discover(base)
+
+        assert requested == ["/robots.txt", "/sitemap.xml", "/posts.xml.gz"]
+        assert len(found) == 3
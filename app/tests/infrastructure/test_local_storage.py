@@ -0,0 +1,271 @@
+# app/tests/infrastructure/test_local_storage.py
+
+import asyncio
+import json
+import threading
+
+import pytest
+from infrastructure.local_services import LocalStorage
+from tests.builders.build import Build
+
+
+def build_storage(tmp_path, **kwargs) -> LocalStorage:
+    settings = Build.settings(local_storage_path=str(tmp_path), **kwargs)
+    return LocalStorage(settings=settings)
+
+
+def scrape_result(url: str) -> dict:
+    return Build.scrape_result(url=url).model_dump()
+
+
+class TestLocalStorage:
+    """Test the write-behind buffer of the local storage"""
+
+    @pytest.mark.asyncio
+    async def test_async_writes_are_buffered_until_flush(self, tmp_path):
+        """Test that async writes reach the disk only once flushed"""
+        storage = build_storage(tmp_path, local_storage_flush_interval_ms=60000)
+
+        await storage.awrite_json("scrape/success/a_scraped.json",
+                                  scrape_result("https://example.com/a"))
+
+        assert not (tmp_path / "scrape/success/a_scraped.json").exists()
+        await storage.aflush()
+        assert (tmp_path / "scrape/success/a_scraped.json").exists()
+        storage.close()
+
+    @pytest.mark.asyncio
+    async def test_reads_see_buffered_writes(self, tmp_path):
+        """Test read-your-writes before the buffer is flushed"""
+        storage = build_storage(tmp_path, local_storage_flush_interval_ms=60000)
+
+        await storage.awrite_json("scrape/success/a_scraped.json",
+                                  scrape_result("https://example.com/a"))
+
+        assert storage.read_json(
+            "scrape/success/a_scraped.json")["url"] == "https://example.com/a"
+        data = await storage.aread_json("scrape/success/a_scraped.json")
+        assert data["url"] == "https://example.com/a"
+        storage.close()
+
+    @pytest.mark.asyncio
+    async def test_full_batch_is_flushed_without_waiting(self, tmp_path):
+        """Test that reaching the batch size starts a flush immediately"""
+        storage = build_storage(tmp_path, local_storage_write_batch_size=2,
+                                local_storage_flush_interval_ms=60000)
+
+        for name in ("a", "b"):
+            await storage.awrite_json(f"scrape/success/{name}_scraped.json",
+                                      scrape_result(f"https://example.com/{name}"))
+        await asyncio.gather(*storage._inflight)
+
+        assert sorted(p.name for p in (tmp_path / "scrape/success").iterdir()) == [
+            "a_scraped.json", "b_scraped.json"]
+        storage.close()
+
+    @pytest.mark.asyncio
+    async def test_flush_interval_writes_partial_batch(self, tmp_path):
+        """Test that a partial batch is written after the flush interval"""
+        storage = build_storage(tmp_path, local_storage_flush_interval_ms=10)
+
+        await storage.awrite_json("scrape/success/a_scraped.json",
+                                  scrape_result("https://example.com/a"))
+        await asyncio.sleep(0.05)
+        await asyncio.gather(*storage._inflight)
+
+        assert (tmp_path / "scrape/success/a_scraped.json").exists()
+        storage.close()
+
+    @pytest.mark.asyncio
+    async def test_listing_includes_buffered_writes(self, tmp_path):
+        """Test that listings flush first so new files are never missed"""
+        storage = build_storage(tmp_path, local_storage_flush_interval_ms=60000)
+
+        await storage.awrite_json("scrape/success/a_scraped.json",
+                                  scrape_result("https://example.com/a"))
+
+        assert await storage.alist("scrape/success") == [
+            "scrape/success/a_scraped.json"]
+        storage.close()
+
+    @pytest.mark.asyncio
+    async def test_close_writes_pending_files(self, tmp_path):
+        """Test that closing the storage loses no buffered write"""
+        storage = build_storage(tmp_path, local_storage_flush_interval_ms=60000)
+
+        await storage.awrite_json("scrape/success/a_scraped.json",
+                                  scrape_result("https://example.com/a"))
+        await storage.aclose()
+
+        assert (tmp_path / "scrape/success/a_scraped.json").exists()
+
+    @pytest.mark.asyncio
+    async def test_sync_write_supersedes_buffered_write(self, tmp_path):
+        """Test that a direct write is not overwritten by an older buffered one"""
+        storage = build_storage(tmp_path, local_storage_flush_interval_ms=60000)
+
+        await storage.awrite_json("scrape/success/a_scraped.json",
+                                  scrape_result("https://example.com/old"))
+        storage.write_json("scrape/success/a_scraped.json",
+                           scrape_result("https://example.com/new"))
+        await storage.aclose()
+
+        assert storage.read_json(
+            "scrape/success/a_scraped.json")["url"] == "https://example.com/new"
+
+    @pytest.mark.asyncio
+    async def test_sync_write_supersedes_in_flight_write(self, tmp_path):
+        """Test that a direct write wins over an older batch already handed to the I/O pool"""
+        storage = build_storage(tmp_path, local_storage_flush_interval_ms=60000)
+        released = threading.Event()
+        write_batch = storage._write_batch
+        storage._write_batch = lambda batch: released.wait() and write_batch(batch)
+
+        await storage.awrite_json("scrape/success/a_scraped.json",
+                                  scrape_result("https://example.com/old"))
+        storage._start_flush()
+        try:
+            storage.write_json("scrape/success/a_scraped.json",
+                               scrape_result("https://example.com/new"))
+            assert storage.read_json(
+                "scrape/success/a_scraped.json")["url"] == "https://example.com/new"
+        finally:
+            released.set()
+        await asyncio.gather(*storage._inflight)
+        assert json.loads((tmp_path / "scrape/success/a_scraped.json").read_bytes())[
+            "url"] == "https://example.com/new"
+        storage.close()
+
+
+class TestLocalStorageLifecycle:
+    """Test closing the local storage and using it from several event loops"""
+
+    def test_close_unregisters_the_exit_handler(self, tmp_path, monkeypatch):
+        """Test that closing drops the exit handler, once"""
+        registered = []
+        monkeypatch.setattr("atexit.register", registered.append)
+        monkeypatch.setattr("atexit.unregister", registered.remove)
+        storage = build_storage(tmp_path)
+
+        storage.close()
+        storage.close()
+
+        assert registered == []
+
+    def test_reads_and_listings_work_after_close(self, tmp_path):
+        """Test that async reads fall back to a default thread once the I/O pool is shut down"""
+        storage = build_storage(tmp_path)
+        storage.write("scrape/success/a_scraped.json", b"{}")
+        storage.close()
+
+        async def read_and_list():
+            return await storage.aread("scrape/success/a_scraped.json"), await storage.alist("scrape/success")
+
+        assert asyncio.run(read_and_list()) == (b"{}", ["scrape/success/a_scraped.json"])
+
+    def test_flush_timer_follows_the_writing_loop(self, tmp_path):
+        """Test that a write from a new loop schedules its flush there, not on the finished loop"""
+        storage = build_storage(tmp_path, local_storage_flush_interval_ms=10)
+
+        async def write(name: str):
+            await storage.awrite_json(f"scrape/success/{name}_scraped.json",
+                                      scrape_result(f"https://example.com/{name}"))
+
+        async def write_and_wait(name: str):
+            await write(name)
+            await asyncio.sleep(0.05)
+            await asyncio.gather(*storage._inflight)
+
+        asyncio.run(write("a"))
+        asyncio.run(write_and_wait("b"))
+
+        assert sorted(p.name for p in (tmp_path / "scrape/success").iterdir()) == [
+            "a_scraped.json", "b_scraped.json"]
+        storage.close()
+
+class TestLocalStorageListing:
+    """Test the streaming listing of the local storage"""
+
+    @pytest.fixture
+    def storage(self, tmp_path):
+        storage = build_storage(tmp_path)
+        for name in ("2024/01/31/scrape/success/a_scraped.json",
+                     "2024/02/01/scrape/success/b_scraped.json",
+                     "2024/02/01/scrape/success/b_scraped.txt",
+                     "2024/02/01/scrape/failed/c_scraped.json",
+                     "2024/03/01/scrape/success/d_scraped.json",
+                     "exports/_manifest.json"):
+            storage.write(name, b"{}")
+        yield storage
+        storage.close()
+
+    def test_list_all_files_lists_direct_children_only(self, storage):
+        """Test that the flat listing does not recurse"""
+        assert storage.list_all_files("2024/02/01/scrape/success") == [
+            "2024/02/01/scrape/success/b_scraped.json",
+            "2024/02/01/scrape/success/b_scraped.txt",
+        ]
+        assert storage.list_all_files("2024/02/01") == []
+
+    def test_iter_files_recurses_in_name_order(self, storage):
+        """Test that the recursive walk yields every file in string order"""
+        names = list(storage.iter_files("", recursive=True))
+
+        assert names == sorted(names)
+        assert len(names) == 6
+
+    def test_iter_files_filters_by_suffix_and_pattern(self, storage):
+        """Test the suffix and glob filters on file names"""
+        assert list(storage.iter_files("2024", recursive=True, suffix=".txt")) == [
+            "2024/02/01/scrape/success/b_scraped.txt"]
+        assert list(storage.iter_files("2024", recursive=True, pattern="[cd]_*.json")) == [
+            "2024/02/01/scrape/failed/c_scraped.json",
+            "2024/03/01/scrape/success/d_scraped.json",
+        ]
+
+    def test_iter_files_prunes_date_partitions(self, storage, monkeypatch):
+        """Test that partitions outside the date range are never scanned"""
+        scanned = []
+        original = storage._walk
+
+        def walk(folder, *args):
+            scanned.append(folder)
+            return original(folder, *args)
+
+        monkeypatch.setattr(storage, "_walk", walk)
+
+        names = list(storage.iter_files("", recursive=True,
+                                        date_from="2024-02-01", date_to="2024-02-29"))
+
+        assert names == [
+            "2024/02/01/scrape/failed/c_scraped.json",
+            "2024/02/01/scrape/success/b_scraped.json",
+            "2024/02/01/scrape/success/b_scraped.txt",
+        ]
+        assert "2024/01" not in scanned
+        assert "2024/03" not in scanned
+        assert "exports" not in scanned
+
+    def test_iter_files_paginates(self, storage):
+        """Test that start_after and limit page through the listing"""
+        first = list(storage.iter_files("", recursive=True, limit=4))
+        second = list(storage.iter_files(
+            "", recursive=True, start_after=first[-1], limit=4))
+
+        assert first + second == list(storage.iter_files("", recursive=True))
+        assert len(second) == 2
+
+    def test_iter_files_orders_folders_like_names(self, storage):
+        """Test that a folder and a file sharing a prefix keep string order"""
+        storage.write("x/a/b.json", b"{}")
+        storage.write("x/a-c.json", b"{}")
+
+        assert list(storage.iter_files("x", recursive=True)) == [
+            "x/a-c.json", "x/a/b.json"]
+        assert list(storage.iter_files("x", recursive=True, start_after="x/a-c.json")) == [
+            "x/a/b.json"]
+
+    def test_iter_files_missing_path_raises(self, storage):
+        """Test that a missing folder raises like list_all_files"""
+        with pytest.raises(FileNotFoundError):
+            list(storage.iter_files("missing"))
@@ -0,0 +1,65 @@
+# app/tests/infrastructure/test_metrics_exporter.py
+
+import json
+import urllib.request
+
+import pytest
+from core.metrics import REGISTRY
+from core.tracing import TRACER
+from infrastructure.metrics_exporter import MetricsExporter
+from tests.builders.build import Build
+
+
+@pytest.fixture
+def exporter(tmp_path):
+    settings = Build.settings(
+        metrics_enabled=True,
+        metrics_http_port=0,
+        metrics_file_path=str(tmp_path / "metrics.prom"),
+        metrics_traces_path=str(tmp_path / "traces.jsonl"),
+        metrics_export_interval_seconds=60,
+    )
+    exporter = MetricsExporter(settings=settings)
+    yield exporter
+    exporter.close()
+
+
+class TestMetricsExporter:
+    """Test the Prometheus endpoint and the file exporter"""
+
+    def test_serves_the_registry_over_http(self, exporter):
+        """Test that /metrics answers in the Prometheus text format"""
+        REGISTRY.counter("exporter_test_total", "Exporter test").inc()
+        exporter.start()
+
+        with urllib.request.urlopen(f"http://127.0.0.1:{exporter.port}/metrics") as response:
+            body = response.read().decode()
+            content_type = response.headers["Content-Type"]
+
+        assert content_type.startswith("text/plain; version=0.0.4")
+        assert "# TYPE exporter_test_total counter" in body
+
+    def test_close_writes_metrics_and_traces(self, exporter, tmp_path):
+        """Test that the last export on close leaves the metrics file and the spans"""
+        exporter.start()
+        with TRACER.span("scrape", url="https://example.com/post"):
+            pass
+
+        exporter.close()
+
+        assert "# HELP" in (tmp_path / "metrics.prom").read_text()
+        spans = [json.loads(line) for line in (tmp_path / "traces.jsonl").read_text().splitlines()]
+        assert [s["name"] for s in spans] == ["scrape"]
+        assert spans[0]["attributes"]["url"] == "https://example.com/post"
+        assert not TRACER.enabled
+
+    def test_disabled_exporter_does_nothing(self, tmp_path):
+        """Test that nothing is served or written unless metrics are enabled"""
+        exporter = MetricsExporter(settings=Build.settings(
+            metrics_http_port=0, metrics_file_path=str(tmp_path / "metrics.prom")))
+
+        exporter.start()
+        exporter.close()
+
+        assert exporter.port is None
+        assert not (tmp_path / "metrics.prom").exists()
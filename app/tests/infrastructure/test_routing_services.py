@@ -0,0 +1,45 @@
+# app/tests/infrastructure/test_routing_services.py
+import pytest
+from configuration import Settings
+from core.chat_model import ChatModelProvider
+from core.domain import ModelHost
+from infrastructure.anthropic_services import AnthropicModule
+from infrastructure.routing_services import LLMRoutingModule, RoutingChatModelProvider
+from injector import Injector
+from tests.builders.build import Build
+
+
+def build_injector(settings: Settings) -> Injector:
+    return Injector([
+        lambda binder: binder.bind(Settings, to=settings),
+        AnthropicModule(llm_model_host=ModelHost.ROUTING),
+        LLMRoutingModule(llm_model_host=ModelHost.ROUTING),
+    ])
+
+
+def test_routes_over_every_anthropic_endpoint():
+    """Test that each configured Anthropic endpoint is a host the routing provider can use"""
+    settings = Build.settings(
+        llm_host=ModelHost.ROUTING, llm_routing_hosts="anthropic,backup",
+        anthropic_endpoints={"backup": {"API_KEY": "backup_api_key", "API_URL": "https://proxy.example"}})
+    injector = build_injector(settings)
+
+    providers = injector.get(dict[str, ChatModelProvider])
+    provider = injector.get(ChatModelProvider)
+
+    assert sorted(providers) == ["anthropic", "backup"]
+    assert isinstance(provider, RoutingChatModelProvider)
+    assert [route.name for route in provider.router.routes] == ["anthropic", "backup"]
+    default_model = providers["anthropic"].get_chat_model()
+    backup_model = providers["backup"].get_chat_model()
+    assert default_model.anthropic_api_key.get_secret_value() == "test_api_key"
+    assert backup_model.anthropic_api_key.get_secret_value() == "backup_api_key"
+    assert backup_model.anthropic_api_url == "https://proxy.example"
+
+
+def test_routing_to_an_unknown_host_fails_at_startup():
+    """Test that listing a host without a registered provider is rejected"""
+    settings = Build.settings(llm_host=ModelHost.ROUTING, llm_routing_hosts="anthropic,backup")
+
+    with pytest.raises(ValueError, match="backup"):
+        build_injector(settings).get(ChatModelProvider)
@@ -0,0 +1,60 @@
+# app/tests/infrastructure/test_run_profiler.py
+
+import asyncio
+import json
+import time
+
+import pytest
+from core.profiling import current_stage, stage_scope
+from infrastructure.profiling import RunProfiler
+
+
+def crunch(n: int) -> int:
+    return sum(i * i for i in range(n))
+
+
+async def analysis_worker() -> None:
+    with stage_scope("analysis"):
+        for _ in range(3):
+            await asyncio.to_thread(crunch, 200_000)
+
+
+async def blocking_worker() -> None:
+    with stage_scope("scrape"):
+        await asyncio.sleep(0)
+        # blocks the event loop, as a synchronous call in a coroutine would
+        time.sleep(0.15)
+
+
+@pytest.mark.asyncio
+async def test_stage_scope_reaches_threads():
+    """Test that the stage follows the work into asyncio.to_thread"""
+    with stage_scope("analysis"):
+        assert await asyncio.to_thread(current_stage) == "analysis"
+    assert current_stage() is None
+
+
+@pytest.mark.asyncio
+async def test_profiler_reports_stages_executor_and_slow_callbacks(tmp_path):
+    """Test that a profiled run writes every report with the work attributed to its stage"""
+    async with RunProfiler(tmp_path, top_n=10, sample_interval=0.001, lag_interval=0.01,
+                           slow_callback_seconds=0.1) as profiler:
+        await asyncio.gather(analysis_worker(), blocking_worker())
+
+    summary = json.loads((tmp_path / "profile_summary.json").read_text())
+    executor = summary["executor"][f"analysis {__name__}.crunch"]
+    assert executor["calls"] == 3
+    assert executor["run_seconds"] > 0
+
+    slow = summary["slow_callbacks"]
+    assert slow and slow[0]["stage"] == "scrape"
+    assert "blocking_worker" in slow[0]["callback"]
+    assert summary["loop"]["blocked_seconds"] >= 0.15
+    assert summary["loop"]["lag_max_seconds"] >= 0.1
+
+    folded = (tmp_path / "profile.folded").read_text()
+    assert "executor;analysis;" in folded
+    assert "crunch" in folded
+    assert (tmp_path / "event_loop.pstats").exists()
+    assert "crunch" in (tmp_path / "profile_summary.txt").read_text()
+    assert profiler.output_dir == tmp_path
@@ -0,0 +1,173 @@
+# app/tests/infrastructure/test_s3_storage.py
+
+import pytest
+from infrastructure.aws_services import S3Storage
+from tests.builders.build import Build
+
+
+class NoSuchKey(Exception):
+    def __init__(self):
+        super().__init__("NoSuchKey")
+        self.response = {"Error": {"Code": "NoSuchKey"}}
+
+
+class FakeBody:
+    def __init__(self, data: bytes):
+        self._data = data
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *args):
+        return None
+
+    async def read(self) -> bytes:
+        return self._data
+
+
+class FakeS3Client:
+    """In-memory stand-in for the subset of the S3 API used by S3Storage"""
+
+    def __init__(self, page_size: int = 2):
+        self.objects: dict[str, bytes] = {}
+        self.uploads: dict[str, dict[int, bytes]] = {}
+        self.calls: list[str] = []
+        self.page_size = page_size
+
+    async def get_object(self, Bucket, Key):
+        self.calls.append("get_object")
+        if Key not in self.objects:
+            raise NoSuchKey()
+        return {"Body": FakeBody(self.objects[Key])}
+
+    async def put_object(self, Bucket, Key, Body, ContentType=None):
+        self.calls.append("put_object")
+        self.objects[Key] = Body
+
+    async def delete_object(self, Bucket, Key):
+        self.objects.pop(Key, None)
+
+    async def create_multipart_upload(self, Bucket, Key, ContentType=None):
+        upload_id = f"upload-{len(self.uploads)}"
+        self.uploads[upload_id] = {}
+        return {"UploadId": upload_id}
+
+    async def upload_part(self, Bucket, Key, UploadId, PartNumber, Body):
+        self.calls.append("upload_part")
+        self.uploads[UploadId][PartNumber] = Body
+        return {"ETag": f"etag-{PartNumber}"}
+
+    async def complete_multipart_upload(self, Bucket, Key, UploadId, MultipartUpload):
+        parts = self.uploads.pop(UploadId)
+        self.objects[Key] = b"".join(parts[p["PartNumber"]] for p in MultipartUpload["Parts"])
+
+    async def abort_multipart_upload(self, Bucket, Key, UploadId):
+        self.uploads.pop(UploadId, None)
+
+    async def list_objects_v2(self, Bucket, Prefix, MaxKeys, Delimiter=None,
+                              StartAfter=None, ContinuationToken=None):
+        self.calls.append("list_objects_v2")
+        start = ContinuationToken or StartAfter or ""
+        keys = [k for k in sorted(self.objects) if k.startswith(Prefix) and k > start]
+        if Delimiter:
+            keys = [k for k in keys if Delimiter not in k[len(Prefix):]]
+        page = keys[:min(MaxKeys, self.page_size)]
+        truncated = len(keys) > len(page)
+        return {
+            "Contents": [{"Key": k} for k in page],
+            "IsTruncated": truncated,
+            "NextContinuationToken": page[-1] if truncated else None,
+        }
+
+
+class FakeS3Storage(S3Storage):
+    def __init__(self, settings, client: FakeS3Client):
+        self.client = client
+        super().__init__(settings)
+
+    async def _create_client(self):
+        return self.client
+
+
+@pytest.fixture
+def client():
+    return FakeS3Client()
+
+
+def build_storage(client: FakeS3Client, **kwargs) -> FakeS3Storage:
+    return FakeS3Storage(Build.settings(app_host="aws", **kwargs), client)
+
+
+@pytest.fixture
+def storage(client):
+    storage = build_storage(client, aws_s3_prefix="data")
+    yield storage
+    storage.close()
+
+
+class TestS3Storage:
+    """Test the S3 storage against an in-memory client"""
+
+    def test_write_and_read_json(self, storage, client):
+        """Test that JSON objects round trip under the key prefix"""
+        storage.write_json("2024/01/01/scrape/success/a_scraped.json",
+                           Build.scrape_result(url="https://example.com/a").model_dump())
+
+        assert "data/2024/01/01/scrape/success/a_scraped.json" in client.objects
+        data = storage.read_json("2024/01/01/scrape/success/a_scraped.json")
+        assert data["url"] == "https://example.com/a"
+
+    def test_missing_object_raises_file_not_found(self, storage):
+        """Test that a missing key behaves like a missing file"""
+        with pytest.raises(FileNotFoundError):
+            storage.read("missing.json")
+
+    def test_large_exports_use_multipart_upload(self, client):
+        """Test that uploads over the threshold are sent in parts and reassembled"""
+        storage = build_storage(client, aws_s3_multipart_threshold_mb=5,
+                                aws_s3_multipart_chunk_mb=5)
+        data = bytes(range(256)) * (12 * 1024 * 1024 // 256)
+
+        url = storage.store_export("exports/part.parquet", data)
+
+        assert url == "s3://test-bucket/exports/part.parquet"
+        assert client.calls.count("upload_part") == 3
+        assert client.objects["exports/part.parquet"] == data
+        storage.close()
+
+    def test_write_many_json_writes_every_file(self, storage, client):
+        """Test the concurrent bulk write"""
+        storage.write_many_json({f"bulk/{i}.json": {"i": i} for i in range(20)})
+
+        assert len(client.objects) == 20
+        assert storage.read_json("bulk/7.json") == {"i": 7}
+
+    def test_listing_pages_and_filters(self, storage):
+        """Test prefix listing across pages, recursion, dates and pagination"""
+        for name in ("2024/01/31/scrape/success/a_scraped.json",
+                     "2024/02/01/scrape/success/b_scraped.json",
+                     "2024/02/01/scrape/success/c_scraped.json",
+                     "2024/03/01/scrape/success/d_scraped.json"):
+            storage.write(name, b"{}")
+
+        assert storage.list_all_files("2024/02/01/scrape/success") == [
+            "2024/02/01/scrape/success/b_scraped.json",
+            "2024/02/01/scrape/success/c_scraped.json",
+        ]
+        assert storage.list_all_files("2024/02/01") == []
+        assert list(storage.iter_files("", recursive=True, date_from="2024-02-01",
+                                       date_to="2024-02-29")) == [
+            "2024/02/01/scrape/success/b_scraped.json",
+            "2024/02/01/scrape/success/c_scraped.json",
+        ]
+        assert list(storage.iter_files("2024", recursive=True,
+                                       start_after="2024/02/01/scrape/success/c_scraped.json")) == [
+            "2024/03/01/scrape/success/d_scraped.json"]
+
+    @pytest.mark.asyncio
+    async def test_async_methods_share_the_client(self, storage, client):
+        """Test that async calls from another loop use the storage's client"""
+        await storage.awrite_json("async/a.json", {"a": 1})
+
+        assert await storage.aread_json("async/a.json") == {"a": 1}
+        assert client.objects["data/async/a.json"] == b'{"a":1}'
@@ -2,6 +2,7 @@
 from unittest.mock import patch
 
 import pytest
+from benchmarks.import_benchmark import import_profile
 from configuration import Settings
 from core.web_search import SearchEngine
 from infrastructure.service_collection import ServiceCollection, ServiceProvider
@@ -46,3 +47,11 @@ def _test_resolving_services(service_types: list[type], service_provider: Servic
     for service_type in service_types:
         service = service_provider.get(service_type)
         assert service is not None
+
+
+@pytest.mark.parametrize("module", ["infrastructure.service_collection", "worker"])
+def test_importing_entry_points_defers_heavy_dependencies(module: str):
+    """Test that playwright, langchain and the search client are only loaded by the services using them"""
+    profile = import_profile(module)
+
+    assert profile["heavy"] == []
@@ -0,0 +1,109 @@
+# app/tests/infrastructure/test_sqlite_analysis_index.py
+
+from datetime import date, datetime
+
+import pytest
+from core.pain_point_clustering import PainPointClusterer
+from infrastructure.sqlite_analysis_index import SQLiteAnalysisIndex
+from tests.builders.build import Build
+
+
+def analysis(url: str, analysis_date: date, *providers: tuple[str, list[tuple[str, str]]]) -> dict:
+    """An analysis with (provider, [(category, description)]) entries"""
+    return {
+        "url": url,
+        "title": url.rsplit("/", 1)[-1],
+        "analysis_date": datetime.combine(analysis_date, datetime.min.time()),
+        "content_type": "non_profit_resource_blog",
+        "service_providers": [{
+            "name": name,
+            "website": None,
+            "pain_points": [{"description": description, "category": category, "impact": "other",
+                             "source_quote": f"We said: {description.lower()}"}
+                            for category, description in pain_points],
+        } for name, pain_points in providers],
+    }
+
+
+@pytest.fixture
+def index(tmp_path):
+    index = SQLiteAnalysisIndex(settings=Build.settings(
+        analysis_index_sqlite_path=str(tmp_path / "analysis_index.db")))
+    index.record("2024/06/01/a.json", analysis(
+        "https://www.riverside.org/volunteers", date(2024, 6, 1),
+        ("Bloomerang", [("volunteer_and_recruitment_management", "Volunteer schedules live in spreadsheets"),
+                        ("fundraising_and_donor_relations", "Donor data is scattered")])))
+    index.record("2024/06/03/b.json", analysis(
+        "https://riverside.org/grants", date(2024, 6, 3),
+        ("bloomerang ", [("grants_and_funding_management", "Grant reports are copied by hand")]),
+        ("Neon One", [("volunteer_and_recruitment_management", "Scheduling volunteers by email")])))
+    index.record("2024/05/20/c.json", analysis(
+        "https://hope.org/post", date(2024, 5, 20),
+        ("Givebutter", [("fundraising_and_donor_relations", "Recurring donors are lost")])))
+    yield index
+    index.close()
+
+
+class TestSQLiteAnalysisIndex:
+    """Test the aggregate and full-text queries of the analysis index"""
+
+    def test_top_categories_within_dates(self, index):
+        """Test category counts and the inclusive date bounds"""
+        top = index.top_categories(since=date(2024, 6, 1))
+
+        assert [(facet.key, facet.pages, facet.pain_points) for facet in top] == [
+            ("volunteer_and_recruitment_management", 2, 2),
+            ("fundraising_and_donor_relations", 1, 1),
+            ("grants_and_funding_management", 1, 1),
+        ]
+        assert [facet.key for facet in index.top_categories(until=date(2024, 6, 1), limit=1)] == [
+            "fundraising_and_donor_relations"]
+
+    def test_providers_and_domains_roll_up(self, index):
+        """Test that provider names are grouped case-insensitively and domains drop www"""
+        providers = index.top_providers()
+        domains = index.top_domains()
+
+        assert (providers[0].pages, providers[0].pain_points) == (2, 3)
+        assert providers[0].key.strip().lower() == "bloomerang"
+        assert [(d.key, d.pages, d.pain_points, d.providers, d.last_analysis_date) for d in domains] == [
+            ("riverside.org", 2, 4, 3, "2024-06-03"), ("hope.org", 1, 1, 1, "2024-05-20")]
+
+    def test_full_text_search_stems_and_ranks(self, index):
+        """Test that words match their variants, all words must match and syntax is escaped"""
+        hits = index.search("volunteer scheduling")
+
+        assert {hit.url for hit in hits} == {"https://www.riverside.org/volunteers", "https://riverside.org/grants"}
+        assert "[" in hits[0].snippet
+        assert index.search("volunteer donors") == []
+        assert [hit.url for hit in index.search('"recurring* (')] == ["https://hope.org/post"]
+        assert index.search("  ") == []
+
+    def test_recording_again_replaces_the_analysis(self, index):
+        """Test that re-analyzing a page replaces its rows and full-text entries"""
+        index.record("2024/06/05/a.json", analysis(
+            "https://www.riverside.org/volunteers", date(2024, 6, 5),
+            ("Bloomerang", [("it_and_data_management", "Exports break every month")])))
+
+        assert index.stats() == {"analyses": 3, "providers": 4, "pain_points": 4}
+        assert index.search("spreadsheets") == []
+        assert [hit.date for hit in index.search("exports")] == ["2024-06-05"]
+
+    def test_clusters_pain_points(self, index):
+        """Test that clustering stores a cluster per pain point and reports them within dates"""
+        index.record("2024/06/04/d.json", analysis(
+            "https://hope.org/donors", date(2024, 6, 4),
+            ("Givebutter", [("fundraising_and_donor_relations", "Recurring donors are often lost")])))
+
+        stats = PainPointClusterer(Build.settings(clustering_similarity_threshold=0.5), index).run()
+        clusters = index.top_clusters()
+
+        assert (stats["pain_points"], stats["clustered"]) == (6, 2)
+        assert [(c.pages, c.pain_points, c.top_category, c.last_analysis_date) for c in clusters] == [
+            (2, 2, "fundraising_and_donor_relations", "2024-06-04")]
+        assert clusters[0].description in {"Recurring donors are lost", "Recurring donors are often lost"}
+        assert index.top_clusters(since=date(2024, 6, 1)) == []
+        assert len(index.top_clusters(since=date(2024, 6, 1), min_size=1)) == 5
+
+        index.record("2024/06/05/c.json", analysis("https://hope.org/post", date(2024, 6, 5)))
+        assert index.top_clusters() == []
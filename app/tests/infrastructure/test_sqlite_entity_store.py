@@ -0,0 +1,95 @@
+# app/tests/infrastructure/test_sqlite_entity_store.py
+
+from datetime import date
+
+import pytest
+from core.entity_resolution import EntityResolver, ProviderMention
+from infrastructure.sqlite_entity_store import SQLiteEntityStore
+from tests.builders.build import Build
+
+
+def mentions(url: str, *providers: tuple[str, str | None], day: str = "2024-06-01") -> list[ProviderMention]:
+    return [ProviderMention(url=url, provider_index=index, name=name, website=website, date=day)
+            for index, (name, website) in enumerate(providers)]
+
+
+@pytest.fixture
+def resolver(tmp_path):
+    settings = Build.settings(entity_sqlite_path=str(tmp_path / "entities.db"))
+    store = SQLiteEntityStore(settings=settings)
+    yield EntityResolver(settings=settings, store=store)
+    store.close()
+
+
+class TestSQLiteEntityStore:
+    """Test the incremental resolution of provider mentions into entities"""
+
+    def test_merges_name_and_domain_variants(self, resolver):
+        """Test names with legal suffixes and domain names resolving to one entity"""
+        first = resolver.resolve("https://a.org/1", mentions("https://a.org/1", ("Bloomerang", None)))
+        second = resolver.resolve("https://a.org/2", mentions(
+            "https://a.org/2", ("Bloomerang, Inc.", "https://bloomerang.co"), ("Givebutter", None)))
+        third = resolver.resolve("https://b.org/1", mentions("https://b.org/1", ("bloomerang.co", None)))
+
+        assert first[0] == second[0] == third[0] != second[1]
+        entity = resolver.store.get(first[0])
+        assert (entity.canonical_name, entity.domain, entity.mentions, entity.pages) == (
+            "Bloomerang", "bloomerang.co", 3, 3)
+        assert sorted(entity.aliases) == ["Bloomerang", "Bloomerang, Inc.", "bloomerang.co"]
+
+    def test_keeps_providers_with_different_domains_apart(self, resolver):
+        """Test the same name on different websites staying two entities"""
+        ids = resolver.resolve("https://a.org/1", mentions(
+            "https://a.org/1", ("Mercury", "mercury.com"), ("Mercury", "mercurynonprofit.org")))
+
+        assert ids[0] != ids[1]
+        assert len(resolver.store.find("Mercury")) == 2
+
+    def test_matches_misspelled_names(self, resolver):
+        """Test a close spelling matching an entity sharing its prefix, and a distant one not"""
+        first = resolver.resolve("https://a.org/1", mentions("https://a.org/1", ("DonorPerfect", None)))
+        second = resolver.resolve("https://a.org/2", mentions(
+            "https://a.org/2", ("Donor Perfct", None), ("DonorSnap", None)))
+
+        assert second[0] == first[0]
+        assert second[1] != first[0]
+
+    def test_bridging_mention_merges_entities(self, resolver):
+        """Test a mention sharing the name of one entity and the domain of another merging the two"""
+        by_name = resolver.resolve("https://a.org/1", mentions("https://a.org/1", ("Neon CRM", None)))
+        by_domain = resolver.resolve("https://a.org/2", mentions("https://a.org/2", ("NeonOne", "neoncrm.com")))
+        bridge = resolver.resolve("https://a.org/3", mentions("https://a.org/3", ("Neon CRM", "neoncrm.com")))
+
+        assert by_name[0] != by_domain[0]
+        assert resolver.store.get(by_name[0]).id == resolver.store.get(by_domain[0]).id == bridge[0]
+        assert resolver.store.get(bridge[0]).mentions == 3
+        assert resolver.store.stats() == {"mentions": 3, "entities": 1, "merged": 1}
+
+    def test_reanalysis_replaces_mentions(self, resolver):
+        """Test a page analyzed again replacing its mentions, and the top entities by date"""
+        resolver.resolve("https://a.org/1", mentions("https://a.org/1", ("Givebutter", None), ("Bloomerang", None)))
+        resolver.resolve("https://a.org/2", mentions("https://a.org/2", ("Bloomerang", None), day="2024-05-01"))
+        resolver.resolve("https://a.org/1", mentions("https://a.org/1", ("Givebutter", None)))
+
+        assert [(e.canonical_name, e.mentions) for e in resolver.store.top()] == [
+            ("Bloomerang", 1), ("Givebutter", 1)]
+        assert [e.canonical_name for e in resolver.store.top(since=date(2024, 6, 1))] == ["Givebutter"]
+        assert resolver.store.stats()["mentions"] == 2
+
+    def test_counters_follow_reanalysis_and_merges(self, resolver):
+        """Test the stored mention, page and date counters against a count of the mentions"""
+        resolver.resolve("https://a.org/1", mentions("https://a.org/1", ("Neon CRM", None), ("Neon CRM", None)))
+        resolver.resolve("https://a.org/2", mentions("https://a.org/2", ("NeonOne", "neoncrm.com"), day="2024-07-01"))
+        resolver.resolve("https://a.org/1", mentions(
+            "https://a.org/1", ("Neon CRM", None), ("NeonOne", "neoncrm.com"), day="2024-05-01"))
+        entity_id = resolver.resolve("https://a.org/3", mentions("https://a.org/3", ("Neon CRM", "neoncrm.com")))[0]
+        resolver.resolve("https://a.org/2", [])
+
+        entity = resolver.store.get(entity_id)
+        assert (entity.mentions, entity.pages, entity.last_seen) == (3, 2, "2024-06-01")
+        conn = resolver.store._pool.connection()
+        assert [tuple(row) for row in conn.execute(
+            """SELECT e.mentions, e.pages, e.last_seen FROM entities e WHERE e.parent_id IS NULL""")] == [
+            tuple(row) for row in conn.execute(
+                """SELECT COUNT(*), COUNT(DISTINCT url), MAX(date) FROM mentions GROUP BY entity_id""")]
+
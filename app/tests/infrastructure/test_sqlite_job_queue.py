@@ -0,0 +1,198 @@
+# app/tests/infrastructure/test_sqlite_job_queue.py
+
+import asyncio
+
+import pytest
+from core.job_queue import JobStatus
+from core.workers import QueueWorker
+from infrastructure.sqlite_job_queue import SQLiteJobQueue
+from tests.builders.build import Build
+
+
+class FakeClock:
+    def __init__(self, now: float = 1000.0):
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+@pytest.fixture
+def queue(tmp_path, clock):
+    settings = Build.settings(
+        job_queue_sqlite_path=str(tmp_path / "queue.db"),
+        job_queue_lease_seconds=60, job_queue_max_attempts=2, job_queue_retry_delay_seconds=10)
+    queue = SQLiteJobQueue(settings=settings)
+    queue._clock = clock
+    yield queue
+    queue.close()
+
+
+class TestSQLiteJobQueue:
+    """Test the SQLite job queue"""
+
+    def test_enqueue_deduplicates_by_key(self, queue):
+        """Test that a key is only enqueued once per queue"""
+        assert queue.enqueue("scrape", {"url": "a"}, key="a")
+        assert not queue.enqueue("scrape", {"url": "a"}, key="a")
+        assert queue.enqueue("analysis", {"url": "a"}, key="a")
+        assert queue.enqueue_many("scrape", [("a", {}), ("b", {}), ("c", {})]) == 2
+
+        assert queue.stats("scrape")[JobStatus.PENDING] == 3
+
+    def test_finished_key_can_be_enqueued_again(self, queue):
+        """Test that only pending and leased jobs block their key, e.g. for a later run"""
+        queue.enqueue("scrape", {"url": "a", "file_path": "run1"}, key="a")
+        queue.complete(queue.lease("scrape", "w1")[0])
+
+        assert queue.enqueue("scrape", {"url": "a", "file_path": "run2"}, key="a")
+        assert not queue.enqueue("scrape", {"url": "a", "file_path": "run3"}, key="a")
+        assert queue.lease("scrape", "w1")[0].payload["file_path"] == "run2"
+
+    def test_leases_in_order_of_readiness(self, queue, clock):
+        """Test that jobs are leased first in, first out, retries once their delay is over"""
+        queue.enqueue_many("scrape", [(key, {}) for key in "edcba"])
+        queue.fail(queue.lease("scrape", "w1")[0], "boom")
+        clock.now += 5
+        queue.enqueue("scrape", {}, key="f")
+
+        assert {job.key for job in queue.lease("scrape", "w1", limit=2)} == {"d", "c"}
+        assert {job.key for job in queue.lease("scrape", "w1", limit=2)} == {"b", "a"}
+        clock.now += 10
+        assert {job.key for job in queue.lease("scrape", "w1", limit=2)} == {"f", "e"}
+
+        # a lease that expired before a job was enqueued is taken over first
+        clock.now += 60
+        queue.enqueue("scrape", {}, key="g")
+        clock.now += 1
+        assert [job.key for job in queue.lease("scrape", "w2")] == ["d"]
+
+    def test_leases_do_not_overlap(self, queue):
+        """Test that two workers never lease the same job"""
+        queue.enqueue_many("scrape", [(str(i), {"i": i}) for i in range(5)])
+
+        first = queue.lease("scrape", "w1", limit=3)
+        second = queue.lease("scrape", "w2", limit=3)
+
+        assert len(first) == 3
+        assert len(second) == 2
+        assert not {job.id for job in first} & {job.id for job in second}
+        assert queue.lease("scrape", "w3") == []
+
+    def test_expired_lease_is_taken_over(self, queue, clock):
+        """Test that a job of a dead worker becomes visible again after its lease"""
+        queue.enqueue("scrape", {"url": "a"}, key="a")
+        stale = queue.lease("scrape", "w1")[0]
+
+        clock.now += 61
+        job = queue.lease("scrape", "w2")[0]
+
+        assert job.id == stale.id
+        assert job.attempts == 2
+        assert not queue.complete(stale)
+        assert queue.complete(job)
+        assert queue.stats("scrape")[JobStatus.DONE] == 1
+
+    def test_extend_keeps_the_lease(self, queue, clock):
+        """Test that a heartbeat keeps a running job invisible"""
+        queue.enqueue("scrape", {"url": "a"}, key="a")
+        job = queue.lease("scrape", "w1")[0]
+
+        clock.now += 50
+        assert queue.extend(job)
+        clock.now += 50
+
+        assert queue.lease("scrape", "w2") == []
+
+    def test_failed_job_retries_with_backoff_then_dead_letters(self, queue, clock):
+        """Test that failures are retried after a delay and dead-lettered when out of attempts"""
+        queue.enqueue("scrape", {"url": "a"}, key="a")
+        queue.fail(queue.lease("scrape", "w1")[0], "timeout")
+
+        assert queue.lease("scrape", "w1") == []
+        clock.now += 10
+        job = queue.lease("scrape", "w1")[0]
+        queue.fail(job, "timeout again")
+
+        dead = queue.dead_letters("scrape")
+        assert [(d.id, d.error) for d in dead] == [(job.id, "timeout again")]
+        assert queue.stats("scrape")[JobStatus.DEAD] == 1
+
+    def test_expired_lease_out_of_attempts_is_dead_lettered(self, queue, clock):
+        """Test that a job that keeps killing its workers ends in the dead letters"""
+        queue.enqueue("scrape", {"url": "a"}, key="a")
+        queue.lease("scrape", "w1")
+        clock.now += 61
+        queue.lease("scrape", "w2")
+        clock.now += 61
+
+        assert queue.lease("scrape", "w3") == []
+        assert queue.dead_letters("scrape")[0].error == "lease expired"
+
+    def test_requeue_dead(self, queue):
+        """Test that dead-lettered jobs get a new set of attempts"""
+        queue.enqueue("scrape", {"url": "a"}, key="a", max_attempts=1)
+        queue.fail(queue.lease("scrape", "w1")[0], "boom")
+
+        assert queue.requeue_dead("scrape") == 1
+        job = queue.lease("scrape", "w1")[0]
+        assert job.attempts == 1
+        assert job.payload == {"url": "a"}
+
+    def test_requeue_dead_skips_keys_enqueued_again(self, queue):
+        """Test that a dead job is not revived next to a new job with its key"""
+        queue.enqueue("scrape", {"url": "a"}, key="a", max_attempts=1)
+        queue.fail(queue.lease("scrape", "w1")[0], "boom")
+        queue.enqueue("scrape", {"url": "a"}, key="a")
+
+        assert queue.requeue_dead("scrape") == 0
+        assert queue.stats("scrape")[JobStatus.PENDING] == 1
+
+
+class TestQueueWorker:
+    """Test the worker loop over the SQLite job queue"""
+
+    @pytest.mark.asyncio
+    async def test_worker_runs_jobs_concurrently_until_idle(self, queue):
+        """Test that a worker completes successful jobs and fails the others"""
+        queue.enqueue_many("scrape", [(str(i), {"i": i}) for i in range(6)])
+        running = 0
+        peak = 0
+
+        async def handle(job):
+            nonlocal running, peak
+            running += 1
+            peak = max(peak, running)
+            await asyncio.sleep(0.01)
+            running -= 1
+            if job.payload["i"] == 0:
+                raise RuntimeError("boom")
+
+        worker = QueueWorker(queue, "scrape", handle, concurrency=3,
+                             lease_seconds=60, poll_seconds=0.01, worker_id="w1")
+        summary = await worker.run(stop_when_idle=True)
+
+        assert summary["completed"] == 5
+        assert summary["failed"] == 1
+        assert peak == 3
+        assert queue.stats("scrape")[JobStatus.PENDING] == 1
+
+    @pytest.mark.asyncio
+    async def test_worker_stops_after_max_jobs(self, queue):
+        """Test that a worker leases no more than max_jobs"""
+        queue.enqueue_many("scrape", [(str(i), {}) for i in range(5)])
+
+        async def handle(job):
+            pass
+
+        worker = QueueWorker(queue, "scrape", handle, concurrency=2,
+                             lease_seconds=60, poll_seconds=0.01, worker_id="w1")
+        summary = await worker.run(max_jobs=3)
+
+        assert summary["completed"] == 3
+        assert queue.stats("scrape")[JobStatus.PENDING] == 2
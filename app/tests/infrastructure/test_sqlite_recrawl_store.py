@@ -0,0 +1,30 @@
+# app/tests/infrastructure/test_sqlite_recrawl_store.py
+
+import pytest
+from core.recrawl import RecrawlRecord
+from infrastructure.sqlite_recrawl_store import SQLiteRecrawlStore
+from tests.builders.build import Build
+
+NOW = 1000.0
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = SQLiteRecrawlStore(settings=Build.settings(recrawl_sqlite_path=str(tmp_path / "recrawl.db")))
+    yield store
+    store.close()
+
+
+class TestSQLiteRecrawlStore:
+    """Test the recrawl records kept in SQLite"""
+
+    def test_claims_hide_pages_until_they_expire(self, store):
+        """Test that claimed pages are not handed out twice while the claim holds"""
+        store.track([RecrawlRecord(url=url, next_fetch_at=NOW, interval_seconds=3600)
+                     for url in ("https://blog.example/a", "https://blog.example/b")])
+
+        claimed = store.claim_due(NOW, 1, 3600)
+        assert store.stats(NOW) == {"tracked": 2, "due": 1}
+        assert [r.url for r in store.claim_due(NOW, 10, 3600)] != [r.url for r in claimed]
+        assert store.stats(NOW) == {"tracked": 2, "due": 0}
+        assert len(store.claim_due(NOW + 3600, 10, 3600)) == 2
@@ -0,0 +1,103 @@
+# app/tests/infrastructure/test_sqlite_storage.py
+
+import pytest
+from infrastructure.sqlite_storage import SQLiteStorage
+from tests.builders.build import Build
+
+
+@pytest.fixture
+def storage(tmp_path):
+    settings = Build.settings(
+        local_storage_path=str(tmp_path), local_storage_backend="sqlite")
+    storage = SQLiteStorage(settings=settings)
+    yield storage
+    storage.close()
+
+
+def scrape_result(url: str, success: bool = True) -> dict:
+    return Build.scrape_result(url=url, success=success).model_dump()
+
+
+class TestSQLiteStorage:
+    """Test the SQLite backed storage"""
+
+    def test_write_and_read_json(self, storage):
+        """Test that JSON files round trip through the database"""
+        storage.write_json("2024/01/01/scrape/success/a_scraped.json",
+                           scrape_result("https://example.com/a"))
+
+        data = storage.read_json("2024/01/01/scrape/success/a_scraped.json")
+
+        assert data["url"] == "https://example.com/a"
+        assert data["created_at"] == "2024-01-01T12:00:00"
+
+    def test_read_missing_file_raises(self, storage):
+        """Test that missing files behave like LocalStorage"""
+        with pytest.raises(FileNotFoundError):
+            storage.read("missing.json")
+
+    def test_list_all_files_only_lists_direct_children(self, storage):
+        """Test that listings use the folder index, not nested folders"""
+        storage.write_many_json({
+            "2024/01/01/scrape/success/a_scraped.json": scrape_result("https://example.com/a"),
+            "2024/01/01/scrape/success/b_scraped.json": scrape_result("https://example.com/b"),
+            "2024/01/01/scrape/failed/c_scraped.json": scrape_result("https://example.com/c", False),
+        })
+
+        assert storage.list_all_files("2024/01/01/scrape/success") == [
+            "2024/01/01/scrape/success/a_scraped.json",
+            "2024/01/01/scrape/success/b_scraped.json",
+        ]
+        assert storage.list_all_files("2024/01/01/scrape") == []
+        with pytest.raises(FileNotFoundError):
+            storage.list_all_files("2024/02")
+
+    def test_find_files_by_metadata(self, storage):
+        """Test domain, stage, status and date range lookups"""
+        storage.write_many_json({
+            "2024/01/01/scrape/success/a_scraped.json": scrape_result("https://www.example.com/a"),
+            "2024/01/20/scrape/success/b_scraped.json": scrape_result("https://example.com/b"),
+            "2024/02/01/scrape/success/c_scraped.json": scrape_result("https://example.com/c"),
+            "2024/01/05/scrape/success/d_scraped.json": scrape_result("https://other.org/d"),
+            "2024/01/06/scrape/failed/e_scraped.json": scrape_result("https://example.com/e", False),
+        })
+
+        found = storage.find_files(domain="example.com", stage="scrape", status="success",
+                                   date_from="2024-01-01", date_to="2024-01-31")
+
+        assert found == [
+            "2024/01/01/scrape/success/a_scraped.json",
+            "2024/01/20/scrape/success/b_scraped.json",
+        ]
+        assert storage.find_files(url="https://other.org/d") == [
+            "2024/01/05/scrape/success/d_scraped.json"]
+
+    def test_write_replaces_existing_file(self, storage):
+        """Test that writing the same name twice keeps the latest content"""
+        storage.write("exports/a.bin", b"first")
+        storage.write("exports/a.bin", b"second")
+
+        assert storage.read("exports/a.bin") == b"second"
+        storage.delete("exports/a.bin")
+        with pytest.raises(FileNotFoundError):
+            storage.read("exports/a.bin")
+
+    def test_iter_files_recurses_filters_and_paginates(self, storage):
+        """Test the streaming listing matches the LocalStorage semantics"""
+        storage.write_many_json({
+            "2024/01/31/scrape/success/a_scraped.json": scrape_result("https://example.com/a"),
+            "2024/02/01/scrape/success/b_scraped.json": scrape_result("https://example.com/b"),
+            "2024/02/01/scrape/failed/c_scraped.json": scrape_result("https://example.com/c", False),
+            "2024/03/01/scrape/success/d_scraped.json": scrape_result("https://example.com/d"),
+        })
+
+        assert list(storage.iter_files("2024", recursive=True, pattern="[bc]_*",
+                                       date_from="2024-02-01", date_to="2024-02-29")) == [
+            "2024/02/01/scrape/failed/c_scraped.json",
+            "2024/02/01/scrape/success/b_scraped.json",
+        ]
+        first = list(storage.iter_files("", recursive=True, limit=3))
+        assert list(storage.iter_files("", recursive=True, start_after=first[-1])) == [
+            "2024/03/01/scrape/success/d_scraped.json"]
+        with pytest.raises(FileNotFoundError):
+            list(storage.iter_files("2025", recursive=True))
@@ -29,14 +29,7 @@ def test_settings():
 
 @pytest.fixture
 def web_scraper(test_settings, mock_storage):
-    scraper = WebScraperGeneric(settings=test_settings, storage=mock_storage)
-    yield scraper
-    # Reset internal counters and lists
-    scraper._total_requests = 0
-    scraper._successful_requests = 0
-    scraper._failed_requests = 0
-    scraper._failed_urls.clear()
-    scraper._successful_urls.clear()
+    return WebScraperGeneric(settings=test_settings, storage=mock_storage)
 
 
 class TestWebScraperGeneric:
@@ -99,55 +92,72 @@ class TestWebScraperGeneric:
         mock_storage.write.assert_not_called()  # Verify failed result not saved
 
     @pytest.mark.asyncio
-    async def test_scrape_multiple_handles_mixed_results(self, web_scraper):
+    async def test_scrape_page_keeps_no_statistics_between_batches(self, web_scraper):
+        """Test that the statistics only cover the results of one batch"""
+        mock_page = AsyncMock()
+        mock_page.goto.side_effect = Exception("Failed to load")
+        first = await web_scraper._scrape_page("https://example.com/first", mock_page)
+        second = await web_scraper._scrape_page("https://example.com/second", mock_page)
+
+        result = web_scraper._get_statistics([second])
+
+        assert not first.success
+        assert result.total_requests == 1
+        assert result.failed_urls == ["https://example.com/second"]
+        assert result.successful_urls == []
+
+    @pytest.fixture
+    def browser(self):
+        """Playwright chain serving a success page, an error page and another success page"""
+        success_page = AsyncMock()
+        success_page.title.return_value = "Success Page"
+        success_page.query_selector.return_value.text_content.return_value = "Success Content"
+
+        error_page = AsyncMock()
+        error_page.goto.side_effect = Exception("Failed to load")
+
+        mock_context = AsyncMock()
+        mock_context.new_page.side_effect = [success_page, error_page, success_page]
+        mock_browser = AsyncMock()
+        mock_browser.new_context.return_value = mock_context
+        mock_playwright_instance = AsyncMock()
+        mock_playwright_instance.chromium.launch.return_value = mock_browser
+
+        # the scraper imports playwright when it opens a session
+        with patch("playwright.async_api.async_playwright") as mock_playwright:
+            mock_playwright.return_value.__aenter__.return_value = mock_playwright_instance
+            yield mock_browser
+
+    @pytest.mark.asyncio
+    async def test_session_scrapes_each_page_in_its_own_tab(self, web_scraper, browser):
+        """Test that a session shares one browser context and closes each tab"""
+        async with web_scraper.session() as session:
+            first = await session.scrape("https://example.com/success1")
+            second = await session.scrape("https://example.com/error")
+
+        context = browser.new_context.return_value
+        assert first.success and first.title == "Success Page"
+        assert not second.success
+        assert browser.new_context.call_count == 1
+        context.route.assert_awaited_once()
+        assert context.new_page.call_count == 2
+        assert browser.close.call_count == 1
+
+    @pytest.mark.asyncio
+    async def test_scrape_multiple_handles_mixed_results(self, web_scraper, browser):
         """Test scraping multiple URLs with mixed success/failure"""
-        # Setup - URLs to test
         urls = [
             "https://example.com/success1",
             "https://example.com/error",
             "https://example.com/success2"
         ]
 
-        # Mock playwright context
-        with patch('app.infrastructure.web_scrape_services.async_playwright') as mock_playwright:
-            # Setup success page
-            success_page = AsyncMock()
-            success_page.title.return_value = "Success Page"
-            success_page.query_selector.return_value.text_content.return_value = "Success Content"
-            success_page.goto = AsyncMock()  # Will succeed
-
-            # Setup error page
-            error_page = AsyncMock()
-            error_page.goto.side_effect = Exception("Failed to load")
-
-            # Setup browser context to return different pages
-            mock_context = AsyncMock()
-            mock_context.new_page.side_effect = [
-                success_page, error_page, success_page]
-            mock_context.route = AsyncMock()
-
-            # Setup browser chain
-            mock_browser = AsyncMock()
-            mock_browser.new_context.return_value = mock_context
-            mock_chromium = AsyncMock()
-            mock_chromium.launch.return_value = mock_browser
-            mock_playwright_instance = AsyncMock()
-            mock_playwright_instance.chromium = mock_chromium
-            mock_playwright.return_value.__aenter__.return_value = mock_playwright_instance
+        result = await web_scraper.scrape_multiple(urls)
 
-            # Test
-            result = await web_scraper.scrape_multiple(urls)
-
-            # Verify results
-            assert result.total_requests == 3
-            assert result.successful_requests == 2
-            assert result.failed_requests == 1
-            assert len(result.successful_urls) == 2
-            assert len(result.failed_urls) == 1
-            assert "https://example.com/error" in result.failed_urls
-            assert "https://example.com/success1" in result.successful_urls
-            assert "https://example.com/success2" in result.successful_urls
-
-            # Verify concurrent behavior
-            assert mock_context.new_page.call_count == 3  # Created page for each URL
-            assert mock_browser.close.call_count == 1  # Browser was closed
+        assert result.total_requests == 3
+        assert result.successful_requests == 2
+        assert result.failed_requests == 1
+        assert result.failed_urls == ["https://example.com/error"]
+        assert set(result.successful_urls) == {"https://example.com/success1", "https://example.com/success2"}
+        assert browser.new_context.return_value.new_page.call_count == 3  # Created page for each URL
+        assert browser.close.call_count == 1  # Browser was closed
@@ -0,0 +1,87 @@
+#!/usr/bin/env python
+"""
+Runs the pipeline as separate worker processes sharing a durable job queue. Start as many
+scrape and analysis workers as needed on one machine; the SQLite queue cannot be shared
+between machines.
+
+Usage: python worker.py enqueue <query> [<query> ...]
+       python worker.py scrape [--concurrency N] [--idle-exit]
+       python worker.py analyze [--concurrency N] [--idle-exit]
+       python worker.py stats
+       python worker.py requeue-dead {scrape,analysis}
+"""
+import argparse
+import asyncio
+import json
+import logging
+from datetime import datetime
+
+from core.job_queue import ANALYSIS_QUEUE, SCRAPE_QUEUE, JobQueue
+from core.storage import Storage
+from core.workers import PipelineWorkers
+from infrastructure.metrics_exporter import MetricsExporter
+from infrastructure.service_collection import ServiceCollection
+
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+    handlers=[logging.StreamHandler()]
+)
+
+QUEUE_COMMANDS = ("stats", "requeue-dead")
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Run pipeline workers over the job queue")
+    commands = parser.add_subparsers(dest="command", required=True)
+    enqueue = commands.add_parser("enqueue", help="Search the queries and enqueue the pages to scrape")
+    enqueue.add_argument("queries", nargs="+")
+    for name in ("scrape", "analyze"):
+        worker = commands.add_parser(name, help=f"Run a worker that takes {name} jobs")
+        worker.add_argument("--concurrency", type=int)
+        worker.add_argument("--idle-exit", action="store_true",
+                            help="Exit once the queue is empty instead of waiting for jobs")
+    commands.add_parser("stats", help="Print the job counts of the queues")
+    requeue = commands.add_parser("requeue-dead", help="Retry the dead-lettered jobs of a queue")
+    requeue.add_argument("queue", choices=[SCRAPE_QUEUE, ANALYSIS_QUEUE])
+    return parser.parse_args()
+
+
+async def main():
+    args = parse_args()
+    service_provider = ServiceCollection.add_services()
+    queue = service_provider.get(JobQueue)
+
+    # the queue commands only need the queue, so they skip building the pipeline services
+    if args.command in QUEUE_COMMANDS:
+        try:
+            if args.command == "stats":
+                print(json.dumps({name: queue.stats(name)
+                                  for name in (SCRAPE_QUEUE, ANALYSIS_QUEUE)}, indent=4))
+            elif args.command == "requeue-dead":
+                print(f"Requeued {queue.requeue_dead(args.queue)} jobs")
+        finally:
+            queue.close()
+        return
+
+    storage = service_provider.get(Storage)
+    metrics = service_provider.get(MetricsExporter)
+    metrics.start()
+    workers = service_provider.get(PipelineWorkers)
+
+    try:
+        if args.command == "enqueue":
+            folder_path = datetime.now().strftime("%Y/%m/%d")
+            print(f"Enqueued {await workers.enqueue_searches(args.queries, folder_path)} pages to scrape")
+        elif args.command == "scrape":
+            print(json.dumps(await workers.run_scrape_worker(args.concurrency, args.idle_exit), indent=4))
+        elif args.command == "analyze":
+            print(json.dumps(await workers.run_analysis_worker(args.concurrency, args.idle_exit), indent=4))
+    finally:
+        queue.close()
+        await storage.aclose()
+        metrics.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())